@@ -0,0 +1,240 @@
+"""
+Columnar file scoring
+Scores CSV/Parquet files chunk by chunk as NumPy columns and writes CSV/Parquet output
+
+Usage:
+    python -m app.batch.file_scorer portfolio.parquet scored.parquet
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
+import logging
+
+import numpy as np
+
+from app.config import API_FEATURES, FILE_SCORING_CHUNK_ROWS
+from app.models.model_service import model_service, RISK_CATEGORIES, RISK_STRATEGIES, round_probabilities
+from app.models.model_registry import model_registry, PRIMARY_VERSION
+from app.models.columnar_batch import valid_rows
+from app.utils.arrow import require_pyarrow
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INPUT_FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet'}
+OUTPUT_COLUMNS = ['recovery_probability', 'risk_category', 'recommended_strategy']
+
+# Bytes of CSV parsed per block (each block is then split into chunk_rows slices)
+CSV_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+def file_format(path: Path) -> str:
+    """
+    Detect the file format from the extension
+
+    Args:
+        path: CSV or Parquet file path
+
+    Returns:
+        'csv' or 'parquet'
+
+    Raises:
+        ValueError: If the extension is not supported
+    """
+    fmt = INPUT_FORMATS.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported file type '{Path(path).suffix}', expected .csv or .parquet")
+    return fmt
+
+
+def iter_batches(path: Path, chunk_rows: int = FILE_SCORING_CHUNK_ROWS) -> Iterator:
+    """
+    Read a CSV or Parquet file as Arrow record batches of at most chunk_rows rows
+
+    Args:
+        path: Input file
+        chunk_rows: Maximum rows per batch
+
+    Yields:
+        pyarrow.RecordBatch
+    """
+    pa = require_pyarrow("File scoring")
+
+    if file_format(path) == 'parquet':
+        parquet_file = pa.parquet.ParquetFile(path)
+        missing = set(API_FEATURES) - set(parquet_file.schema_arrow.names)
+        if missing:
+            raise ValueError(f"Input is missing required columns: {sorted(missing)}")
+        yield from parquet_file.iter_batches(batch_size=chunk_rows)
+        return
+
+    reader = pa.csv.open_csv(
+        path,
+        read_options=pa.csv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+        convert_options=pa.csv.ConvertOptions(column_types={name: pa.float64() for name in API_FEATURES})
+    )
+    missing = set(API_FEATURES) - set(reader.schema.names)
+    if missing:
+        raise ValueError(f"Input is missing required columns: {sorted(missing)}")
+
+    for batch in reader:
+        for start in range(0, batch.num_rows, chunk_rows):
+            yield batch.slice(start, chunk_rows)
+
+
+def score_batch(batch, bundle=None) -> tuple:
+    """
+    Score one Arrow record batch
+
+    Feature columns go straight from the Arrow buffers into float64 NumPy
+    arrays. Rows the prediction API would reject (missing, non-finite or
+    out-of-range features, see columnar_batch.valid_rows) get null outputs.
+
+    Args:
+        batch: pyarrow.RecordBatch containing the API_FEATURES columns
+        bundle: Bundle to score with (defaults to the served model)
+
+    Returns:
+        Tuple of (output RecordBatch, risk codes of valid rows, number of invalid rows)
+    """
+    pa = require_pyarrow("File scoring")
+
+    columns = {
+        name: batch.column(name).cast(pa.float64()).to_numpy(zero_copy_only=False)
+        for name in API_FEATURES
+    }
+    valid = valid_rows(columns)
+    n_invalid = int(batch.num_rows - np.count_nonzero(valid))
+
+    if n_invalid:
+        columns = {name: column[valid] for name, column in columns.items()}
+
+    probabilities, codes = model_service.predict_columns(columns, bundle=bundle)
+
+    if n_invalid:
+        full_probabilities = np.full(batch.num_rows, np.nan)
+        full_probabilities[valid] = probabilities
+        full_codes = np.zeros(batch.num_rows, dtype=np.int8)
+        full_codes[valid] = codes
+        mask = ~valid
+    else:
+        full_probabilities, full_codes, mask = probabilities, codes, None
+
+    categories = pa.array(RISK_CATEGORIES.tolist(), type=pa.string())
+    strategies = pa.array(RISK_STRATEGIES.tolist(), type=pa.string())
+    indices = pa.array(full_codes, type=pa.int8(), mask=mask)
+
+    output = pa.RecordBatch.from_arrays(
+        list(batch.columns) + [
+            pa.array(round_probabilities(full_probabilities), mask=mask),
+            pa.DictionaryArray.from_arrays(indices, categories),
+            pa.DictionaryArray.from_arrays(indices, strategies)
+        ],
+        names=list(batch.schema.names) + OUTPUT_COLUMNS
+    )
+    return output, codes, n_invalid
+
+
+class _OutputWriter:
+    """Writes record batches to Parquet (dictionary encoded) or CSV"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.format = file_format(path)
+        self._writer = None
+
+    def write(self, batch):
+        pa = require_pyarrow("File scoring")
+
+        if self.format == 'csv':
+            # CSV has no dictionary type, write the category strings
+            batch = pa.RecordBatch.from_arrays(
+                [
+                    column.dictionary_decode() if pa.types.is_dictionary(column.type) else column
+                    for column in batch.columns
+                ],
+                names=batch.schema.names
+            )
+            if self._writer is None:
+                self._writer = pa.csv.CSVWriter(self.path, batch.schema)
+        elif self._writer is None:
+            self._writer = pa.parquet.ParquetWriter(self.path, batch.schema)
+
+        self._writer.write_batch(batch)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_file(input_path: Path, output_path: Path, chunk_rows: Optional[int] = None,
+               version: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Score a CSV or Parquet file and write the input columns plus predictions
+
+    Only one chunk of chunk_rows rows is held in memory at a time.
+
+    Args:
+        input_path: CSV or Parquet file with the API_FEATURES columns
+        output_path: Output file (.parquet or .csv)
+        chunk_rows: Rows scored per chunk (defaults to FILE_SCORING_CHUNK_ROWS)
+        version: Registry version to score with (defaults to the primary model)
+
+    Returns:
+        Summary with row counts, risk category counts and throughput
+    """
+    chunk_rows = chunk_rows or FILE_SCORING_CHUNK_ROWS
+    if not model_service.is_model_loaded() and (not version or version == PRIMARY_VERSION):
+        raise RuntimeError("Model is not loaded. Please train the model first.")
+
+    bundle = model_registry.get(version) if version and version != PRIMARY_VERSION else None
+    started = time.perf_counter()
+    rows = 0
+    invalid_rows = 0
+    risk_counts = np.zeros(len(RISK_CATEGORIES), dtype=np.int64)
+
+    writer = _OutputWriter(output_path)
+    try:
+        for batch in iter_batches(Path(input_path), chunk_rows):
+            output, codes, n_invalid = score_batch(batch, bundle)
+            writer.write(output)
+            rows += batch.num_rows
+            invalid_rows += n_invalid
+            risk_counts += np.bincount(codes, minlength=len(RISK_CATEGORIES))
+    finally:
+        writer.close()
+
+    if rows == 0:
+        raise ValueError(f"Input file {input_path} has no rows")
+
+    seconds = time.perf_counter() - started
+    summary = {
+        'rows': rows,
+        'invalid_rows': invalid_rows,
+        'risk_categories': dict(zip(RISK_CATEGORIES.tolist(), risk_counts.tolist())),
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(rows / seconds, 1) if seconds > 0 else 0.0,
+        'output_path': str(output_path)
+    }
+    logger.info(f"✅ Scored {rows} rows from {input_path} in {seconds:.2f}s ({summary['rows_per_second']} rows/s)")
+    return summary
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file of debt cases")
+    parser.add_argument("input", type=Path, help="Input .csv or .parquet file with the API feature columns")
+    parser.add_argument("output", type=Path, help="Output .parquet or .csv file")
+    parser.add_argument("--chunk-rows", type=int, default=FILE_SCORING_CHUNK_ROWS, help="Rows scored per chunk")
+    parser.add_argument("--model-version", default=None, help="Registry version to score with")
+    args = parser.parse_args()
+
+    model_service.ensure_loaded()
+    summary = score_file(args.input, args.output, args.chunk_rows, args.model_version)
+    for key, value in summary.items():
+        logger.info(f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
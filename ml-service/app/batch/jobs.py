@@ -0,0 +1,502 @@
+"""
+Asynchronous batch scoring jobs
+A job is split into chunks on local disk and scored chunk by chunk by
+background workers. Progress is persisted after every chunk, so a restarted
+service resumes each unfinished job from its last completed chunk. Results
+are served one page per chunk while the job is still running.
+
+Layout of a job directory (JOBS_DIR/<job_id>/):
+    job.json            Manifest: status, rows per chunk, progress
+    source.<ext>        Uploaded CSV/Parquet file, until it is split into chunks
+    inputs/<n>.npz      Feature columns of chunk n
+    results/<n>.npz     Probabilities and risk codes of chunk n
+"""
+import asyncio
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import logging
+
+import numpy as np
+
+from app.config import API_FEATURES, JOBS_DIR, JOB_CHUNK_ROWS, JOB_WORKERS
+from app.models.model_service import (
+    model_service, RISK_CATEGORIES, RISK_STRATEGIES, LOAD_STATE_LOADING, round_probabilities
+)
+from app.models.model_registry import model_registry, PRIMARY_VERSION
+from app.models.inference_executor import inference_executor, InferenceExecutor
+from app.models.metrics import batch_size
+from app.models.columnar_batch import valid_rows
+from app.utils.arrow import require_pyarrow
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+UNFINISHED_STATES = (JOB_QUEUED, JOB_RUNNING)
+
+# Endpoint label of the job scoring metrics
+JOBS_METRIC_LABEL = "/jobs"
+
+MANIFEST_NAME = "job.json"
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# Seconds between checks while the primary model is still loading
+MODEL_WAIT_INTERVAL = 1.0
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _chunk_name(index: int) -> str:
+    return f"{index:05d}.npz"
+
+
+def _save_npz(path: Path, **arrays: np.ndarray):
+    """Write arrays to path atomically (a crash never leaves a partial file)"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def _save_chunks(columns: Dict[str, np.ndarray], directory: Path, chunk_rows: int,
+                 first_index: int = 0) -> List[int]:
+    """Split feature columns into chunk files and return the rows per chunk"""
+    n_rows = len(columns[API_FEATURES[0]])
+    rows = []
+    for index, start in enumerate(range(0, n_rows, chunk_rows), start=first_index):
+        chunk = {name: column[start:start + chunk_rows] for name, column in columns.items()}
+        _save_npz(directory / _chunk_name(index), **chunk)
+        rows.append(len(chunk[API_FEATURES[0]]))
+    return rows
+
+
+def split_file(source: Path, directory: Path, chunk_rows: int) -> List[int]:
+    """
+    Split a CSV or Parquet file into feature chunk files
+
+    Args:
+        source: Input file with the API_FEATURES columns
+        directory: Directory that receives the chunk files
+        chunk_rows: Maximum rows per chunk
+
+    Returns:
+        Number of rows of every chunk, in order
+    """
+    # pyarrow is only needed for file jobs
+    from app.batch.file_scorer import iter_batches
+    pa = require_pyarrow("File jobs")
+
+    rows = []
+    for batch in iter_batches(Path(source), chunk_rows):
+        columns = {
+            name: batch.column(name).cast(pa.float64()).to_numpy(zero_copy_only=False)
+            for name in API_FEATURES
+        }
+        rows += _save_chunks(columns, directory, chunk_rows, first_index=len(rows))
+    if not rows:
+        raise ValueError(f"Input file {Path(source).name} has no rows")
+    return rows
+
+
+def score_chunk(input_path: str, output_path: str, version: Optional[str] = None) -> int:
+    """
+    Score one chunk file and write its results (module level so it can be pickled)
+
+    Rows the prediction API would reject (missing, non-finite or out-of-range
+    features, see columnar_batch.valid_rows) get a NaN probability and risk
+    code -1.
+
+    Args:
+        input_path: Chunk file with the feature columns
+        output_path: Result file to write
+        version: Registry version to score with (defaults to the primary model)
+
+    Returns:
+        Number of invalid rows
+    """
+    with np.load(input_path) as data:
+        columns = {name: data[name] for name in API_FEATURES}
+
+    valid = valid_rows(columns)
+    n_invalid = int(len(valid) - np.count_nonzero(valid))
+    if n_invalid:
+        columns = {name: column[valid] for name, column in columns.items()}
+
+    bundle = model_registry.get(version) if version and version != PRIMARY_VERSION else None
+    probabilities, codes = model_service.predict_columns(columns, bundle=bundle)
+
+    if n_invalid:
+        full_probabilities = np.full(len(valid), np.nan)
+        full_probabilities[valid] = probabilities
+        full_codes = np.full(len(valid), -1, dtype=np.int8)
+        full_codes[valid] = codes
+        probabilities, codes = full_probabilities, full_codes
+
+    _save_npz(Path(output_path), probability=probabilities, code=codes)
+    return n_invalid
+
+
+def encode_page(job: Dict[str, Any], page: int, probabilities: np.ndarray, codes: np.ndarray) -> bytes:
+    """
+    Encode one result page as columnar JSON
+
+    Args:
+        job: Job manifest
+        page: Page (chunk) index
+        probabilities: Probabilities of the page (NaN for invalid rows)
+        codes: Risk codes of the page (-1 for invalid rows)
+
+    Returns:
+        JSON body with the page position and one array per output field;
+        invalid rows are null
+    """
+    invalid = codes < 0
+    recovery_probability = round_probabilities(probabilities).astype(object)
+    risk_category = RISK_CATEGORIES[codes]
+    recommended_strategy = RISK_STRATEGIES[codes]
+    if invalid.any():
+        recovery_probability[invalid] = None
+        risk_category[invalid] = None
+        recommended_strategy[invalid] = None
+
+    return json.dumps({
+        'job_id': job['job_id'],
+        'page': page,
+        'pages': len(job['chunk_rows']),
+        'offset': int(sum(job['chunk_rows'][:page])),
+        'rows': len(codes),
+        'recovery_probability': recovery_probability.tolist(),
+        'risk_category': risk_category.tolist(),
+        'recommended_strategy': recommended_strategy.tolist()
+    }).encode()
+
+
+class JobManager:
+    """
+    Creates, runs and serves asynchronous scoring jobs
+
+    Jobs wait in a queue for one of `workers` background tasks. A worker
+    scores a job's chunks in order on the inference executor and saves the
+    manifest after each one, so at most one chunk is lost when the service
+    stops. start() re-queues every job that was queued or running.
+    """
+
+    def __init__(self, directory: Path = JOBS_DIR, executor: InferenceExecutor = inference_executor,
+                 chunk_rows: int = JOB_CHUNK_ROWS, workers: int = JOB_WORKERS):
+        self.directory = Path(directory)
+        self._executor = executor
+        self.chunk_rows = max(1, chunk_rows)
+        self.workers = max(1, workers)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = set()
+        self._cancelled = set()
+
+    async def start(self):
+        """Start the workers and resume unfinished jobs"""
+        self._ensure_workers()
+        if not self.directory.exists():
+            return
+
+        resumed = 0
+        for manifest_path in sorted(self.directory.glob(f"*/{MANIFEST_NAME}")):
+            try:
+                job = self.get(manifest_path.parent.name)
+            except KeyError:
+                logger.warning(f"⚠️ Skipping unreadable job manifest {manifest_path}")
+                continue
+            if job['status'] in UNFINISHED_STATES and job['job_id'] not in self._running:
+                self._queue.put_nowait(job['job_id'])
+                resumed += 1
+        if resumed:
+            logger.info(f"Resuming {resumed} unfinished batch job(s)")
+
+    async def stop(self):
+        """Stop the workers; unfinished jobs resume on the next start()"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def create_from_columns(self, columns: Dict[str, np.ndarray], version: str = PRIMARY_VERSION) -> Dict[str, Any]:
+        """
+        Create a job from feature columns (split into chunks right away)
+
+        Args:
+            columns: Dictionary of API feature name to 1-D array
+            version: Model version to score with
+
+        Returns:
+            Job manifest
+        """
+        job = self._new_job(version, source=None)
+        inputs = self._job_dir(job['job_id']) / "inputs"
+        job['chunk_rows'] = _save_chunks(columns, inputs, self.chunk_rows)
+        self._save(job)
+        return job
+
+    def create_for_file(self, suffix: str, version: str = PRIMARY_VERSION) -> Dict[str, Any]:
+        """
+        Create a job for an uploaded file
+
+        The caller writes the upload to source_path(job) before submit(); the
+        worker splits it into chunks when the job starts.
+
+        Args:
+            suffix: File extension (.csv or .parquet)
+            version: Model version to score with
+
+        Returns:
+            Job manifest
+        """
+        job = self._new_job(version, source=f"source{suffix.lower()}")
+        self._save(job)
+        return job
+
+    def source_path(self, job: Dict[str, Any]) -> Path:
+        """Where the uploaded file of a file job is stored"""
+        return self._job_dir(job['job_id']) / job['source']
+
+    def submit(self, job_id: str):
+        """Queue a created job for scoring"""
+        self._ensure_workers()
+        self._queue.put_nowait(job_id)
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        """
+        Manifest of a job
+
+        Raises:
+            KeyError: If there is no such job
+        """
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+
+        manifest_path = self._job_dir(job_id) / MANIFEST_NAME
+        try:
+            job = json.loads(manifest_path.read_text())
+        except (OSError, ValueError):
+            raise KeyError(f"Unknown job '{job_id}'")
+        self._jobs[job_id] = job
+        return job
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        """
+        Progress of a job
+
+        Returns:
+            Dictionary with the state, row and chunk counts and progress (0-1)
+
+        Raises:
+            KeyError: If there is no such job
+        """
+        job = self.get(job_id)
+        chunks = job['chunk_rows']
+        total_rows = sum(chunks) if chunks is not None else None
+        return {
+            'job_id': job['job_id'],
+            'status': job['status'],
+            'model_version': job['model_version'],
+            'created_at': job['created_at'],
+            'started_at': job['started_at'],
+            'finished_at': job['finished_at'],
+            'total_rows': total_rows,
+            'rows_scored': job['rows_scored'],
+            'invalid_rows': job['invalid_rows'],
+            'chunks_total': len(chunks) if chunks is not None else None,
+            'chunks_completed': job['chunks_completed'],
+            'progress': round(job['rows_scored'] / total_rows, 4) if total_rows else 0.0,
+            'error': job['error']
+        }
+
+    def result_page(self, job_id: str, page: int) -> Optional[bytes]:
+        """
+        One page (chunk) of a job's results
+
+        Args:
+            job_id: Job id
+            page: Page index, 0-based
+
+        Returns:
+            Encoded page, or None if the page has not been scored yet
+
+        Raises:
+            KeyError: If there is no such job or page
+        """
+        job = self.get(job_id)
+        if job['chunk_rows'] is not None and not 0 <= page < len(job['chunk_rows']):
+            raise KeyError(f"Job '{job_id}' has no page {page}")
+        if page >= job['chunks_completed']:
+            return None
+
+        with np.load(self._job_dir(job_id) / "results" / _chunk_name(page)) as data:
+            return encode_page(job, page, data['probability'], data['code'])
+
+    def delete(self, job_id: str):
+        """
+        Delete a job and its files; a running job stops after its current chunk
+
+        Raises:
+            KeyError: If there is no such job
+        """
+        self.get(job_id)
+        if job_id in self._running:
+            self._cancelled.add(job_id)
+        else:
+            self._remove(job_id)
+
+    def _new_job(self, version: str, source: Optional[str]) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        job_dir = self._job_dir(job_id)
+        (job_dir / "inputs").mkdir(parents=True)
+        (job_dir / "results").mkdir()
+        job = {
+            'job_id': job_id,
+            'status': JOB_QUEUED,
+            'model_version': version,
+            'source': source,
+            'created_at': _now(),
+            'started_at': None,
+            'finished_at': None,
+            'chunk_rows': None,
+            'chunks_completed': 0,
+            'rows_scored': 0,
+            'invalid_rows': 0,
+            'error': None
+        }
+        self._jobs[job_id] = job
+        return job
+
+    def _job_dir(self, job_id: str) -> Path:
+        if not JOB_ID_PATTERN.match(job_id):
+            raise KeyError(f"Unknown job '{job_id}'")
+        return self.directory / job_id
+
+    def _save(self, job: Dict[str, Any]):
+        """Write the manifest atomically"""
+        manifest_path = self._job_dir(job['job_id']) / MANIFEST_NAME
+        tmp_path = manifest_path.with_name(MANIFEST_NAME + ".tmp")
+        tmp_path.write_text(json.dumps(job, indent=2))
+        os.replace(tmp_path, manifest_path)
+
+    def _remove(self, job_id: str):
+        self._jobs.pop(job_id, None)
+        self._cancelled.discard(job_id)
+        shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+
+    def _ensure_workers(self):
+        loop = asyncio.get_running_loop()
+        if self._tasks and self._loop is loop:
+            return
+        # Workers of a previous (closed) event loop cannot run anymore
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            if job_id in self._running:
+                continue
+            try:
+                job = self.get(job_id)
+            except KeyError:
+                # Deleted while queued
+                continue
+            if job['status'] not in UNFINISHED_STATES:
+                continue
+
+            self._running.add(job_id)
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job['status'] = JOB_FAILED
+                job['error'] = str(e)
+                job['finished_at'] = _now()
+                logger.error(f"❌ Batch job {job_id} failed: {e}")
+            finally:
+                self._running.discard(job_id)
+
+            if job_id in self._cancelled:
+                self._remove(job_id)
+                logger.info(f"Deleted batch job {job_id}")
+            elif job['status'] != JOB_RUNNING:
+                self._save(job)
+
+    async def _run(self, job: Dict[str, Any]):
+        """Score the remaining chunks of a job"""
+        job_id = job['job_id']
+        job_dir = self._job_dir(job_id)
+        version = job['model_version']
+
+        # Jobs resumed at startup may run before a background model load finishes
+        while (version == PRIMARY_VERSION and not model_service.is_model_loaded()
+               and model_service.get_status()['load_state'] == LOAD_STATE_LOADING):
+            await asyncio.sleep(MODEL_WAIT_INTERVAL)
+
+        job['status'] = JOB_RUNNING
+        job['started_at'] = job['started_at'] or _now()
+        self._save(job)
+
+        if job['chunk_rows'] is None:
+            source = self.source_path(job)
+            job['chunk_rows'] = await asyncio.to_thread(split_file, source, job_dir / "inputs", self.chunk_rows)
+            # Record the chunks before deleting the upload, so a restart never finds neither
+            self._save(job)
+        if job['source'] is not None:
+            # Also removes an upload left behind by a restart right after the save
+            self.source_path(job).unlink(missing_ok=True)
+
+        for index in range(job['chunks_completed'], len(job['chunk_rows'])):
+            if job_id in self._cancelled:
+                return
+
+            input_path = job_dir / "inputs" / _chunk_name(index)
+            output_path = job_dir / "results" / _chunk_name(index)
+            n_rows = job['chunk_rows'][index]
+            if output_path.exists():
+                # Scored before a restart, but the manifest was not saved
+                with np.load(output_path) as data:
+                    n_invalid = int(np.count_nonzero(data['code'] < 0))
+            else:
+                started = time.perf_counter()
+                try:
+                    n_invalid = await self._executor.run(score_chunk, str(input_path), str(output_path), version)
+                except Exception:
+                    model_registry.record_latency(version, time.perf_counter() - started, n_rows, error=True)
+                    raise
+                model_registry.record_latency(version, time.perf_counter() - started, n_rows)
+                batch_size.labels(JOBS_METRIC_LABEL).observe(n_rows)
+
+            input_path.unlink(missing_ok=True)
+            job['chunks_completed'] = index + 1
+            job['rows_scored'] += n_rows
+            job['invalid_rows'] += n_invalid
+            self._save(job)
+
+        job['status'] = JOB_COMPLETED
+        job['finished_at'] = _now()
+        logger.info(f"✅ Batch job {job_id} completed: {job['rows_scored']} rows in {len(job['chunk_rows'])} chunks")
+
+
+# Global job manager instance
+job_manager = JobManager()
@@ -7,7 +7,7 @@ from pathlib import Path
 # Base paths
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
-MODELS_DIR = BASE_DIR / "models"
+MODELS_DIR = Path(os.getenv("MODELS_DIR", str(BASE_DIR / "models")))
 
 # Dataset paths
 LENDING_CLUB_PATH = DATA_DIR / "Loan data" / "loan.csv"
@@ -20,6 +20,17 @@ INDIAN_BANK_UNSEEN_PATH = DATA_DIR / "Indian Bank Dataset" / "Unseen_Dataset.xls
 MODEL_PATH = MODELS_DIR / "recovery_model.pkl"
 SCALER_PATH = MODELS_DIR / "scaler.pkl"
 METADATA_PATH = MODELS_DIR / "model_metadata.json"
+SURROGATE_PATH = MODELS_DIR / "surrogate_model.pkl"  # Cheap first stage of cascade inference
+
+# Artifact format served by workers: "pickle" (joblib) or "mmap" (memory-mapped
+# flat artifacts in models/flat/, shared by all worker processes)
+MODEL_ARTIFACT_FORMAT = os.getenv("MODEL_ARTIFACT_FORMAT", "pickle")
+FLAT_ARTIFACTS_DIRNAME = "flat"
+
+# Startup: "background" loads the model on a thread while the server already
+# answers /health (readiness via /ready), "blocking" loads it before serving
+MODEL_LOAD_MODE = os.getenv("MODEL_LOAD_MODE", "background").lower()
+MODEL_WARM_UP_ON_LOAD = os.getenv("MODEL_WARM_UP_ON_LOAD", "true").lower() == "true"
 
 # Feature definitions (as per roadmap)
 DEBTOR_FEATURES = [
@@ -66,6 +77,15 @@ RANDOM_FOREST_PARAMS = {
     'n_jobs': -1
 }
 
+# Cascade surrogate: a few shallow trees, scored before the full model
+SURROGATE_PARAMS = {
+    'n_estimators': 16,
+    'max_depth': 4,
+    'min_samples_leaf': 50,
+    'random_state': 42,
+    'n_jobs': -1
+}
+
 XGBOOST_PARAMS = {
     'n_estimators': 200,
     'max_depth': 6,
@@ -86,6 +106,21 @@ GRADIENT_BOOSTING_PARAMS = {
 TEST_SIZE = 0.2
 RANDOM_STATE = 42
 CV_FOLDS = 5
+LENDING_CLUB_CHUNK_ROWS = int(os.getenv("LENDING_CLUB_CHUNK_ROWS", "20000"))  # Rows read (and sampled) per chunk of loan.csv
+# Exact Lending Club sample size for training, stratified on loan_status (0 = 10% per-chunk sample)
+TRAINING_SAMPLE_SIZE = int(os.getenv("TRAINING_SAMPLE_SIZE", "0"))
+SAMPLE_MIN_PER_STRATUM = int(os.getenv("SAMPLE_MIN_PER_STRATUM", "1000"))  # Rows kept per loan_status value when available
+TRAINING_DATA_WORKERS = int(os.getenv("TRAINING_DATA_WORKERS", str(os.cpu_count() or 1)))  # Processes preparing sources in parallel
+
+# Out-of-core training on the whole Lending Club file: chunked passes gather
+# statistics, then write the scaled float32 training matrix to disk (memory-mapped)
+OUT_OF_CORE_ENABLED = os.getenv("OUT_OF_CORE_ENABLED", "false").lower() == "true"
+OUT_OF_CORE_DIR = Path(os.getenv("OUT_OF_CORE_DIR", str(BASE_DIR / "training_data")))
+OUT_OF_CORE_SKETCH_SIZE = int(os.getenv("OUT_OF_CORE_SKETCH_SIZE", "20000"))  # Values kept per column to estimate medians
+
+# Columnar dataset cache (Feather copies of the raw datasets, rebuilt when a source changes)
+DATASET_CACHE_ENABLED = os.getenv("DATASET_CACHE_ENABLED", "true").lower() == "true"
+DATASET_CACHE_DIR = Path(os.getenv("DATASET_CACHE_DIR", str(DATA_DIR / "cache")))
 
 # Risk thresholds (as per roadmap)
 RISK_THRESHOLDS = {
@@ -104,5 +139,78 @@ STRATEGY_MAP = {
 # Model version
 MODEL_VERSION = "1.0.0"
 
+# Batch inference
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "10000"))  # Rows per predict_proba call
+
+# Native NumPy tree-ensemble engine (traverses single rows and small batches,
+# larger batches are traversed by the model's own multi-threaded apply)
+TREE_ENGINE_ENABLED = os.getenv("TREE_ENGINE_ENABLED", "true").lower() == "true"
+TREE_ENGINE_MAX_ROWS = int(os.getenv("TREE_ENGINE_MAX_ROWS", "256"))
+
+# Cascade inference: the surrogate scores every case, the full model only cases
+# within CASCADE_MARGIN of a risk threshold or with surrogate trees disagreeing
+# (standard deviation of per-tree probabilities) by more than CASCADE_MAX_UNCERTAINTY
+CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "false").lower() == "true"
+CASCADE_MARGIN = float(os.getenv("CASCADE_MARGIN", "0.05"))
+CASCADE_MAX_UNCERTAINTY = float(os.getenv("CASCADE_MAX_UNCERTAINTY", "0.15"))
+
+# Prediction result cache (single-case predictions)
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() == "true"
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "10000"))
+PREDICTION_CACHE_MAX_BYTES = int(os.getenv("PREDICTION_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "300"))
+
+# Micro-batching of concurrent single-case requests (opt-in)
+MICRO_BATCHING_ENABLED = os.getenv("MICRO_BATCHING_ENABLED", "false").lower() == "true"
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "32"))
+MICRO_BATCH_MAX_WAIT_US = int(os.getenv("MICRO_BATCH_MAX_WAIT_US", "2000"))
+
+# Inference executor (keeps CPU-bound inference off the event loop)
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")  # "thread" or "process"
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Streaming NDJSON scoring
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "1000"))  # Cases scored per vectorized call
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", "65536"))  # Longer lines are rejected
+
+# Top-K case selection (expected recovery ranking)
+TOP_K_MAX = int(os.getenv("TOP_K_MAX", "10000"))  # Largest K a request may ask for
+TOP_K_CHUNK_ROWS = int(os.getenv("TOP_K_CHUNK_ROWS", "10000"))  # Cases scored per vectorized call
+
+# Columnar file scoring (CSV/Parquet)
+FILE_SCORING_CHUNK_ROWS = int(os.getenv("FILE_SCORING_CHUNK_ROWS", "100000"))  # Rows scored per chunk
+
+# Admission control and load shedding (POST /predictions/* endpoints)
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "false").lower() == "true"
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "32"))  # Requests served at once per endpoint
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))  # Requests waiting per endpoint before shedding
+ADMISSION_LATENCY_BUDGET_MS = float(os.getenv("ADMISSION_LATENCY_BUDGET_MS", "1000"))  # Shed instead of answering later
+ADMISSION_LIMITS = os.getenv("ADMISSION_LIMITS", "")  # e.g. "/predictions/batch=4:8:5000" (concurrency:queue[:budget_ms])
+ADMISSION_DEGRADE_ENABLED = os.getenv("ADMISSION_DEGRADE_ENABLED", "false").lower() == "true"  # Surrogate-only batches under overload
+
+# Asynchronous batch jobs (chunks and results are kept on local disk)
+JOBS_DIR = Path(os.getenv("JOBS_DIR", str(BASE_DIR / "jobs")))
+JOB_CHUNK_ROWS = int(os.getenv("JOB_CHUNK_ROWS", "10000"))  # Rows per chunk and per result page
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))  # Jobs scored concurrently
+
+# Hot model reload
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")  # Admin endpoints are disabled when empty
+MODEL_WATCH_ENABLED = os.getenv("MODEL_WATCH_ENABLED", "false").lower() == "true"
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "5"))
+
+# Multi-model registry (models/registry/<version>/ holds one artifact set per version)
+MODEL_REGISTRY_DIR = MODELS_DIR / "registry"
+MODEL_REGISTRY_MAX_BYTES = int(os.getenv("MODEL_REGISTRY_MAX_BYTES", str(512 * 1024 * 1024)))
+MODEL_TRAFFIC_SPLIT = os.getenv("MODEL_TRAFFIC_SPLIT", "")  # e.g. "2.0.0=10,2.1.0=5" (percent of requests)
+SHADOW_MODEL_VERSION = os.getenv("SHADOW_MODEL_VERSION", "")  # Registry version scored in shadow mode
+SHADOW_MAX_PENDING = int(os.getenv("SHADOW_MAX_PENDING", "4"))  # Shadow batches in flight before dropping
+
+# Prometheus metrics (GET /metrics)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# On-demand request profiling (X-Profile header, admin token required)
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(BASE_DIR / "profiles")))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))  # Newest profiles kept on disk
+
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
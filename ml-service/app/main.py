@@ -1,14 +1,21 @@
 """
 FastAPI ML Service Entry Point
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 import logging
 
-from app.routers import predictions
+from app.routers import predictions, admin, jobs
 from app.models.model_service import model_service
-from app.models.schemas import HealthResponse
+from app.models.inference_executor import inference_executor
+from app.models.model_watcher import model_watcher
+from app.models.shadow_scorer import shadow_scorer
+from app.batch.jobs import job_manager
+from app.config import MODEL_WATCH_ENABLED, MODEL_LOAD_MODE, MODEL_WARM_UP_ON_LOAD, METRICS_ENABLED
+from app.models.metrics import metrics
+from app.models.schemas import HealthResponse, ReadinessResponse
 
 logging.basicConfig(
     level=logging.INFO,
@@ -22,17 +29,32 @@ async def lifespan(app: FastAPI):
     """Lifespan event handler for startup and shutdown"""
     # Startup
     logger.info("Starting ML Service...")
-    try:
-        model_service.load_model()
-        logger.info("✅ Model loaded successfully")
-    except Exception as e:
-        logger.warning(f"⚠️ Could not load model: {e}")
-        logger.info("Service will start but predictions will not be available until model is trained")
+    if MODEL_LOAD_MODE == "background":
+        # Accept connections right away; /ready turns 200 once the model is served
+        model_service.load_in_background(warm_up=MODEL_WARM_UP_ON_LOAD)
+        logger.info("Loading model in the background")
+    else:
+        try:
+            model_service.load_model(warm_up=MODEL_WARM_UP_ON_LOAD)
+            logger.info("✅ Model loaded successfully")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load model: {e}")
+            logger.info("Service will start but predictions will not be available until model is trained")
+    
+    if MODEL_WATCH_ENABLED:
+        model_watcher.start()
+    
+    # Resume batch jobs interrupted by the last shutdown
+    await job_manager.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down ML Service...")
+    model_watcher.stop()
+    await job_manager.stop()
+    await shadow_scorer.drain()
+    inference_executor.shutdown()
 
 
 app = FastAPI(
@@ -53,6 +75,8 @@ app.add_middleware(
 
 # Include routers
 app.include_router(predictions.router)
+app.include_router(admin.router)
+app.include_router(jobs.router)
 
 
 @app.get("/")
@@ -74,3 +98,24 @@ async def health_check():
         service="ml-service",
         model_loaded=model_service.is_model_loaded()
     )
+
+
+@app.get("/ready", response_model=ReadinessResponse)
+async def readiness_check(response: Response):
+    """Readiness check: 503 until the primary model is loaded and warmed up"""
+    model_status = model_service.get_status()
+    if not model_service.is_ready():
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessResponse(
+        ready=model_service.is_ready(),
+        load_state=model_status['load_state'],
+        model_version=model_status['model_version'],
+        load_error=model_status['load_error']
+    )
+
+
+if METRICS_ENABLED:
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    async def prometheus_metrics():
+        """Prometheus metrics in the text exposition format"""
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,242 @@
+"""
+Admission control and load shedding
+Bounds concurrent and queued requests per endpoint and rejects requests that
+could not be answered within the latency budget, instead of serving them late
+"""
+import asyncio
+import math
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Tuple
+import logging
+
+from app.config import (
+    ADMISSION_CONTROL_ENABLED, ADMISSION_MAX_CONCURRENCY, ADMISSION_MAX_QUEUE,
+    ADMISSION_LATENCY_BUDGET_MS, ADMISSION_LIMITS, ADMISSION_DEGRADE_ENABLED
+)
+from app.models.metrics import requests_shed, admission_queue_depth
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Reasons a request is shed (label of ml_requests_shed_total)
+SHED_QUEUE_FULL = "queue_full"            # max_queue requests already waiting
+SHED_LATENCY_BUDGET = "latency_budget"    # Expected wait exceeds the budget
+SHED_QUEUE_TIMEOUT = "queue_timeout"      # Waited for a slot until the budget ran out
+
+# Weight of the newest sample in the service time average
+SERVICE_TIME_ALPHA = 0.2
+
+# Whether the request being handled was admitted while its endpoint was saturated
+_admitted_under_load: ContextVar[bool] = ContextVar("admitted_under_load", default=False)
+
+
+def parse_admission_limits(spec: str) -> Dict[str, Tuple[int, int, Optional[float]]]:
+    """
+    Parse per-endpoint limits such as '/predictions/batch=4:8:5000,/predictions/recovery=64:128'
+
+    Args:
+        spec: Comma separated endpoint=concurrency:queue[:budget_ms] entries
+
+    Returns:
+        Dictionary of endpoint to (max concurrency, max queue, budget in seconds or None)
+
+    Raises:
+        ValueError: If the spec is malformed
+    """
+    limits = {}
+    for part in filter(None, (item.strip() for item in spec.split(','))):
+        endpoint, _, values = part.partition('=')
+        fields = values.split(':')
+        if not endpoint or len(fields) not in (2, 3):
+            raise ValueError(f"Invalid admission limit '{part}', expected endpoint=concurrency:queue[:budget_ms]")
+        concurrency, queue = int(fields[0]), int(fields[1])
+        if concurrency < 1 or queue < 0:
+            raise ValueError(f"Admission limit '{part}' needs concurrency >= 1 and queue >= 0")
+        budget = float(fields[2]) / 1000 if len(fields) == 3 else None
+        limits[endpoint.strip()] = (concurrency, queue, budget)
+    return limits
+
+
+class Overloaded(Exception):
+    """A request was shed; retry_after is the suggested wait in seconds"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Request shed ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionGate:
+    """
+    Concurrency limit, bounded FIFO queue and latency budget of one endpoint
+
+    Up to max_concurrency requests are served at once; up to max_queue more
+    wait for a slot. The expected wait of a new request is its queue
+    position divided by max_concurrency, times the average service time.
+    A request is shed right away when the queue is full or when that
+    expected wait plus its own service time would exceed the budget, and
+    shed later if it is still waiting when the budget runs out. All state is
+    touched from the event loop only, so no lock is needed.
+    """
+
+    def __init__(self, endpoint: str, max_concurrency: int = ADMISSION_MAX_CONCURRENCY,
+                 max_queue: int = ADMISSION_MAX_QUEUE, budget_seconds: float = ADMISSION_LATENCY_BUDGET_MS / 1000):
+        self.endpoint = endpoint
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.budget_seconds = budget_seconds
+        self.active = 0
+        self.service_seconds = 0.0
+        self.admitted = 0
+        self.shed = 0
+        self._waiters = deque()
+        self._queue_depth = admission_queue_depth.labels(endpoint)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def expected_wait(self, position: int) -> float:
+        """Expected seconds until the request at queue position (1-based) gets a slot"""
+        return position / self.max_concurrency * self.service_seconds
+
+    async def acquire(self) -> bool:
+        """
+        Wait for a slot
+
+        Returns:
+            Whether the endpoint was saturated (the request had to queue)
+
+        Raises:
+            Overloaded: If the request is shed
+        """
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return False
+
+        position = len(self._waiters) + 1
+        expected = self.expected_wait(position)
+        if position > self.max_queue:
+            self._shed(SHED_QUEUE_FULL, expected)
+        # Time left for waiting once the request's own service time is reserved
+        max_wait = max(0.0, self.budget_seconds - self.service_seconds)
+        if expected > max_wait:
+            self._shed(SHED_LATENCY_BUDGET, expected)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._queue_depth.inc()
+        try:
+            # release() hands its slot over by resolving the future
+            await asyncio.wait_for(future, max_wait)
+        except asyncio.TimeoutError:
+            self._shed(SHED_QUEUE_TIMEOUT, self.expected_wait(len(self._waiters)))
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the request went away
+                self._hand_over()
+            raise
+        finally:
+            if future in self._waiters:
+                self._waiters.remove(future)
+                self._queue_depth.dec()
+
+        self.admitted += 1
+        return True
+
+    def release(self, seconds: float):
+        """
+        Give a slot back (to the first waiting request, if any)
+
+        Args:
+            seconds: Time the request held the slot
+        """
+        if self.service_seconds:
+            self.service_seconds += SERVICE_TIME_ALPHA * (seconds - self.service_seconds)
+        else:
+            self.service_seconds = seconds
+        self._hand_over()
+
+    def _hand_over(self):
+        """Pass a slot to the first request still waiting, or free it"""
+        while self._waiters:
+            future = self._waiters.popleft()
+            self._queue_depth.dec()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def _shed(self, reason: str, expected_wait: float):
+        self.shed += 1
+        requests_shed.labels(self.endpoint, reason).inc()
+        raise Overloaded(reason, max(1, math.ceil(expected_wait)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'budget_ms': round(self.budget_seconds * 1000, 1),
+            'active': self.active,
+            'queue_depth': self.queue_depth,
+            'avg_service_ms': round(self.service_seconds * 1000, 3),
+            'admitted': self.admitted,
+            'shed': self.shed
+        }
+
+
+class AdmissionController:
+    """
+    Per-endpoint admission gates
+
+    Gates are created on first use with the default limits or the
+    endpoint's ADMISSION_LIMITS override. When degrade is on, batch
+    endpoints score requests admitted under load with the cascade surrogate
+    (see should_degrade()).
+    """
+
+    def __init__(self, enabled: bool = ADMISSION_CONTROL_ENABLED,
+                 max_concurrency: int = ADMISSION_MAX_CONCURRENCY, max_queue: int = ADMISSION_MAX_QUEUE,
+                 budget_ms: float = ADMISSION_LATENCY_BUDGET_MS, limits: str = ADMISSION_LIMITS,
+                 degrade: bool = ADMISSION_DEGRADE_ENABLED):
+        self.enabled = enabled
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.budget_seconds = budget_ms / 1000
+        self.limits = parse_admission_limits(limits)
+        self.degrade = degrade
+        self._gates: Dict[str, AdmissionGate] = {}
+
+    def gate(self, endpoint: str) -> Optional[AdmissionGate]:
+        """Gate of an endpoint, or None when admission control is disabled"""
+        if not self.enabled:
+            return None
+        gate = self._gates.get(endpoint)
+        if gate is None:
+            concurrency, queue, budget = self.limits.get(endpoint, (self.max_concurrency, self.max_queue, None))
+            gate = AdmissionGate(endpoint, concurrency, queue, budget if budget is not None else self.budget_seconds)
+            self._gates[endpoint] = gate
+        return gate
+
+    def should_degrade(self) -> bool:
+        """Whether the request being handled should be scored with the surrogate"""
+        return self.degrade and _admitted_under_load.get()
+
+    def stats(self) -> Dict[str, Any]:
+        """Limits and counters per gated endpoint"""
+        return {endpoint: gate.stats() for endpoint, gate in self._gates.items()}
+
+
+def set_admitted_under_load(value: bool):
+    """Mark the request being handled as admitted under load (returns a reset token)"""
+    return _admitted_under_load.set(value)
+
+
+def reset_admitted_under_load(token):
+    _admitted_under_load.reset(token)
+
+
+# Global admission controller instance
+admission_controller = AdmissionController()
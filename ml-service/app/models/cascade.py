@@ -0,0 +1,154 @@
+"""
+Cascade inference: a cheap surrogate first, the full model only where it matters
+Most cases score far from the risk thresholds, where a few shallow trees
+already give the right risk category. Only cases close to a threshold, or
+on which the surrogate's trees disagree, are escalated to the full ensemble.
+"""
+from typing import Callable, Dict, Any, Tuple
+
+import numpy as np
+
+from app.config import RISK_THRESHOLDS, CASCADE_MARGIN, CASCADE_MAX_UNCERTAINTY
+from app.models.tree_engine import FlatEnsemble, export_ensemble
+from app.models.metrics import cascade_cases
+
+# Stage that decided a case (label of ml_cascade_cases_total)
+CASCADE_STAGE_SURROGATE = "surrogate"
+CASCADE_STAGE_FULL = "full"
+
+# Probability cut-offs between risk categories
+RISK_CUTOFFS = np.array([RISK_THRESHOLDS['LOW_RISK'], RISK_THRESHOLDS['MEDIUM_RISK']])
+
+
+def risk_codes(probabilities: np.ndarray) -> np.ndarray:
+    """
+    Risk category codes (0 LOW, 1 MEDIUM, 2 HIGH) for an array of probabilities
+
+    Args:
+        probabilities: Array of recovery probabilities (0-1)
+
+    Returns:
+        int8 array of indexes into RISK_CATEGORIES
+    """
+    codes = np.full(probabilities.shape, 2, dtype=np.int8)
+    codes[probabilities >= RISK_THRESHOLDS['MEDIUM_RISK']] = 1
+    codes[probabilities >= RISK_THRESHOLDS['LOW_RISK']] = 0
+    return codes
+
+
+class Cascade:
+    """
+    Surrogate-first scoring with escalation to the full model
+
+    The surrogate is a small averaging tree ensemble (RandomForest) run on
+    the native tree engine. Its probability is the mean of the per-tree
+    probabilities and its uncertainty their standard deviation. A case is
+    escalated when the probability lies within margin of a risk cut-off or
+    the uncertainty exceeds max_uncertainty; escalated cases get the full
+    model's probability, all others keep the surrogate's.
+    """
+
+    def __init__(self, surrogate: FlatEnsemble, margin: float = CASCADE_MARGIN,
+                 max_uncertainty: float = CASCADE_MAX_UNCERTAINTY):
+        if surrogate.aggregation != 'mean':
+            raise ValueError(
+                f"Cascade surrogate must be an averaging ensemble, got {surrogate.model_type or 'a boosted model'}"
+            )
+        self.surrogate = surrogate
+        self.margin = margin
+        self.max_uncertainty = max_uncertainty
+
+    @classmethod
+    def from_model(cls, model, **kwargs) -> 'Cascade':
+        """Build a cascade from a fitted RandomForest/ExtraTrees surrogate"""
+        return cls(export_ensemble(model), **kwargs)
+
+    def score_surrogate(self, features_array: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Surrogate probability and uncertainty per row
+
+        Args:
+            features_array: Preprocessed feature matrix
+
+        Returns:
+            Tuple of (mean per-tree probability, standard deviation across trees)
+        """
+        leaf_values = self.surrogate.leaf_values(features_array)
+        return leaf_values.mean(axis=1), leaf_values.std(axis=1)
+
+    def escalate(self, probabilities: np.ndarray, uncertainty: np.ndarray) -> np.ndarray:
+        """
+        Rows the full model has to score
+
+        Args:
+            probabilities: Surrogate probabilities
+            uncertainty: Surrogate uncertainty
+
+        Returns:
+            Boolean mask of escalated rows
+        """
+        distance = np.abs(probabilities[:, None] - RISK_CUTOFFS[None, :]).min(axis=1)
+        return (distance < self.margin) | (uncertainty > self.max_uncertainty)
+
+    def predict(self, features_array: np.ndarray, full_model: Callable[[np.ndarray], np.ndarray],
+                record: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score rows with the surrogate and escalate where needed
+
+        Args:
+            features_array: Preprocessed feature matrix
+            full_model: Returns full-model probabilities for a feature matrix
+            record: Count the cases in ml_cascade_cases_total
+
+        Returns:
+            Tuple of (probabilities, boolean mask of escalated rows)
+        """
+        probabilities, uncertainty = self.score_surrogate(features_array)
+        escalated = self.escalate(probabilities, uncertainty)
+
+        n_escalated = int(np.count_nonzero(escalated))
+        if n_escalated:
+            probabilities[escalated] = full_model(features_array[escalated])
+
+        if record:
+            cascade_cases.labels(CASCADE_STAGE_FULL).inc(n_escalated)
+            cascade_cases.labels(CASCADE_STAGE_SURROGATE).inc(len(probabilities) - n_escalated)
+
+        return probabilities, escalated
+
+    def evaluate(self, features_array: np.ndarray, full_probabilities: np.ndarray) -> Dict[str, Any]:
+        """
+        Compare cascade and full-model risk categories
+
+        Args:
+            features_array: Preprocessed feature matrix
+            full_probabilities: Full-model probabilities for the same rows
+
+        Returns:
+            Dictionary with the escalation rate and the fraction of rows whose
+            risk category differs from the full model's
+        """
+        probabilities, uncertainty = self.score_surrogate(features_array)
+        escalated = self.escalate(probabilities, uncertainty)
+        full_probabilities = np.asarray(full_probabilities, dtype=np.float64)
+        cascade_probabilities = np.where(escalated, full_probabilities, probabilities)
+
+        return {
+            'margin': self.margin,
+            'max_uncertainty': self.max_uncertainty,
+            'escalation_rate': round(float(escalated.mean()), 4),
+            'category_disagreement': round(
+                float(np.mean(risk_codes(cascade_probabilities) != risk_codes(full_probabilities))), 4
+            )
+        }
+
+
+def cascade_stats() -> Dict[str, Any]:
+    """Cases decided by the surrogate and escalated to the full model in this process"""
+    escalated = int(cascade_cases.labels(CASCADE_STAGE_FULL).value)
+    cases = escalated + int(cascade_cases.labels(CASCADE_STAGE_SURROGATE).value)
+    return {
+        'cases': cases,
+        'escalated': escalated,
+        'escalation_rate': round(escalated / cases, 4) if cases else 0.0
+    }
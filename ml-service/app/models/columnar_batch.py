@@ -0,0 +1,230 @@
+"""
+Columnar (struct-of-arrays) batch requests and responses
+A request carries one array per feature and the response one array per
+output field. Decoded JSON arrays go straight into NumPy columns, range
+checks are vectorized with the constraints declared on PredictionRequest,
+and the response is encoded from the result arrays, so no per-case model
+or dictionary is built anywhere on the way.
+"""
+import json
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.config import API_FEATURES
+from app.models.schemas import PredictionRequest
+from app.models.model_service import RISK_CATEGORIES, RISK_STRATEGIES, round_probabilities
+
+# Validation errors reported per request (the rest are counted, not listed)
+MAX_ERRORS = 20
+
+# Pre-encoded JSON strings of the categorical outputs, indexed by risk code
+_CATEGORY_JSON = np.array([json.dumps(category).encode() for category in RISK_CATEGORIES], dtype=object)
+_STRATEGY_JSON = np.array([json.dumps(strategy).encode() for strategy in RISK_STRATEGIES], dtype=object)
+
+
+class ColumnarValidationError(ValueError):
+    """Invalid columnar request; errors are in the request validation error format"""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__(f"{len(errors)} validation error(s)")
+        self.errors = errors
+
+
+def _feature_constraints() -> Dict[str, Dict[str, Any]]:
+    """Bounds and integer flag of every API feature, read from PredictionRequest"""
+    constraints = {}
+    for name in API_FEATURES:
+        field = PredictionRequest.model_fields[name]
+        bounds = {'integer': field.annotation is int}
+        for metadata in field.metadata:
+            for bound in ('gt', 'ge', 'lt', 'le'):
+                if getattr(metadata, bound, None) is not None:
+                    bounds[bound] = getattr(metadata, bound)
+        constraints[name] = bounds
+    return constraints
+
+
+FEATURE_CONSTRAINTS = _feature_constraints()
+
+# Vectorized check, error type and message per bound (mirrors pydantic's errors)
+_BOUND_CHECKS = {
+    'gt': (np.less_equal, 'greater_than', "Input should be greater than {}"),
+    'ge': (np.less, 'greater_than_equal', "Input should be greater than or equal to {}"),
+    'lt': (np.greater_equal, 'less_than', "Input should be less than {}"),
+    'le': (np.greater, 'less_than_equal', "Input should be less than or equal to {}")
+}
+
+
+class _Errors:
+    """Collects at most MAX_ERRORS errors and counts the rest"""
+
+    def __init__(self):
+        self.items: List[Dict[str, Any]] = []
+        self.total = 0
+
+    def add(self, error_type: str, loc: tuple, msg: str, value: Any = None, ctx: Optional[dict] = None):
+        self.total += 1
+        if len(self.items) < MAX_ERRORS:
+            error = {'type': error_type, 'loc': ('body',) + loc, 'msg': msg, 'input': value}
+            if ctx:
+                error['ctx'] = ctx
+            self.items.append(error)
+
+    def add_rows(self, name: str, rows: np.ndarray, values: np.ndarray, error_type: str, msg: str,
+                 ctx: Optional[dict] = None):
+        shown = rows[:max(0, MAX_ERRORS - len(self.items))]
+        for row in shown.tolist():
+            value = values[row].item()
+            # NaN and infinity are not valid JSON in the error response
+            self.add(error_type, (name, row), msg, value if math.isfinite(value) else None, ctx)
+        self.total += len(rows) - len(shown)
+
+    def raise_if_any(self):
+        if self.total:
+            errors = self.items
+            if self.total > len(errors):
+                errors = errors + [{
+                    'type': 'too_many_errors',
+                    'loc': ('body',),
+                    'msg': f"{self.total - len(errors)} more validation error(s) not shown",
+                    'input': None
+                }]
+            raise ColumnarValidationError(errors)
+
+
+def _column_violations(name: str, column: np.ndarray) -> List[tuple]:
+    """
+    Rows of a feature column breaking each PredictionRequest rule
+
+    Args:
+        name: API feature name
+        column: float64 values of the feature
+
+    Returns:
+        List of (boolean mask of the offending rows, error type, message, ctx)
+    """
+    constraints = FEATURE_CONSTRAINTS[name]
+    non_finite = ~np.isfinite(column)
+    violations = [(non_finite, 'finite_number', "Input should be a finite number", None)]
+
+    with np.errstate(invalid='ignore'):
+        if constraints['integer']:
+            violations.append((~non_finite & (column != np.floor(column)), 'int_from_float',
+                               "Input should be a valid integer, got a number with a fractional part", None))
+        for bound, (violates, error_type, msg) in _BOUND_CHECKS.items():
+            if bound in constraints:
+                limit = constraints[bound]
+                violations.append((violates(column, limit), error_type, msg.format(limit), {bound: limit}))
+    return violations
+
+
+def valid_rows(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Mask of the rows a single or batch prediction request would accept
+
+    A row is valid when every feature is finite and satisfies the
+    PredictionRequest constraints (bounds, whole numbers for integer
+    features). Used by the file and job scorers, which score the valid rows
+    and report the others instead of rejecting the whole input.
+
+    Args:
+        columns: Dictionary of API feature name to float64 array
+
+    Returns:
+        Boolean array, True for rows that can be scored
+    """
+    valid = np.ones(len(next(iter(columns.values()))), dtype=bool)
+    for name, column in columns.items():
+        for violations, *_ in _column_violations(name, column):
+            valid &= ~violations
+    return valid
+
+
+def _to_array(name: str, values: list, errors: _Errors) -> Optional[np.ndarray]:
+    """Convert one decoded JSON array to float64, reporting elements that are not numbers"""
+    try:
+        column = np.asarray(values, dtype=np.float64)
+        if column.ndim == 1:
+            return column
+    except (TypeError, ValueError):
+        pass
+
+    # Error path only: find the offending elements
+    reported = errors.total
+    for row, value in enumerate(values):
+        if not isinstance(value, (int, float, type(None))):
+            errors.add('float_type', (name, row), "Input should be a valid number", value)
+    if errors.total == reported:
+        errors.add('float_type', (name,), "Input should be an array of numbers")
+    return None
+
+
+def parse_columns(payload: Any) -> Dict[str, np.ndarray]:
+    """
+    Validate a decoded columnar request and return its feature columns
+
+    Every feature must be an array of the same length; values must satisfy
+    the PredictionRequest constraints (integer features must be whole
+    numbers). Checks run on whole columns at once.
+
+    Args:
+        payload: Decoded JSON body
+
+    Returns:
+        Dictionary of API feature name to float64 array
+
+    Raises:
+        ColumnarValidationError: If the request is invalid
+    """
+    errors = _Errors()
+    if not isinstance(payload, dict):
+        errors.add('dict_type', (), "Input should be a valid dictionary or object", payload)
+        errors.raise_if_any()
+
+    columns = {}
+    for name in API_FEATURES:
+        values = payload.get(name)
+        if name not in payload:
+            errors.add('missing', (name,), "Field required")
+        elif not isinstance(values, list):
+            errors.add('list_type', (name,), "Input should be a valid list", values)
+        else:
+            column = _to_array(name, values, errors)
+            if column is not None:
+                columns[name] = column
+    errors.raise_if_any()
+
+    lengths = {name: len(column) for name, column in columns.items()}
+    if len(set(lengths.values())) > 1:
+        errors.add('value_error', (), "All feature arrays must have the same length", None, {'lengths': lengths})
+        errors.raise_if_any()
+
+    for name, column in columns.items():
+        for violations, error_type, msg, ctx in _column_violations(name, column):
+            errors.add_rows(name, np.flatnonzero(violations), column, error_type, msg, ctx)
+    errors.raise_if_any()
+
+    return columns
+
+
+def encode_response(probabilities: np.ndarray, codes: np.ndarray) -> bytes:
+    """
+    Encode scored columns as a columnar JSON response body
+
+    Args:
+        probabilities: Recovery probabilities
+        codes: Risk codes indexing RISK_CATEGORIES and RISK_STRATEGIES
+
+    Returns:
+        JSON body with recovery_probability, risk_category and
+        recommended_strategy arrays plus total_cases
+    """
+    body = [
+        b'{"recovery_probability":', json.dumps(round_probabilities(probabilities).tolist()).encode(),
+        b',"risk_category":[', b','.join(_CATEGORY_JSON[codes].tolist()),
+        b'],"recommended_strategy":[', b','.join(_STRATEGY_JSON[codes].tolist()),
+        b'],"total_cases":', str(len(probabilities)).encode(), b'}'
+    ]
+    return b''.join(body)
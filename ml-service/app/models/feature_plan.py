@@ -0,0 +1,132 @@
+"""
+Precompiled feature plan for fast, pandas-free preprocessing
+Maps API feature dictionaries straight into scaled float64 rows
+"""
+import numpy as np
+from typing import Dict, List, Optional
+
+from app.config import API_FEATURES
+
+
+class FeaturePlan:
+    """
+    Precompiled mapping from input features to the scaled model input
+
+    Built once when the model loads from the preprocessor's feature names and
+    the StandardScaler's mean_ and scale_. Scaling uses the same float64
+    operations as StandardScaler.transform (subtract mean, divide by scale),
+    so the output is bit-identical to the pandas/sklearn path.
+    """
+
+    def __init__(self, feature_names: List[str], mean: Optional[np.ndarray] = None,
+                 scale: Optional[np.ndarray] = None):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.index = {name: i for i, name in enumerate(self.feature_names)}
+
+        if mean is None:
+            mean = np.zeros(self.n_features)
+        if scale is None:
+            scale = np.ones(self.n_features)
+
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+
+        # Python floats for the scalar path (same IEEE double arithmetic)
+        self._mean_list = self.mean.tolist()
+        self._scale_list = self.scale.tolist()
+
+        # Preallocated row with every feature at its scaled default (0)
+        self.template = (np.zeros(self.n_features) - self.mean) / self.scale
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor: Optional[dict]) -> Optional['FeaturePlan']:
+        """
+        Build a plan from a saved preprocessor dictionary
+
+        Args:
+            preprocessor: Preprocessor data as saved by DataPreprocessor.save (or None)
+
+        Returns:
+            FeaturePlan, or None if the scaler cannot be expressed as mean/scale vectors
+        """
+        if not preprocessor:
+            return cls(API_FEATURES)
+
+        feature_names = preprocessor.get('feature_names', API_FEATURES)
+        scaler = preprocessor.get('scaler')
+
+        if not scaler:
+            return cls(feature_names)
+
+        if not hasattr(scaler, 'scale_') or not hasattr(scaler, 'with_mean'):
+            return None
+
+        mean = scaler.mean_ if scaler.with_mean else None
+        scale = scaler.scale_ if scaler.with_std else None
+
+        return cls(feature_names, mean, scale)
+
+    def transform_one(self, features: Dict[str, float]) -> np.ndarray:
+        """
+        Map a single case into a scaled (1, n_features) row
+
+        Args:
+            features: Dictionary with feature values
+
+        Returns:
+            Scaled feature row
+        """
+        row = self.template.copy()
+        index = self.index
+
+        for name, value in features.items():
+            i = index.get(name)
+            if i is not None:
+                row[i] = (float(value) - self._mean_list[i]) / self._scale_list[i]
+
+        return row.reshape(1, -1)
+
+    def transform_batch(self, cases: List[Dict[str, float]]) -> np.ndarray:
+        """
+        Map many cases into a scaled (n_cases, n_features) matrix
+
+        Args:
+            cases: List of feature dictionaries
+
+        Returns:
+            Scaled feature matrix
+        """
+        features_array = np.tile(self.template, (len(cases), 1))
+
+        present = set()
+        for case in cases:
+            present.update(case)
+
+        for name in present:
+            i = self.index.get(name)
+            if i is not None:
+                column = np.array([case.get(name, 0) for case in cases], dtype=np.float64)
+                features_array[:, i] = (column - self.mean[i]) / self.scale[i]
+
+        return features_array
+
+    def transform_columns(self, columns: Dict[str, np.ndarray], n_rows: int) -> np.ndarray:
+        """
+        Map column arrays (e.g. from a CSV/Parquet chunk) into a scaled matrix
+
+        Args:
+            columns: Dictionary of feature name to 1-D array of length n_rows
+            n_rows: Number of rows
+
+        Returns:
+            Scaled (n_rows, n_features) feature matrix
+        """
+        features_array = np.tile(self.template, (n_rows, 1))
+
+        for name, column in columns.items():
+            i = self.index.get(name)
+            if i is not None:
+                features_array[:, i] = (np.asarray(column, dtype=np.float64) - self.mean[i]) / self.scale[i]
+
+        return features_array
@@ -0,0 +1,206 @@
+"""
+Memory-mapped model artifacts
+Stores the flattened tree ensemble and scaler vectors as uncompressed .npy
+files that every worker maps read-only, so all workers share one copy
+
+Usage:
+    python -m app.models.flat_artifacts
+"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+import logging
+
+import numpy as np
+
+from app.config import MODEL_PATH, SCALER_PATH, FLAT_ARTIFACTS_DIRNAME
+from app.models.feature_plan import FeaturePlan
+from app.models.tree_engine import FlatEnsemble
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+
+class FlatModel:
+    """
+    Minimal classifier backed only by a FlatEnsemble
+
+    Stands in for the pickled sklearn/XGBoost model when serving from
+    memory-mapped artifacts, so the pickle never has to be loaded.
+    """
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, engine: FlatEnsemble, n_features: int):
+        self.engine = engine
+        self.n_features_in_ = n_features
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.engine.predict_proba(X)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return (self.engine.predict_proba(X)[:, 1] >= 0.5).astype(int)
+
+
+def flat_dir(model_path: Path = MODEL_PATH) -> Path:
+    """Directory holding the flat artifacts of a model"""
+    return model_path.parent / FLAT_ARTIFACTS_DIRNAME
+
+
+def _source_stamps(paths: tuple) -> Dict[str, Any]:
+    """Size and modification time of the pickled source artifacts"""
+    stamps = {}
+    for path in paths:
+        if path.exists():
+            stat = path.stat()
+            stamps[path.name] = [stat.st_size, stat.st_mtime_ns]
+    return stamps
+
+
+def export_flat_artifacts(engine: FlatEnsemble, feature_plan: FeaturePlan, version: str,
+                          metadata: Optional[Dict[str, Any]] = None, model_path: Path = MODEL_PATH,
+                          scaler_path: Path = SCALER_PATH, output_dir: Optional[Path] = None) -> Path:
+    """
+    Write the engine and scaler vectors as .npy files plus a manifest
+
+    Every file is written under a temporary name and renamed into place;
+    the manifest is written last, so readers never see a partial export.
+
+    Args:
+        engine: Verified flat ensemble of the model
+        feature_plan: Feature plan with the scaler's mean and scale
+        version: Model version of the exported bundle
+        metadata: Model metadata to carry along
+        model_path: Pickled model the engine was built from
+        scaler_path: Pickled preprocessor the plan was built from
+        output_dir: Target directory (defaults to <model dir>/flat)
+
+    Returns:
+        Path of the written manifest
+    """
+    output_dir = Path(output_dir or flat_dir(model_path))
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    arrays = {f"engine_{name}": getattr(engine, name) for name in FlatEnsemble.ARRAY_FIELDS}
+    arrays['scaler_mean'] = feature_plan.mean
+    arrays['scaler_scale'] = feature_plan.scale
+
+    files = {}
+    for name, array in arrays.items():
+        filename = f"{name}.npy"
+        tmp_path = output_dir / f".{filename}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(tmp_path, output_dir / filename)
+        files[name] = {'file': filename, 'dtype': str(array.dtype), 'shape': list(array.shape)}
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'model_version': version,
+        'created_at': time.time(),
+        'sources': _source_stamps((model_path, scaler_path)),
+        'n_features': int(feature_plan.n_features),
+        'feature_names': feature_plan.feature_names,
+        'engine': {name: getattr(engine, name) for name in FlatEnsemble.SCALAR_FIELDS},
+        'arrays': files,
+        'metadata': metadata or {}
+    }
+
+    manifest_path = output_dir / MANIFEST_NAME
+    tmp_path = output_dir / f".{MANIFEST_NAME}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    size = sum((output_dir / entry['file']).stat().st_size for entry in files.values())
+    logger.info(f"✅ Exported flat artifacts for {version} to {output_dir} ({size / 1e6:.1f} MB)")
+    return manifest_path
+
+
+def is_current(directory: Path, model_path: Path = MODEL_PATH, scaler_path: Path = SCALER_PATH) -> bool:
+    """
+    Check that flat artifacts exist and match the pickled artifacts next to them
+
+    Pickles that are absent are not compared, so a node can be deployed with
+    the flat artifacts only.
+
+    Args:
+        directory: Flat artifact directory
+        model_path: Pickled model
+        scaler_path: Pickled preprocessor
+
+    Returns:
+        True if the manifest exists and no source artifact changed since export
+    """
+    manifest_path = Path(directory) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return False
+
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    if manifest.get('format_version') != FORMAT_VERSION:
+        return False
+
+    recorded = manifest.get('sources', {})
+    current = _source_stamps((model_path, scaler_path))
+    return all(recorded.get(name) == stamp for name, stamp in current.items())
+
+
+def load_flat_artifacts(directory: Path) -> Dict[str, Any]:
+    """
+    Memory-map flat artifacts
+
+    Arrays are opened with mmap_mode='r': pages come from the OS page cache
+    and are shared by every process that maps the same files.
+
+    Args:
+        directory: Flat artifact directory
+
+    Returns:
+        Dictionary with model (FlatModel), engine, feature_plan, metadata and version
+    """
+    directory = Path(directory)
+    with open(directory / MANIFEST_NAME, 'r') as f:
+        manifest = json.load(f)
+
+    arrays = {
+        name: np.load(directory / entry['file'], mmap_mode='r')
+        for name, entry in manifest['arrays'].items()
+    }
+
+    engine = FlatEnsemble(
+        **{name: arrays[f"engine_{name}"] for name in FlatEnsemble.ARRAY_FIELDS},
+        **manifest['engine']
+    )
+    feature_plan = FeaturePlan(manifest['feature_names'], arrays['scaler_mean'], arrays['scaler_scale'])
+
+    logger.info(f"✅ Memory-mapped flat artifacts from {directory}")
+    return {
+        'model': FlatModel(engine, manifest['n_features']),
+        'engine': engine,
+        'feature_plan': feature_plan,
+        'feature_names': manifest['feature_names'],
+        'metadata': manifest.get('metadata', {}),
+        'version': manifest['model_version']
+    }
+
+
+def main():
+    """Export flat artifacts for the model in MODELS_DIR"""
+    from app.models.model_bundle import ModelBundle
+
+    bundle = ModelBundle.load(model_path=MODEL_PATH, scaler_path=SCALER_PATH, use_flat=False)
+    if bundle.engine is None or bundle.feature_plan is None:
+        raise SystemExit("❌ Model is not a supported tree ensemble with a StandardScaler, nothing to export")
+
+    export_flat_artifacts(bundle.engine, bundle.feature_plan, bundle.version, bundle.metadata)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Bounded executor for CPU-bound inference
+Keeps the asyncio event loop free while models score requests
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Any, Optional, Callable
+import logging
+
+from app.config import INFERENCE_EXECUTOR, INFERENCE_WORKERS
+from app.models.model_service import model_service
+from app.models.model_registry import model_registry, split_degraded, PRIMARY_VERSION
+from app.models.metrics import merge_stages, current_timings
+from app.models.request_profiler import profiled_call
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EXECUTOR_KINDS = ('thread', 'process')
+
+
+def _init_worker():
+    """Make sure the model is loaded in a fresh worker process"""
+    model_service.ensure_loaded()
+
+
+def _bundle(version: Optional[str]):
+    """Bundle of a registry version (degraded labels included), or None for the primary model"""
+    version, degraded = split_degraded(version)
+    bundle = None if not version or version == PRIMARY_VERSION else model_registry.get(version)
+    if degraded:
+        return (bundle or model_service.bundle).degraded()
+    return bundle
+
+
+def _predict(features: Dict[str, float], version: Optional[str] = None) -> tuple:
+    """Single-case prediction task (module level so it can be pickled), returns (result, stage timings)"""
+    timings = {}
+    return model_service.predict(features, _bundle(version), timings=timings), timings
+
+
+def _predict_batch(cases: list, chunk_size: Optional[int] = None, version: Optional[str] = None) -> tuple:
+    """Batch prediction task (module level so it can be pickled), returns (results, stage timings)"""
+    timings = {}
+    return model_service.predict_batch(cases, chunk_size, _bundle(version), timings=timings), timings
+
+
+def _predict_columns(columns: Dict[str, Any], chunk_size: Optional[int] = None,
+                     version: Optional[str] = None) -> tuple:
+    """Columnar scoring task (module level so it can be pickled), returns ((probabilities, codes), stage timings)"""
+    timings = {}
+    return model_service.predict_columns(columns, chunk_size, _bundle(version), timings=timings), timings
+
+
+class InferenceExecutor:
+    """
+    Dedicated pool of inference workers
+
+    Thread workers share the loaded model in memory; process workers load
+    their own copy and sidestep the GIL for the Python parts of inference.
+    Either way the number of concurrent inference tasks is bounded by
+    max_workers, and the event loop only awaits the result.
+    """
+
+    def __init__(self, kind: str = INFERENCE_EXECUTOR, max_workers: int = INFERENCE_WORKERS):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown inference executor '{kind}', expected one of {EXECUTOR_KINDS}")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        """Create the worker pool on first use"""
+        if self._executor is None:
+            if self.kind == 'process':
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='inference'
+                )
+            logger.info(f"Started {self.kind} inference executor with {self.max_workers} workers")
+        return self._executor
+
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        Run a callable on the inference workers
+
+        Args:
+            func: Callable to run (must be picklable for the process executor)
+            *args: Positional arguments for func
+
+        Returns:
+            Result of func
+        """
+        loop = asyncio.get_running_loop()
+
+        timings = current_timings()
+        if timings is not None and timings.worker_profiles is not None:
+            # The request is being profiled: profile the task inside the worker
+            result, stats = await loop.run_in_executor(self._get_executor(), partial(profiled_call, func, *args))
+            timings.worker_profiles.append(stats)
+            return result
+
+        return await loop.run_in_executor(self._get_executor(), partial(func, *args))
+
+    async def predict(self, features: Dict[str, float], version: Optional[str] = None,
+                      timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        Score a single case on the inference workers
+
+        Args:
+            features: Dictionary with feature values
+            version: Registry version (defaults to the primary model)
+            timings: Dictionary that receives the seconds spent per stage
+
+        Returns:
+            Dictionary with prediction results
+        """
+        started = time.perf_counter()
+        result, worker_timings = await self.run(_predict, features, version)
+        merge_stages(timings, worker_timings, time.perf_counter() - started)
+        return result
+
+    async def predict_batch(self, cases: list, chunk_size: Optional[int] = None,
+                            version: Optional[str] = None, timings: Optional[Dict[str, float]] = None) -> list:
+        """
+        Score many cases on the inference workers
+
+        Args:
+            cases: List of feature dictionaries
+            chunk_size: Rows per predict_proba call
+            version: Registry version (defaults to the primary model)
+            timings: Dictionary that receives the seconds spent per stage
+
+        Returns:
+            List of prediction results
+        """
+        started = time.perf_counter()
+        results, worker_timings = await self.run(_predict_batch, cases, chunk_size, version)
+        merge_stages(timings, worker_timings, time.perf_counter() - started)
+        return results
+
+    async def predict_columns(self, columns: Dict[str, Any], chunk_size: Optional[int] = None,
+                              version: Optional[str] = None, timings: Optional[Dict[str, float]] = None) -> tuple:
+        """
+        Score feature columns on the inference workers
+
+        Args:
+            columns: Dictionary of API feature name to 1-D array
+            chunk_size: Rows per predict_proba call
+            version: Registry version (defaults to the primary model)
+            timings: Dictionary that receives the seconds spent per stage
+
+        Returns:
+            Tuple of (probabilities, risk codes)
+        """
+        started = time.perf_counter()
+        scores, worker_timings = await self.run(_predict_columns, columns, chunk_size, version)
+        merge_stages(timings, worker_timings, time.perf_counter() - started)
+        return scores
+
+    def on_model_reload(self, bundle=None):
+        """
+        Recycle process workers after a model swap
+
+        Thread workers read the swapped bundle directly. Process workers hold
+        their own copy, so the old pool is retired (queued tasks still finish
+        on it) and the next task starts a pool that loads the new artifacts.
+        """
+        if self.kind == 'process' and self._executor is not None:
+            executor, self._executor = self._executor, None
+            executor.shutdown(wait=False)
+            logger.info("Retired process inference workers after model reload")
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool (it is recreated on next use)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+            logger.info("Stopped inference executor")
+
+
+# Global inference executor instance
+inference_executor = InferenceExecutor()
+model_service.add_reload_listener(inference_executor.on_model_reload)
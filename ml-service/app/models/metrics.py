@@ -0,0 +1,344 @@
+"""
+Prometheus metrics for the prediction service
+Latency histograms per endpoint and stage, batch sizes, model load times
+and in-flight requests, rendered in the Prometheus text format
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# Histogram buckets (upper bounds, the +Inf bucket is implicit)
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536, 262144)
+LOAD_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Request stages, in the order they happen
+STAGE_PARSE = "parse"                  # Body read, JSON decoding and request validation
+STAGE_BATCH_WAIT = "batch_wait"        # Waiting for a micro-batch to be flushed
+STAGE_EXECUTOR_WAIT = "executor_wait"  # Waiting for and dispatching to an inference worker
+STAGE_PREPROCESS = "preprocess"        # preprocess_features / preprocess_batch
+STAGE_PREDICT = "predict_proba"        # Model scoring
+STAGE_CATEGORIZE = "categorize"        # Risk category and strategy lookup
+STAGE_SERIALIZE = "serialize"          # Response validation and JSON encoding
+
+STAGE_ORDER = {
+    stage: position for position, stage in enumerate((
+        STAGE_PARSE, STAGE_BATCH_WAIT, STAGE_EXECUTOR_WAIT, STAGE_PREPROCESS,
+        STAGE_PREDICT, STAGE_CATEGORIZE, STAGE_SERIALIZE
+    ))
+}
+
+
+class _Shards:
+    """
+    Per-thread value arrays merged when metrics are scraped
+
+    Every thread writes only to its own preallocated list, so recording
+    needs no lock; the lock is only taken when a thread records for the
+    first time and when the shards are summed.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._shards: List[list] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> list:
+        """Value array of the calling thread"""
+        try:
+            return self._local.values
+        except AttributeError:
+            values = [0] * self._size
+            with self._lock:
+                self._shards.append(values)
+            self._local.values = values
+            return values
+
+    def totals(self) -> list:
+        """Element-wise sum over all threads"""
+        with self._lock:
+            shards = list(self._shards)
+        totals = [0] * self._size
+        for values in shards:
+            for i, value in enumerate(values):
+                totals[i] += value
+        return totals
+
+
+class Histogram:
+    """Histogram with fixed buckets; observe() is lock-free"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = tuple(buckets)
+        # One count per bucket, one for +Inf, and the sum of observed values
+        self._shards = _Shards(len(self.buckets) + 2)
+
+    def observe(self, value: float):
+        values = self._shards.get()
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Return (non-cumulative bucket counts including +Inf, sum)"""
+        totals = self._shards.totals()
+        return totals[:-1], totals[-1]
+
+
+class Counter:
+    """Monotonic counter; inc() is lock-free"""
+
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1):
+        self._shards.get()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._shards.totals()[0]
+
+
+class Gauge:
+    """
+    Gauge holding the last set value
+
+    inc() and dec() are meant for the event loop thread (e.g. in-flight
+    requests); set() may be called from any thread.
+    """
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+
+class MetricFamily:
+    """A named metric with one child per label combination"""
+
+    def __init__(self, name: str, help_text: str, kind: str, label_names: Tuple[str, ...], factory):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.label_names = tuple(label_names)
+        self._factory = factory
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """
+        Child metric for a label combination (created on first use)
+
+        Args:
+            *values: One value per label name, in order
+
+        Returns:
+            Histogram, Counter or Gauge
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def _label_text(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        """Prometheus text lines of this family"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(list(self._children.items()), key=lambda item: item[0]):
+            if self.kind == "histogram":
+                counts, total = child.snapshot()
+                cumulative = 0
+                for bound, count in zip(child.buckets + (float('inf'),), counts):
+                    cumulative += count
+                    le = 'le="+Inf"' if bound == float('inf') else f'le="{bound:g}"'
+                    lines.append(f"{self.name}_bucket{self._label_text(values, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{self._label_text(values)} {_number(total)}")
+                lines.append(f"{self.name}_count{self._label_text(values)} {cumulative}")
+            else:
+                lines.append(f"{self.name}{self._label_text(values)} {_number(child.value)}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together"""
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+
+    def _register(self, family: MetricFamily) -> MetricFamily:
+        if family.name in self._families:
+            raise ValueError(f"Metric {family.name} is already registered")
+        self._families[family.name] = family
+        return family
+
+    def histogram(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> MetricFamily:
+        return self._register(MetricFamily(name, help_text, "histogram", label_names, lambda: Histogram(buckets)))
+
+    def counter(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> MetricFamily:
+        return self._register(MetricFamily(name, help_text, "counter", label_names, Counter))
+
+    def gauge(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> MetricFamily:
+        return self._register(MetricFamily(name, help_text, "gauge", label_names, Gauge))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+class RequestTimings:
+    """
+    Stage durations of one request, filled in as the request progresses
+
+    worker_profiles is a list only while the request is being profiled;
+    the inference executor then appends the profiles of its tasks.
+    finished is set once parse and serialize have been booked.
+    """
+
+    __slots__ = ('started', 'endpoint_started', 'endpoint_finished', 'finished', 'stages', 'worker_profiles')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.endpoint_started = None
+        self.endpoint_finished = None
+        self.finished = None
+        self.stages: Dict[str, float] = {}
+        self.worker_profiles: Optional[list] = None
+
+    def server_timing(self, total: float) -> str:
+        """
+        Server-Timing header value with every stage in milliseconds
+
+        Args:
+            total: End-to-end duration in seconds
+
+        Returns:
+            Header value like 'parse;dur=0.412, preprocess;dur=0.051, total;dur=1.234'
+        """
+        stages = sorted(self.stages.items(), key=lambda item: STAGE_ORDER.get(item[0], len(STAGE_ORDER)))
+        entries = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in stages]
+        entries.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(entries)
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+
+
+def set_current_timings(timings: Optional[RequestTimings]):
+    """
+    Make timings the current request's timings
+
+    Returns:
+        Token for reset_current_timings
+    """
+    return _current_timings.set(timings)
+
+
+def reset_current_timings(token):
+    """Restore the timings that were current before set_current_timings"""
+    _current_timings.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the request being handled, or None outside a timed route"""
+    return _current_timings.get()
+
+
+def current_stages() -> Optional[Dict[str, float]]:
+    """Stage dictionary of the request being handled, or None outside a timed route"""
+    timings = _current_timings.get()
+    return timings.stages if timings is not None else None
+
+
+def is_profiling() -> bool:
+    """Whether the request being handled runs under the request profiler"""
+    timings = _current_timings.get()
+    return timings is not None and timings.worker_profiles is not None
+
+
+def merge_stages(stages: Optional[Dict[str, float]], worker_stages: Dict[str, float], elapsed: float):
+    """
+    Add the stages measured by an inference worker to a request's stages
+
+    The part of the elapsed time the worker did not account for is booked
+    as executor_wait (queueing, dispatch and, for process workers, pickling).
+
+    Args:
+        stages: Stage dictionary of the request (nothing is done if None)
+        worker_stages: Stages measured inside the worker
+        elapsed: Wall time the caller waited for the worker
+    """
+    if stages is None:
+        return
+    stages.update(worker_stages)
+    stages[STAGE_EXECUTOR_WAIT] = max(0.0, elapsed - sum(worker_stages.values()))
+
+
+# Global metrics registry and service metrics
+metrics = MetricsRegistry()
+
+stage_seconds = metrics.histogram(
+    "ml_stage_duration_seconds", "Time spent per request stage", ("endpoint", "stage"))
+request_seconds = metrics.histogram(
+    "ml_request_duration_seconds", "End-to-end request handling time", ("endpoint",))
+requests_total = metrics.counter(
+    "ml_requests_total", "Requests handled", ("endpoint", "status"))
+requests_in_flight = metrics.gauge(
+    "ml_requests_in_flight", "Requests currently being handled", ("endpoint",))
+batch_size = metrics.histogram(
+    "ml_batch_size", "Cases scored per vectorized call", ("endpoint",), BATCH_SIZE_BUCKETS)
+model_load_seconds = metrics.histogram(
+    "ml_model_load_duration_seconds", "Time to load model artifacts", ("kind",), LOAD_BUCKETS)
+model_loaded = metrics.gauge(
+    "ml_model_loaded", "Whether the primary model is loaded (1) or not (0)")
+cascade_cases = metrics.counter(
+    "ml_cascade_cases_total", "Cases scored in cascade mode, by the stage that decided them", ("stage",))
+requests_shed = metrics.counter(
+    "ml_requests_shed_total", "Requests rejected by admission control", ("endpoint", "reason"))
+requests_degraded = metrics.counter(
+    "ml_requests_degraded_total", "Batch requests scored with the surrogate under overload", ("endpoint",))
+admission_queue_depth = metrics.gauge(
+    "ml_admission_queue_depth", "Requests waiting for an admission slot", ("endpoint",))
+
+
+def record_stages(endpoint: str, stages: Dict[str, float]):
+    """
+    Observe every stage duration of a request
+
+    Args:
+        endpoint: Endpoint label (route path)
+        stages: Stage name to seconds
+    """
+    for stage, seconds in stages.items():
+        stage_seconds.labels(endpoint, stage).observe(seconds)
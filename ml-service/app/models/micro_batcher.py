@@ -0,0 +1,190 @@
+"""
+Adaptive micro-batching for single-case predictions
+Coalesces concurrent /predictions/recovery requests into small vectorized batches
+"""
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from app.config import MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_US
+from app.models.inference_executor import inference_executor, InferenceExecutor
+from app.models.model_service import model_service
+from app.models.prediction_cache import prediction_cache
+from app.models.shadow_scorer import shadow_scorer
+from app.models.metrics import batch_size as batch_size_metric, STAGE_BATCH_WAIT
+
+# Endpoint label of micro-batch sizes in the metrics
+MICRO_BATCH_METRIC_LABEL = "micro_batch"
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Smoothing factor for the inter-arrival time estimate
+ARRIVAL_EWMA_ALPHA = 0.2
+
+
+class MicroBatchStats:
+    """Counters describing queue depth, batch size and wait time"""
+
+    def __init__(self):
+        self.requests = 0
+        self.batches = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.max_batch_size = 0
+        self.total_wait_us = 0.0
+        self.max_wait_us = 0.0
+
+    def record_enqueue(self, queue_depth: int):
+        self.requests += 1
+        self.queue_depth = queue_depth
+        if queue_depth > self.max_queue_depth:
+            self.max_queue_depth = queue_depth
+
+    def record_batch(self, batch_size: int, waits_us: List[float]):
+        self.batches += 1
+        self.queue_depth = 0
+        if batch_size > self.max_batch_size:
+            self.max_batch_size = batch_size
+        self.total_wait_us += sum(waits_us)
+        self.max_wait_us = max(self.max_wait_us, max(waits_us))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current counters as a dictionary"""
+        batched = self.requests - self.queue_depth
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'avg_batch_size': round(batched / self.batches, 3) if self.batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'avg_wait_us': round(self.total_wait_us / batched, 1) if batched else 0.0,
+            'max_wait_us': round(self.max_wait_us, 1)
+        }
+
+
+class MicroBatcher:
+    """
+    Request coalescer for single-case predictions
+
+    The first request of a batch arms a timer of at most max_wait_us. The
+    batch is flushed when the timer fires or max_batch_size requests have
+    queued, whichever comes first, and scored with one vectorized
+    predict_batch call on the inference executor. When requests arrive
+    further apart than the wait budget, a lone request is scored
+    immediately instead of waiting.
+    """
+
+    def __init__(self, executor: InferenceExecutor, max_batch_size: int = MICRO_BATCH_MAX_SIZE,
+                 max_wait_us: int = MICRO_BATCH_MAX_WAIT_US):
+        self._executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_us / 1e6
+        self._pending: List[Tuple[Dict[str, float], asyncio.Future, float, Optional[Dict[str, float]]]] = []
+        self._timer = None
+        self._last_arrival = None
+        self._interarrival = None
+        self._tasks = set()
+        self.stats = MicroBatchStats()
+
+    async def predict(self, features: Dict[str, float],
+                      timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        Queue a single case and wait for its prediction
+
+        Args:
+            features: Dictionary with feature values
+            timings: Dictionary that receives the seconds spent per stage (the
+                batch's stages plus this request's batch_wait)
+
+        Returns:
+            Dictionary with prediction results
+        """
+        key = model_service.cache_key(features)
+        if key is not None:
+            cached = prediction_cache.get(key)
+            if cached is not None:
+                return cached
+
+        loop = asyncio.get_running_loop()
+        now = time.perf_counter()
+        self._track_arrival(now)
+
+        future = loop.create_future()
+        self._pending.append((features, future, now, timings))
+        self.stats.record_enqueue(len(self._pending))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            if self._interarrival is not None and self._interarrival > self.max_wait:
+                # Traffic is too sparse to fill a batch within the wait budget
+                self._flush()
+            else:
+                self._timer = loop.call_later(self.max_wait, self._flush)
+
+        result = await future
+        if key is not None:
+            prediction_cache.put(key, result)
+        return result
+
+    def _track_arrival(self, now: float):
+        """Update the exponentially weighted inter-arrival time"""
+        if self._last_arrival is not None:
+            gap = now - self._last_arrival
+            if self._interarrival is None:
+                self._interarrival = gap
+            else:
+                self._interarrival += ARRIVAL_EWMA_ALPHA * (gap - self._interarrival)
+        self._last_arrival = now
+
+    def _flush(self):
+        """Hand all pending requests to the executor as one batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        waits = [started - queued for _, _, queued, _ in batch]
+        self.stats.record_batch(len(batch), [wait * 1e6 for wait in waits])
+        batch_size_metric.labels(MICRO_BATCH_METRIC_LABEL).observe(len(batch))
+        for (_, _, _, timings), wait in zip(batch, waits):
+            if timings is not None:
+                timings[STAGE_BATCH_WAIT] = wait
+
+        # Keep a reference so the task is not garbage collected while running
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: list):
+        """Score one batch and resolve the futures of its callers"""
+        cases = [features for features, _, _, _ in batch]
+        batch_timings = {}
+        try:
+            results = await self._executor.predict_batch(cases, timings=batch_timings)
+        except Exception as e:
+            logger.error(f"Error scoring micro-batch of {len(batch)} cases: {e}")
+            for _, future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _, timings), result in zip(batch, results):
+            if timings is not None:
+                timings.update(batch_timings)
+            if not future.done():
+                future.set_result(result)
+
+        # The candidate model sees the same coalesced batch
+        shadow_scorer.submit(cases, results)
+
+
+# Global micro-batcher instance
+micro_batcher = MicroBatcher(inference_executor)
@@ -0,0 +1,477 @@
+"""
+Model bundle: the set of artifacts that is served together
+Model, preprocessor, metadata and everything derived from them
+
+joblib and pandas are imported where they are used: memory-mapped bundles
+never unpickle the model, and the feature plan serves requests without pandas.
+"""
+import copy
+import hashlib
+import json
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, Any, Optional
+import logging
+
+from app.config import (
+    MODEL_PATH, SCALER_PATH, METADATA_PATH, SURROGATE_PATH, API_FEATURES, MODEL_VERSION,
+    TREE_ENGINE_ENABLED, TREE_ENGINE_MAX_ROWS, MODEL_ARTIFACT_FORMAT, CASCADE_ENABLED, ADMISSION_DEGRADE_ENABLED
+)
+from app.models.feature_plan import FeaturePlan
+from app.models import flat_artifacts
+from app.models.tree_engine import FlatEnsemble, build_engine
+from app.models.cascade import Cascade
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Number of synthetic rows scored when warming up a freshly loaded bundle
+WARM_UP_ROWS = 64
+
+
+class ModelBundle:
+    """
+    Immutable bundle of model, preprocessor and metadata
+
+    A bundle is never modified after it is built. ModelService swaps whole
+    bundles in a single assignment, so a request that grabbed a bundle
+    keeps a consistent model/preprocessor pair until it finishes.
+    """
+
+    def __init__(self, model=None, preprocessor: Optional[dict] = None,
+                 metadata: Optional[Dict[str, Any]] = None,
+                 feature_plan: Optional[FeaturePlan] = None,
+                 engine: Optional[FlatEnsemble] = None,
+                 cascade: Optional[Cascade] = None,
+                 surrogate: Optional[Cascade] = None,
+                 version: Optional[str] = None, source: Optional[Path] = None,
+                 load_seconds: float = 0.0):
+        self.model = model
+        self.preprocessor = preprocessor
+        self.metadata = metadata or {}
+        self.feature_plan = feature_plan
+        self.engine = engine
+        self.cascade = cascade
+        # Surrogate for degraded (overload) scoring; also the cascade's first stage
+        self.surrogate = surrogate if surrogate is not None else cascade
+        self.surrogate_only = False
+        self._degraded = None
+        self.version = version
+        self.source = source
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+
+    @classmethod
+    def load(cls, model_path: Path = MODEL_PATH, scaler_path: Path = SCALER_PATH,
+             metadata_path: Path = METADATA_PATH, use_flat: Optional[bool] = None) -> 'ModelBundle':
+        """
+        Load model, preprocessor, and metadata into a new bundle
+
+        With MODEL_ARTIFACT_FORMAT=mmap and up-to-date flat artifacts next to
+        the model, the bundle memory-maps them instead of unpickling. With
+        CASCADE_ENABLED the cascade surrogate next to the model is loaded too.
+
+        Args:
+            model_path: Path to the pickled model
+            scaler_path: Path to the pickled preprocessor
+            metadata_path: Path to the metadata JSON
+            use_flat: Use flat artifacts (defaults to MODEL_ARTIFACT_FORMAT == 'mmap')
+
+        Returns:
+            ModelBundle (with model None if the model file does not exist)
+        """
+        if use_flat is None:
+            use_flat = MODEL_ARTIFACT_FORMAT == 'mmap'
+
+        if use_flat:
+            directory = flat_artifacts.flat_dir(model_path)
+            if flat_artifacts.is_current(directory, model_path, scaler_path):
+                return cls.load_flat(directory, metadata_path)
+            logger.warning(f"⚠️ No up-to-date flat artifacts in {directory}, loading pickles")
+
+        import joblib
+
+        started = time.perf_counter()
+        logger.info("Loading model artifacts...")
+
+        # Load model
+        if model_path.exists():
+            model = joblib.load(model_path)
+            logger.info(f"✅ Loaded model from {model_path}")
+        else:
+            logger.warning(f"⚠️ Model not found at {model_path}")
+            model = None
+
+        # Load preprocessor
+        if scaler_path.exists():
+            preprocessor = joblib.load(scaler_path)
+            logger.info(f"✅ Loaded preprocessor from {scaler_path}")
+        else:
+            logger.warning(f"⚠️ Preprocessor not found at {scaler_path}")
+            preprocessor = None
+
+        # Load metadata
+        if metadata_path.exists():
+            with open(metadata_path, 'r') as f:
+                metadata = json.load(f)
+            logger.info(f"✅ Loaded metadata from {metadata_path}")
+        else:
+            logger.warning(f"⚠️ Metadata not found at {metadata_path}")
+            metadata = {}
+
+        # Precompile the pandas-free feature plan
+        feature_plan = FeaturePlan.from_preprocessor(preprocessor)
+        if feature_plan is None:
+            logger.warning("⚠️ Scaler does not expose mean_/scale_, using pandas preprocessing")
+
+        # Flatten tree ensembles for the native NumPy engine
+        engine = None
+        if TREE_ENGINE_ENABLED and model is not None:
+            n_features = getattr(model, 'n_features_in_', None)
+            if n_features is None and feature_plan is not None:
+                n_features = feature_plan.n_features
+            if n_features:
+                engine = build_engine(model, n_features)
+
+        surrogate_path = model_path.with_name(SURROGATE_PATH.name)
+        version = cls.compute_version(metadata, (model_path, scaler_path, surrogate_path))
+        surrogate = cls.load_cascade(surrogate_path, cls.surrogate_wanted()) if model is not None else None
+
+        return cls(
+            model=model,
+            preprocessor=preprocessor,
+            metadata=metadata,
+            feature_plan=feature_plan,
+            engine=engine,
+            cascade=surrogate if CASCADE_ENABLED else None,
+            surrogate=surrogate,
+            version=version,
+            source=model_path.parent,
+            load_seconds=time.perf_counter() - started
+        )
+
+    @classmethod
+    def load_flat(cls, directory: Path, metadata_path: Path = METADATA_PATH) -> 'ModelBundle':
+        """
+        Build a bundle from memory-mapped flat artifacts
+
+        The model is a FlatModel that scores every batch size with the tree
+        engine; the preprocessor only carries the feature names, scaling is
+        done by the feature plan.
+
+        Args:
+            directory: Flat artifact directory
+            metadata_path: Metadata JSON (the manifest's copy is used if absent)
+
+        Returns:
+            ModelBundle
+        """
+        started = time.perf_counter()
+        parts = flat_artifacts.load_flat_artifacts(directory)
+        surrogate = cls.load_cascade(Path(directory).parent / SURROGATE_PATH.name, cls.surrogate_wanted())
+
+        metadata = parts['metadata']
+        if metadata_path.exists():
+            with open(metadata_path, 'r') as f:
+                metadata = json.load(f)
+
+        return cls(
+            model=parts['model'],
+            preprocessor={'feature_names': parts['feature_names']},
+            metadata=metadata,
+            feature_plan=parts['feature_plan'],
+            engine=parts['engine'],
+            cascade=surrogate if CASCADE_ENABLED else None,
+            surrogate=surrogate,
+            version=parts['version'],
+            source=Path(directory).parent,
+            load_seconds=time.perf_counter() - started
+        )
+
+    @staticmethod
+    def surrogate_wanted() -> bool:
+        """Whether the surrogate is needed, for cascade mode or for degraded scoring"""
+        return CASCADE_ENABLED or ADMISSION_DEGRADE_ENABLED
+
+    @staticmethod
+    def load_cascade(surrogate_path: Path, enabled: Optional[bool] = None) -> Optional[Cascade]:
+        """
+        Load the cascade surrogate trained with the model
+
+        The surrogate is a few shallow trees, so it is always unpickled and
+        flattened for the tree engine, also for memory-mapped bundles.
+
+        Args:
+            surrogate_path: Path to the pickled surrogate
+            enabled: Load it at all (defaults to CASCADE_ENABLED)
+
+        Returns:
+            Cascade, or None if disabled, missing or unsupported
+        """
+        if not (CASCADE_ENABLED if enabled is None else enabled):
+            return None
+        if not surrogate_path.exists():
+            logger.warning(f"⚠️ No cascade surrogate at {surrogate_path}, scoring with the full model")
+            return None
+
+        import joblib
+
+        try:
+            cascade = Cascade.from_model(joblib.load(surrogate_path))
+        except Exception as e:
+            logger.warning(f"⚠️ Cascade surrogate not used: {e}")
+            return None
+
+        logger.info(f"✅ Loaded cascade surrogate from {surrogate_path} ({cascade.surrogate.n_trees} trees)")
+        return cascade
+
+    @staticmethod
+    def compute_version(metadata: Dict[str, Any], paths: tuple) -> str:
+        """
+        Build a version string from the metadata version and an artifact hash
+
+        Args:
+            metadata: Model metadata
+            paths: Artifact files to hash
+
+        Returns:
+            String like '1.0.0:3f2a9c1b0d4e5f67'
+        """
+        digest = hashlib.sha256()
+        for path in paths:
+            if path.exists():
+                with open(path, 'rb') as f:
+                    for block in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(block)
+
+        version = metadata.get('model_version', MODEL_VERSION)
+        return f"{version}:{digest.hexdigest()[:16]}"
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.model is not None
+
+    @property
+    def feature_names(self) -> list:
+        if self.preprocessor:
+            return self.preprocessor.get('feature_names', API_FEATURES)
+        return API_FEATURES
+
+    def preprocess_features(self, features: Dict[str, float]) -> np.ndarray:
+        """
+        Preprocess a single case
+
+        Uses the precompiled feature plan when available, which avoids
+        pandas and sklearn entirely for a single row.
+
+        Args:
+            features: Dictionary with feature values
+
+        Returns:
+            Preprocessed feature array
+        """
+        if self.feature_plan is not None:
+            return self.feature_plan.transform_one(features)
+
+        return self.preprocess_features_pandas(features)
+
+    def preprocess_features_pandas(self, features: Dict[str, float]) -> np.ndarray:
+        """
+        Preprocess a single case with pandas and the fitted scaler
+
+        Args:
+            features: Dictionary with feature values
+
+        Returns:
+            Preprocessed feature array
+        """
+        import pandas as pd
+
+        # Create DataFrame from API features
+        df = pd.DataFrame([features])
+
+        # Ensure all required features are present
+        for feature in API_FEATURES:
+            if feature not in df.columns:
+                df[feature] = 0
+
+        # If we have a preprocessor, use it
+        if self.preprocessor:
+            scaler = self.preprocessor.get('scaler')
+            feature_names = self.preprocessor.get('feature_names', API_FEATURES)
+
+            # Add missing features with default values
+            for feature in feature_names:
+                if feature not in df.columns:
+                    df[feature] = 0
+
+            # Select and order features
+            df = df[feature_names]
+
+            # Scale
+            if scaler:
+                features_array = scaler.transform(df)
+            else:
+                features_array = df.values
+        else:
+            # No preprocessor, use raw features
+            df = df[API_FEATURES]
+            features_array = df.values
+
+        return features_array
+
+    def preprocess_batch(self, cases: list) -> np.ndarray:
+        """
+        Preprocess many cases into a single feature matrix
+
+        Produces exactly the same values as preprocess_features on each case.
+
+        Args:
+            cases: List of feature dictionaries
+
+        Returns:
+            Preprocessed feature matrix with one row per case
+        """
+        if self.feature_plan is not None:
+            return self.feature_plan.transform_batch(cases)
+
+        import pandas as pd
+
+        # Fall back to one DataFrame and a single transform call
+        scaler = self.preprocessor.get('scaler') if self.preprocessor else None
+
+        # One column per feature, missing features default to 0
+        df = pd.DataFrame({
+            feature: [case.get(feature, 0) for case in cases]
+            for feature in self.feature_names
+        })
+
+        if scaler:
+            return scaler.transform(df)
+        return df.values
+
+    def preprocess_columns(self, columns: Dict[str, np.ndarray], n_rows: int) -> np.ndarray:
+        """
+        Preprocess column arrays into a feature matrix
+
+        Args:
+            columns: Dictionary of feature name to 1-D array of length n_rows
+            n_rows: Number of rows
+
+        Returns:
+            Preprocessed feature matrix with one row per input row
+        """
+        if self.feature_plan is not None:
+            return self.feature_plan.transform_columns(columns, n_rows)
+
+        import pandas as pd
+
+        scaler = self.preprocessor.get('scaler') if self.preprocessor else None
+        zeros = np.zeros(n_rows)
+        df = pd.DataFrame({feature: columns.get(feature, zeros) for feature in self.feature_names})
+
+        if scaler:
+            return scaler.transform(df)
+        return df.values
+
+    def predict_positive(self, features_array: np.ndarray) -> np.ndarray:
+        """
+        Recovery probabilities for preprocessed rows
+
+        In cascade mode the surrogate scores every row first and only rows
+        near a risk threshold reach the full model.
+
+        Args:
+            features_array: Preprocessed feature matrix
+
+        Returns:
+            Array of recovery probabilities
+        """
+        if self.surrogate_only:
+            return self.surrogate.score_surrogate(features_array)[0]
+        if self.cascade is not None:
+            return self.cascade.predict(features_array, self.predict_full)[0]
+        return self.predict_full(features_array)
+
+    def degraded(self) -> 'ModelBundle':
+        """
+        View of this bundle that scores with the surrogate alone
+
+        Used to keep answering batches under overload at a fraction of the
+        full model's cost. Without a surrogate the bundle itself is returned.
+
+        Returns:
+            ModelBundle sharing this bundle's artifacts
+        """
+        if self.surrogate is None or self.surrogate_only:
+            return self
+        if self._degraded is None:
+            degraded = copy.copy(self)
+            degraded.cascade = None
+            degraded.surrogate_only = True
+            degraded.version = f"{self.version}+surrogate"
+            self._degraded = degraded
+        return self._degraded
+
+    def predict_full(self, features_array: np.ndarray) -> np.ndarray:
+        """
+        Recovery probabilities of the full model
+
+        Single rows and small batches go through the native tree engine,
+        which avoids predict_proba's per-call overhead and thread fan-out.
+        Larger batches are traversed by the model's own multi-threaded
+        apply(), and the engine sums the leaf values it returns. Every row
+        thus gets the same probability whatever the batch size, which
+        predict_proba (summing trees in thread completion order) would not
+        guarantee.
+
+        Args:
+            features_array: Preprocessed feature matrix
+
+        Returns:
+            Array of recovery probabilities
+        """
+        if self.engine is None:
+            return self.model.predict_proba(features_array)[:, 1]
+        if features_array.shape[0] <= TREE_ENGINE_MAX_ROWS or self.engine.source_index is None:
+            return self.engine.predict_proba(features_array)[:, 1]
+        return self.engine.predict_proba_from_leaves(self.model.apply(features_array))[:, 1]
+
+    def warm_up(self, n_rows: int = WARM_UP_ROWS, random_state: int = 0) -> float:
+        """
+        Score synthetic cases so first real requests do not pay warm-up costs
+
+        Exercises the single-row path and both batch paths (engine and
+        the model's apply).
+
+        Args:
+            n_rows: Number of synthetic rows
+            random_state: Seed for the synthetic rows
+
+        Returns:
+            Warm-up duration in seconds
+        """
+        started = time.perf_counter()
+        rng = np.random.default_rng(random_state)
+
+        cases = [
+            {
+                'debt_amount': float(rng.uniform(100, 50000)),
+                'days_past_due': int(rng.integers(0, 365)),
+                'credit_score': float(rng.uniform(300, 850)),
+                'payment_attempts': int(rng.integers(0, 20)),
+                'communication_count': int(rng.integers(0, 50))
+            }
+            for _ in range(n_rows)
+        ]
+
+        features_array = self.preprocess_batch(cases)
+        self.predict_full(self.preprocess_features(cases[0]))
+        self.predict_full(features_array)
+        if self.engine is not None and self.engine.source_index is not None:
+            self.model.apply(features_array)
+        if self.cascade is not None:
+            self.cascade.predict(features_array, self.predict_full, record=False)
+
+        return time.perf_counter() - started
@@ -0,0 +1,339 @@
+"""
+Registry of versioned models kept in memory side by side
+Routes requests between versions and records per-version statistics
+"""
+import random
+import threading
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+import logging
+
+import numpy as np
+
+from app.config import (
+    MODEL_REGISTRY_DIR, MODEL_REGISTRY_MAX_BYTES, MODEL_TRAFFIC_SPLIT,
+    MODEL_PATH, SCALER_PATH, METADATA_PATH
+)
+from app.models.model_bundle import ModelBundle
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Label of the model served by ModelService (MODEL_PATH)
+PRIMARY_VERSION = "primary"
+
+# Latency samples kept per version for percentiles
+LATENCY_WINDOW = 1024
+
+# Suffix of a version label that scores with that version's surrogate alone (overload fallback)
+DEGRADED_SUFFIX = "+surrogate"
+
+
+def degraded_version(version: str) -> str:
+    """Label that scores a version in degraded (surrogate-only) mode"""
+    return version + DEGRADED_SUFFIX
+
+
+def split_degraded(version: Optional[str]) -> Tuple[Optional[str], bool]:
+    """
+    Split a version label into the version and whether it is degraded
+
+    Args:
+        version: Version label, possibly ending in DEGRADED_SUFFIX
+
+    Returns:
+        Tuple of (version, degraded)
+    """
+    if version and version.endswith(DEGRADED_SUFFIX):
+        return version[:-len(DEGRADED_SUFFIX)], True
+    return version, False
+
+
+def parse_traffic_split(spec: str) -> Dict[str, float]:
+    """
+    Parse a traffic split such as '2.0.0=10,2.1.0=5'
+
+    Args:
+        spec: Comma separated version=percent pairs
+
+    Returns:
+        Dictionary of version to percent of requests
+
+    Raises:
+        ValueError: If the spec is malformed or the percentages exceed 100
+    """
+    split = {}
+    for part in filter(None, (item.strip() for item in spec.split(','))):
+        version, _, percent = part.partition('=')
+        if not version or not percent:
+            raise ValueError(f"Invalid traffic split entry '{part}', expected version=percent")
+        split[version.strip()] = float(percent)
+
+    if any(percent < 0 for percent in split.values()) or sum(split.values()) > 100:
+        raise ValueError(f"Traffic split percentages must be >= 0 and sum to at most 100: {spec}")
+    return split
+
+
+class VersionStats:
+    """Latency and shadow disagreement counters for one model version"""
+
+    def __init__(self):
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.shadow_batches = 0
+        self.shadow_rows = 0
+        self.shadow_disagreements = 0
+        self.shadow_abs_diff = 0.0
+        self.shadow_max_abs_diff = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current counters as a dictionary"""
+        latencies = np.array(self.latencies) * 1000 if self.latencies else None
+        snapshot = {
+            'requests': self.requests,
+            'rows': self.rows,
+            'errors': self.errors,
+            'avg_latency_ms': round(self.total_seconds * 1000 / self.requests, 3) if self.requests else 0.0,
+            'p50_latency_ms': round(float(np.percentile(latencies, 50)), 3) if latencies is not None else 0.0,
+            'p95_latency_ms': round(float(np.percentile(latencies, 95)), 3) if latencies is not None else 0.0
+        }
+        if self.shadow_batches:
+            snapshot.update({
+                'shadow_batches': self.shadow_batches,
+                'shadow_rows': self.shadow_rows,
+                'shadow_disagreements': self.shadow_disagreements,
+                'shadow_disagreement_rate': round(self.shadow_disagreements / self.shadow_rows, 4)
+                if self.shadow_rows else 0.0,
+                'shadow_mean_abs_diff': round(self.shadow_abs_diff / self.shadow_rows, 6)
+                if self.shadow_rows else 0.0,
+                'shadow_max_abs_diff': round(self.shadow_max_abs_diff, 6)
+            })
+        return snapshot
+
+
+class ModelRegistry:
+    """
+    Versioned models loaded on demand and kept under an LRU memory cap
+
+    Each version lives in its own directory under registry_dir with the same
+    artifact names as MODELS_DIR (recovery_model.pkl, scaler.pkl,
+    model_metadata.json). The primary model stays with ModelService and is
+    not counted against the cap.
+    """
+
+    def __init__(self, registry_dir: Path = MODEL_REGISTRY_DIR,
+                 max_bytes: int = MODEL_REGISTRY_MAX_BYTES,
+                 traffic_split: Optional[Dict[str, float]] = None):
+        self.registry_dir = registry_dir
+        self.max_bytes = max_bytes
+        self.traffic_split = traffic_split if traffic_split is not None else parse_traffic_split(MODEL_TRAFFIC_SPLIT)
+        self._bundles: "OrderedDict[str, ModelBundle]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, VersionStats] = {}
+        self._stats_lock = threading.Lock()
+        self.evictions = 0
+
+        unknown = [version for version in self.traffic_split if not self.has_version(version)]
+        if unknown:
+            logger.warning(f"⚠️ Traffic split versions not in {self.registry_dir}: {unknown}; "
+                           f"their share is served by the primary model until they are added")
+
+    def _version_dir(self, version: str) -> Path:
+        return self.registry_dir / version
+
+    def has_version(self, version: str) -> bool:
+        """Check if a version exists in the registry directory"""
+        if not version or '/' in version or '\\' in version or version.startswith('.'):
+            return False
+        return (self._version_dir(version) / MODEL_PATH.name).exists()
+
+    def available_versions(self) -> List[str]:
+        """List versions present in the registry directory"""
+        if not self.registry_dir.exists():
+            return []
+        return sorted(path.name for path in self.registry_dir.iterdir() if self.has_version(path.name))
+
+    def loaded_versions(self) -> List[str]:
+        """List versions currently held in memory, least recently used first"""
+        with self._lock:
+            return list(self._bundles)
+
+    @staticmethod
+    def _bundle_size(bundle: ModelBundle, directory: Path) -> int:
+        """Approximate memory footprint: pickled artifact sizes plus engine arrays"""
+        size = sum(
+            (directory / name).stat().st_size
+            for name in (MODEL_PATH.name, SCALER_PATH.name)
+            if (directory / name).exists()
+        )
+        if bundle.engine is not None:
+            size += sum(value.nbytes for value in vars(bundle.engine).values() if isinstance(value, np.ndarray))
+        return size
+
+    def get(self, version: str) -> ModelBundle:
+        """
+        Get the bundle of a version, loading it if needed
+
+        Args:
+            version: Registry version (directory name)
+
+        Returns:
+            ModelBundle of the version
+
+        Raises:
+            KeyError: If the version does not exist in the registry
+        """
+        with self._lock:
+            bundle = self._bundles.get(version)
+            if bundle is not None:
+                self._bundles.move_to_end(version)
+                return bundle
+
+        if not self.has_version(version):
+            raise KeyError(f"Model version '{version}' not found in {self.registry_dir}")
+
+        # Load outside the lock so versions already in memory keep serving
+        directory = self._version_dir(version)
+        bundle = ModelBundle.load(
+            directory / MODEL_PATH.name,
+            directory / SCALER_PATH.name,
+            directory / METADATA_PATH.name
+        )
+        size = self._bundle_size(bundle, directory)
+
+        with self._lock:
+            if version in self._bundles:
+                # Loaded concurrently by another request
+                self._bundles.move_to_end(version)
+                return self._bundles[version]
+
+            self._bundles[version] = bundle
+            self._sizes[version] = size
+            self._bytes += size
+            logger.info(f"✅ Loaded model version {version} ({size / 1e6:.1f} MB)")
+
+            # Evict least recently used versions, but always keep the one just loaded
+            while self._bytes > self.max_bytes and len(self._bundles) > 1:
+                evicted, _ = self._bundles.popitem(last=False)
+                self._bytes -= self._sizes.pop(evicted)
+                self.evictions += 1
+                logger.info(f"Evicted model version {evicted} from memory")
+
+        return bundle
+
+    def unload(self, version: str):
+        """Drop a version from memory (it is reloaded on next use)"""
+        with self._lock:
+            if self._bundles.pop(version, None) is not None:
+                self._bytes -= self._sizes.pop(version)
+
+    def route(self, requested_version: Optional[str] = None) -> str:
+        """
+        Pick the version that serves a request
+
+        An explicit version (X-Model-Version header) wins; otherwise the
+        request is assigned by the configured percentage split and falls
+        through to the primary model. A split version missing from the
+        registry (a typo, or deleted) is served by the primary model.
+
+        Args:
+            requested_version: Version requested by the caller, if any
+
+        Returns:
+            Registry version or PRIMARY_VERSION
+
+        Raises:
+            KeyError: If the requested version does not exist
+        """
+        if requested_version:
+            if requested_version == PRIMARY_VERSION:
+                return PRIMARY_VERSION
+            if not self.has_version(requested_version):
+                raise KeyError(f"Model version '{requested_version}' not found")
+            return requested_version
+
+        if self.traffic_split:
+            draw = random.random() * 100
+            for version, percent in self.traffic_split.items():
+                if draw < percent:
+                    return version if self.has_version(version) else PRIMARY_VERSION
+                draw -= percent
+
+        return PRIMARY_VERSION
+
+    def _version_stats(self, version: str) -> VersionStats:
+        stats = self._stats.get(version)
+        if stats is None:
+            stats = self._stats.setdefault(version, VersionStats())
+        return stats
+
+    def record_latency(self, version: str, seconds: float, rows: int = 1, error: bool = False):
+        """
+        Record one scoring call of a version
+
+        Args:
+            version: Registry version or PRIMARY_VERSION
+            seconds: Wall time of the call
+            rows: Number of cases scored
+            error: Whether the call failed
+        """
+        with self._stats_lock:
+            stats = self._version_stats(version)
+            stats.requests += 1
+            stats.rows += rows
+            stats.total_seconds += seconds
+            stats.latencies.append(seconds)
+            if error:
+                stats.errors += 1
+
+    def record_shadow(self, version: str, primary: List[Dict[str, Any]], shadow: List[Dict[str, Any]]):
+        """
+        Compare shadow predictions with the primary predictions of the same cases
+
+        Args:
+            version: Shadow version
+            primary: Results returned to callers
+            shadow: Results of the shadow version
+        """
+        primary_proba = np.array([result['recovery_probability'] for result in primary])
+        shadow_proba = np.array([result['recovery_probability'] for result in shadow])
+        abs_diff = np.abs(primary_proba - shadow_proba)
+        disagreements = sum(
+            p['risk_category'] != s['risk_category'] for p, s in zip(primary, shadow)
+        )
+
+        with self._stats_lock:
+            stats = self._version_stats(version)
+            stats.shadow_batches += 1
+            stats.shadow_rows += len(primary)
+            stats.shadow_disagreements += disagreements
+            stats.shadow_abs_diff += float(abs_diff.sum())
+            if abs_diff.size:
+                stats.shadow_max_abs_diff = max(stats.shadow_max_abs_diff, float(abs_diff.max()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return registry usage and per-version statistics"""
+        with self._lock:
+            loaded = list(self._bundles)
+            used = self._bytes
+        with self._stats_lock:
+            versions = {version: stats.snapshot() for version, stats in self._stats.items()}
+        return {
+            'available': self.available_versions(),
+            'loaded': loaded,
+            'bytes': used,
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions,
+            'traffic_split': self.traffic_split,
+            'versions': versions
+        }
+
+
+# Global model registry instance
+model_registry = ModelRegistry()
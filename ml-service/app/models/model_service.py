@@ -1,81 +1,285 @@
 """
 Model service for loading and managing ML models
 Implements singleton pattern for model caching
+
+Importing this module does not load anything: the API loads the model in
+its lifespan (optionally on a background thread), scripts and workers call
+load_model() or ensure_loaded() explicitly.
 """
-import joblib
-import json
-import pandas as pd
+import threading
+import time
 import numpy as np
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable
 import logging
 
-from app.config import MODEL_PATH, SCALER_PATH, METADATA_PATH, RISK_THRESHOLDS, STRATEGY_MAP, API_FEATURES
+from app.config import (
+    MODEL_PATH, SCALER_PATH, METADATA_PATH, RISK_THRESHOLDS, STRATEGY_MAP,
+    BATCH_CHUNK_SIZE, PREDICTION_CACHE_ENABLED
+)
+from app.models.model_bundle import ModelBundle
+from app.models.cascade import risk_codes
+from app.models.prediction_cache import PredictionCache, prediction_cache
+from app.models.metrics import (
+    model_load_seconds, model_loaded, STAGE_PREPROCESS, STAGE_PREDICT, STAGE_CATEGORIZE
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Risk categories in the order used by the vectorized categorization (codes 0, 1, 2)
+RISK_CATEGORIES = np.array(['LOW_RISK', 'MEDIUM_RISK', 'HIGH_RISK'], dtype=object)
+RISK_STRATEGIES = np.array([STRATEGY_MAP[category] for category in RISK_CATEGORIES], dtype=object)
+
+# Decimals of the recovery probabilities returned by every endpoint
+PROBABILITY_DECIMALS = 4
+
+
+def round_probabilities(probabilities: np.ndarray) -> np.ndarray:
+    """
+    Round probabilities exactly like round(p, PROBABILITY_DECIMALS)
+
+    np.round scales by 10**decimals before rounding, which can pick the other
+    neighbour for values within an ulp of a half-way point. Those few values
+    are rounded with Python's round, so columnar and file outputs match the
+    row-wise responses digit for digit.
+
+    Args:
+        probabilities: Probabilities (NaN stays NaN)
+
+    Returns:
+        float64 array of rounded probabilities
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    rounded = np.round(probabilities, PROBABILITY_DECIMALS)
+    scaled = probabilities * 10 ** PROBABILITY_DECIMALS
+    with np.errstate(invalid='ignore'):
+        near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_half).tolist():
+        rounded[i] = round(float(probabilities[i]), PROBABILITY_DECIMALS)
+    return rounded
+
+
+# Load states reported by get_status() and /ready
+LOAD_STATE_NOT_STARTED = "not_started"
+LOAD_STATE_LOADING = "loading"
+LOAD_STATE_READY = "ready"
+LOAD_STATE_MISSING = "missing"
+LOAD_STATE_FAILED = "failed"
+
 
 class ModelService:
-    """Singleton service for model management"""
+    """
+    Singleton service for model management
+
+    All served artifacts live in one immutable ModelBundle. Loading or
+    reloading builds a complete new bundle and replaces the reference in a
+    single assignment; every prediction reads the reference once, so
+    in-flight requests finish on the bundle they started with.
+    """
     
     _instance = None
-    _model = None
-    _preprocessor = None
-    _metadata = None
+    _bundle = ModelBundle()
+    _reload_lock = threading.Lock()
+    _reload_listeners: list = []
+    _load_lock = threading.RLock()
+    _load_state = LOAD_STATE_NOT_STARTED
+    _load_error: Optional[str] = None
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(ModelService, cls).__new__(cls)
         return cls._instance
     
-    def __init__(self):
-        """Initialize model service"""
-        if self._model is None:
-            self.load_model()
+    @property
+    def bundle(self) -> ModelBundle:
+        """The currently served bundle"""
+        return self._bundle
+    
+    def load_model(self, model_path: Path = MODEL_PATH, scaler_path: Path = SCALER_PATH,
+                   metadata_path: Path = METADATA_PATH, warm_up: bool = False):
+        """
+        Load model, preprocessor, and metadata and start serving them
+        
+        Args:
+            model_path: Path to the pickled model
+            scaler_path: Path to the pickled preprocessor
+            metadata_path: Path to the metadata JSON
+            warm_up: Score synthetic cases before serving the bundle
+        """
+        with self._load_lock:
+            ModelService._load_state = LOAD_STATE_LOADING
+            try:
+                bundle = ModelBundle.load(model_path, scaler_path, metadata_path)
+                if bundle.is_loaded:
+                    model_load_seconds.labels('load').observe(bundle.load_seconds)
+                if warm_up and bundle.is_loaded:
+                    bundle.warm_up()
+                self._swap(bundle)
+            except Exception as e:
+                ModelService._load_state = LOAD_STATE_FAILED
+                ModelService._load_error = str(e)
+                logger.error(f"❌ Error loading model artifacts: {e}")
+                raise
+    
+    def ensure_loaded(self) -> bool:
+        """
+        Load the model unless it is already served
+        
+        Waits for a load that is already running (e.g. the background load)
+        instead of starting a second one.
+        
+        Returns:
+            True if a model is loaded
+        """
+        if not self._bundle.is_loaded:
+            with self._load_lock:
+                if not self._bundle.is_loaded:
+                    self.load_model()
+        return self._bundle.is_loaded
+    
+    def load_in_background(self, warm_up: bool = True) -> threading.Thread:
+        """
+        Load (and warm up) the model on a daemon thread
+        
+        The service can answer liveness checks meanwhile; is_ready() turns
+        true once the bundle is swapped in. Failures are kept in the load
+        state instead of being raised.
+        
+        Args:
+            warm_up: Score synthetic cases before serving the bundle
+            
+        Returns:
+            The started loader thread
+        """
+        def load():
+            try:
+                self.load_model(warm_up=warm_up)
+            except Exception:
+                pass
+        
+        ModelService._load_state = LOAD_STATE_LOADING
+        thread = threading.Thread(target=load, name='model-loader', daemon=True)
+        thread.start()
+        return thread
     
-    def load_model(self):
-        """Load model, preprocessor, and metadata"""
+    def is_ready(self) -> bool:
+        """Check if the service can score requests with the primary model"""
+        return self._bundle.is_loaded
+    
+    def reload_model(self, model_path: Path = MODEL_PATH, scaler_path: Path = SCALER_PATH,
+                     metadata_path: Path = METADATA_PATH) -> Dict[str, Any]:
+        """
+        Load new artifacts, warm them up and swap them in atomically
+        
+        The current bundle keeps serving while the new one loads. If the new
+        artifacts are missing or fail to load or warm up, nothing is swapped.
+        
+        Args:
+            model_path: Path to the pickled model
+            scaler_path: Path to the pickled preprocessor
+            metadata_path: Path to the metadata JSON
+            
+        Returns:
+            Dictionary with previous and new version and timings
+            
+        Raises:
+            RuntimeError: If a reload is already running or the new model is missing
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            raise RuntimeError("A model reload is already in progress")
+        
         try:
-            logger.info("Loading model artifacts...")
-            
-            # Load model
-            if MODEL_PATH.exists():
-                self._model = joblib.load(MODEL_PATH)
-                logger.info(f"✅ Loaded model from {MODEL_PATH}")
-            else:
-                logger.warning(f"⚠️ Model not found at {MODEL_PATH}")
-                self._model = None
-            
-            # Load preprocessor
-            if SCALER_PATH.exists():
-                preprocessor_data = joblib.load(SCALER_PATH)
-                self._preprocessor = preprocessor_data
-                logger.info(f"✅ Loaded preprocessor from {SCALER_PATH}")
-            else:
-                logger.warning(f"⚠️ Preprocessor not found at {SCALER_PATH}")
-                self._preprocessor = None
-            
-            # Load metadata
-            if METADATA_PATH.exists():
-                with open(METADATA_PATH, 'r') as f:
-                    self._metadata = json.load(f)
-                logger.info(f"✅ Loaded metadata from {METADATA_PATH}")
-            else:
-                logger.warning(f"⚠️ Metadata not found at {METADATA_PATH}")
-                self._metadata = {}
+            previous_version = self._bundle.version
+            logger.info("Reloading model artifacts...")
+            
+            bundle = ModelBundle.load(model_path, scaler_path, metadata_path)
+            if not bundle.is_loaded:
+                raise RuntimeError(f"Model not found at {model_path}, keeping the current model")
+            
+            model_load_seconds.labels('reload').observe(bundle.load_seconds)
+            warm_up_seconds = bundle.warm_up()
+            self._swap(bundle)
             
+            logger.info(f"✅ Reloaded model {previous_version} -> {bundle.version}")
+            return {
+                'previous_version': previous_version,
+                'model_version': bundle.version,
+                'load_seconds': round(bundle.load_seconds, 4),
+                'warm_up_seconds': round(warm_up_seconds, 4)
+            }
         except Exception as e:
-            logger.error(f"❌ Error loading model artifacts: {e}")
+            logger.error(f"❌ Model reload failed, keeping version {self._bundle.version}: {e}")
             raise
+        finally:
+            self._reload_lock.release()
+    
+    def _swap(self, bundle: ModelBundle):
+        """Serve a new bundle and drop predictions of the previous one"""
+        ModelService._bundle = bundle
+        ModelService._load_state = LOAD_STATE_READY if bundle.is_loaded else LOAD_STATE_MISSING
+        ModelService._load_error = None
+        model_loaded.labels().set(int(bundle.is_loaded))
+        prediction_cache.clear()
+        logger.info(f"Model version: {bundle.version}")
+        
+        for listener in list(self._reload_listeners):
+            try:
+                listener(bundle)
+            except Exception as e:
+                logger.warning(f"⚠️ Model reload listener failed: {e}")
+    
+    def add_reload_listener(self, listener: Callable[[ModelBundle], None]):
+        """
+        Register a callback invoked with the new bundle after every swap
+        
+        Args:
+            listener: Callable taking the new ModelBundle
+        """
+        self._reload_listeners.append(listener)
+    
+    def get_model_version(self) -> Optional[str]:
+        """Get the version/artifact hash of the loaded model"""
+        return self._bundle.version
+    
+    def cache_key(self, features: Dict[str, float], bundle: Optional[ModelBundle] = None) -> Optional[tuple]:
+        """
+        Prediction cache key for a case under the loaded model
+        
+        Args:
+            features: Dictionary with feature values
+            bundle: Bundle the case is scored with (defaults to the current one)
+            
+        Returns:
+            Cache key, or None if caching is disabled or the case is not cacheable
+        """
+        bundle = bundle or self._bundle
+        if not PREDICTION_CACHE_ENABLED or not bundle.is_loaded:
+            return None
+        return PredictionCache.make_key(features, bundle.version)
     
     def is_model_loaded(self) -> bool:
         """Check if model is loaded"""
-        return self._model is not None
+        return self._bundle.is_loaded
     
     def get_metadata(self) -> Dict[str, Any]:
         """Get model metadata"""
-        return self._metadata if self._metadata else {}
+        return self._bundle.metadata
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Version and load information for the served bundle"""
+        bundle = self._bundle
+        return {
+            'model_loaded': bundle.is_loaded,
+            'load_state': self._load_state,
+            'load_error': self._load_error,
+            'model_version': bundle.version,
+            'loaded_at': bundle.loaded_at,
+            'load_seconds': round(bundle.load_seconds, 4),
+            'tree_engine': bundle.engine is not None,
+            'cascade': bundle.cascade is not None,
+            'reload_in_progress': self._reload_lock.locked()
+        }
     
     def preprocess_features(self, features: Dict[str, float]) -> np.ndarray:
         """
@@ -87,98 +291,195 @@ class ModelService:
         Returns:
             Preprocessed feature array
         """
-        # Create DataFrame from API features
-        df = pd.DataFrame([features])
-        
-        # Ensure all required features are present
-        for feature in API_FEATURES:
-            if feature not in df.columns:
-                df[feature] = 0
-        
-        # If we have a preprocessor, use it
-        if self._preprocessor:
-            scaler = self._preprocessor.get('scaler')
-            feature_names = self._preprocessor.get('feature_names', API_FEATURES)
-            
-            # Add missing features with default values
-            for feature in feature_names:
-                if feature not in df.columns:
-                    df[feature] = 0
-            
-            # Select and order features
-            df = df[feature_names]
-            
-            # Scale
-            if scaler:
-                features_array = scaler.transform(df)
-            else:
-                features_array = df.values
-        else:
-            # No preprocessor, use raw features
-            df = df[API_FEATURES]
-            features_array = df.values
-        
-        return features_array
+        return self._bundle.preprocess_features(features)
     
-    def predict(self, features: Dict[str, float]) -> Dict[str, Any]:
+    def predict(self, features: Dict[str, float], bundle: Optional[ModelBundle] = None,
+                timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
         """
         Make prediction for a single case
         
         Args:
             features: Dictionary with feature values
+            bundle: Bundle to score with (defaults to the served model)
+            timings: Dictionary that receives the seconds spent per stage
             
         Returns:
             Dictionary with prediction results
         """
-        if not self.is_model_loaded():
+        bundle = bundle or self._bundle
+        if not bundle.is_loaded:
             raise RuntimeError("Model is not loaded. Please train the model first.")
         
+        key = self.cache_key(features, bundle)
+        if key is not None:
+            cached = prediction_cache.get(key)
+            if cached is not None:
+                return cached
+        
         try:
+            started = time.perf_counter()
+            
             # Preprocess features
-            features_array = self.preprocess_features(features)
+            features_array = bundle.preprocess_features(features)
+            preprocessed = time.perf_counter()
             
             # Get probability
-            probability = self._model.predict_proba(features_array)[0][1]
+            probability = bundle.predict_positive(features_array)[0]
+            predicted = time.perf_counter()
             
             # Determine risk category and strategy
             risk_category, strategy = self._categorize_risk(probability)
             
-            return {
-                'recovery_probability': round(float(probability), 4),
+            if timings is not None:
+                timings[STAGE_PREPROCESS] = preprocessed - started
+                timings[STAGE_PREDICT] = predicted - preprocessed
+                timings[STAGE_CATEGORIZE] = time.perf_counter() - predicted
+            
+            result = {
+                'recovery_probability': round(float(probability), PROBABILITY_DECIMALS),
                 'risk_category': risk_category,
                 'recommended_strategy': strategy
             }
             
+            if key is not None:
+                prediction_cache.put(key, result)
+            
+            return result
+            
         except Exception as e:
             logger.error(f"Error making prediction: {e}")
             raise
     
-    def predict_batch(self, cases: list) -> list:
+    def preprocess_batch(self, cases: list) -> np.ndarray:
+        """
+        Preprocess many cases into a single feature matrix
+        
+        Produces exactly the same values as calling preprocess_features on
+        each case.
+        
+        Args:
+            cases: List of feature dictionaries
+            
+        Returns:
+            Preprocessed feature matrix with one row per case
+        """
+        return self._bundle.preprocess_batch(cases)
+    
+    def predict_proba_batch(self, features_array: np.ndarray, chunk_size: Optional[int] = None,
+                            bundle: Optional[ModelBundle] = None) -> np.ndarray:
+        """
+        Get recovery probabilities for a preprocessed feature matrix
+        
+        Args:
+            features_array: Preprocessed feature matrix
+            chunk_size: Rows per predict_proba call (defaults to BATCH_CHUNK_SIZE)
+            bundle: Bundle to score with (defaults to the current one)
+            
+        Returns:
+            Array of recovery probabilities
+        """
+        bundle = bundle or self._bundle
+        chunk_size = chunk_size or BATCH_CHUNK_SIZE
+        n_rows = features_array.shape[0]
+        probabilities = np.empty(n_rows, dtype=np.float64)
+        
+        for start in range(0, n_rows, chunk_size):
+            end = min(start + chunk_size, n_rows)
+            probabilities[start:end] = bundle.predict_positive(features_array[start:end])
+        
+        return probabilities
+    
+    def predict_batch(self, cases: list, chunk_size: Optional[int] = None,
+                      bundle: Optional[ModelBundle] = None, timings: Optional[Dict[str, float]] = None) -> list:
         """
         Make predictions for multiple cases
         
+        The whole batch is preprocessed into one matrix, scored with
+        predict_proba in chunks and categorized in a single vectorized step.
+        Results are identical to calling predict on each case.
+        
         Args:
             cases: List of feature dictionaries
+            chunk_size: Rows per predict_proba call (defaults to BATCH_CHUNK_SIZE)
+            bundle: Bundle to score with (defaults to the served model)
+            timings: Dictionary that receives the seconds spent per stage
             
         Returns:
             List of prediction results
         """
-        if not self.is_model_loaded():
+        bundle = bundle or self._bundle
+        if not bundle.is_loaded:
             raise RuntimeError("Model is not loaded. Please train the model first.")
         
+        if not cases:
+            return []
+        
         try:
-            predictions = []
+            started = time.perf_counter()
+            features_array = bundle.preprocess_batch(cases)
+            preprocessed = time.perf_counter()
+            probabilities = self.predict_proba_batch(features_array, chunk_size, bundle)
+            predicted = time.perf_counter()
+            categories, strategies = self._categorize_risk_batch(probabilities)
+            
+            results = [
+                {
+                    'recovery_probability': round(probability, PROBABILITY_DECIMALS),
+                    'risk_category': category,
+                    'recommended_strategy': strategy
+                }
+                for probability, category, strategy in zip(
+                    probabilities.tolist(), categories.tolist(), strategies.tolist()
+                )
+            ]
             
-            for case in cases:
-                prediction = self.predict(case)
-                predictions.append(prediction)
+            if timings is not None:
+                timings[STAGE_PREPROCESS] = preprocessed - started
+                timings[STAGE_PREDICT] = predicted - preprocessed
+                timings[STAGE_CATEGORIZE] = time.perf_counter() - predicted
             
-            return predictions
+            return results
             
         except Exception as e:
             logger.error(f"Error making batch predictions: {e}")
             raise
     
+    def predict_columns(self, columns: Dict[str, np.ndarray], chunk_size: Optional[int] = None,
+                        bundle: Optional[ModelBundle] = None, timings: Optional[Dict[str, float]] = None) -> tuple:
+        """
+        Score column arrays without building per-row Python objects
+        
+        Args:
+            columns: Dictionary of API feature name to 1-D array (one entry per row)
+            chunk_size: Rows per predict_proba call (defaults to BATCH_CHUNK_SIZE)
+            bundle: Bundle to score with (defaults to the served model)
+            timings: Dictionary that receives the seconds spent per stage
+            
+        Returns:
+            Tuple of (probabilities, risk codes); codes index RISK_CATEGORIES and RISK_STRATEGIES
+        """
+        bundle = bundle or self._bundle
+        if not bundle.is_loaded:
+            raise RuntimeError("Model is not loaded. Please train the model first.")
+        
+        n_rows = len(next(iter(columns.values()))) if columns else 0
+        if n_rows == 0:
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int8)
+        
+        started = time.perf_counter()
+        features_array = bundle.preprocess_columns(columns, n_rows)
+        preprocessed = time.perf_counter()
+        probabilities = self.predict_proba_batch(features_array, chunk_size, bundle)
+        predicted = time.perf_counter()
+        codes = self._risk_codes(probabilities)
+        
+        if timings is not None:
+            timings[STAGE_PREPROCESS] = preprocessed - started
+            timings[STAGE_PREDICT] = predicted - preprocessed
+            timings[STAGE_CATEGORIZE] = time.perf_counter() - predicted
+        
+        return probabilities, codes
+    
     def _categorize_risk(self, probability: float) -> tuple:
         """
         Categorize risk based on recovery probability
@@ -195,6 +496,31 @@ class ModelService:
             return 'MEDIUM_RISK', STRATEGY_MAP['MEDIUM_RISK']
         else:
             return 'HIGH_RISK', STRATEGY_MAP['HIGH_RISK']
+    
+    def _categorize_risk_batch(self, probabilities: np.ndarray) -> tuple:
+        """
+        Vectorized version of _categorize_risk
+        
+        Args:
+            probabilities: Array of recovery probabilities (0-1)
+            
+        Returns:
+            Tuple of (risk_categories, recommended_strategies) object arrays
+        """
+        codes = self._risk_codes(probabilities)
+        return RISK_CATEGORIES[codes], RISK_STRATEGIES[codes]
+    
+    def _risk_codes(self, probabilities: np.ndarray) -> np.ndarray:
+        """
+        Risk category codes (0 LOW, 1 MEDIUM, 2 HIGH) for an array of probabilities
+        
+        Args:
+            probabilities: Array of recovery probabilities (0-1)
+            
+        Returns:
+            int8 array of indexes into RISK_CATEGORIES
+        """
+        return risk_codes(probabilities)
 
 
 # Global model service instance
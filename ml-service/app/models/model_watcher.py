@@ -0,0 +1,103 @@
+"""
+Polling watcher that hot-reloads the model when artifacts in MODELS_DIR change
+"""
+import threading
+from pathlib import Path
+from typing import Optional
+import logging
+
+from app.config import MODEL_PATH, SCALER_PATH, METADATA_PATH, MODEL_WATCH_INTERVAL_SECONDS
+from app.models.model_service import model_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ModelWatcher:
+    """
+    Background thread that reloads the model when its artifacts change
+
+    Artifacts are compared by modification time and size. A change is only
+    acted on once it has been stable for a full polling interval, so a
+    model that is still being copied into place is not loaded half-written.
+    """
+
+    def __init__(self, model_path: Path = MODEL_PATH, scaler_path: Path = SCALER_PATH,
+                 metadata_path: Path = METADATA_PATH,
+                 interval_seconds: float = MODEL_WATCH_INTERVAL_SECONDS):
+        self.paths = (model_path, scaler_path, metadata_path)
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._applied = None
+        self._pending = None
+
+    def _signature(self) -> tuple:
+        """Modification time and size of every watched artifact"""
+        signature = []
+        for path in self.paths:
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def poll(self) -> bool:
+        """
+        Check the artifacts once and reload if a stable change is found
+
+        Returns:
+            True if the model was reloaded
+        """
+        signature = self._signature()
+
+        if signature == self._applied:
+            self._pending = None
+            return False
+
+        if signature != self._pending:
+            # First sighting of this change, wait one interval for it to settle
+            self._pending = signature
+            return False
+
+        self._pending = None
+        # Do not retry the same artifacts on every poll, even if the reload fails
+        self._applied = signature
+        try:
+            model_service.reload_model(*self.paths)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Model watcher could not reload changed artifacts: {e}")
+            return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.poll()
+
+    def mark_current(self):
+        """Treat the artifacts as they are now as already loaded"""
+        self._applied = self._signature()
+        self._pending = None
+
+    def start(self):
+        """Start watching in a daemon thread"""
+        if self._thread is not None:
+            return
+        self.mark_current()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+        self._thread.start()
+        logger.info(f"Watching model artifacts every {self.interval_seconds}s")
+
+    def stop(self):
+        """Stop the watcher thread"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+
+# Global model watcher instance
+model_watcher = ModelWatcher()
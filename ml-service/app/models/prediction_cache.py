@@ -0,0 +1,149 @@
+"""
+In-process LRU cache for single-case predictions
+Entries expire after a TTL and are keyed on the model version
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from app.config import (
+    API_FEATURES,
+    PREDICTION_CACHE_MAX_ENTRIES,
+    PREDICTION_CACHE_MAX_BYTES,
+    PREDICTION_CACHE_TTL_SECONDS
+)
+
+_API_FEATURE_SET = frozenset(API_FEATURES)
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with TTL and entry/memory limits
+
+    Keys are the canonicalized API feature tuple plus the model version, so
+    a result can never be served for a different model. The cache is also
+    cleared whenever a new model is loaded.
+    """
+
+    def __init__(self, max_entries: int = PREDICTION_CACHE_MAX_ENTRIES,
+                 max_bytes: int = PREDICTION_CACHE_MAX_BYTES,
+                 ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, Tuple[float, Dict[str, Any], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(features: Dict[str, float], model_version: str) -> Optional[tuple]:
+        """
+        Canonicalize a feature dictionary into a cache key
+
+        Values are converted to float so 45 and 45.0 share an entry.
+
+        Args:
+            features: Dictionary with feature values
+            model_version: Version/artifact hash of the loaded model
+
+        Returns:
+            Cache key, or None if the case has features outside API_FEATURES
+        """
+        if not _API_FEATURE_SET.issuperset(features):
+            return None
+        return (model_version,) + tuple(float(features.get(name, 0)) for name in API_FEATURES)
+
+    @staticmethod
+    def _entry_size(key: tuple, value: Dict[str, Any]) -> int:
+        """Approximate memory footprint of one entry in bytes"""
+        size = sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key)
+        size += sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value.values())
+        return size
+
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        """
+        Look up a prediction
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Copy of the cached prediction, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value, size = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+
+    def put(self, key: tuple, value: Dict[str, Any]):
+        """
+        Store a prediction, evicting least recently used entries if needed
+
+        Args:
+            key: Cache key from make_key
+            value: Prediction result
+        """
+        size = self._entry_size(key, value)
+        expires_at = time.monotonic() + self.ttl_seconds
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+
+            self._entries[key] = (expires_at, dict(value), size)
+            self._bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss and eviction counters and current usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+# Global prediction cache instance
+prediction_cache = PredictionCache()
@@ -0,0 +1,180 @@
+"""
+On-demand profiling of individual requests
+Runs one request under cProfile (event loop and inference worker), stores
+the merged profile on disk and reports its hottest functions
+"""
+import cProfile
+import pstats
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import logging
+
+from app.config import PROFILE_DIR, PROFILE_KEEP
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = ".prof"
+PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+
+class _StatsSnapshot:
+    """Wraps a pstats dictionary so pstats.Stats can load it"""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def profiled_call(func, *args) -> tuple:
+    """
+    Run a task under cProfile on the current (worker) thread or process
+
+    Module level so process workers can run it.
+
+    Returns:
+        Tuple of (result of func, pstats dictionary)
+    """
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        result = func(*args)
+    finally:
+        profile.disable()
+    profile.create_stats()
+    return result, profile.stats
+
+
+class RequestProfiler:
+    """
+    Profiles one request at a time and keeps the newest profiles on disk
+
+    The profile of the event loop thread covers parsing, the endpoint and
+    serialization; inference tasks the request sends to the executor are
+    profiled inside the worker and merged in. Other requests running on the
+    event loop meanwhile can show up in the loop-thread part.
+    """
+
+    def __init__(self, directory: Path = PROFILE_DIR, keep: int = PROFILE_KEEP):
+        self.directory = Path(directory)
+        self.keep = max(1, keep)
+        self._lock = threading.Lock()
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """
+        Start profiling the calling thread
+
+        Returns:
+            Running profile, or None if another request is being profiled
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except Exception:
+            self._lock.release()
+            raise
+        return profile
+
+    def finish(self, profile: cProfile.Profile, worker_stats: List[dict], endpoint: str) -> str:
+        """
+        Stop profiling, merge worker profiles and store the result
+
+        Args:
+            profile: Profile returned by start()
+            worker_stats: pstats dictionaries returned by profiled_call
+            endpoint: Route path of the profiled request
+
+        Returns:
+            Profile id
+        """
+        try:
+            profile.disable()
+        finally:
+            self._lock.release()
+
+        stats = pstats.Stats(profile)
+        for worker in worker_stats:
+            stats.add(pstats.Stats(_StatsSnapshot(worker)))
+
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", endpoint).strip("-") or "request"
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{slug}-{uuid.uuid4().hex[:8]}"
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(self.directory / f"{profile_id}{PROFILE_SUFFIX}")
+        self._prune()
+
+        logger.info(f"Stored profile {profile_id} of {endpoint}")
+        return profile_id
+
+    def _prune(self):
+        """Delete all but the newest profiles"""
+        profiles = sorted(self.directory.glob(f"*{PROFILE_SUFFIX}"), key=lambda path: path.stat().st_mtime)
+        for path in profiles[:-self.keep]:
+            path.unlink(missing_ok=True)
+
+    def list_profiles(self) -> List[str]:
+        """Stored profile ids, newest first"""
+        if not self.directory.exists():
+            return []
+        profiles = sorted(self.directory.glob(f"*{PROFILE_SUFFIX}"), key=lambda path: path.stat().st_mtime,
+                          reverse=True)
+        return [path.stem for path in profiles]
+
+    def path(self, profile_id: str) -> Path:
+        """
+        File of a stored profile
+
+        Raises:
+            KeyError: If the id is malformed or no such profile exists
+        """
+        path = self.directory / f"{profile_id}{PROFILE_SUFFIX}"
+        if not PROFILE_ID_PATTERN.match(profile_id) or not path.exists():
+            raise KeyError(f"Profile '{profile_id}' not found")
+        return path
+
+    def top_functions(self, profile_id: str, limit: int = 25, sort: str = 'cumulative') -> Dict[str, Any]:
+        """
+        Hottest functions of a stored profile
+
+        Args:
+            profile_id: Id returned by finish()
+            limit: Number of functions
+            sort: 'cumulative', 'tottime' or 'ncalls'
+
+        Returns:
+            Dictionary with total time and a list of function entries
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key '{sort}', expected one of {SORT_KEYS}")
+
+        stats = pstats.Stats(str(self.path(profile_id)))
+        column = {'cumulative': 3, 'tottime': 2, 'ncalls': 1}[sort]
+        entries = sorted(stats.stats.items(), key=lambda item: item[1][column], reverse=True)[:limit]
+
+        return {
+            'profile_id': profile_id,
+            'total_seconds': round(stats.total_tt, 6),
+            'sort': sort,
+            'functions': [
+                {
+                    'function': f"{filename}:{line}({name})",
+                    'calls': calls,
+                    'total_seconds': round(total, 6),
+                    'cumulative_seconds': round(cumulative, 6)
+                }
+                for (filename, line, name), (_, calls, total, cumulative, _) in entries
+            ]
+        }
+
+
+# Global request profiler instance
+request_profiler = RequestProfiler()
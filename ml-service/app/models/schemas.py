@@ -2,7 +2,7 @@
 Pydantic schemas for API request/response models
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, Union
 
 
 class PredictionRequest(BaseModel):
@@ -93,6 +93,168 @@ class BatchPredictionResponse(BaseModel):
         }
 
 
+class ColumnarBatchPredictionRequest(BaseModel):
+    """
+    Request model for columnar batch predictions (one array per feature)
+
+    Documents the request body; the endpoint validates it column-wise
+    with the PredictionRequest constraints instead of parsing it into
+    this model.
+    """
+    debt_amount: list[float] = Field(..., description="Outstanding debt amount per case (> 0)")
+    days_past_due: list[int] = Field(..., description="Days overdue per case (>= 0)")
+    credit_score: list[float] = Field(..., description="Credit score per case (300-850)")
+    payment_attempts: list[int] = Field(..., description="Payment attempts per case (>= 0)")
+    communication_count: list[int] = Field(..., description="Communications sent per case (>= 0)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "debt_amount": [5000.0, 12000.0],
+                "days_past_due": [45, 200],
+                "credit_score": [650.0, 540.0],
+                "payment_attempts": [3, 0],
+                "communication_count": [5, 1]
+            }
+        }
+
+
+class ColumnarBatchPredictionResponse(BaseModel):
+    """Response model for columnar batch predictions (one array per output field)"""
+    recovery_probability: list[float] = Field(..., description="Probability of debt recovery per case")
+    risk_category: list[str] = Field(..., description="Risk category per case")
+    recommended_strategy: list[str] = Field(..., description="Recommended strategy per case")
+    total_cases: int = Field(..., description="Total number of cases processed")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "recovery_probability": [0.7234, 0.3456],
+                "risk_category": ["LOW_RISK", "HIGH_RISK"],
+                "recommended_strategy": ["STANDARD_FOLLOW_UP", "ESCALATION"],
+                "total_cases": 2
+            }
+        }
+
+
+class TopKCase(BaseModel):
+    """One case of a top-K selection"""
+    rank: int = Field(..., description="Position in the ranking (1 = highest expected recovery)")
+    line: int = Field(..., description="Line of the case in the NDJSON body")
+    case_id: Optional[Union[str, int]] = Field(None, description="case_id of the input case, if given")
+    expected_recovery: float = Field(..., description="recovery_probability * debt_amount")
+    recovery_probability: float = Field(..., description="Probability of debt recovery (0-1)")
+    debt_amount: float = Field(..., description="Outstanding debt amount of the case")
+    risk_category: str = Field(..., description="Risk category: LOW_RISK, MEDIUM_RISK, or HIGH_RISK")
+    recommended_strategy: str = Field(..., description="Recommended strategy: STANDARD_FOLLOW_UP, NEGOTIATION_OFFER, or ESCALATION")
+
+
+class TopKResponse(BaseModel):
+    """Response model for top-K selection by expected recovery"""
+    k: int = Field(..., description="Requested number of cases")
+    total_cases: int = Field(..., description="Valid cases scored")
+    invalid_cases: int = Field(..., description="Lines skipped because they failed to parse or validate")
+    errors: list[dict] = Field(..., description="First validation errors as {line, error}")
+    cases: list[TopKCase] = Field(..., description="At most k cases, highest expected recovery first")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "k": 2,
+                "total_cases": 250000,
+                "invalid_cases": 1,
+                "errors": [{"line": 1734, "error": "credit_score: Input should be less than or equal to 850"}],
+                "cases": [
+                    {
+                        "rank": 1,
+                        "line": 88213,
+                        "case_id": "C-88213",
+                        "expected_recovery": 36412.5,
+                        "recovery_probability": 0.8125,
+                        "debt_amount": 44815.38,
+                        "risk_category": "LOW_RISK",
+                        "recommended_strategy": "STANDARD_FOLLOW_UP"
+                    },
+                    {
+                        "rank": 2,
+                        "line": 4102,
+                        "case_id": "C-4102",
+                        "expected_recovery": 35980.11,
+                        "recovery_probability": 0.7361,
+                        "debt_amount": 48879.1,
+                        "risk_category": "LOW_RISK",
+                        "recommended_strategy": "STANDARD_FOLLOW_UP"
+                    }
+                ]
+            }
+        }
+
+
+class JobStatusResponse(BaseModel):
+    """Response model for an asynchronous batch job"""
+    job_id: str = Field(..., description="Job id")
+    status: str = Field(..., description="queued, running, completed or failed")
+    model_version: str = Field(..., description="Model version the job scores with")
+    created_at: str = Field(..., description="When the job was submitted")
+    started_at: Optional[str] = Field(None, description="When scoring started")
+    finished_at: Optional[str] = Field(None, description="When the job completed or failed")
+    total_rows: Optional[int] = Field(None, description="Rows to score (null until an uploaded file is split)")
+    rows_scored: int = Field(..., description="Rows of the completed chunks")
+    invalid_rows: int = Field(..., description=(
+        "Rows with a missing, non-finite or out-of-range feature, as rejected by /predictions/batch "
+        "(null predictions)"
+    ))
+    chunks_total: Optional[int] = Field(None, description="Number of chunks, which is also the number of result pages")
+    chunks_completed: int = Field(..., description="Chunks scored; pages below this index can be downloaded")
+    progress: float = Field(..., description="Fraction of rows scored (0-1)")
+    error: Optional[str] = Field(None, description="Error of a failed job")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": "3f2a9c1b0d4e4f67a1b2c3d4e5f60718",
+                "status": "running",
+                "model_version": "primary",
+                "created_at": "2026-01-06T23:00:00",
+                "started_at": "2026-01-06T23:00:01",
+                "finished_at": None,
+                "total_rows": 2500000,
+                "rows_scored": 1200000,
+                "invalid_rows": 12,
+                "chunks_total": 250,
+                "chunks_completed": 120,
+                "progress": 0.48,
+                "error": None
+            }
+        }
+
+
+class JobResultsPage(BaseModel):
+    """Response model for one page of job results (one array per output field)"""
+    job_id: str = Field(..., description="Job id")
+    page: int = Field(..., description="Page index, 0-based")
+    pages: int = Field(..., description="Total number of pages")
+    offset: int = Field(..., description="Position of the page's first row in the job input")
+    rows: int = Field(..., description="Rows on this page")
+    recovery_probability: list[Optional[float]] = Field(..., description="Probability per row (null if a feature was missing)")
+    risk_category: list[Optional[str]] = Field(..., description="Risk category per row")
+    recommended_strategy: list[Optional[str]] = Field(..., description="Recommended strategy per row")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": "3f2a9c1b0d4e4f67a1b2c3d4e5f60718",
+                "page": 1,
+                "pages": 250,
+                "offset": 10000,
+                "rows": 2,
+                "recovery_probability": [0.7234, None],
+                "risk_category": ["LOW_RISK", None],
+                "recommended_strategy": ["STANDARD_FOLLOW_UP", None]
+            }
+        }
+
+
 class ModelInfoResponse(BaseModel):
     """Response model for model information"""
     model_version: str = Field(..., description="Model version")
@@ -131,3 +293,174 @@ class HealthResponse(BaseModel):
                 "model_loaded": True
             }
         }
+
+
+class ReadinessResponse(BaseModel):
+    """Response model for the readiness check"""
+    ready: bool = Field(..., description="Whether the primary model is loaded and serving")
+    load_state: str = Field(..., description="not_started, loading, ready, missing or failed")
+    model_version: Optional[str] = Field(None, description="Version of the served model")
+    load_error: Optional[str] = Field(None, description="Error of the last failed load")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "ready": True,
+                "load_state": "ready",
+                "model_version": "1.0.0:3f2a9c1b0d4e5f67",
+                "load_error": None
+            }
+        }
+
+
+class ServiceStatsResponse(BaseModel):
+    """Response model for runtime service statistics"""
+    micro_batching_enabled: bool = Field(..., description="Whether single-case requests are micro-batched")
+    micro_batching: dict = Field(..., description="Micro-batching queue depth, batch size and wait time counters")
+    prediction_cache_enabled: bool = Field(..., description="Whether single-case predictions are cached")
+    prediction_cache: dict = Field(..., description="Prediction cache hit, miss and eviction counters")
+    model_registry: dict = Field(..., description="Loaded model versions with per-version latency and shadow disagreement")
+    shadow: dict = Field(..., description="Shadow scoring submission counters")
+    cascade_enabled: bool = Field(..., description="Whether the served model scores in cascade mode")
+    cascade: dict = Field(..., description="Cases scored in cascade mode and the fraction escalated to the full model")
+    admission_control_enabled: bool = Field(..., description="Whether prediction endpoints shed load")
+    admission: dict = Field(..., description="Per-endpoint limits, queue depth, service time and shed counters")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "micro_batching_enabled": True,
+                "micro_batching": {
+                    "requests": 1200,
+                    "batches": 85,
+                    "queue_depth": 3,
+                    "max_queue_depth": 32,
+                    "avg_batch_size": 14.1,
+                    "max_batch_size": 32,
+                    "avg_wait_us": 812.4,
+                    "max_wait_us": 2105.7
+                },
+                "prediction_cache_enabled": True,
+                "prediction_cache": {
+                    "entries": 812,
+                    "bytes": 603264,
+                    "max_entries": 10000,
+                    "max_bytes": 16777216,
+                    "ttl_seconds": 300.0,
+                    "hits": 2210,
+                    "misses": 812,
+                    "hit_rate": 0.7313,
+                    "evictions": 0,
+                    "expirations": 0
+                },
+                "model_registry": {
+                    "available": ["2.0.0"],
+                    "loaded": ["2.0.0"],
+                    "bytes": 462318,
+                    "max_bytes": 536870912,
+                    "evictions": 0,
+                    "traffic_split": {},
+                    "versions": {
+                        "primary": {
+                            "requests": 3022,
+                            "rows": 3022,
+                            "errors": 0,
+                            "avg_latency_ms": 0.912,
+                            "p50_latency_ms": 0.711,
+                            "p95_latency_ms": 2.304
+                        },
+                        "2.0.0": {
+                            "requests": 85,
+                            "rows": 3022,
+                            "errors": 0,
+                            "avg_latency_ms": 1.406,
+                            "p50_latency_ms": 1.12,
+                            "p95_latency_ms": 3.017,
+                            "shadow_batches": 85,
+                            "shadow_rows": 3022,
+                            "shadow_disagreements": 41,
+                            "shadow_disagreement_rate": 0.0136,
+                            "shadow_mean_abs_diff": 0.018213,
+                            "shadow_max_abs_diff": 0.2114
+                        }
+                    }
+                },
+                "shadow": {
+                    "version": "2.0.0",
+                    "pending": 0,
+                    "submitted": 85,
+                    "dropped": 0,
+                    "failed": 0
+                },
+                "cascade_enabled": True,
+                "cascade": {
+                    "cases": 3022,
+                    "escalated": 574,
+                    "escalation_rate": 0.1899
+                },
+                "admission_control_enabled": True,
+                "admission": {
+                    "/predictions/recovery": {
+                        "max_concurrency": 32,
+                        "max_queue": 64,
+                        "budget_ms": 1000.0,
+                        "active": 5,
+                        "queue_depth": 0,
+                        "avg_service_ms": 4.812,
+                        "admitted": 2937,
+                        "shed": 0
+                    }
+                }
+            }
+        }
+
+
+class ModelReloadResponse(BaseModel):
+    """Response model for a hot model reload"""
+    previous_version: Optional[str] = Field(None, description="Version served before the reload")
+    model_version: str = Field(..., description="Version served after the reload")
+    load_seconds: float = Field(..., description="Time spent loading the new artifacts")
+    warm_up_seconds: float = Field(..., description="Time spent warming up the new model")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "previous_version": "1.0.0:3f2a9c1b0d4e5f67",
+                "model_version": "1.0.0:9b8e7d6c5a4f3e21",
+                "load_seconds": 0.8421,
+                "warm_up_seconds": 0.0613
+            }
+        }
+
+
+class ProfileFunction(BaseModel):
+    """One function of a request profile"""
+    function: str = Field(..., description="file:line(function)")
+    calls: int = Field(..., description="Number of calls")
+    total_seconds: float = Field(..., description="Time spent in the function itself")
+    cumulative_seconds: float = Field(..., description="Time spent in the function and its callees")
+
+
+class ProfileResponse(BaseModel):
+    """Response model for a stored request profile"""
+    profile_id: str = Field(..., description="Profile id (from the X-Profile-Id response header)")
+    total_seconds: float = Field(..., description="Total profiled time")
+    sort: str = Field(..., description="Sort key of the function list")
+    functions: list[ProfileFunction] = Field(..., description="Hottest functions")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "profile_id": "20240101T120000-predictions-batch-1a2b3c4d",
+                "total_seconds": 0.0123,
+                "sort": "cumulative",
+                "functions": [
+                    {
+                        "function": "app/models/model_service.py:301(predict_batch)",
+                        "calls": 1,
+                        "total_seconds": 0.0004,
+                        "cumulative_seconds": 0.0081
+                    }
+                ]
+            }
+        }
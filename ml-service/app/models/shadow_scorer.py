@@ -0,0 +1,97 @@
+"""
+Shadow scoring of a candidate model on live traffic
+The candidate scores the same batches as the primary model off the request path
+"""
+import asyncio
+import time
+from typing import Dict, Any, List, Optional
+import logging
+
+from app.config import SHADOW_MODEL_VERSION, SHADOW_MAX_PENDING
+from app.models.inference_executor import inference_executor, InferenceExecutor
+from app.models.model_registry import model_registry, ModelRegistry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ShadowScorer:
+    """
+    Fire-and-forget scoring of a registry version next to the primary model
+
+    Callers hand over a batch of cases together with the results already
+    returned to the client. The shadow version scores them in a background
+    task and the registry records its latency and how often it disagrees
+    with the primary model. Shadow work is dropped rather than queued when
+    max_pending batches are already in flight, so it cannot build up a
+    backlog on the inference workers.
+    """
+
+    def __init__(self, executor: InferenceExecutor, registry: ModelRegistry,
+                 version: Optional[str] = SHADOW_MODEL_VERSION, max_pending: int = SHADOW_MAX_PENDING):
+        self._executor = executor
+        self._registry = registry
+        self.version = version or None
+        self.max_pending = max(1, max_pending)
+        self._tasks = set()
+        self.submitted = 0
+        self.dropped = 0
+        self.failed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.version is not None
+
+    def submit(self, cases: List[Dict[str, float]], primary_results: List[Dict[str, Any]]):
+        """
+        Schedule shadow scoring of a batch without waiting for it
+
+        Args:
+            cases: Feature dictionaries scored by the primary model
+            primary_results: Primary results for the same cases, in order
+        """
+        if not self.enabled or not cases:
+            return
+
+        if len(self._tasks) >= self.max_pending:
+            self.dropped += 1
+            return
+
+        self.submitted += 1
+        # Keep a reference so the task is not garbage collected while running
+        task = asyncio.ensure_future(self._score(list(cases), list(primary_results)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _score(self, cases: List[Dict[str, float]], primary_results: List[Dict[str, Any]]):
+        """Score one batch with the shadow version and record the comparison"""
+        started = time.perf_counter()
+        try:
+            shadow_results = await self._executor.predict_batch(cases, version=self.version)
+        except Exception as e:
+            self.failed += 1
+            self._registry.record_latency(self.version, time.perf_counter() - started, len(cases), error=True)
+            logger.warning(f"⚠️ Shadow scoring with version {self.version} failed: {e}")
+            return
+
+        self._registry.record_latency(self.version, time.perf_counter() - started, len(cases))
+        self._registry.record_shadow(self.version, primary_results, shadow_results)
+
+    async def drain(self):
+        """Wait for all in-flight shadow batches (used on shutdown and in tests)"""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return shadow submission counters"""
+        return {
+            'version': self.version,
+            'pending': len(self._tasks),
+            'submitted': self.submitted,
+            'dropped': self.dropped,
+            'failed': self.failed
+        }
+
+
+# Global shadow scorer instance
+shadow_scorer = ShadowScorer(inference_executor, model_registry)
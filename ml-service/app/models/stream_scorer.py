@@ -0,0 +1,228 @@
+"""
+Streaming NDJSON scoring
+Reads newline-delimited cases in chunks and yields newline-delimited results in order
+"""
+import json
+import time
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+import logging
+
+from pydantic import ValidationError
+from starlette.responses import StreamingResponse
+
+from app.config import STREAM_CHUNK_ROWS, STREAM_MAX_LINE_BYTES
+from app.models.schemas import PredictionRequest
+from app.models.inference_executor import inference_executor, InferenceExecutor
+from app.models.model_registry import model_registry, PRIMARY_VERSION
+from app.models.shadow_scorer import shadow_scorer
+from app.models.metrics import batch_size, record_stages, STAGE_SERIALIZE
+
+# Endpoint label of the streaming metrics (stages are recorded per scored chunk)
+STREAM_METRIC_LABEL = "/predictions/stream"
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes],
+                     max_line_bytes: int = STREAM_MAX_LINE_BYTES) -> AsyncIterator[Optional[bytes]]:
+    """
+    Split a byte stream into lines without holding more than one line in memory
+
+    Args:
+        chunks: Async iterator of raw body chunks
+        max_line_bytes: Longest accepted line
+
+    Yields:
+        Each line without its newline, or None for a line longer than max_line_bytes
+    """
+    buffer = bytearray()
+    too_long = False
+
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b'\n', start)
+            if end < 0:
+                if not too_long:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        # Drop the rest of this line instead of buffering it
+                        too_long = True
+                        buffer.clear()
+                break
+
+            if too_long:
+                yield None
+                too_long = False
+            else:
+                buffer += chunk[start:end]
+                yield None if len(buffer) > max_line_bytes else bytes(buffer)
+            buffer.clear()
+            start = end + 1
+
+    if too_long:
+        yield None
+    elif buffer:
+        yield bytes(buffer)
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose body generator reads the request body
+
+    StreamingResponse normally listens for client disconnects by calling
+    receive() concurrently with the body generator, which would swallow
+    request body chunks the generator is still reading. Here the generator
+    is the only consumer of receive().
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def decode_case(line: bytes) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Decode one NDJSON line into a JSON object
+
+    Args:
+        line: Raw JSON line
+
+    Returns:
+        Tuple of (payload, error); exactly one of them is None
+    """
+    try:
+        payload = json.loads(line)
+    except ValueError as e:
+        return None, f"Invalid JSON: {e}"
+
+    if not isinstance(payload, dict):
+        return None, "Each line must be a JSON object"
+    return payload, None
+
+
+def validate_case(payload: Dict[str, Any]) -> Tuple[Optional[Dict[str, float]], Optional[str]]:
+    """
+    Validate a decoded case against PredictionRequest
+
+    Args:
+        payload: Decoded JSON object
+
+    Returns:
+        Tuple of (features, error); exactly one of them is None
+    """
+    try:
+        return PredictionRequest(**payload).dict(), None
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        )
+
+
+def parse_case(line: bytes) -> Tuple[Optional[Dict[str, float]], Optional[str]]:
+    """
+    Parse and validate one NDJSON case
+
+    Args:
+        line: Raw JSON line
+
+    Returns:
+        Tuple of (features, error); exactly one of them is None
+    """
+    payload, error = decode_case(line)
+    if error is not None:
+        return None, error
+    return validate_case(payload)
+
+
+class StreamScorer:
+    """
+    Scores an NDJSON body chunk by chunk
+
+    Cases are parsed and validated as they arrive. Every chunk_rows
+    lines are scored with one vectorized predict_batch call and written out
+    before more of the body is read, so memory depends on the chunk size,
+    not on the size of the input. Output has one line per non-empty input
+    line, in input order: the prediction, or {"line": n, "error": ...} for
+    a line that could not be parsed or validated.
+    """
+
+    def __init__(self, executor: InferenceExecutor = inference_executor,
+                 chunk_rows: int = STREAM_CHUNK_ROWS, max_line_bytes: int = STREAM_MAX_LINE_BYTES):
+        self._executor = executor
+        self.chunk_rows = max(1, chunk_rows)
+        self.max_line_bytes = max_line_bytes
+
+    async def score(self, chunks: AsyncIterator[bytes], version: str = PRIMARY_VERSION) -> AsyncIterator[bytes]:
+        """
+        Score an NDJSON byte stream
+
+        Args:
+            chunks: Async iterator of raw body chunks
+            version: Model version to score with
+
+        Yields:
+            Encoded NDJSON output, one block per scored chunk
+        """
+        # Each entry is either a case (scored) or an error record, in input order
+        entries: List[Tuple[Optional[Dict[str, float]], Optional[Dict[str, Any]]]] = []
+        line_number = 0
+
+        async for line in iter_lines(chunks, self.max_line_bytes):
+            line_number += 1
+            if line is None:
+                entries.append((None, {'line': line_number, 'error': f"Line exceeds {self.max_line_bytes} bytes"}))
+            elif line.strip():
+                features, error = parse_case(line)
+                if error is None:
+                    entries.append((features, None))
+                else:
+                    entries.append((None, {'line': line_number, 'error': error}))
+            else:
+                continue
+
+            if len(entries) >= self.chunk_rows:
+                yield await self._score_chunk(entries, version)
+                entries = []
+
+        if entries:
+            yield await self._score_chunk(entries, version)
+
+    async def _score_chunk(self, entries: list, version: str) -> bytes:
+        """Score the valid cases of a chunk and encode all entries in order"""
+        cases = [features for features, error in entries if error is None]
+
+        results = []
+        if cases:
+            started = time.perf_counter()
+            timings = {}
+            try:
+                results = await self._executor.predict_batch(cases, version=version, timings=timings)
+            except Exception:
+                model_registry.record_latency(version, time.perf_counter() - started, len(cases), error=True)
+                raise
+            model_registry.record_latency(version, time.perf_counter() - started, len(cases))
+            batch_size.labels(STREAM_METRIC_LABEL).observe(len(cases))
+            if version == PRIMARY_VERSION:
+                shadow_scorer.submit(cases, results)
+
+        encoding = time.perf_counter()
+        scored = iter(results)
+        output = b''.join(
+            json.dumps(next(scored) if error is None else error).encode() + b'\n'
+            for _, error in entries
+        )
+        if cases:
+            timings[STAGE_SERIALIZE] = time.perf_counter() - encoding
+            record_stages(STREAM_METRIC_LABEL, timings)
+        return output
+
+
+# Global stream scorer instance
+stream_scorer = StreamScorer()
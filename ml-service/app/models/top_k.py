@@ -0,0 +1,259 @@
+"""
+Top-K case selection
+Scores a streamed NDJSON case set chunk by chunk and keeps only the K cases
+with the highest expected recovery (recovery_probability * debt_amount)
+"""
+import time
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from app.config import API_FEATURES, TOP_K_CHUNK_ROWS, STREAM_MAX_LINE_BYTES
+from app.models.inference_executor import inference_executor, InferenceExecutor
+from app.models.model_registry import model_registry, PRIMARY_VERSION
+from app.models.model_service import RISK_CATEGORIES, RISK_STRATEGIES
+from app.models.stream_scorer import iter_lines, decode_case, validate_case
+from app.models.columnar_batch import parse_columns, ColumnarValidationError, MAX_ERRORS
+from app.models.metrics import batch_size, STAGE_PARSE
+
+# Endpoint label of the top-K metrics
+TOP_K_METRIC_LABEL = "/predictions/top-k"
+
+# Optional field of an input case that is passed through to the result
+CASE_ID_FIELD = "case_id"
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TopK:
+    """
+    Running selection of the K rows with the highest score
+
+    Rows are added chunk by chunk as parallel arrays. Every chunk is merged
+    with the current selection and cut back to K rows with np.argpartition,
+    so memory is O(K + chunk) however many rows pass through. Which of
+    several rows tied at the cut-off is kept is unspecified.
+    """
+
+    def __init__(self, k: int):
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        self.k = k
+        self.rows_seen = 0
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+
+    def add(self, scores: np.ndarray, **columns: np.ndarray):
+        """
+        Offer a chunk of rows
+
+        Args:
+            scores: Score per row (higher is better)
+            **columns: Other per-row arrays to keep alongside the score
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        n_rows = len(scores)
+        # Arrival order breaks ties when the selection is sorted
+        chunk = dict(columns, score=scores, order=np.arange(self.rows_seen, self.rows_seen + n_rows))
+        self.rows_seen += n_rows
+
+        if self._columns is not None:
+            chunk = {name: np.concatenate((self._columns[name], values)) for name, values in chunk.items()}
+        if len(chunk['score']) > self.k:
+            keep = np.argpartition(-chunk['score'], self.k - 1)[:self.k]
+            chunk = {name: values[keep] for name, values in chunk.items()}
+        self._columns = chunk
+
+    def result(self) -> Dict[str, np.ndarray]:
+        """
+        Selected rows, highest score first (ties in arrival order)
+
+        Returns:
+            Dictionary of the added columns plus 'score', at most K rows each
+        """
+        if self._columns is None:
+            return {'score': np.empty(0)}
+        ranked = np.lexsort((self._columns['order'], -self._columns['score']))
+        return {name: values[ranked] for name, values in self._columns.items() if name != 'order'}
+
+
+class TopKScorer:
+    """
+    Ranks an NDJSON body by expected recovery without keeping the scores
+
+    Lines are decoded as they arrive; every chunk_rows lines the chunk is
+    validated column-wise (parse_columns), scored and folded into a TopK, so
+    neither the body nor the full result set is ever held in memory. Only a
+    chunk that fails the column-wise check is validated case by case, to
+    skip the invalid lines. Invalid lines are counted and the first
+    max_errors are reported.
+    """
+
+    def __init__(self, executor: InferenceExecutor = inference_executor,
+                 chunk_rows: int = TOP_K_CHUNK_ROWS, max_line_bytes: int = STREAM_MAX_LINE_BYTES,
+                 max_errors: int = MAX_ERRORS):
+        self._executor = executor
+        self.chunk_rows = max(1, chunk_rows)
+        self.max_line_bytes = max_line_bytes
+        self.max_errors = max_errors
+
+    async def select(self, chunks: AsyncIterator[bytes], k: int, version: str = PRIMARY_VERSION,
+                     timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        Select the K cases with the highest expected recovery
+
+        Args:
+            chunks: Async iterator of raw NDJSON body chunks
+            k: Number of cases to return
+            version: Model version to score with
+            timings: Dictionary that receives the seconds spent per stage
+
+        Returns:
+            Dictionary with the ranked cases, the number of valid and invalid
+            input lines and the first validation errors
+        """
+        started = time.perf_counter()
+        stages: Dict[str, float] = {}
+        top = TopK(k)
+        errors: List[Dict[str, Any]] = []
+        invalid = 0
+        # (line number, decoded case or None, error or None) per non-empty line
+        entries: List[Tuple[int, Optional[Dict[str, Any]], Optional[str]]] = []
+        line_number = 0
+
+        async for line in iter_lines(chunks, self.max_line_bytes):
+            line_number += 1
+            if line is None:
+                entries.append((line_number, None, f"Line exceeds {self.max_line_bytes} bytes"))
+            elif line.strip():
+                payload, error = decode_case(line)
+                if error is None:
+                    error = _case_id_error(payload.get(CASE_ID_FIELD))
+                entries.append((line_number, payload, error))
+            else:
+                continue
+
+            if len(entries) >= self.chunk_rows:
+                invalid += await self._score_chunk(top, entries, version, stages, errors)
+                entries = []
+
+        if entries:
+            invalid += await self._score_chunk(top, entries, version, stages, errors)
+
+        # Everything not spent scoring went to reading and validating the body
+        stages[STAGE_PARSE] = max(0.0, time.perf_counter() - started - sum(stages.values()))
+        if timings is not None:
+            for stage, seconds in stages.items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+
+        return {
+            'k': k,
+            'total_cases': top.rows_seen,
+            'invalid_cases': invalid,
+            'errors': errors,
+            'cases': _ranked_cases(top.result())
+        }
+
+    async def _score_chunk(self, top: TopK, entries: list, version: str, stages: Dict[str, float],
+                           errors: List[Dict[str, Any]]) -> int:
+        """Score the valid cases of a chunk, fold them into the selection and return the invalid count"""
+        columns, lines, case_ids, chunk_errors = _validate_chunk(entries)
+        for line, error in chunk_errors:
+            if len(errors) < self.max_errors:
+                errors.append({'line': line, 'error': error})
+        if not lines:
+            return len(chunk_errors)
+
+        started = time.perf_counter()
+        chunk_timings = {}
+        try:
+            probabilities, codes = await self._executor.predict_columns(columns, version=version,
+                                                                        timings=chunk_timings)
+        except Exception:
+            model_registry.record_latency(version, time.perf_counter() - started, len(lines), error=True)
+            raise
+        model_registry.record_latency(version, time.perf_counter() - started, len(lines))
+        batch_size.labels(TOP_K_METRIC_LABEL).observe(len(lines))
+        for stage, seconds in chunk_timings.items():
+            stages[stage] = stages.get(stage, 0.0) + seconds
+
+        top.add(
+            probabilities * columns['debt_amount'],
+            line=np.array(lines),
+            case_id=np.array(case_ids, dtype=object),
+            probability=probabilities,
+            debt_amount=columns['debt_amount'],
+            code=codes
+        )
+        return len(chunk_errors)
+
+
+def _case_id_error(case_id: Any) -> Optional[str]:
+    """Error for a case_id that cannot be passed through, or None"""
+    if case_id is None or (isinstance(case_id, (str, int)) and not isinstance(case_id, bool)):
+        return None
+    return f"{CASE_ID_FIELD} must be a string or an integer"
+
+
+def _validate_chunk(entries: list) -> Tuple[Dict[str, np.ndarray], List[int], List[Any], List[Tuple[int, str]]]:
+    """
+    Feature columns of the valid cases of a chunk
+
+    Args:
+        entries: (line number, decoded case or None, error or None) per line
+
+    Returns:
+        Tuple of (feature columns, line numbers, case ids) of the valid cases
+        and (line number, error) of the invalid ones, in input order
+    """
+    decoded = [(line, payload) for line, payload, error in entries if error is None]
+    failed = {}
+    try:
+        columns = parse_columns({name: [payload.get(name) for _, payload in decoded] for name in API_FEATURES})
+    except ColumnarValidationError:
+        # Some case is invalid: validate one by one to find out which
+        valid = []
+        for line, payload in decoded:
+            features, error = validate_case(payload)
+            if error is None:
+                valid.append(features)
+            else:
+                failed[line] = error
+        columns = {name: np.array([features[name] for features in valid], dtype=np.float64) for name in API_FEATURES}
+
+    lines, case_ids, errors = [], [], []
+    for line, payload, error in entries:
+        error = error or failed.get(line)
+        if error is None:
+            lines.append(line)
+            case_ids.append(payload.get(CASE_ID_FIELD))
+        else:
+            errors.append((line, error))
+    return columns, lines, case_ids, errors
+
+
+def _ranked_cases(selection: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Result dictionaries of the selected rows, best first"""
+    if not len(selection['score']):
+        return []
+    return [
+        {
+            'rank': rank,
+            'line': int(line),
+            CASE_ID_FIELD: case_id,
+            'expected_recovery': round(float(score), 2),
+            'recovery_probability': round(float(probability), 4),
+            'debt_amount': float(debt_amount),
+            'risk_category': RISK_CATEGORIES[code],
+            'recommended_strategy': RISK_STRATEGIES[code]
+        }
+        for rank, (line, case_id, score, probability, debt_amount, code) in enumerate(zip(
+            selection['line'], selection[CASE_ID_FIELD], selection['score'],
+            selection['probability'], selection['debt_amount'], selection['code']
+        ), start=1)
+    ]
+
+
+# Global top-K scorer instance
+top_k_scorer = TopKScorer()
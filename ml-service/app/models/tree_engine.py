@@ -0,0 +1,468 @@
+"""
+Native NumPy inference engine for tree ensembles
+Flattens RandomForest, GradientBoosting and XGBoost models into contiguous
+node arrays and evaluates all trees for a batch at once
+"""
+import json
+import numpy as np
+from typing import Optional
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Target number of (row, tree) pairs evaluated per traversal step
+TRAVERSAL_BLOCK_SIZE = 1 << 15
+
+# Probabilities of float64 sklearn models are reproduced to this precision;
+# XGBoost computes in float32, so its outputs only agree to float32 precision
+SKLEARN_TOLERANCE = 1e-9
+XGBOOST_TOLERANCE = 1e-6
+
+
+class FlatEnsemble:
+    """
+    Tree ensemble stored as contiguous per-node arrays
+
+    Every node has a feature index, threshold, left child, leaf value and
+    missing-value direction. Nodes are laid out so that the right child of
+    a split always directly follows its left child, and trees are
+    concatenated with roots holding the index of each tree's root. Leaves
+    point to themselves with an infinite threshold, so a fixed number of
+    traversal steps (the maximum depth) lands every row on a leaf.
+
+    Thresholds are stored as float32, rounded so that comparing float32
+    features gives exactly the same decisions as sklearn's float64
+    thresholds.
+
+    Two aggregation modes are supported:
+    - 'mean': probability is the mean leaf value (RandomForest)
+    - 'logit': probability is sigmoid(base_score + scale * sum of leaf values)
+      (GradientBoosting, XGBoost)
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 value: np.ndarray, missing_left: np.ndarray, roots: np.ndarray,
+                 max_depth: int, aggregation: str, base_score: float = 0.0,
+                 scale: float = 1.0, strict: bool = False, model_type: str = '',
+                 tolerance: float = SKLEARN_TOLERANCE, is_leaf: Optional[np.ndarray] = None,
+                 source_index: Optional[np.ndarray] = None, source_roots: Optional[np.ndarray] = None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float32)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.missing_left = np.ascontiguousarray(missing_left, dtype=bool)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        if is_leaf is None:
+            is_leaf = self.left == np.arange(len(self.left))
+        self.is_leaf = np.ascontiguousarray(is_leaf, dtype=bool)
+        self.max_depth = int(max_depth)
+        self.aggregation = aggregation
+        self.base_score = float(base_score)
+        self.scale = float(scale)
+        self.strict = strict
+        self.model_type = model_type
+        self.tolerance = tolerance
+        # Flat position of every node of the source model (trees concatenated in
+        # their original numbering), so the model's own apply() output can be
+        # mapped onto the flat leaves; not kept in flat artifacts
+        self.source_index = None if source_index is None else np.ascontiguousarray(source_index, dtype=np.intp)
+        self.source_roots = None if source_roots is None else np.ascontiguousarray(source_roots, dtype=np.intp)
+
+    # Per-node arrays (stored as .npy files by flat_artifacts) and scalar settings
+    ARRAY_FIELDS = ('feature', 'threshold', 'left', 'value', 'missing_left', 'roots', 'is_leaf')
+    SCALAR_FIELDS = ('max_depth', 'aggregation', 'base_score', 'scale', 'strict', 'model_type', 'tolerance')
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def leaf_values(self, X: np.ndarray) -> np.ndarray:
+        """
+        Leaf value of every tree for every row
+
+        Args:
+            X: Feature matrix (n_rows, n_features)
+
+        Returns:
+            Array of shape (n_rows, n_trees)
+        """
+        # Trees compare float32 features, exactly like sklearn and XGBoost
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+        out = np.empty((n_rows, self.n_trees), dtype=np.float64)
+
+        block_rows = max(1, TRAVERSAL_BLOCK_SIZE // max(1, self.n_trees))
+        for start in range(0, n_rows, block_rows):
+            end = min(start + block_rows, n_rows)
+            block = X[start:end]
+            if np.isfinite(block).all():
+                leaves = self._traverse(block)
+            else:
+                leaves = self._traverse_non_finite(block)
+            out[start:end] = self.value.take(leaves)
+
+        return out
+
+    def _traverse(self, X: np.ndarray) -> np.ndarray:
+        """Walk all trees for a block of finite rows and return the leaf indices"""
+        n_rows, n_features = X.shape
+        values = X.ravel()
+        row_offsets = (np.arange(n_rows) * n_features)[:, None]
+        node = np.tile(self.roots, (n_rows, 1))
+
+        for _ in range(self.max_depth):
+            x = values.take(row_offsets + self.feature.take(node))
+            threshold = self.threshold.take(node)
+            go_right = (x >= threshold) if self.strict else (x > threshold)
+            node = self.left.take(node) + go_right
+
+        return node
+
+    def _traverse_non_finite(self, X: np.ndarray) -> np.ndarray:
+        """Slower traversal that honours missing-value directions for NaN/inf rows"""
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.tile(self.roots, (X.shape[0], 1))
+
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            threshold = self.threshold[node]
+            go_left = (x < threshold) if self.strict else (x <= threshold)
+            go_left |= np.isnan(x) & self.missing_left[node]
+            go_left |= self.is_leaf[node]
+            node = self.left[node] + ~go_left
+
+        return node
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities in the same layout as sklearn's predict_proba
+
+        Args:
+            X: Feature matrix (n_rows, n_features)
+
+        Returns:
+            Array of shape (n_rows, 2)
+        """
+        return self._probabilities(self.leaf_values(X))
+
+    def predict_proba_from_leaves(self, leaves: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities from the leaf indices of the source model
+
+        The model's own apply() does the traversal (multi-threaded and
+        compiled, so fast for large batches); the leaf values are then summed
+        exactly as in predict_proba, giving bit-identical probabilities.
+
+        Args:
+            leaves: Output of the source model's apply(), one leaf per row and tree
+
+        Returns:
+            Array of shape (n_rows, 2)
+
+        Raises:
+            ValueError: If the engine was not exported from a model
+        """
+        if self.source_index is None:
+            raise ValueError("Engine has no source model node mapping")
+
+        leaves = np.asarray(leaves).reshape(len(leaves), -1).astype(np.intp)
+        return self._probabilities(self.value.take(self.source_index[leaves + self.source_roots]))
+
+    def _probabilities(self, leaf_values: np.ndarray) -> np.ndarray:
+        """Aggregate a (n_rows, n_trees) matrix of leaf values into class probabilities"""
+        # Row-wise sums over contiguous (row, tree) blocks use the same
+        # summation order for every row regardless of batch size
+        totals = leaf_values.sum(axis=1)
+
+        if self.aggregation == 'mean':
+            positive = totals / self.n_trees
+        else:
+            positive = 1.0 / (1.0 + np.exp(-(self.base_score + self.scale * totals)))
+
+        return np.column_stack((1.0 - positive, positive))
+
+
+def _float32_at_most(threshold: np.ndarray) -> np.ndarray:
+    """
+    Largest float32 values that do not exceed the float64 thresholds
+
+    For any float32 x, x <= threshold holds exactly when x <= the result.
+    """
+    rounded = threshold.astype(np.float32)
+    too_high = rounded.astype(np.float64) > threshold
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+def _sibling_order(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Breadth-first node order in which every right child follows its left child
+
+    Returns:
+        Array mapping new position -> original node index
+    """
+    order = [0]
+    for node in order:
+        if left[node] >= 0:
+            order.append(left[node])
+            order.append(right[node])
+    return np.asarray(order, dtype=np.intp)
+
+
+def _concatenate_trees(trees: list, strict: bool = False) -> dict:
+    """
+    Concatenate per-tree node arrays into the flat layout
+
+    Each tree is a dict with feature, threshold, left, right, value and
+    missing_left arrays using local child indices (-1 for leaves).
+    """
+    arrays = {key: [] for key in ('feature', 'threshold', 'left', 'value', 'missing_left', 'source_index')}
+    roots = []
+    source_roots = []
+    offset = 0
+    source_offset = 0
+
+    for tree in trees:
+        order = _sibling_order(tree['left'], tree['right'])
+        position = np.empty(len(tree['left']), dtype=np.intp)
+        position[order] = np.arange(len(order))
+
+        left = np.asarray(tree['left'])[order]
+        is_leaf = left < 0
+        node_ids = np.arange(len(order)) + offset
+
+        threshold = np.asarray(tree['threshold'], dtype=np.float64)[order]
+        threshold = threshold.astype(np.float32) if strict else _float32_at_most(threshold)
+
+        arrays['feature'].append(np.where(is_leaf, 0, np.asarray(tree['feature'])[order]))
+        arrays['threshold'].append(np.where(is_leaf, np.float32(np.inf), threshold))
+        arrays['left'].append(np.where(is_leaf, node_ids, position[np.maximum(left, 0)] + offset))
+        arrays['value'].append(np.asarray(tree['value'])[order])
+        arrays['missing_left'].append(np.where(is_leaf, True, np.asarray(tree['missing_left'])[order]))
+        arrays['source_index'].append(position + offset)
+
+        roots.append(offset)
+        source_roots.append(source_offset)
+        offset += len(order)
+        source_offset += len(position)
+
+    flat = {key: np.concatenate(parts) for key, parts in arrays.items()}
+    flat['roots'] = np.asarray(roots)
+    flat['source_roots'] = np.asarray(source_roots)
+    return flat
+
+
+def _export_sklearn_tree(tree, value: np.ndarray) -> dict:
+    """Node arrays of a fitted sklearn Tree object"""
+    missing_left = getattr(tree, 'missing_go_to_left', None)
+    if missing_left is None:
+        missing_left = np.zeros(tree.node_count, dtype=bool)
+
+    return {
+        'feature': np.asarray(tree.feature),
+        'threshold': np.asarray(tree.threshold),
+        'left': np.asarray(tree.children_left),
+        'right': np.asarray(tree.children_right),
+        'value': value,
+        'missing_left': np.asarray(missing_left, dtype=bool)
+    }
+
+
+def _export_random_forest(model) -> FlatEnsemble:
+    """Flatten a RandomForestClassifier / ExtraTreesClassifier"""
+    trees = []
+    max_depth = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        # Normalized class-1 fraction per node, as in DecisionTreeClassifier.predict_proba
+        counts = tree.value[:, 0, :]
+        normalizer = counts.sum(axis=1)
+        normalizer[normalizer == 0.0] = 1.0
+        trees.append(_export_sklearn_tree(tree, counts[:, 1] / normalizer))
+        max_depth = max(max_depth, tree.max_depth)
+
+    return FlatEnsemble(
+        **_concatenate_trees(trees),
+        max_depth=max_depth,
+        aggregation='mean',
+        model_type=type(model).__name__
+    )
+
+
+def _export_gradient_boosting(model) -> FlatEnsemble:
+    """Flatten a binary GradientBoostingClassifier"""
+    if model.init_ == 'zero':
+        base_score = 0.0
+    elif hasattr(model.init_, 'class_prior_'):
+        # Same clipping as sklearn's HalfBinomialLoss.get_init_raw_predictions
+        eps = np.finfo(np.float32).eps
+        prior = np.clip(model.init_.class_prior_[1], eps, 1 - eps)
+        base_score = float(np.log(prior / (1 - prior)))
+    else:
+        raise ValueError(f"Unsupported GradientBoosting init estimator: {type(model.init_).__name__}")
+
+    trees = []
+    max_depth = 0
+
+    for estimator in model.estimators_[:, 0]:
+        tree = estimator.tree_
+        trees.append(_export_sklearn_tree(tree, tree.value[:, 0, 0]))
+        max_depth = max(max_depth, tree.max_depth)
+
+    return FlatEnsemble(
+        **_concatenate_trees(trees),
+        max_depth=max_depth,
+        aggregation='logit',
+        base_score=base_score,
+        scale=model.learning_rate,
+        model_type=type(model).__name__
+    )
+
+
+def _export_xgboost(model) -> FlatEnsemble:
+    """Flatten a binary:logistic XGBClassifier"""
+    learner = json.loads(model.get_booster().save_raw('json'))['learner']
+
+    if learner['objective']['name'] != 'binary:logistic':
+        raise ValueError(f"Unsupported XGBoost objective: {learner['objective']['name']}")
+    if learner['gradient_booster']['name'] != 'gbtree':
+        raise ValueError(f"Unsupported XGBoost booster: {learner['gradient_booster']['name']}")
+
+    base_probability = float(learner['learner_model_param']['base_score'])
+    base_score = float(np.log(base_probability / (1 - base_probability)))
+
+    trees = []
+    max_depth = 0
+
+    for tree in learner['gradient_booster']['model']['trees']:
+        if any(tree.get('split_type', [])):
+            raise ValueError("Categorical XGBoost splits are not supported")
+
+        left = np.asarray(tree['left_children'])
+        right = np.asarray(tree['right_children'])
+        # split_conditions holds thresholds for splits and weights for leaves
+        conditions = np.asarray(tree['split_conditions'], dtype=np.float32).astype(np.float64)
+
+        trees.append({
+            'feature': np.asarray(tree['split_indices']),
+            'threshold': conditions,
+            'left': left,
+            'right': right,
+            'value': np.where(left < 0, conditions, 0.0),
+            'missing_left': np.asarray(tree['default_left'], dtype=bool)
+        })
+        max_depth = max(max_depth, _tree_depth(left, right))
+
+    return FlatEnsemble(
+        **_concatenate_trees(trees, strict=True),
+        max_depth=max_depth,
+        aggregation='logit',
+        base_score=base_score,
+        strict=True,
+        model_type=type(model).__name__,
+        tolerance=XGBOOST_TOLERANCE
+    )
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    """Depth of a tree given its child arrays (-1 for leaves)"""
+    depth = np.zeros(len(left), dtype=np.int64)
+    for node in range(len(left)):
+        if left[node] >= 0:
+            depth[left[node]] = depth[node] + 1
+            depth[right[node]] = depth[node] + 1
+    return int(depth.max())
+
+
+def export_ensemble(model) -> FlatEnsemble:
+    """
+    Flatten a fitted binary tree-ensemble classifier
+
+    Args:
+        model: RandomForest/ExtraTrees, GradientBoosting or XGBoost classifier
+
+    Returns:
+        FlatEnsemble equivalent to model.predict_proba
+
+    Raises:
+        ValueError: If the model type or configuration is not supported
+    """
+    if len(getattr(model, 'classes_', [])) != 2:
+        raise ValueError("Only binary classifiers are supported")
+
+    model_type = type(model).__name__
+
+    if model_type in ('RandomForestClassifier', 'ExtraTreesClassifier'):
+        return _export_random_forest(model)
+    if model_type == 'GradientBoostingClassifier':
+        return _export_gradient_boosting(model)
+    if model_type == 'XGBClassifier':
+        return _export_xgboost(model)
+
+    raise ValueError(f"Unsupported model type: {model_type}")
+
+
+def verify_ensemble(engine: FlatEnsemble, model, n_features: int, n_rows: int = 512,
+                    random_state: int = 0) -> float:
+    """
+    Compare engine and model probabilities on synthetic scaled inputs
+
+    Also checks that the engine scores the model's own leaf indices
+    (predict_proba_from_leaves) like it scores the features.
+
+    Args:
+        engine: Flattened ensemble
+        model: Original model
+        n_features: Number of model input features
+        n_rows: Number of synthetic rows
+        random_state: Seed for the synthetic rows
+
+    Returns:
+        Maximum absolute probability difference
+    """
+    rng = np.random.default_rng(random_state)
+    X = rng.normal(0.0, 1.5, size=(n_rows, n_features))
+
+    expected = model.predict_proba(X)[:, 1]
+    actual = engine.predict_proba(X)[:, 1]
+    from_leaves = engine.predict_proba_from_leaves(model.apply(X))[:, 1]
+
+    return float(max(np.max(np.abs(expected - actual)), np.max(np.abs(from_leaves - actual))))
+
+
+def build_engine(model, n_features: int) -> Optional[FlatEnsemble]:
+    """
+    Export a model and check it against the original
+
+    Args:
+        model: Fitted model
+        n_features: Number of model input features
+
+    Returns:
+        FlatEnsemble, or None if the model is unsupported or does not match
+    """
+    try:
+        engine = export_ensemble(model)
+    except Exception as e:
+        logger.info(f"Tree engine not used: {e}")
+        return None
+
+    max_diff = verify_ensemble(engine, model, n_features)
+    if max_diff > engine.tolerance:
+        logger.warning(
+            f"⚠️ Tree engine disagrees with {engine.model_type} (max diff {max_diff:.3g}), "
+            f"using predict_proba"
+        )
+        return None
+
+    logger.info(
+        f"✅ Tree engine ready: {engine.n_trees} trees, {engine.n_nodes} nodes, "
+        f"max depth {engine.max_depth} (max diff {max_diff:.3g})"
+    )
+    return engine
@@ -0,0 +1,118 @@
+"""
+Admin API router
+Operational endpoints guarded by the ADMIN_API_TOKEN shared secret
+"""
+import asyncio
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Header, Query, status
+from app.models.schemas import ModelReloadResponse, ProfileResponse
+from app.models.model_service import model_service
+from app.models.request_profiler import request_profiler, SORT_KEYS
+from app.config import ADMIN_API_TOKEN
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+# Header carrying the admin token
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Check that admin endpoints are enabled and the token matches"""
+    return bool(ADMIN_API_TOKEN and token and hmac.compare_digest(token, ADMIN_API_TOKEN))
+
+
+def _check_admin_token(token: Optional[str]):
+    """Reject the request unless admin endpoints are enabled and the token matches"""
+    if not is_admin_token(token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or missing admin token"
+        )
+
+
+@router.post("/reload-model", response_model=ModelReloadResponse, status_code=status.HTTP_200_OK)
+async def reload_model(x_admin_token: Optional[str] = Header(None)):
+    """
+    Load the current artifacts from MODELS_DIR and swap them in without downtime
+
+    The new model is loaded and warmed up off the event loop while the old
+    one keeps serving; the swap itself is a single reference assignment.
+
+    Args:
+        x_admin_token: Value of the X-Admin-Token header
+
+    Returns:
+        Previous and new model version with load and warm-up timings
+    """
+    _check_admin_token(x_admin_token)
+
+    try:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, model_service.reload_model)
+        return ModelReloadResponse(**result)
+
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Model reload error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error reloading model: {str(e)}"
+        )
+
+
+@router.get("/profiles", status_code=status.HTTP_200_OK)
+async def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """
+    List stored request profiles, newest first
+
+    Requests sent with the X-Profile header (and the admin token) are
+    profiled; their id comes back in the X-Profile-Id response header.
+
+    Args:
+        x_admin_token: Value of the X-Admin-Token header
+
+    Returns:
+        Dictionary with the stored profile ids
+    """
+    _check_admin_token(x_admin_token)
+    return {"profiles": request_profiler.list_profiles()}
+
+
+@router.get("/profiles/{profile_id}", response_model=ProfileResponse, status_code=status.HTTP_200_OK)
+async def get_profile(profile_id: str, limit: int = Query(25, ge=1, le=500),
+                      sort: str = Query("cumulative", pattern=f"^({'|'.join(SORT_KEYS)})$"),
+                      x_admin_token: Optional[str] = Header(None)):
+    """
+    Hottest functions of a stored request profile
+
+    The raw profile is kept as <PROFILE_DIR>/<profile_id>.prof for pstats or snakeviz.
+
+    Args:
+        profile_id: Id from the X-Profile-Id response header
+        limit: Number of functions to return
+        sort: 'cumulative', 'tottime' or 'ncalls'
+        x_admin_token: Value of the X-Admin-Token header
+
+    Returns:
+        Profile summary with the hottest functions
+    """
+    _check_admin_token(x_admin_token)
+
+    try:
+        return ProfileResponse(**request_profiler.top_functions(profile_id, limit, sort))
+    except KeyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e.args[0])
+        )
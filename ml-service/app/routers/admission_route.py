@@ -0,0 +1,51 @@
+"""
+Route class that applies admission control
+Sheds POST requests with 503 and Retry-After when their endpoint is overloaded
+"""
+import time
+from typing import Callable
+
+from fastapi import HTTPException, status
+
+from app.models.admission import (
+    admission_controller, Overloaded, set_admitted_under_load, reset_admitted_under_load
+)
+from app.routers.timed_route import TimedRoute
+
+
+class AdmissionRoute(TimedRoute):
+    """
+    TimedRoute whose POST endpoints pass through an admission gate
+
+    The gate is taken before the body is read, so a shed request costs
+    almost nothing, and released when the endpoint's response is returned
+    (for streaming responses that is before the body is streamed). Shed
+    requests never reach the request metrics; they are counted in
+    ml_requests_shed_total. GET endpoints are never gated.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        gate = admission_controller.gate(self.path_format) if "POST" in self.methods else None
+        if gate is None:
+            return handler
+
+        async def admitted_handler(request):
+            try:
+                under_load = await gate.acquire()
+            except Overloaded as e:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Service is overloaded, retry later",
+                    headers={"Retry-After": str(e.retry_after)}
+                )
+
+            token = set_admitted_under_load(under_load)
+            started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                reset_admitted_under_load(token)
+                gate.release(time.perf_counter() - started)
+
+        return admitted_handler
@@ -0,0 +1,174 @@
+"""
+Batch job API router
+Submits large scoring jobs, reports their progress and serves paged results
+"""
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, File, HTTPException, Header, Query, Response, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+import numpy as np
+
+from app.models.schemas import BatchPredictionRequest, JobStatusResponse, JobResultsPage
+from app.models.model_service import model_service
+from app.models.model_registry import PRIMARY_VERSION
+from app.batch.jobs import job_manager
+from app.batch.file_scorer import file_format
+from app.routers.versioning import route_version
+from app.routers.timed_route import TimedRoute
+from app.config import API_FEATURES
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/jobs", tags=["jobs"], route_class=TimedRoute)
+
+
+def _check_model_loaded(version: str):
+    """Reject new primary-model jobs while no model is loaded"""
+    if version == PRIMARY_VERSION and not model_service.is_model_loaded():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Model is not loaded. Please train the model first."
+        )
+
+
+def _job_not_found(e: KeyError) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e.args[0]))
+
+
+@router.post("/batch", response_model=JobStatusResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_batch_job(request: BatchPredictionRequest, x_model_version: Optional[str] = Header(None)):
+    """
+    Submit a batch of cases for asynchronous scoring
+
+    Args:
+        request: Batch prediction request with list of cases
+        x_model_version: Optional registry version to score with (X-Model-Version header)
+
+    Returns:
+        Status of the queued job
+    """
+    version = route_version(x_model_version)
+    _check_model_loaded(version)
+
+    columns = {
+        name: np.array([getattr(case, name) for case in request.cases], dtype=np.float64)
+        for name in API_FEATURES
+    }
+    job = await run_in_threadpool(job_manager.create_from_columns, columns, version)
+    job_manager.submit(job['job_id'])
+    logger.info(f"Queued batch job {job['job_id']} with {len(request.cases)} cases")
+
+    return JobStatusResponse(**job_manager.status(job['job_id']))
+
+
+@router.post("/file", response_model=JobStatusResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_file_job(file: UploadFile = File(..., description="CSV or Parquet file with the API feature columns"),
+                          x_model_version: Optional[str] = Header(None)):
+    """
+    Submit a CSV or Parquet file for asynchronous scoring
+
+    Args:
+        file: Uploaded .csv or .parquet file
+        x_model_version: Optional registry version to score with (X-Model-Version header)
+
+    Returns:
+        Status of the queued job
+    """
+    suffix = Path(file.filename or '').suffix.lower()
+    try:
+        file_format(Path(f"upload{suffix}"))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    version = route_version(x_model_version)
+    _check_model_loaded(version)
+
+    job = job_manager.create_for_file(suffix, version)
+
+    def save_upload():
+        with open(job_manager.source_path(job), 'wb') as f:
+            shutil.copyfileobj(file.file, f, 1 << 20)
+
+    try:
+        await run_in_threadpool(save_upload)
+    except Exception as e:
+        # Do not leave a queued job without its upload to be resumed on the next start
+        job_manager.delete(job['job_id'])
+        logger.error(f"❌ Could not store upload for job {job['job_id']}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Could not store the uploaded file: {e}"
+        )
+    job_manager.submit(job['job_id'])
+    logger.info(f"Queued file job {job['job_id']} for {file.filename}")
+
+    return JobStatusResponse(**job_manager.status(job['job_id']))
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse, status_code=status.HTTP_200_OK)
+async def get_job(job_id: str):
+    """
+    Get the progress of a job
+
+    Args:
+        job_id: Job id returned on submission
+
+    Returns:
+        Job status with row and chunk counts
+    """
+    try:
+        return JobStatusResponse(**job_manager.status(job_id))
+    except KeyError as e:
+        raise _job_not_found(e)
+
+
+@router.get(
+    "/{job_id}/results",
+    response_model=JobResultsPage,
+    status_code=status.HTTP_200_OK,
+    responses={409: {"description": "The page has not been scored yet"}}
+)
+async def get_job_results(job_id: str, page: int = Query(0, ge=0, description="Page index (one page per chunk)")):
+    """
+    Download one page of a job's results
+
+    Pages can be fetched as soon as their chunk is scored, before the job
+    completes.
+
+    Args:
+        job_id: Job id returned on submission
+        page: Page index, 0-based
+
+    Returns:
+        JobResultsPage JSON
+    """
+    try:
+        body = await run_in_threadpool(job_manager.result_page, job_id, page)
+    except KeyError as e:
+        raise _job_not_found(e)
+
+    if body is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Page {page} has not been scored yet"
+        )
+    return Response(content=body, media_type="application/json")
+
+
+@router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_job(job_id: str):
+    """
+    Delete a job and its results (a running job stops after its current chunk)
+
+    Args:
+        job_id: Job id returned on submission
+    """
+    try:
+        job_manager.delete(job_id)
+    except KeyError as e:
+        raise _job_not_found(e)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -2,54 +2,122 @@
 Prediction API router
 Implements endpoints as per roadmap specification
 """
-from fastapi import APIRouter, HTTPException, status
+import time
+from typing import Optional
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from fastapi import APIRouter, File, HTTPException, Header, Query, Request, Response, UploadFile, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from app.models.schemas import (
     PredictionRequest,
     PredictionResponse,
     BatchPredictionRequest,
     BatchPredictionResponse,
-    ModelInfoResponse
+    ColumnarBatchPredictionRequest,
+    ColumnarBatchPredictionResponse,
+    TopKResponse,
+    ModelInfoResponse,
+    ServiceStatsResponse
 )
 from app.models.model_service import model_service
+from app.models.inference_executor import inference_executor
+from app.models.micro_batcher import micro_batcher
+from app.models.prediction_cache import prediction_cache
+from app.models.model_registry import model_registry, degraded_version, PRIMARY_VERSION
+from app.models.shadow_scorer import shadow_scorer
+from app.models.stream_scorer import stream_scorer, NDJSONStreamingResponse
+from app.models.top_k import top_k_scorer
+from app.models.cascade import cascade_stats
+from app.models.admission import admission_controller
+from app.models.columnar_batch import parse_columns, encode_response, ColumnarValidationError
+from app.batch.file_scorer import score_file, file_format
+from app.models.metrics import (
+    batch_size, requests_degraded, current_stages, is_profiling, STAGE_PARSE, STAGE_SERIALIZE
+)
+from app.routers.admission_route import AdmissionRoute
+from app.routers.versioning import route_version
+from app.config import MICRO_BATCHING_ENABLED, PREDICTION_CACHE_ENABLED, TOP_K_MAX
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/predictions", tags=["predictions"])
+router = APIRouter(prefix="/predictions", tags=["predictions"], route_class=AdmissionRoute)
+
+
+def _scoring_version(version: str, endpoint: str, headers) -> str:
+    """
+    Version label to score a batch with
+
+    Requests admitted while their endpoint was overloaded are scored with
+    the surrogate alone when ADMISSION_DEGRADE_ENABLED is set; the response
+    says so in the X-Degraded header.
+    """
+    if not admission_controller.should_degrade():
+        return version
+    bundle = model_service.bundle if version == PRIMARY_VERSION else model_registry.get(version)
+    if bundle.surrogate is None:
+        return version
+    requests_degraded.labels(endpoint).inc()
+    headers["X-Degraded"] = "surrogate"
+    return degraded_version(version)
 
 
 @router.post("/recovery", response_model=PredictionResponse, status_code=status.HTTP_200_OK)
-async def predict_recovery(request: PredictionRequest):
+async def predict_recovery(request: PredictionRequest, response: Response,
+                           x_model_version: Optional[str] = Header(None)):
     """
     Predict recovery probability for a single case
     
     Args:
         request: Prediction request with case features
+        response: Response used to report the serving model version
+        x_model_version: Optional registry version to score with (X-Model-Version header)
         
     Returns:
         Prediction response with probability, risk category, and strategy
     """
+    version = route_version(x_model_version)
+    response.headers["X-Model-Version"] = version
+    started = time.perf_counter()
+    
     try:
-        logger.info(f"Received prediction request: {request.dict()}")
-        
         # Convert request to dictionary
         features = request.dict()
         
-        # Make prediction
-        result = model_service.predict(features)
+        logger.info(f"Received prediction request: {features}")
         
+        # Make prediction (coalesced with concurrent requests when micro-batching is enabled)
+        stages = current_stages()
+        if version != PRIMARY_VERSION:
+            result = await inference_executor.predict(features, version, timings=stages)
+        elif MICRO_BATCHING_ENABLED and not is_profiling():
+            result = await micro_batcher.predict(features, timings=stages)
+        else:
+            result = await inference_executor.predict(features, timings=stages)
+            shadow_scorer.submit([features], [result])
+        
+        model_registry.record_latency(version, time.perf_counter() - started)
         logger.info(f"Prediction result: {result}")
         
         return PredictionResponse(**result)
         
     except RuntimeError as e:
+        model_registry.record_latency(version, time.perf_counter() - started, error=True)
         logger.error(f"Model not loaded: {e}")
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Model is not loaded. Please train the model first."
         )
     except Exception as e:
+        model_registry.record_latency(version, time.perf_counter() - started, error=True)
         logger.error(f"Prediction error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -58,24 +126,36 @@ async def predict_recovery(request: PredictionRequest):
 
 
 @router.post("/batch", response_model=BatchPredictionResponse, status_code=status.HTTP_200_OK)
-async def predict_batch(request: BatchPredictionRequest):
+async def predict_batch(request: BatchPredictionRequest, response: Response,
+                        x_model_version: Optional[str] = Header(None)):
     """
     Predict recovery probability for multiple cases
     
     Args:
         request: Batch prediction request with list of cases
+        response: Response used to report the serving model version
+        x_model_version: Optional registry version to score with (X-Model-Version header)
         
     Returns:
         Batch prediction response with list of predictions
     """
+    version = route_version(x_model_version)
+    response.headers["X-Model-Version"] = version
+    started = time.perf_counter()
+    
     try:
         logger.info(f"Received batch prediction request with {len(request.cases)} cases")
         
         # Convert requests to dictionaries
         cases = [case.dict() for case in request.cases]
         
-        # Make batch predictions
-        results = model_service.predict_batch(cases)
+        # Make batch predictions on the inference executor
+        batch_size.labels("/predictions/batch").observe(len(cases))
+        scoring_version = _scoring_version(version, "/predictions/batch", response.headers)
+        results = await inference_executor.predict_batch(cases, version=scoring_version, timings=current_stages())
+        model_registry.record_latency(version, time.perf_counter() - started, len(cases))
+        if scoring_version == PRIMARY_VERSION:
+            shadow_scorer.submit(cases, results)
         
         # Convert to response models
         predictions = [PredictionResponse(**result) for result in results]
@@ -88,12 +168,14 @@ async def predict_batch(request: BatchPredictionRequest):
         )
         
     except RuntimeError as e:
+        model_registry.record_latency(version, time.perf_counter() - started, len(request.cases), error=True)
         logger.error(f"Model not loaded: {e}")
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Model is not loaded. Please train the model first."
         )
     except Exception as e:
+        model_registry.record_latency(version, time.perf_counter() - started, len(request.cases), error=True)
         logger.error(f"Batch prediction error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -101,6 +183,244 @@ async def predict_batch(request: BatchPredictionRequest):
         )
 
 
+@router.post(
+    "/batch/columnar",
+    response_model=ColumnarBatchPredictionResponse,
+    status_code=status.HTTP_200_OK,
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": ColumnarBatchPredictionRequest.model_json_schema()}}
+    }}
+)
+async def predict_batch_columnar(request: Request, x_model_version: Optional[str] = Header(None)):
+    """
+    Predict recovery probability for a batch sent as one array per feature
+    
+    The body is decoded straight into NumPy columns and range-checked
+    column-wise with the PredictionRequest constraints; the response holds
+    one array per output field. Unlike /predictions/batch, no per-case
+    request or response objects are built.
+    
+    Args:
+        request: Raw request with a ColumnarBatchPredictionRequest JSON body
+        x_model_version: Optional registry version to score with (X-Model-Version header)
+        
+    Returns:
+        ColumnarBatchPredictionResponse JSON
+    """
+    stages = current_stages()
+    parse_started = time.perf_counter()
+    try:
+        payload = json.loads(await request.body())
+    except ValueError as e:
+        raise RequestValidationError([{
+            'type': 'json_invalid', 'loc': ('body',), 'msg': f"JSON decode error: {e}", 'input': None
+        }])
+    try:
+        columns = parse_columns(payload)
+    except ColumnarValidationError as e:
+        raise RequestValidationError(e.errors)
+    n_rows = len(columns[next(iter(columns))])
+    if stages is not None:
+        stages[STAGE_PARSE] = time.perf_counter() - parse_started
+    
+    version = route_version(x_model_version)
+    started = time.perf_counter()
+    
+    try:
+        logger.info(f"Received columnar batch prediction request with {n_rows} cases")
+        
+        batch_size.labels("/predictions/batch/columnar").observe(n_rows)
+        headers = {"X-Model-Version": version}
+        scoring_version = _scoring_version(version, "/predictions/batch/columnar", headers)
+        probabilities, codes = await inference_executor.predict_columns(columns, version=scoring_version,
+                                                                        timings=stages)
+        model_registry.record_latency(version, time.perf_counter() - started, n_rows)
+        
+        encode_started = time.perf_counter()
+        body = encode_response(probabilities, codes)
+        if stages is not None:
+            stages[STAGE_SERIALIZE] = time.perf_counter() - encode_started
+        
+        logger.info(f"Columnar batch prediction completed: {n_rows} predictions")
+        
+        return Response(content=body, media_type="application/json", headers=headers)
+        
+    except RuntimeError as e:
+        model_registry.record_latency(version, time.perf_counter() - started, n_rows, error=True)
+        logger.error(f"Model not loaded: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Model is not loaded. Please train the model first."
+        )
+    except Exception as e:
+        model_registry.record_latency(version, time.perf_counter() - started, n_rows, error=True)
+        logger.error(f"Columnar batch prediction error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error making batch predictions: {str(e)}"
+        )
+
+
+@router.post("/stream", status_code=status.HTTP_200_OK, response_class=NDJSONStreamingResponse)
+async def predict_stream(request: Request, x_model_version: Optional[str] = Header(None)):
+    """
+    Score newline-delimited JSON cases and stream NDJSON results
+    
+    The body is read and scored in chunks, so memory stays bounded for any
+    input size. Results come back in input order, one line per non-empty
+    input line; invalid lines produce {"line": n, "error": ...}.
+    
+    Args:
+        request: Raw request with an NDJSON body of prediction cases
+        x_model_version: Optional registry version to score with (X-Model-Version header)
+        
+    Returns:
+        Streaming NDJSON response
+    """
+    version = route_version(x_model_version)
+    if version == PRIMARY_VERSION and not model_service.is_model_loaded():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Model is not loaded. Please train the model first."
+        )
+    
+    async def body():
+        try:
+            async for block in stream_scorer.score(request.stream(), version):
+                yield block
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error(f"Streaming prediction error: {e}")
+            yield json.dumps({'error': f"Error making predictions: {str(e)}"}).encode() + b'\n'
+    
+    return NDJSONStreamingResponse(body(), headers={"X-Model-Version": version})
+
+
+@router.post(
+    "/top-k",
+    response_model=TopKResponse,
+    status_code=status.HTTP_200_OK,
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/x-ndjson": {"schema": {"type": "string"}}}
+    }}
+)
+async def predict_top_k(request: Request, response: Response,
+                        k: int = Query(100, ge=1, le=TOP_K_MAX, description="Number of cases to return"),
+                        x_model_version: Optional[str] = Header(None)):
+    """
+    Return the K cases with the highest expected recovery
+    
+    The NDJSON body (one PredictionRequest per line, optionally with a
+    case_id) is read and scored in chunks; expected recovery is
+    recovery_probability * debt_amount. Only a running top K is kept, so
+    memory is bounded by K plus one chunk and only K results are returned.
+    Invalid lines are skipped and counted.
+    
+    Args:
+        request: Raw request with an NDJSON body of prediction cases
+        response: Response used to report the serving model version
+        k: Number of cases to return
+        x_model_version: Optional registry version to score with (X-Model-Version header)
+        
+    Returns:
+        Top-K response, highest expected recovery first
+    """
+    version = route_version(x_model_version)
+    response.headers["X-Model-Version"] = version
+    if version == PRIMARY_VERSION and not model_service.is_model_loaded():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Model is not loaded. Please train the model first."
+        )
+    
+    try:
+        selection = await top_k_scorer.select(request.stream(), k, version, timings=current_stages())
+        
+        logger.info(f"Top-{k} selection completed over {selection['total_cases']} cases "
+                    f"({selection['invalid_cases']} invalid)")
+        
+        return TopKResponse(**selection)
+        
+    except RuntimeError as e:
+        logger.error(f"Model not loaded: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Model is not loaded. Please train the model first."
+        )
+    except Exception as e:
+        logger.error(f"Top-K selection error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error selecting top cases: {str(e)}"
+        )
+
+
+@router.post("/file", status_code=status.HTTP_200_OK, response_class=FileResponse)
+async def predict_file(file: UploadFile = File(..., description="CSV or Parquet file with the API feature columns"),
+                       output_format: str = Query("parquet", pattern="^(parquet|csv)$"),
+                       x_model_version: Optional[str] = Header(None)):
+    """
+    Score a CSV or Parquet file column by column
+    
+    The upload is scored in chunks straight from the Arrow buffers and the
+    input columns are returned with recovery_probability, risk_category and
+    recommended_strategy added.
+    
+    Args:
+        file: Uploaded .csv or .parquet file
+        output_format: 'parquet' (default) or 'csv'
+        x_model_version: Optional registry version to score with (X-Model-Version header)
+        
+    Returns:
+        Scored file
+    """
+    try:
+        input_suffix = Path(file.filename or '').suffix.lower()
+        file_format(Path(f"upload{input_suffix}"))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    version = route_version(x_model_version)
+    workdir = Path(tempfile.mkdtemp(prefix="file-scoring-"))
+    input_path = workdir / f"input{input_suffix}"
+    output_path = workdir / f"scored.{output_format}"
+    started = time.perf_counter()
+    
+    try:
+        def save_upload():
+            with open(input_path, 'wb') as f:
+                shutil.copyfileobj(file.file, f, 1 << 20)
+        
+        await run_in_threadpool(save_upload)
+        summary = await inference_executor.run(score_file, input_path, output_path, None, version)
+        model_registry.record_latency(version, time.perf_counter() - started, summary['rows'])
+        input_path.unlink()
+        
+    except Exception as e:
+        shutil.rmtree(workdir, ignore_errors=True)
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        if isinstance(e, RuntimeError):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Model is not loaded. Please train the model first."
+            )
+        logger.error(f"File scoring error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error scoring file: {str(e)}"
+        )
+    
+    return FileResponse(
+        output_path,
+        filename=f"{Path(file.filename).stem}_scored.{output_format}",
+        headers={"X-Model-Version": version, "X-Rows-Scored": str(summary['rows'])},
+        background=BackgroundTask(shutil.rmtree, workdir, ignore_errors=True)
+    )
+
+
 @router.get("/model-info", response_model=ModelInfoResponse, status_code=status.HTTP_200_OK)
 async def get_model_info():
     """
@@ -134,3 +454,25 @@ async def get_model_info():
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving model information: {str(e)}"
         )
+
+
+@router.get("/stats", response_model=ServiceStatsResponse, status_code=status.HTTP_200_OK)
+async def get_service_stats():
+    """
+    Get runtime statistics for the prediction service
+    
+    Returns:
+        Micro-batching, prediction cache, per-model-version, cascade and admission counters
+    """
+    return ServiceStatsResponse(
+        micro_batching_enabled=MICRO_BATCHING_ENABLED,
+        micro_batching=micro_batcher.stats.snapshot(),
+        prediction_cache_enabled=PREDICTION_CACHE_ENABLED,
+        prediction_cache=prediction_cache.stats(),
+        model_registry=model_registry.stats(),
+        shadow=shadow_scorer.stats(),
+        cascade_enabled=model_service.bundle.cascade is not None,
+        cascade=cascade_stats(),
+        admission_control_enabled=admission_controller.enabled,
+        admission=admission_controller.stats()
+    )
@@ -0,0 +1,150 @@
+"""
+Route class that records per-stage request latency
+Also serves opt-in Server-Timing headers and on-demand request profiling
+"""
+import asyncio
+import functools
+import time
+from typing import Callable
+
+from fastapi import HTTPException, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+from app.config import METRICS_ENABLED
+from app.models.request_profiler import request_profiler
+from app.routers.admin import is_admin_token, ADMIN_TOKEN_HEADER
+from app.models.metrics import (
+    RequestTimings, current_timings, set_current_timings, reset_current_timings, record_stages,
+    request_seconds, requests_total, requests_in_flight, STAGE_PARSE, STAGE_SERIALIZE
+)
+
+# Opt-in request headers
+SERVER_TIMING_HEADER = "X-Server-Timing"
+PROFILE_HEADER = "X-Profile"
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    """Wrap an async endpoint so the request's timings know when it ran"""
+    if getattr(endpoint, '_timed', False):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        timings = current_timings()
+        if timings is None:
+            return await endpoint(*args, **kwargs)
+        timings.endpoint_started = time.perf_counter()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            timings.endpoint_finished = time.perf_counter()
+
+    wrapper._timed = True
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that times every request stage
+
+    Time before the endpoint function starts is booked as 'parse' (body
+    read, JSON decoding, validation), time after it returns as 'serialize'
+    (response validation and encoding), both on top of any parse or
+    serialize time the endpoint booked itself. Stages measured inside the
+    endpoint (preprocess, predict_proba, ...) are added to the request's
+    RequestTimings via current_stages(). Everything is recorded under the
+    route path as endpoint label.
+
+    Per request, the X-Server-Timing header returns the stages in a
+    Server-Timing response header, and X-Profile (with a valid
+    X-Admin-Token) runs the request under the request profiler and returns
+    the stored profile's id in X-Profile-Id. Without metrics and without
+    these headers the handler runs untimed.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if asyncio.iscoroutinefunction(endpoint):
+            endpoint = _timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        endpoint = self.path_format
+        in_flight = requests_in_flight.labels(endpoint)
+        duration = request_seconds.labels(endpoint)
+
+        async def timed_handler(request):
+            server_timing = SERVER_TIMING_HEADER in request.headers
+            profile_requested = PROFILE_HEADER in request.headers
+            if not (METRICS_ENABLED or server_timing or profile_requested):
+                return await handler(request)
+
+            timings = RequestTimings()
+            profile = None
+            if profile_requested:
+                if not is_admin_token(request.headers.get(ADMIN_TOKEN_HEADER)):
+                    raise HTTPException(
+                        status_code=status.HTTP_403_FORBIDDEN,
+                        detail="Profiling requires a valid admin token"
+                    )
+                profile = request_profiler.start()
+                if profile is not None:
+                    timings.worker_profiles = []
+
+            token = set_current_timings(timings)
+            if METRICS_ENABLED:
+                in_flight.inc()
+            status_code = 500
+            try:
+                response = await handler(request)
+                status_code = response.status_code
+                finished = _close_stages(timings)
+
+                if server_timing or profile_requested:
+                    response.headers["Server-Timing"] = timings.server_timing(finished - timings.started)
+                if profile is not None:
+                    response.headers["X-Profile-Id"] = request_profiler.finish(
+                        profile, timings.worker_profiles, endpoint)
+                    profile = None
+                elif profile_requested:
+                    response.headers["X-Profile-Error"] = "Another request is being profiled"
+                return response
+            except HTTPException as e:
+                status_code = e.status_code
+                raise
+            except RequestValidationError:
+                status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+                raise
+            finally:
+                reset_current_timings(token)
+                if profile is not None:
+                    # The request failed; keep the profile, it may show why
+                    request_profiler.finish(profile, timings.worker_profiles, endpoint)
+                if METRICS_ENABLED:
+                    in_flight.dec()
+                    finished = _close_stages(timings)
+                    record_stages(endpoint, timings.stages)
+                    duration.observe(finished - timings.started)
+                    requests_total.labels(endpoint, str(status_code)).inc()
+
+        return timed_handler
+
+
+def _close_stages(timings: RequestTimings) -> float:
+    """
+    Book parse and serialize (once) and return the finish time
+
+    Endpoints that decode or encode bodies themselves may already have
+    booked part of these stages; the time outside the endpoint is added.
+    """
+    if timings.finished is not None:
+        return timings.finished
+
+    finished = timings.finished = time.perf_counter()
+    stages = timings.stages
+    if timings.endpoint_started is not None:
+        stages[STAGE_PARSE] = stages.get(STAGE_PARSE, 0.0) + timings.endpoint_started - timings.started
+        if timings.endpoint_finished is not None:
+            stages[STAGE_SERIALIZE] = stages.get(STAGE_SERIALIZE, 0.0) + finished - timings.endpoint_finished
+    return finished
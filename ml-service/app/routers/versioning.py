@@ -0,0 +1,31 @@
+"""
+Model version routing for API requests
+Shared by the prediction and job routers
+"""
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from app.models.model_registry import model_registry
+
+
+def route_version(requested_version: Optional[str]) -> str:
+    """
+    Pick the model version for a request
+
+    Args:
+        requested_version: X-Model-Version header value, if any
+
+    Returns:
+        Registry version or PRIMARY_VERSION (see ModelRegistry.route)
+
+    Raises:
+        HTTPException: 404 for an unknown version
+    """
+    try:
+        return model_registry.route(requested_version)
+    except KeyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e.args[0])
+        )
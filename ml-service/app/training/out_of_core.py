@@ -0,0 +1,354 @@
+"""
+Out-of-core training data pipeline
+Builds the scaled training matrix of the whole Lending Club file with memory
+bounded by the chunk size. It follows the in-memory pipeline (clean_data,
+handle_missing_values, feature engineering, DataPreprocessor.fit_transform)
+in three chunked passes:
+
+    1. Raw chunks: find duplicate rows and gather missing rates, medians
+       and modes of the deduplicated rows
+    2. Raw chunks: clean, fill and engineer features; append the unscaled
+       rows to the train/test files and gather the features' medians,
+       mean and variance
+    3. Train/test files: fill missing features and scale them in place
+
+Statistics are gathered with the mergeable accumulators of
+app.utils.accumulators. Medians come from a sample of OUT_OF_CORE_SKETCH_SIZE
+values per column (exact below that many rows). Rows go to the test set with
+probability TEST_SIZE instead of through a stratified split.
+
+The only per-row state kept in memory is the 8-byte hash of every distinct
+raw row, needed to drop duplicates across chunks.
+
+Layout of the output directory (OUT_OF_CORE_DIR):
+    manifest.json             Shapes, feature names and statistics; written last
+    keep.u8                   1 for every raw row kept after removing duplicates
+    X_train.f32, X_test.f32   Scaled features, float32, one row after the other
+    y_train.i8, y_test.i8     Targets, int8
+"""
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import logging
+
+import numpy as np
+import pandas as pd
+
+from app.config import (
+    OUT_OF_CORE_DIR, OUT_OF_CORE_SKETCH_SIZE, LENDING_CLUB_CHUNK_ROWS, TEST_SIZE, RANDOM_STATE
+)
+from app.utils.accumulators import MomentAccumulator, QuantileSketch, CategoryCounter, MissingCounter
+from app.utils.data_loader import DataLoader
+from app.utils.feature_engineering import FeatureEngineer
+from app.utils.preprocessor import DataPreprocessor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+KEEP_NAME = "keep.u8"
+MATRIX_FILES = {
+    'X_train': "X_train.f32",
+    'X_test': "X_test.f32",
+    'y_train': "y_train.i8",
+    'y_test': "y_test.i8"
+}
+
+TARGET = 'recovered'
+# Raw columns with a larger fraction of missing values are dropped (as in DataLoader.clean_data)
+MAX_MISSING_RATE = 0.8
+
+
+class DuplicateFilter:
+    """
+    Drops rows seen before, across chunks
+
+    Keeps the sorted 64-bit hashes of the distinct rows seen so far (8 bytes
+    per distinct row). Within a chunk the first occurrence of a row is kept,
+    like DataFrame.drop_duplicates().
+    """
+
+    def __init__(self):
+        self.seen = np.empty(0, dtype=np.uint64)
+
+    def keep(self, chunk: pd.DataFrame) -> np.ndarray:
+        """
+        Mask of the rows of a chunk that were not seen before
+
+        Args:
+            chunk: Raw rows
+
+        Returns:
+            Boolean array, one entry per row
+        """
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        unique, first = np.unique(hashes, return_index=True)
+
+        if len(self.seen):
+            positions = np.minimum(np.searchsorted(self.seen, unique), len(self.seen) - 1)
+            new = self.seen[positions] != unique
+            unique, first = unique[new], first[new]
+
+        keep = np.zeros(len(chunk), dtype=bool)
+        keep[first] = True
+        self.seen = np.insert(self.seen, np.searchsorted(self.seen, unique), unique)
+        return keep
+
+
+class RawStatistics:
+    """Statistics of the deduplicated raw rows (pass 1)"""
+
+    def __init__(self, rows_read: int, rows_kept: int, missing_rate: Dict[str, float],
+                 medians: Dict[str, float], modes: Dict[str, Any]):
+        self.rows_read = rows_read
+        self.rows_kept = rows_kept
+        self.missing_rate = missing_rate
+        self.dropped_columns = [column for column, rate in missing_rate.items() if rate > MAX_MISSING_RATE]
+        self.fill_values = {
+            column: value for column, value in {**medians, **modes}.items()
+            if column not in self.dropped_columns and value is not None and not pd.isna(value)
+        }
+
+    def prepare(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Clean, fill and engineer the features of a chunk of deduplicated raw rows"""
+        chunk = chunk.drop(columns=[c for c in self.dropped_columns if c in chunk.columns])
+        chunk = chunk.fillna({c: v for c, v in self.fill_values.items() if c in chunk.columns})
+        features = FeatureEngineer.create_lending_club_features(chunk)
+        features = FeatureEngineer.add_derived_features(features)
+        return features.dropna(subset=[TARGET])
+
+
+def gather_raw_statistics(chunks: Iterable[pd.DataFrame], keep_path: Path,
+                          sketch_size: int = OUT_OF_CORE_SKETCH_SIZE) -> RawStatistics:
+    """
+    Pass 1: find duplicate rows and gather the statistics clean_data and
+    handle_missing_values compute over the whole frame
+
+    Args:
+        chunks: Raw Lending Club chunks
+        keep_path: File that receives one byte per raw row (1 = kept)
+        sketch_size: Values kept per numeric column to estimate its median
+
+    Returns:
+        RawStatistics
+    """
+    duplicates = DuplicateFilter()
+    missing = MissingCounter()
+    modes = CategoryCounter()
+    sketch = None
+    numeric: List[str] = []
+    text: List[str] = []
+    rows_read = 0
+
+    with open(keep_path, 'wb') as keep_file:
+        for chunk in chunks:
+            if sketch is None:
+                numeric = chunk.select_dtypes(include=[np.number]).columns.tolist()
+                text = chunk.select_dtypes(include=['object']).columns.tolist()
+                sketch = QuantileSketch(len(numeric), size=sketch_size)
+            keep = duplicates.keep(chunk)
+            keep.astype(np.uint8).tofile(keep_file)
+            rows_read += len(chunk)
+
+            kept = chunk[keep]
+            missing.update(kept)
+            sketch.update(kept[numeric].to_numpy(dtype=np.float64))
+            modes.update(kept, text)
+
+    if sketch is None:
+        raise ValueError("Lending Club dataset has no rows")
+
+    return RawStatistics(
+        rows_read=rows_read,
+        rows_kept=missing.rows,
+        missing_rate=missing.rate(),
+        medians=dict(zip(numeric, sketch.median())),
+        modes={column: modes.mode(column) for column in text}
+    )
+
+
+def _deduplicated(chunks: Iterable[pd.DataFrame], keep_path: Path) -> Iterator[pd.DataFrame]:
+    """Raw chunks without the rows pass 1 marked as duplicates"""
+    keep = np.memmap(keep_path, dtype=np.uint8, mode='r') if keep_path.stat().st_size else np.empty(0, np.uint8)
+    offset = 0
+    for chunk in chunks:
+        mask = keep[offset:offset + len(chunk)].astype(bool)
+        offset += len(chunk)
+        yield chunk[mask]
+
+
+def _feature_matrix(features: pd.DataFrame, feature_names: List[str]) -> np.ndarray:
+    try:
+        return features.reindex(columns=feature_names).to_numpy(dtype=np.float32)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Out-of-core training needs numeric features; "
+                         f"found {features[feature_names].dtypes.to_dict()}") from e
+
+
+def _open_matrix(path: Path, shape: tuple, dtype, mode: str = 'r') -> np.ndarray:
+    """Memory-map one of the matrix files (empty files cannot be mapped)"""
+    if shape[0] == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, shape=shape)
+
+
+class TrainingMatrix:
+    """
+    Training matrix written by build_training_matrix, memory-mapped read-only
+
+    Attributes:
+        X_train, X_test: Scaled float32 features (numpy memmaps)
+        y_train, y_test: int8 targets
+        feature_names: Feature names, in column order
+        manifest: Contents of manifest.json
+    """
+
+    def __init__(self, directory: Path = OUT_OF_CORE_DIR):
+        self.directory = Path(directory)
+        manifest_path = self.directory / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No training matrix in {self.directory} (run build_training_matrix)")
+        self.manifest = json.loads(manifest_path.read_text())
+        self.feature_names = self.manifest['feature_names']
+
+        n_features = len(self.feature_names)
+        rows = self.manifest['rows']
+        self.X_train = _open_matrix(self.directory / MATRIX_FILES['X_train'], (rows['train'], n_features), np.float32)
+        self.X_test = _open_matrix(self.directory / MATRIX_FILES['X_test'], (rows['test'], n_features), np.float32)
+        self.y_train = _open_matrix(self.directory / MATRIX_FILES['y_train'], (rows['train'],), np.int8)
+        self.y_test = _open_matrix(self.directory / MATRIX_FILES['y_test'], (rows['test'],), np.int8)
+
+    def preprocessor(self) -> DataPreprocessor:
+        """Preprocessor whose scaler produced the matrix (for serving)"""
+        stats = self.manifest['statistics']
+        return DataPreprocessor.from_statistics(
+            self.feature_names, np.array(stats['mean']), np.array(stats['variance']), stats['rows']
+        )
+
+
+def build_training_matrix(output_dir: Path = OUT_OF_CORE_DIR, path: Optional[Path] = None,
+                          chunk_rows: int = LENDING_CLUB_CHUNK_ROWS,
+                          extra_features: Optional[Dict[str, pd.DataFrame]] = None,
+                          test_size: float = TEST_SIZE, sketch_size: int = OUT_OF_CORE_SKETCH_SIZE,
+                          random_state: int = RANDOM_STATE) -> TrainingMatrix:
+    """
+    Build the scaled float32 training matrix of the whole Lending Club file
+
+    Args:
+        output_dir: Directory that receives the matrix files (see module docstring)
+        path: loan.csv to read (default: the configured dataset, through the cache)
+        chunk_rows: Rows per chunk, also when reading through the dataset cache;
+            bounds the memory of every pass
+        extra_features: Feature frames of other sources (e.g. UCI), appended
+            after the Lending Club rows and scaled with them
+        test_size: Probability of a row going to the test set
+        sketch_size: Values kept per column to estimate medians
+        random_state: Seed of the train/test assignment
+
+    Returns:
+        TrainingMatrix over the written files
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # A manifest marks a complete matrix: remove it before overwriting the files
+    (output_dir / MANIFEST_NAME).unlink(missing_ok=True)
+    keep_path = output_dir / KEEP_NAME
+    timings = {}
+
+    def raw_chunks():
+        return DataLoader.iter_lending_club(path=path, chunk_rows=chunk_rows)
+
+    # Pass 1: duplicates, missing rates, medians and modes of the raw columns
+    started = time.perf_counter()
+    raw = gather_raw_statistics(raw_chunks(), keep_path, sketch_size=sketch_size)
+    timings['raw_statistics'] = round(time.perf_counter() - started, 3)
+    logger.info(f"✅ Pass 1: {raw.rows_read} rows read, {raw.rows_read - raw.rows_kept} duplicates, "
+                f"dropped columns {raw.dropped_columns} ({timings['raw_statistics']:.1f}s)")
+
+    # Pass 2: features, written unscaled, and their statistics
+    started = time.perf_counter()
+    rng = np.random.default_rng(random_state)
+    feature_names: List[str] = []
+    moments = sketch = None
+    rows = {'train': 0, 'test': 0}
+    files = {name: open(output_dir / filename, 'wb') for name, filename in MATRIX_FILES.items()}
+    try:
+        def feature_chunks():
+            for chunk in _deduplicated(raw_chunks(), keep_path):
+                yield raw.prepare(chunk)
+            for frame in (extra_features or {}).values():
+                frame = frame.dropna(subset=[TARGET])
+                for start in range(0, len(frame), chunk_rows):
+                    yield frame.iloc[start:start + chunk_rows]
+
+        for features in feature_chunks():
+            if not feature_names:
+                feature_names = [c for c in features.columns if c != TARGET]
+                moments = MomentAccumulator(len(feature_names))
+                sketch = QuantileSketch(len(feature_names), size=sketch_size, random_state=random_state)
+            X = _feature_matrix(features, feature_names)
+            y = features[TARGET].to_numpy(dtype=np.int8)
+            moments.update(X)
+            sketch.update(X)
+
+            test = rng.random(len(X)) < test_size
+            for split, mask in (('train', ~test), ('test', test)):
+                X[mask].tofile(files[f'X_{split}'])
+                y[mask].tofile(files[f'y_{split}'])
+                rows[split] += int(mask.sum())
+    finally:
+        for f in files.values():
+            f.close()
+
+    if not feature_names:
+        raise ValueError("No rows with a target were prepared")
+    timings['features'] = round(time.perf_counter() - started, 3)
+    logger.info(f"✅ Pass 2: {rows['train']} train and {rows['test']} test rows, "
+                f"{len(feature_names)} features ({timings['features']:.1f}s)")
+
+    # Statistics of the features after filling missing values with medians
+    n_rows = rows['train'] + rows['test']
+    medians = np.nan_to_num(sketch.median())
+    moments.merge(MomentAccumulator.constant(medians, n_rows - moments.count))
+    preprocessor = DataPreprocessor.from_statistics(feature_names, moments.mean, moments.variance, n_rows)
+    scaler = preprocessor.scaler
+
+    # Pass 3: fill and scale in place, one block at a time
+    started = time.perf_counter()
+    for split in ('train', 'test'):
+        X = _open_matrix(output_dir / MATRIX_FILES[f'X_{split}'], (rows[split], len(feature_names)),
+                         np.float32, mode='r+')
+        for start in range(0, len(X), chunk_rows):
+            block = X[start:start + chunk_rows].astype(np.float64)
+            block = np.where(np.isnan(block), medians, block)
+            X[start:start + chunk_rows] = (block - scaler.mean_) / scaler.scale_
+        if isinstance(X, np.memmap):
+            X.flush()
+        del X
+    timings['scale'] = round(time.perf_counter() - started, 3)
+    logger.info(f"✅ Pass 3: scaled {n_rows} rows ({timings['scale']:.1f}s)")
+
+    manifest = {
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+        'source': str(path) if path is not None else 'lending_club',
+        'extra_sources': list(extra_features or {}),
+        'feature_names': feature_names,
+        'rows': rows,
+        'raw': {
+            'rows_read': raw.rows_read,
+            'rows_kept': raw.rows_kept,
+            'dropped_columns': raw.dropped_columns,
+            'missing_rate': raw.missing_rate
+        },
+        'statistics': {
+            'rows': n_rows,
+            'median': medians.tolist(),
+            'mean': scaler.mean_.tolist(),
+            'variance': scaler.var_.tolist()
+        },
+        'timings': timings
+    }
+    (output_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, default=str))
+    return TrainingMatrix(output_dir)
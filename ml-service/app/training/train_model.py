@@ -13,18 +13,21 @@ from datetime import datetime
 from pathlib import Path
 import logging
 import sys
+import time
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from app.utils.data_loader import DataLoader
-from app.utils.feature_engineering import FeatureEngineer
+from app.training.data_pipeline import training_pipelines, prepare_sources, prepare_uci
+from app.training.out_of_core import build_training_matrix
 from app.utils.preprocessor import DataPreprocessor, DataValidator
 from app.training.model_evaluator import ModelEvaluator
+from app.models.cascade import Cascade
 from app.config import (
-    MODEL_PATH, SCALER_PATH, METADATA_PATH,
-    RANDOM_FOREST_PARAMS, XGBOOST_PARAMS, GRADIENT_BOOSTING_PARAMS,
-    CV_FOLDS, MODEL_VERSION, MODELS_DIR
+    MODEL_PATH, SCALER_PATH, METADATA_PATH, SURROGATE_PATH,
+    RANDOM_FOREST_PARAMS, XGBOOST_PARAMS, GRADIENT_BOOSTING_PARAMS, SURROGATE_PARAMS,
+    CV_FOLDS, MODEL_VERSION, MODELS_DIR, CASCADE_MARGIN, CASCADE_MAX_UNCERTAINTY, TRAINING_SAMPLE_SIZE,
+    OUT_OF_CORE_ENABLED
 )
 
 logging.basicConfig(
@@ -33,15 +36,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Escalation margins reported for the cascade surrogate
+CASCADE_REPORT_MARGINS = (0.0, 0.02, 0.05, 0.1, 0.15)
 
-def load_and_prepare_data(use_lending_club: bool = True, use_uci: bool = True, sample_size: int = None):
+
+def load_and_prepare_data(use_lending_club: bool = True, use_uci: bool = True, sample_size: int = None,
+                          timings: dict = None):
     """
     Load and prepare datasets for training
     
+    Each source is loaded, cleaned and feature engineered in its own worker
+    process (see app.training.data_pipeline), at the same time.
+    
     Args:
         use_lending_club: Whether to use Lending Club dataset
         use_uci: Whether to use UCI dataset
-        sample_size: Number of samples to use (None for all)
+        sample_size: Lending Club rows to sample, stratified on loan_status (None for a 10% sample)
+        timings: Dictionary that receives the seconds spent per source and stage
         
     Returns:
         Combined DataFrame with features
@@ -50,49 +61,19 @@ def load_and_prepare_data(use_lending_club: bool = True, use_uci: bool = True, s
     logger.info("LOADING AND PREPARING DATA")
     logger.info("="*60)
     
-    datasets = []
-    
-    # Load Lending Club (primary dataset)
-    if use_lending_club:
-        try:
-            logger.info("\n📊 Loading Lending Club dataset...")
-            lc_df = DataLoader.load_lending_club(nrows=sample_size, sample_frac=0.1)
-            lc_df = DataLoader.clean_data(lc_df)
-            lc_df = DataLoader.handle_missing_values(lc_df)
-            
-            logger.info("🔧 Engineering features from Lending Club...")
-            lc_features = FeatureEngineer.create_lending_club_features(lc_df)
-            lc_features = FeatureEngineer.add_derived_features(lc_features)
-            
-            datasets.append(lc_features)
-            logger.info(f"✅ Lending Club: {len(lc_features)} records prepared")
-            
-        except Exception as e:
-            logger.error(f"❌ Error loading Lending Club: {e}")
-    
-    # Load UCI Credit Card (supplementary dataset)
-    if use_uci:
-        try:
-            logger.info("\n📊 Loading UCI Credit Card dataset...")
-            uci_df = DataLoader.load_uci_credit_card()
-            uci_df = DataLoader.clean_data(uci_df)
-            uci_df = DataLoader.handle_missing_values(uci_df)
-            
-            logger.info("🔧 Engineering features from UCI...")
-            uci_features = FeatureEngineer.create_uci_features(uci_df)
-            uci_features = FeatureEngineer.add_derived_features(uci_features)
-            
-            datasets.append(uci_features)
-            logger.info(f"✅ UCI: {len(uci_features)} records prepared")
-            
-        except Exception as e:
-            logger.error(f"❌ Error loading UCI: {e}")
+    pipelines = training_pipelines(use_lending_club, use_uci, sample_size)
+    logger.info(f"\n📊 Preparing {', '.join(pipelines)} in parallel...")
+    started = time.perf_counter()
+    frames, source_timings = prepare_sources(pipelines)
+    if timings is not None:
+        timings['sources'] = source_timings
+        timings['wall_seconds'] = round(time.perf_counter() - started, 3)
     
     # Combine datasets
-    if not datasets:
+    if not frames:
         raise ValueError("No datasets were loaded successfully")
     
-    combined_df = pd.concat(datasets, ignore_index=True)
+    combined_df = pd.concat([frames[name] for name in pipelines if name in frames], ignore_index=True)
     logger.info(f"\n✅ Combined dataset: {len(combined_df)} total records")
     
     # Remove rows with NaN target
@@ -102,6 +83,37 @@ def load_and_prepare_data(use_lending_club: bool = True, use_uci: bool = True, s
     return combined_df
 
 
+def load_out_of_core_data(use_uci: bool = True, timings: dict = None):
+    """
+    Build the memory-mapped training matrix of the whole Lending Club file
+    
+    Lending Club is processed in chunks (see app.training.out_of_core); the
+    UCI features, which fit in memory, are appended and scaled with it.
+    
+    Args:
+        use_uci: Whether to add the UCI dataset
+        timings: Dictionary that receives the seconds spent per source and pass
+        
+    Returns:
+        Tuple of (X_train, X_test, y_train, y_test, preprocessor); X are float32 memmaps
+    """
+    logger.info("="*60)
+    logger.info("BUILDING OUT-OF-CORE TRAINING MATRIX")
+    logger.info("="*60)
+    
+    extra_features, source_timings = {}, {}
+    if use_uci:
+        extra_features, source_timings = prepare_sources({'uci': prepare_uci}, workers=1)
+    matrix = build_training_matrix(extra_features=extra_features)
+    if timings is not None:
+        timings['sources'] = source_timings
+        timings['out_of_core'] = matrix.manifest['timings']
+    
+    logger.info(f"✅ Training matrix: {len(matrix.X_train)} train, {len(matrix.X_test)} test rows "
+                f"in {matrix.directory}")
+    return matrix.X_train, matrix.X_test, np.asarray(matrix.y_train), np.asarray(matrix.y_test), matrix.preprocessor()
+
+
 def train_models(X_train, X_test, y_train, y_test, feature_names):
     """
     Train all three models as per roadmap: Random Forest, XGBoost, Gradient Boosting
@@ -195,7 +207,52 @@ def train_models(X_train, X_test, y_train, y_test, feature_names):
     }
 
 
-def save_model_artifacts(model, preprocessor, results, feature_names):
+def train_surrogate(best_model, X_train, X_test, y_train):
+    """
+    Train the cascade surrogate and compare the cascade with the full model
+    
+    The surrogate is a few shallow trees. On the test set the cascade's
+    risk categories are compared with the full model's for the configured
+    margin and a range of alternative margins.
+    
+    Args:
+        best_model: Trained full model
+        X_train: Training features
+        X_test: Test features
+        y_train: Training target
+        
+    Returns:
+        Tuple of (surrogate model, cascade report)
+    """
+    logger.info("\n" + "="*60)
+    logger.info("TRAINING CASCADE SURROGATE")
+    logger.info("="*60)
+    
+    surrogate = RandomForestClassifier(**SURROGATE_PARAMS)
+    surrogate.fit(X_train, y_train)
+    
+    full_probabilities = best_model.predict_proba(X_test)[:, 1]
+    report = Cascade.from_model(surrogate).evaluate(X_test, full_probabilities)
+    report['margins'] = [
+        Cascade.from_model(surrogate, margin=margin).evaluate(X_test, full_probabilities)
+        for margin in CASCADE_REPORT_MARGINS
+    ]
+    
+    logger.info(f"   Surrogate: {SURROGATE_PARAMS['n_estimators']} trees, depth {SURROGATE_PARAMS['max_depth']}")
+    logger.info(f"   {'Margin':>8} {'Escalated':>10} {'Category disagreement':>22}")
+    for row in report['margins']:
+        logger.info(f"   {row['margin']:>8.2f} {row['escalation_rate']:>10.1%} {row['category_disagreement']:>22.2%}")
+    logger.info(
+        f"✅ Cascade at margin {CASCADE_MARGIN} (max uncertainty {CASCADE_MAX_UNCERTAINTY}): "
+        f"{report['escalation_rate']:.1%} escalated, "
+        f"{report['category_disagreement']:.2%} risk categories differ from the full model"
+    )
+    
+    return surrogate, report
+
+
+def save_model_artifacts(model, preprocessor, results, feature_names, surrogate=None, cascade_report=None,
+                         data_timings=None):
     """
     Save model, scaler, and metadata
     
@@ -204,6 +261,9 @@ def save_model_artifacts(model, preprocessor, results, feature_names):
         preprocessor: Fitted preprocessor
         results: Training results
         feature_names: List of feature names
+        surrogate: Cascade surrogate model (optional)
+        cascade_report: Cascade comparison from train_surrogate (optional)
+        data_timings: Per-source data preparation timings from load_and_prepare_data (optional)
     """
     logger.info("\n" + "="*60)
     logger.info("SAVING MODEL ARTIFACTS")
@@ -220,6 +280,11 @@ def save_model_artifacts(model, preprocessor, results, feature_names):
     preprocessor.save(SCALER_PATH)
     logger.info(f"✅ Saved preprocessor to {SCALER_PATH}")
     
+    # Save cascade surrogate
+    if surrogate is not None:
+        joblib.dump(surrogate, SURROGATE_PATH)
+        logger.info(f"✅ Saved cascade surrogate to {SURROGATE_PATH}")
+    
     # Save metadata
     metadata = {
         'model_version': MODEL_VERSION,
@@ -237,6 +302,10 @@ def save_model_artifacts(model, preprocessor, results, feature_names):
         'confusion_matrix': results['best_results']['confusion_matrix'],
         'classification_report': results['best_results']['classification_report']
     }
+    if cascade_report is not None:
+        metadata['cascade'] = cascade_report
+    if data_timings is not None:
+        metadata['data_preparation'] = data_timings
     
     with open(METADATA_PATH, 'w') as f:
         json.dump(metadata, f, indent=2)
@@ -252,35 +321,49 @@ def main():
     logger.info("="*80)
     
     try:
-        # 1. Load and prepare data
-        df = load_and_prepare_data(use_lending_club=True, use_uci=True)
-        
-        # 2. Validate data
-        logger.info("\n🔍 Validating data...")
-        DataValidator.validate_data_types(df)
-        DataValidator.validate_ranges(df)
-        balance_info = DataValidator.check_class_balance(df['recovered'])
-        
-        # 3. Preprocess data
-        logger.info("\n⚙️ Preprocessing data...")
-        preprocessor = DataPreprocessor()
-        X, y = preprocessor.fit_transform(df, target_col='recovered')
-        
-        # 4. Split data
-        X_train, X_test, y_train, y_test = preprocessor.split_data(X, y)
+        data_timings = {}
+        if OUT_OF_CORE_ENABLED:
+            # 1-4. Whole dataset, preprocessed and split chunk by chunk into memory-mapped files
+            X_train, X_test, y_train, y_test, preprocessor = load_out_of_core_data(use_uci=True,
+                                                                                  timings=data_timings)
+            balance_info = DataValidator.check_class_balance(pd.Series(y_train))
+        else:
+            # 1. Load and prepare data
+            df = load_and_prepare_data(use_lending_club=True, use_uci=True,
+                                       sample_size=TRAINING_SAMPLE_SIZE or None, timings=data_timings)
+            
+            # 2. Validate data
+            logger.info("\n🔍 Validating data...")
+            DataValidator.validate_data_types(df)
+            DataValidator.validate_ranges(df)
+            balance_info = DataValidator.check_class_balance(df['recovered'])
+            
+            # 3. Preprocess data
+            logger.info("\n⚙️ Preprocessing data...")
+            preprocessor = DataPreprocessor()
+            X, y = preprocessor.fit_transform(df, target_col='recovered')
+            
+            # 4. Split data
+            X_train, X_test, y_train, y_test = preprocessor.split_data(X, y)
         
         # 5. Train models
         training_results = train_models(X_train, X_test, y_train, y_test, preprocessor.feature_names)
         
-        # 6. Save artifacts
+        # 6. Train cascade surrogate
+        surrogate, cascade_report = train_surrogate(training_results['best_model'], X_train, X_test, y_train)
+        
+        # 7. Save artifacts
         save_model_artifacts(
             training_results['best_model'],
             preprocessor,
             training_results,
-            preprocessor.feature_names
+            preprocessor.feature_names,
+            surrogate,
+            cascade_report,
+            data_timings
         )
         
-        # 7. Final summary
+        # 8. Final summary
         logger.info("\n" + "="*80)
         logger.info("TRAINING COMPLETE!")
         logger.info("="*80)
@@ -0,0 +1,179 @@
+"""
+Mergeable streaming statistics
+Each accumulator is updated one chunk at a time with memory independent of
+the number of rows, and two accumulators built over different chunks (or
+in different processes) can be merged into the accumulator of all of them.
+"""
+from collections import Counter
+from typing import Dict, Hashable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config import RANDOM_STATE, OUT_OF_CORE_SKETCH_SIZE
+
+
+class MomentAccumulator:
+    """
+    Count, mean and variance per column, ignoring NaN
+
+    Chunks are combined with the pairwise update of Chan et al., which is
+    numerically stable for long streams. Variance is the population
+    variance (ddof=0), as used by StandardScaler.
+    """
+
+    def __init__(self, n_columns: int):
+        self.count = np.zeros(n_columns, dtype=np.int64)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+
+    @classmethod
+    def constant(cls, values: np.ndarray, counts: np.ndarray) -> "MomentAccumulator":
+        """Accumulator of counts[j] copies of values[j] in column j (e.g. filled-in missing values)"""
+        accumulator = cls(len(values))
+        accumulator.count = np.asarray(counts, dtype=np.int64).copy()
+        accumulator.mean = np.where(accumulator.count > 0, np.nan_to_num(values), 0.0)
+        return accumulator
+
+    def update(self, values: np.ndarray) -> "MomentAccumulator":
+        """
+        Add a chunk of rows
+
+        Args:
+            values: 2-D array, one column per statistic column
+
+        Returns:
+            self
+        """
+        values = np.asarray(values, dtype=np.float64)
+        present = ~np.isnan(values)
+        count = present.sum(axis=0)
+        total = np.where(present, values, 0.0).sum(axis=0)
+        mean = np.divide(total, count, out=np.zeros(len(count)), where=count > 0)
+        m2 = np.where(present, (values - mean) ** 2, 0.0).sum(axis=0)
+
+        chunk = MomentAccumulator(len(count))
+        chunk.count, chunk.mean, chunk.m2 = count.astype(np.int64), mean, m2
+        return self.merge(chunk)
+
+    def merge(self, other: "MomentAccumulator") -> "MomentAccumulator":
+        """Fold another accumulator into this one (returns self)"""
+        count = self.count + other.count
+        safe = np.maximum(count, 1)
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / safe
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / safe
+        self.count = count
+        return self
+
+    @property
+    def variance(self) -> np.ndarray:
+        return np.divide(self.m2, self.count, out=np.zeros(len(self.count)), where=self.count > 0)
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles per column from a uniform sample of its values
+
+    Every non-missing value gets a uniform random key and each column keeps
+    the `size` values with the smallest keys: a uniform sample of the column,
+    whatever the number of rows. Quantiles are exact while a column has at
+    most `size` values. Merging keeps the smallest keys of both samples, so
+    sketches merged across processes must use different random_state values.
+    """
+
+    def __init__(self, n_columns: int, size: int = OUT_OF_CORE_SKETCH_SIZE, random_state: int = RANDOM_STATE):
+        self.size = size
+        self._rng = np.random.default_rng(random_state)
+        self._values = [np.empty(0) for _ in range(n_columns)]
+        self._keys = [np.empty(0) for _ in range(n_columns)]
+
+    def update(self, values: np.ndarray) -> "QuantileSketch":
+        """
+        Add a chunk of rows
+
+        Args:
+            values: 2-D array, one column per sketched column
+
+        Returns:
+            self
+        """
+        values = np.asarray(values, dtype=np.float64)
+        for j in range(values.shape[1]):
+            column = values[:, j]
+            column = column[~np.isnan(column)]
+            self._keep(j, column, self._rng.random(len(column)))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold another sketch into this one (returns self)"""
+        for j in range(len(self._values)):
+            self._keep(j, other._values[j], other._keys[j])
+        return self
+
+    def _keep(self, j: int, values: np.ndarray, keys: np.ndarray):
+        values = np.concatenate([self._values[j], values])
+        keys = np.concatenate([self._keys[j], keys])
+        if len(keys) > self.size:
+            keep = np.argpartition(keys, self.size - 1)[:self.size]
+            values, keys = values[keep], keys[keep]
+        self._values[j], self._keys[j] = values, keys
+
+    def quantile(self, q: float) -> np.ndarray:
+        """q-quantile per column (NaN for a column without values)"""
+        return np.array([np.quantile(values, q) if len(values) else np.nan for values in self._values])
+
+    def median(self) -> np.ndarray:
+        return self.quantile(0.5)
+
+
+class CategoryCounter:
+    """Value counts per column, for modes of text and categorical columns"""
+
+    def __init__(self):
+        self.counts: Dict[str, Counter] = {}
+
+    def update(self, df: pd.DataFrame, columns: Iterable[str]) -> "CategoryCounter":
+        """Add the non-missing values of the given columns of a chunk (returns self)"""
+        for column in columns:
+            counts = df[column].value_counts(dropna=True)
+            self.counts.setdefault(column, Counter()).update(
+                {value: int(count) for value, count in counts.items() if count}
+            )
+        return self
+
+    def merge(self, other: "CategoryCounter") -> "CategoryCounter":
+        """Fold another counter into this one (returns self)"""
+        for column, counts in other.counts.items():
+            self.counts.setdefault(column, Counter()).update(counts)
+        return self
+
+    def mode(self, column: str) -> Optional[Hashable]:
+        """Most frequent value (the smallest one on ties, like Series.mode()[0]), or None"""
+        counts = self.counts.get(column)
+        if not counts:
+            return None
+        top = max(counts.values())
+        return min(value for value, count in counts.items() if count == top)
+
+
+class MissingCounter:
+    """Rows and missing values per column"""
+
+    def __init__(self):
+        self.rows = 0
+        self.missing: Counter = Counter()
+
+    def update(self, df: pd.DataFrame) -> "MissingCounter":
+        self.rows += len(df)
+        self.missing.update({column: int(count) for column, count in df.isna().sum().items()})
+        return self
+
+    def merge(self, other: "MissingCounter") -> "MissingCounter":
+        self.rows += other.rows
+        self.missing.update(other.missing)
+        return self
+
+    def rate(self) -> Dict[str, float]:
+        """Fraction of missing values per column"""
+        return {column: count / self.rows if self.rows else 0.0 for column, count in self.missing.items()}
@@ -0,0 +1,28 @@
+"""
+Optional pyarrow dependency
+pyarrow is imported on first use, so the API and the loaders do not depend
+on it at import time; only file scoring, batch jobs and the dataset cache need it.
+"""
+
+
+def require_pyarrow(feature: str):
+    """
+    Import pyarrow and the submodules the service uses
+
+    Args:
+        feature: What needs pyarrow, for the error message (e.g. "File scoring")
+
+    Returns:
+        The pyarrow module
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow
+        import pyarrow.csv
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(f"{feature} requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
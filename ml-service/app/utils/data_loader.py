@@ -4,59 +4,157 @@ Handles loading and initial preprocessing of all datasets
 """
 import pandas as pd
 import numpy as np
+import json
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Dict, Iterator, List
 import logging
 
 from app.config import (
     LENDING_CLUB_PATH,
     UCI_CREDIT_CARD_PATH,
     INDIAN_BANK_EXTERNAL_PATH,
-    INDIAN_BANK_INTERNAL_PATH
+    INDIAN_BANK_INTERNAL_PATH,
+    INDIAN_BANK_UNSEEN_PATH,
+    LENDING_CLUB_CHUNK_ROWS
 )
+from app.utils.sampling import FractionSampler, ReservoirSampler, StratifiedSampler
+from app.utils.dataset_cache import dataset_cache, DatasetSource
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Lending Club columns relevant for debt recovery prediction (loan.csv has ~145)
+LENDING_CLUB_CATEGORICAL = ['grade', 'sub_grade', 'home_ownership', 'loan_status', 'purpose']
+LENDING_CLUB_TEXT = ['term', 'emp_length', 'verification_status']
+LENDING_CLUB_NUMERIC = [
+    'loan_amnt', 'funded_amnt', 'int_rate', 'installment', 'annual_inc', 'dti',
+    'delinq_2yrs', 'inq_last_6mths', 'open_acc', 'pub_rec', 'revol_bal', 'revol_util',
+    'total_acc', 'out_prncp', 'out_prncp_inv', 'total_pymnt', 'total_rec_prncp',
+    'total_rec_int', 'recoveries', 'collection_recovery_fee', 'last_pymnt_amnt'
+]
+
+# dtype each column is parsed as; columns not listed are never parsed
+LENDING_CLUB_DTYPES = {
+    **{column: 'category' for column in LENDING_CLUB_CATEGORICAL},
+    **{column: 'object' for column in LENDING_CLUB_TEXT},
+    **{column: 'float32' for column in LENDING_CLUB_NUMERIC}
+}
+
+
+def _read_lending_club_csv(path: Path, chunk_rows: int = LENDING_CLUB_CHUNK_ROWS,
+                           nrows: Optional[int] = None, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Parse loan.csv in chunks, only the given columns (default: LENDING_CLUB_DTYPES)"""
+    wanted = set(columns or LENDING_CLUB_DTYPES) & set(LENDING_CLUB_DTYPES)
+    with pd.read_csv(
+        path,
+        usecols=lambda column: column in wanted,
+        dtype=LENDING_CLUB_DTYPES,
+        chunksize=chunk_rows,
+        nrows=nrows
+    ) as reader:
+        yield from reader
+
+
+def _read_excel(header: int = 0):
+    """Parser of an Excel source (one chunk)"""
+    def read(path: Path) -> Iterator[pd.DataFrame]:
+        yield pd.read_excel(path, header=header)
+    return read
+
+
+def _head(chunks: Iterator[pd.DataFrame], nrows: Optional[int]) -> Iterator[pd.DataFrame]:
+    """The chunks holding the first nrows rows (all chunks if nrows is None)"""
+    remaining = nrows
+    for chunk in chunks:
+        if remaining is not None:
+            if remaining <= 0:
+                return
+            chunk = chunk.iloc[:remaining]
+            remaining -= len(chunk)
+        yield chunk
+
+
+def dataset_sources() -> Dict[str, DatasetSource]:
+    """
+    Raw datasets the columnar cache holds, by cache entry name
+
+    Lending Club is cached with the LENDING_CLUB_DTYPES columns and dtypes;
+    the Excel sources with all their columns.
+    """
+    return {
+        'lending_club': DatasetSource('lending_club', LENDING_CLUB_PATH, _read_lending_club_csv,
+                                      signature=json.dumps(LENDING_CLUB_DTYPES, sort_keys=True)),
+        'uci_credit_card': DatasetSource('uci_credit_card', UCI_CREDIT_CARD_PATH, _read_excel(header=1),
+                                         signature="header=1"),
+        'indian_bank_external': DatasetSource('indian_bank_external', INDIAN_BANK_EXTERNAL_PATH, _read_excel()),
+        'indian_bank_internal': DatasetSource('indian_bank_internal', INDIAN_BANK_INTERNAL_PATH, _read_excel()),
+        'indian_bank_unseen': DatasetSource('indian_bank_unseen', INDIAN_BANK_UNSEEN_PATH, _read_excel())
+    }
+
 
 class DataLoader:
     """Load and preprocess datasets"""
     
     @staticmethod
-    def load_lending_club(nrows: Optional[int] = None, sample_frac: float = 0.1) -> pd.DataFrame:
+    def load_lending_club(nrows: Optional[int] = None, sample_frac: float = 0.1,
+                          path: Optional[Path] = None, chunk_rows: int = LENDING_CLUB_CHUNK_ROWS,
+                          sample_size: Optional[int] = None, stratify_by: Optional[str] = None,
+                          columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Load Lending Club dataset (primary dataset - 800K+ records)
         
+        Only the columns in LENDING_CLUB_DTYPES are parsed, with their
+        explicit dtypes, and the file is read chunk by chunk. Every chunk is
+        passed to a streaming sampler (see app.utils.sampling) as soon as it
+        is read, so peak memory follows the sample size rather than the file
+        size. Samples are reproducible for a given RANDOM_STATE.
+        
+        The configured file (no path given) is read through the columnar
+        dataset cache when it is enabled: the first load parses loan.csv into
+        the cache, later loads read the memory-mapped cache instead.
+        
         Args:
-            nrows: Number of rows to load (None for all)
-            sample_frac: Fraction to sample if nrows is None (default 0.1 = 10%)
+            nrows: Load the first nrows rows unsampled (None for the whole file).
+                The head of the file holds the oldest loans; use sample_size
+                for a random sample of a given size
+            sample_frac: Fraction to sample if nrows and sample_size are None (default 0.1 = 10%)
+            path: CSV file to read (default LENDING_CLUB_PATH)
+            chunk_rows: Rows read per chunk
+            sample_size: Exact number of rows to sample from the whole file
+            stratify_by: Column to stratify the sample_size sample on (e.g. 'loan_status')
+            columns: Columns to load (default: all of LENDING_CLUB_DTYPES)
             
         Returns:
             DataFrame with loaded data
+            
+        Raises:
+            ValueError: If nrows is combined with sample_size or stratify_by, or
+                stratify_by is given without sample_size
         """
-        logger.info(f"Loading Lending Club dataset from {LENDING_CLUB_PATH}")
+        if nrows is not None and (sample_size is not None or stratify_by is not None):
+            raise ValueError("nrows loads the head of the file unsampled; it cannot be combined "
+                             "with sample_size or stratify_by")
+        if stratify_by is not None and sample_size is None:
+            raise ValueError("stratify_by requires sample_size")
+        
+        logger.info(f"Loading Lending Club dataset from {path or LENDING_CLUB_PATH}")
         
         try:
-            # Load with selected columns to reduce memory
-            # We'll select relevant columns for debt recovery prediction
-            usecols = [
-                'loan_amnt', 'funded_amnt', 'term', 'int_rate', 'installment',
-                'grade', 'sub_grade', 'emp_length', 'home_ownership', 'annual_inc',
-                'verification_status', 'loan_status', 'purpose', 'dti',
-                'delinq_2yrs', 'inq_last_6mths', 'open_acc', 'pub_rec',
-                'revol_bal', 'revol_util', 'total_acc', 'out_prncp', 'out_prncp_inv',
-                'total_pymnt', 'total_rec_prncp', 'total_rec_int', 'recoveries',
-                'collection_recovery_fee', 'last_pymnt_amnt'
-            ]
-            
-            if nrows:
-                df = pd.read_csv(LENDING_CLUB_PATH, nrows=nrows, low_memory=False)
+            if nrows is not None:
+                sampler = FractionSampler(1.0)
+            elif sample_size is not None and stratify_by is not None:
+                sampler = StratifiedSampler(stratify_by, sample_size)
+            elif sample_size is not None:
+                sampler = ReservoirSampler(sample_size)
             else:
-                # Sample to reduce memory usage
-                df = pd.read_csv(LENDING_CLUB_PATH, low_memory=False)
-                if sample_frac < 1.0:
-                    df = df.sample(frac=sample_frac, random_state=42)
-                    logger.info(f"Sampled {len(df)} records ({sample_frac*100}%)")
+                sampler = FractionSampler(sample_frac)
+            
+            for chunk in DataLoader.iter_lending_club(path, chunk_rows, columns, nrows):
+                sampler.add(chunk)
+            
+            df = sampler.result()
+            if len(df) < sampler.rows_seen:
+                logger.info(f"Sampled {len(df)} of {sampler.rows_seen} records")
             
             logger.info(f"Loaded {len(df)} records with {len(df.columns)} columns")
             return df
@@ -65,6 +163,30 @@ class DataLoader:
             logger.error(f"Error loading Lending Club dataset: {e}")
             raise
     
+    @staticmethod
+    def iter_lending_club(path: Optional[Path] = None, chunk_rows: int = LENDING_CLUB_CHUNK_ROWS,
+                          columns: Optional[List[str]] = None, nrows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Lending Club dataset chunk by chunk, with the LENDING_CLUB_DTYPES dtypes
+        
+        The configured file (no path given) is read through the columnar
+        dataset cache when it is enabled. The index numbers rows in file order.
+        
+        Args:
+            path: CSV file to read (default LENDING_CLUB_PATH)
+            chunk_rows: Rows per chunk, with or without the cache (the cached batch size does not matter)
+            columns: Columns to load (default: all of LENDING_CLUB_DTYPES)
+            nrows: Stop after the first nrows rows (None for the whole file)
+            
+        Yields:
+            DataFrame chunks
+        """
+        if path is None and dataset_cache.enabled:
+            source = dataset_sources()['lending_club']
+            yield from _head(dataset_cache.iter_chunks(source, columns, chunk_rows), nrows)
+        else:
+            yield from _read_lending_club_csv(Path(path or LENDING_CLUB_PATH), chunk_rows, nrows, columns)
+    
     @staticmethod
     def load_uci_credit_card() -> pd.DataFrame:
         """
@@ -77,7 +199,7 @@ class DataLoader:
         
         try:
             # Load XLS file, skip first row if it's metadata
-            df = pd.read_excel(UCI_CREDIT_CARD_PATH, header=1)
+            df = dataset_cache.read(dataset_sources()['uci_credit_card'])
             logger.info(f"Loaded {len(df)} records with {len(df.columns)} columns")
             return df
             
@@ -91,7 +213,7 @@ class DataLoader:
         logger.info(f"Loading Indian Bank External dataset from {INDIAN_BANK_EXTERNAL_PATH}")
         
         try:
-            df = pd.read_excel(INDIAN_BANK_EXTERNAL_PATH)
+            df = dataset_cache.read(dataset_sources()['indian_bank_external'])
             logger.info(f"Loaded {len(df)} records with {len(df.columns)} columns")
             return df
         except Exception as e:
@@ -104,7 +226,7 @@ class DataLoader:
         logger.info(f"Loading Indian Bank Internal dataset from {INDIAN_BANK_INTERNAL_PATH}")
         
         try:
-            df = pd.read_excel(INDIAN_BANK_INTERNAL_PATH)
+            df = dataset_cache.read(dataset_sources()['indian_bank_internal'])
             logger.info(f"Loaded {len(df)} records with {len(df.columns)} columns")
             return df
         except Exception as e:
@@ -0,0 +1,377 @@
+"""
+Columnar on-disk cache for raw datasets
+Converts each source file (CSV, Excel) to an uncompressed Feather file (the
+Arrow IPC file format) on first use. Later loads memory-map the Feather file
+and read only the columns they need instead of parsing the source again.
+
+Layout of the cache directory (DATASET_CACHE_DIR):
+    <name>.feather      Columns of the source, in record batches of one parsed chunk each
+    <name>.meta.json    Source path, size, mtime, SHA-256 and parser signature
+                        the entry was built from
+
+A cache entry is valid while the source's size and mtime and the parser
+signature match its metadata. If only the mtime changed (the file was
+touched or copied), the content hash decides. Anything else rebuilds the
+entry.
+
+Usage (from the ml-service directory):
+    python -m app.utils.dataset_cache            # warm the cache for every source
+    python -m app.utils.dataset_cache --rebuild lending_club
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Dict, Any
+import logging
+
+import pandas as pd
+
+from app.config import DATASET_CACHE_DIR, DATASET_CACHE_ENABLED
+from app.utils.arrow import require_pyarrow
+from app.utils.sampling import concat_chunks
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_SUFFIX = ".feather"
+META_SUFFIX = ".meta.json"
+
+# Parses a source file into DataFrame chunks (a single chunk for Excel files)
+ChunkReader = Callable[[Path], Iterator[pd.DataFrame]]
+
+
+class DatasetSource:
+    """
+    A raw dataset file and how to parse it
+
+    Args:
+        name: Cache entry name
+        path: Source file
+        read_chunks: Parser yielding DataFrame chunks (a single chunk for Excel files)
+        signature: Description of the parse options (e.g. the dtype map);
+            entries built with another signature are rebuilt
+    """
+
+    def __init__(self, name: str, path: Path, read_chunks: ChunkReader, signature: str = ""):
+        self.name = name
+        self.path = Path(path)
+        self.read_chunks = read_chunks
+        self.signature = signature
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _to_arrow(chunk: pd.DataFrame, schema):
+    """Convert a chunk to a record batch with the cache schema"""
+    pa = require_pyarrow("The dataset cache")
+    columns = []
+    for field in schema:
+        values = chunk[field.name]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Categories differ between chunks; they are restored on read
+            values = values.astype(object)
+        try:
+            columns.append(pa.array(values, type=field.type, from_pandas=True))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Object column mixing numbers and text
+            values = values.map(lambda v: None if pd.isna(v) else str(v))
+            columns.append(pa.array(values, type=field.type, from_pandas=True))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def _schema(chunk: pd.DataFrame):
+    """
+    Cache schema of a source, from its first chunk
+
+    Categorical and object columns are stored as strings (object columns
+    mixing numbers and text included); columns Arrow infers as null are
+    stored as strings too, so later chunks with values still fit.
+    """
+    pa = require_pyarrow("The dataset cache")
+    fields = []
+    for name in chunk.columns:
+        values = chunk[name]
+        if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == object:
+            arrow_type = pa.string()
+        else:
+            arrow_type = pa.array(values, from_pandas=True).type
+            if pa.types.is_null(arrow_type):
+                arrow_type = pa.string()
+        fields.append(pa.field(str(name), arrow_type))
+    return pa.schema(fields)
+
+
+class DatasetCache:
+    """
+    Feather copies of raw datasets, rebuilt when their source changes
+
+    Entries are written to a temporary file and renamed into place, so
+    concurrent builders (e.g. training worker processes) never see a
+    partial file.
+    """
+
+    def __init__(self, cache_dir: Path = DATASET_CACHE_DIR, enabled: bool = DATASET_CACHE_ENABLED):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+
+    def cache_path(self, name: str) -> Path:
+        return self.cache_dir / f"{name}{CACHE_SUFFIX}"
+
+    def meta_path(self, name: str) -> Path:
+        return self.cache_dir / f"{name}{META_SUFFIX}"
+
+    def metadata(self, name: str) -> Optional[Dict[str, Any]]:
+        """Metadata of a cache entry, or None if there is none"""
+        try:
+            return json.loads(self.meta_path(name).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, source: DatasetSource) -> bool:
+        """
+        Whether the cache entry was built from the current content of a source
+
+        Args:
+            source: Dataset source
+
+        Returns:
+            True if the entry can be used as is
+        """
+        meta = self.metadata(source.name)
+        if meta is None or not self.cache_path(source.name).exists():
+            return False
+        stat = source.path.stat()
+        if (meta['source'] != str(source.path.resolve()) or meta.get('signature') != source.signature
+                or meta['size'] != stat.st_size):
+            return False
+        if meta['mtime_ns'] == stat.st_mtime_ns:
+            return True
+
+        # Same size, new mtime: only a content change makes the entry stale
+        if file_sha256(source.path) != meta['sha256']:
+            return False
+        meta['mtime_ns'] = stat.st_mtime_ns
+        self._write_meta(source.name, meta)
+        return True
+
+    def build(self, source: DatasetSource) -> Path:
+        """
+        Parse a source file and write its cache entry
+
+        Args:
+            source: Dataset source
+
+        Returns:
+            Path of the Feather file
+        """
+        pa = require_pyarrow("The dataset cache")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        stat = source.path.stat()
+        sha256 = file_sha256(source.path)
+
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{source.name}-", suffix=CACHE_SUFFIX, dir=self.cache_dir)
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        rows = 0
+        categorical = []
+        writer = None
+        try:
+            for chunk in source.read_chunks(source.path):
+                chunk = chunk.rename(columns=str)
+                if writer is None:
+                    schema = _schema(chunk)
+                    categorical = [c for c in chunk.columns if isinstance(chunk[c].dtype, pd.CategoricalDtype)]
+                    writer = pa.ipc.new_file(str(tmp_path), schema)
+                writer.write_batch(_to_arrow(chunk, schema))
+                rows += len(chunk)
+            if writer is None:
+                raise ValueError(f"{source.path} has no rows")
+            writer.close()
+            os.replace(tmp_path, self.cache_path(source.name))
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        self._write_meta(source.name, {
+            'source': str(source.path.resolve()),
+            'signature': source.signature,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': sha256,
+            'rows': rows,
+            'categorical': categorical,
+            'built_at': datetime.now().isoformat(timespec='seconds')
+        })
+        logger.info(f"✅ Cached {source.path.name} as {self.cache_path(source.name).name}: {rows} rows "
+                    f"in {time.perf_counter() - started:.1f}s")
+        return self.cache_path(source.name)
+
+    def ensure(self, source: DatasetSource) -> Path:
+        """Path of a fresh cache entry, building it if missing or stale"""
+        if self.is_fresh(source):
+            return self.cache_path(source.name)
+        if self.cache_path(source.name).exists():
+            logger.info(f"Dataset cache for {source.name} is stale, rebuilding")
+        return self.build(source)
+
+    def iter_chunks(self, source: DatasetSource, columns: Optional[List[str]] = None,
+                    chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Read a dataset chunk by chunk, through the cache when it is enabled
+
+        Chunks are slices of the memory-mapped Feather file; only the
+        requested columns are converted. With chunk_rows, every chunk but the
+        last has exactly chunk_rows rows, whatever batch size the entry was
+        built with, so chunk boundaries (and anything that depends on them,
+        such as per-chunk samples) are the same with or without the cache.
+        The index numbers rows in file order, like pd.read_csv(chunksize=...).
+
+        Args:
+            source: Dataset source (parsed directly on a cache miss or when disabled)
+            columns: Columns to read (None for all)
+            chunk_rows: Rows per chunk (None for the batches as stored, one per parsed chunk)
+
+        Yields:
+            DataFrame chunks
+        """
+        if not self.enabled:
+            chunks = source.read_chunks(source.path)
+            for chunk in (_rechunk(chunks, chunk_rows) if chunk_rows else chunks):
+                yield chunk if columns is None else chunk[[c for c in columns if c in chunk.columns]]
+            return
+
+        pa = require_pyarrow("The dataset cache")
+        path = self.ensure(source)
+        categorical = self.metadata(source.name)['categorical']
+
+        with pa.memory_map(str(path)) as mapped:
+            reader = pa.ipc.open_file(mapped)
+            if columns is not None:
+                columns = [c for c in columns if c in reader.schema.names]
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            if columns is not None:
+                batches = (batch.select(columns) for batch in batches)
+            offset = 0
+            for piece in (_rebatch(batches, chunk_rows) if chunk_rows else batches):
+                chunk = piece.to_pandas()
+                chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+                offset += len(chunk)
+                yield _restore_categories(chunk, categorical)
+
+    def read(self, source: DatasetSource, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read a whole dataset, through the cache when it is enabled
+
+        Args:
+            source: Dataset source (parsed directly on a cache miss or when disabled)
+            columns: Columns to read (None for all)
+
+        Returns:
+            DataFrame with the requested columns
+        """
+        if not self.enabled:
+            return pd.concat(list(self.iter_chunks(source, columns)))
+
+        pa = require_pyarrow("The dataset cache")
+        path = self.ensure(source)
+        categorical = self.metadata(source.name)['categorical']
+
+        with pa.memory_map(str(path)) as mapped:
+            table = pa.ipc.open_file(mapped).read_all()
+            if columns is not None:
+                table = table.select([c for c in columns if c in table.schema.names])
+            return _restore_categories(table.to_pandas(), categorical)
+
+    def _write_meta(self, name: str, meta: Dict[str, Any]):
+        tmp_path = self.meta_path(name).with_name(f".{self.meta_path(name).name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(meta, indent=2))
+        os.replace(tmp_path, self.meta_path(name))
+
+
+def _rebatch(batches: Iterator, chunk_rows: int) -> Iterator:
+    """
+    Regroup record batches into tables of chunk_rows rows (the last may be shorter)
+
+    Slices are zero-copy views of the memory-mapped batches; at most
+    chunk_rows rows plus one stored batch are pending at a time.
+    """
+    pa = require_pyarrow("The dataset cache")
+    pending, rows = [], 0
+    for batch in batches:
+        pending.append(batch)
+        rows += batch.num_rows
+        while rows >= chunk_rows:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_rows)
+            rest = table.slice(chunk_rows)
+            pending, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(pending)
+
+
+def _rechunk(chunks: Iterator[pd.DataFrame], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Regroup DataFrame chunks into chunks of chunk_rows rows (the last may be shorter)"""
+    pending, rows = [], 0
+    for chunk in chunks:
+        pending.append(chunk)
+        rows += len(chunk)
+        while rows >= chunk_rows:
+            frame = concat_chunks(pending)
+            yield frame.iloc[:chunk_rows]
+            pending = [frame.iloc[chunk_rows:]]
+            rows = len(pending[0])
+    if rows:
+        yield concat_chunks(pending)
+
+
+def _restore_categories(chunk: pd.DataFrame, categorical: List[str]) -> pd.DataFrame:
+    for column in categorical:
+        if column in chunk.columns:
+            chunk[column] = chunk[column].astype('category')
+    return chunk
+
+
+# Global dataset cache instance
+dataset_cache = DatasetCache()
+
+
+def main():
+    """Command line entry point: build missing or stale cache entries"""
+    from app.utils.data_loader import dataset_sources
+
+    sources = dataset_sources()
+    parser = argparse.ArgumentParser(description="Warm the columnar dataset cache")
+    parser.add_argument("names", nargs="*", help=f"Sources to cache (default: all of {', '.join(sources)})")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild entries even if they are fresh")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in sources]
+    if unknown:
+        parser.error(f"Unknown sources: {', '.join(unknown)}")
+
+    cache = DatasetCache(enabled=True)
+    for name in args.names or list(sources):
+        source = sources[name]
+        if not source.path.exists():
+            logger.warning(f"⚠️ Skipping {name}: {source.path} does not exist")
+        elif args.rebuild:
+            cache.build(source)
+        elif cache.is_fresh(source):
+            logger.info(f"{name} is up to date ({cache.cache_path(name)})")
+        else:
+            cache.build(source)
+
+
+if __name__ == "__main__":
+    main()
@@ -96,7 +96,8 @@ class FeatureEngineer:
         if grade is None:
             return pd.Series([650] * len(sub_grade) if sub_grade is not None else [650])
         
-        base_score = grade.map(grade_map).fillna(650)
+        # astype(float): mapping a categorical column returns a categorical
+        base_score = grade.map(grade_map).astype(float).fillna(650)
         
         # Adjust based on sub_grade (1-5)
         if sub_grade is not None:
@@ -142,7 +143,7 @@ class FeatureEngineer:
             'Charged Off': 180
         }
         
-        return loan_status.map(status_map).fillna(0)
+        return loan_status.map(status_map).astype(float).fillna(0)
     
     @staticmethod
     def _calculate_response_rate(df: pd.DataFrame) -> pd.Series:
@@ -177,7 +178,7 @@ class FeatureEngineer:
         
         target = loan_status.apply(
             lambda x: 1 if x in recovered_statuses else (0 if x in not_recovered_statuses else np.nan)
-        )
+        ).astype(float)
         
         return target
     
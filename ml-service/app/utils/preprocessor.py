@@ -23,7 +23,41 @@ class DataPreprocessor:
         self.scaler = StandardScaler()
         self.label_encoders = {}
         self.feature_names = []
-    
+
+    @classmethod
+    def from_statistics(cls, feature_names: List[str], mean: np.ndarray, variance: np.ndarray,
+                        n_samples: int) -> "DataPreprocessor":
+        """
+        Preprocessor whose scaler is fitted from precomputed statistics
+
+        Used when the training data never fits in memory at once (see
+        app.training.out_of_core); the result behaves like one returned by
+        fit_transform on numeric features.
+
+        Args:
+            feature_names: Feature names, in column order
+            mean: Mean of each feature
+            variance: Population variance of each feature
+            n_samples: Number of rows the statistics were computed over
+
+        Returns:
+            Fitted DataPreprocessor
+        """
+        preprocessor = cls()
+        scale = np.sqrt(np.asarray(variance, dtype=np.float64))
+        # Constant features are left unscaled, as StandardScaler does
+        scale[scale < 10 * np.finfo(np.float64).eps] = 1.0
+
+        scaler = preprocessor.scaler
+        scaler.mean_ = np.asarray(mean, dtype=np.float64)
+        scaler.var_ = np.asarray(variance, dtype=np.float64)
+        scaler.scale_ = scale
+        scaler.n_samples_seen_ = int(n_samples)
+        scaler.n_features_in_ = len(feature_names)
+        scaler.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        preprocessor.feature_names = list(feature_names)
+        return preprocessor
+
     def fit_transform(self, df: pd.DataFrame, target_col: str = 'recovered') -> Tuple[pd.DataFrame, pd.Series]:
         """
         Fit and transform data
@@ -0,0 +1,189 @@
+"""
+Streaming samplers for chunked reads of large CSV files
+Each sampler sees the file one chunk at a time and holds at most its sample
+(plus the chunk being added), however many rows the file has
+"""
+from typing import Dict, Hashable, Optional
+import logging
+
+import numpy as np
+import pandas as pd
+
+from app.config import RANDOM_STATE, SAMPLE_MIN_PER_STRATUM
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def concat_chunks(chunks: list) -> pd.DataFrame:
+    """
+    Concatenate chunks, keeping categorical columns categorical
+
+    Each chunk read with a 'category' dtype only has the categories it saw;
+    pd.concat turns columns with differing categories into object columns,
+    so the categories are aligned first.
+
+    Args:
+        chunks: Non-empty list of DataFrames with the same columns
+
+    Returns:
+        Concatenated DataFrame (indexes are kept)
+    """
+    if len(chunks) > 1:
+        for column in chunks[0].columns:
+            if not isinstance(chunks[0][column].dtype, pd.CategoricalDtype):
+                continue
+            categories = sorted(set().union(*(chunk[column].cat.categories for chunk in chunks)))
+            chunks = [chunk.assign(**{column: chunk[column].cat.set_categories(categories)}) for chunk in chunks]
+    return pd.concat(chunks)
+
+
+def _keep_smallest(sample: Optional[pd.DataFrame], keys: np.ndarray,
+                   chunk: pd.DataFrame, chunk_keys: np.ndarray, size: int):
+    """Rows of sample + chunk with the `size` smallest keys, and their keys"""
+    if sample is not None and len(sample) >= size:
+        # Rows that cannot beat the current sample are dropped before concatenating
+        candidates = chunk_keys < keys.max()
+        chunk, chunk_keys = chunk[candidates], chunk_keys[candidates]
+        if not len(chunk):
+            return sample, keys
+
+    merged = chunk if sample is None else concat_chunks([sample, chunk])
+    merged_keys = chunk_keys if sample is None else np.concatenate([keys, chunk_keys])
+    if len(merged) > size:
+        keep = np.argpartition(merged_keys, size - 1)[:size]
+        merged, merged_keys = merged.iloc[keep], merged_keys[keep]
+    return merged, merged_keys
+
+
+class FractionSampler:
+    """Keeps each chunk's random sample of sample_frac of its rows (every row when sample_frac >= 1)"""
+
+    def __init__(self, sample_frac: float, random_state: int = RANDOM_STATE):
+        self.sample_frac = sample_frac
+        self.rows_seen = 0
+        self._rng = np.random.RandomState(random_state)
+        self._chunks = []
+
+    def add(self, chunk: pd.DataFrame):
+        self.rows_seen += len(chunk)
+        if self.sample_frac < 1.0:
+            chunk = chunk.sample(frac=self.sample_frac, random_state=self._rng)
+        self._chunks.append(chunk)
+
+    def result(self) -> pd.DataFrame:
+        return concat_chunks(self._chunks) if self._chunks else pd.DataFrame()
+
+
+class ReservoirSampler:
+    """
+    Uniform random sample of exactly `size` rows (or every row of a shorter file)
+
+    Every row gets a uniform random key and the rows with the `size`
+    smallest keys are kept, which is reservoir sampling done a chunk at a
+    time. Keys come from one random stream in file order, so the sample
+    depends on random_state but not on the chunk size.
+    """
+
+    def __init__(self, size: int, random_state: int = RANDOM_STATE):
+        if size < 1:
+            raise ValueError("Sample size must be at least 1")
+        self.size = size
+        self.rows_seen = 0
+        self._rng = np.random.default_rng(random_state)
+        self._sample = None
+        self._keys = np.empty(0)
+
+    def add(self, chunk: pd.DataFrame):
+        keys = self._rng.random(len(chunk))
+        self.rows_seen += len(chunk)
+        self._sample, self._keys = _keep_smallest(self._sample, self._keys, chunk, keys, self.size)
+
+    def result(self) -> pd.DataFrame:
+        """The sample in file order"""
+        if self._sample is None:
+            return pd.DataFrame()
+        return self._sample.sort_index()
+
+
+class StratifiedSampler:
+    """
+    Sample of exactly `size` rows, stratified on one column
+
+    Each stratum gets at least min_per_stratum rows (or all of its rows if it
+    has fewer), so rare values are kept; the rest of the sample is shared in
+    proportion to stratum sizes. Missing values form their own stratum.
+
+    Stratum counts are only known at the end of the file, so every stratum
+    keeps a reservoir of up to `size` rows. Memory is bounded by
+    size x number of strata, independent of the file length.
+    """
+
+    def __init__(self, column: str, size: int, min_per_stratum: int = SAMPLE_MIN_PER_STRATUM,
+                 random_state: int = RANDOM_STATE):
+        if size < 1:
+            raise ValueError("Sample size must be at least 1")
+        self.column = column
+        self.size = size
+        self.min_per_stratum = min_per_stratum
+        self.rows_seen = 0
+        self.counts: Dict[Hashable, int] = {}
+        self._rng = np.random.default_rng(random_state)
+        self._samples: Dict[Hashable, pd.DataFrame] = {}
+        self._keys: Dict[Hashable, np.ndarray] = {}
+
+    def add(self, chunk: pd.DataFrame):
+        keys = self._rng.random(len(chunk))
+        self.rows_seen += len(chunk)
+
+        codes, strata = pd.factorize(chunk[self.column], use_na_sentinel=False)
+        for code, stratum in enumerate(strata):
+            stratum = None if pd.isna(stratum) else stratum
+            positions = np.flatnonzero(codes == code)
+            self.counts[stratum] = self.counts.get(stratum, 0) + len(positions)
+            self._samples[stratum], self._keys[stratum] = _keep_smallest(
+                self._samples.get(stratum), self._keys.get(stratum, np.empty(0)),
+                chunk.iloc[positions], keys[positions], self.size
+            )
+
+    def allocation(self) -> Dict[Hashable, int]:
+        """
+        Rows of the sample per stratum
+
+        Returns:
+            Dictionary of stratum value to number of sampled rows
+        """
+        total = sum(self.counts.values())
+        if total <= self.size:
+            return dict(self.counts)
+
+        floor = min(self.min_per_stratum, self.size // len(self.counts))
+        allocated = {stratum: min(count, floor) for stratum, count in self.counts.items()}
+        remaining = self.size - sum(allocated.values())
+
+        # Largest remainder apportionment of the rest, by rows left per stratum
+        room = {stratum: self.counts[stratum] - allocated[stratum] for stratum in self.counts}
+        total_room = sum(room.values())
+        quotas = {stratum: remaining * r / total_room for stratum, r in room.items()}
+        for stratum, quota in quotas.items():
+            allocated[stratum] += int(quota)
+        leftover = self.size - sum(allocated.values())
+        by_remainder = sorted(quotas, key=lambda s: quotas[s] - int(quotas[s]), reverse=True)
+        for stratum in by_remainder[:leftover]:
+            allocated[stratum] += 1
+        return allocated
+
+    def result(self) -> pd.DataFrame:
+        """The sample in file order"""
+        if not self._samples:
+            return pd.DataFrame()
+
+        allocation = self.allocation()
+        parts = []
+        for stratum, n in allocation.items():
+            keys = self._keys[stratum]
+            # The n smallest keys of a bottom-k sample are a uniform sample of n
+            keep = np.argsort(keys, kind='stable')[:n]
+            parts.append(self._samples[stratum].iloc[keep])
+        logger.info(f"Stratified sample on {self.column}: {allocation} of {self.counts}")
+        return concat_chunks(parts).sort_index()
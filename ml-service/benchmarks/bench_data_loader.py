@@ -0,0 +1,164 @@
+"""
+Peak memory and wall time of loading the Lending Club dataset
+Compares the previous loader (all columns, default dtypes, sampled after
+the whole file is in memory) with the chunked, column-pruned, typed loader
+
+Each loader runs in a fresh process so peak RSS is not shared between
+them. Without --path a synthetic loan.csv with the same width as the real
+file (~145 columns) is generated.
+
+Usage (from the ml-service directory, Linux only):
+    python -m benchmarks.bench_data_loader --rows 200000
+    python -m benchmarks.bench_data_loader --path "data/Loan data/loan.csv"
+"""
+import argparse
+import multiprocessing
+import shutil
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.utils.data_loader import LENDING_CLUB_CATEGORICAL, LENDING_CLUB_TEXT, LENDING_CLUB_NUMERIC
+
+warnings.filterwarnings("ignore")
+
+# Width of the real loan.csv
+TOTAL_COLUMNS = 145
+
+LOAN_STATUSES = ['Current', 'Fully Paid', 'Charged Off', 'Late (31-120 days)',
+                 'In Grace Period', 'Late (16-30 days)', 'Default']
+TEXT_VALUES = {
+    'grade': list('ABCDEFG'),
+    'sub_grade': [f"{grade}{level}" for grade in 'ABCDEFG' for level in range(1, 6)],
+    'home_ownership': ['RENT', 'OWN', 'MORTGAGE', 'OTHER'],
+    'loan_status': LOAN_STATUSES,
+    'purpose': ['debt_consolidation', 'credit_card', 'home_improvement', 'other', 'major_purchase'],
+    'term': [' 36 months', ' 60 months'],
+    'emp_length': ['< 1 year', '1 year', '5 years', '10+ years', 'n/a'],
+    'verification_status': ['Verified', 'Not Verified', 'Source Verified']
+}
+
+
+def synthetic_loan_csv(path: Path, rows: int, total_columns: int = TOTAL_COLUMNS,
+                       chunk_rows: int = 50000, seed: int = 0) -> Path:
+    """
+    Write a loan.csv lookalike: the loader's columns plus unused filler columns
+
+    Args:
+        path: Output CSV path
+        rows: Number of rows
+        total_columns: Total number of columns, filler included
+        chunk_rows: Rows generated and written at a time
+        seed: Random seed
+
+    Returns:
+        The path written
+    """
+    rng = np.random.default_rng(seed)
+    used = LENDING_CLUB_CATEGORICAL + LENDING_CLUB_TEXT + LENDING_CLUB_NUMERIC
+    n_filler = max(0, total_columns - len(used))
+
+    for start in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - start)
+        columns = {}
+        for column in used:
+            if column in TEXT_VALUES:
+                columns[column] = rng.choice(TEXT_VALUES[column], size=n)
+            else:
+                columns[column] = np.round(rng.gamma(2.0, 5000.0, size=n), 2)
+        for i in range(n_filler):
+            # Mix of numeric and free-text columns, like the real file
+            if i % 3 == 0:
+                columns[f"filler_text_{i}"] = rng.choice(['lorem ipsum dolor', 'sit amet', ''], size=n)
+            else:
+                columns[f"filler_{i}"] = np.round(rng.normal(size=n), 4)
+        pd.DataFrame(columns).to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    return path
+
+
+def legacy_load(path: Path, sample_frac: float) -> pd.DataFrame:
+    """The loader before chunked reading: every column, default dtypes, then sample"""
+    df = pd.read_csv(path, low_memory=False)
+    if sample_frac < 1.0:
+        df = df.sample(frac=sample_frac, random_state=42)
+    return df
+
+
+def chunked_load(path: Path, sample_frac: float) -> pd.DataFrame:
+    from app.utils.data_loader import DataLoader
+    return DataLoader.load_lending_club(sample_frac=sample_frac, path=path)
+
+
+LOADERS = {'legacy': legacy_load, 'chunked': chunked_load}
+
+
+def _status_mb(field: str) -> float:
+    """VmRSS (current) or VmHWM (peak) of the current process in MB"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _run(loader: str, path: str, sample_frac: float, results):
+    """Load once in a fresh process and report wall time and memory"""
+    import logging
+    logging.disable(logging.INFO)
+    baseline = _status_mb("VmRSS")
+    started = time.perf_counter()
+    df = LOADERS[loader](Path(path), sample_frac)
+    elapsed = time.perf_counter() - started
+    results.put({
+        'seconds': elapsed,
+        'baseline_mb': baseline,
+        # Not ru_maxrss: that survives exec, so it would include the parent's peak
+        'peak_mb': _status_mb("VmHWM"),
+        'frame_mb': df.memory_usage(deep=True).sum() / 1e6,
+        'rows': len(df),
+        'columns': len(df.columns)
+    })
+
+
+def _measure(loader: str, path: Path, sample_frac: float) -> dict:
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_run, args=(loader, str(path), sample_frac, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare peak memory and wall time of Lending Club loaders")
+    parser.add_argument("--path", type=Path, default=None, help="loan.csv to load (default: synthetic)")
+    parser.add_argument("--rows", type=int, default=200000, help="Rows of the synthetic file")
+    parser.add_argument("--sample-frac", type=float, default=0.1, help="Fraction of rows kept")
+    args = parser.parse_args()
+
+    directory = None
+    path = args.path
+    try:
+        if path is None:
+            directory = Path(tempfile.mkdtemp(prefix="bench-data-loader-"))
+            path = synthetic_loan_csv(directory / "loan.csv", args.rows)
+
+        print(f"{path}: {path.stat().st_size / 1e6:.1f} MB, sample_frac={args.sample_frac}")
+        print(f"{'loader':>8} {'seconds':>8} {'peak RSS MB':>12} {'above baseline MB':>18} "
+              f"{'frame MB':>9} {'rows':>8} {'columns':>8}")
+        for loader in LOADERS:
+            r = _measure(loader, path, args.sample_frac)
+            print(f"{loader:>8} {r['seconds']:>8.2f} {r['peak_mb']:>12.1f} {r['peak_mb'] - r['baseline_mb']:>18.1f} "
+                  f"{r['frame_mb']:>9.1f} {r['rows']:>8} {r['columns']:>8}")
+    finally:
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
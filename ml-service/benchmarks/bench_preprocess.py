@@ -0,0 +1,44 @@
+"""
+Microbenchmark for single-request preprocessing latency
+Compares the pandas/sklearn path with the precompiled feature plan
+
+Usage (from the ml-service directory):
+    python -m benchmarks.bench_preprocess
+"""
+import timeit
+import warnings
+
+from app.models.model_service import model_service
+
+warnings.filterwarnings("ignore")
+
+PAYLOAD = {
+    "debt_amount": 5000.0,
+    "days_past_due": 45,
+    "credit_score": 650.0,
+    "payment_attempts": 3,
+    "communication_count": 5
+}
+
+
+def _best_per_call_us(func, number: int, repeat: int = 5) -> float:
+    """Best-of-N mean latency per call in microseconds"""
+    timings = timeit.repeat(func, number=number, repeat=repeat)
+    return min(timings) / number * 1e6
+
+
+def main():
+    if not model_service.ensure_loaded():
+        raise SystemExit("Model is not loaded. Please train the model first.")
+
+    before = _best_per_call_us(lambda: model_service.bundle.preprocess_features_pandas(PAYLOAD), number=500)
+    after = _best_per_call_us(lambda: model_service.preprocess_features(PAYLOAD), number=20000)
+
+    print("preprocess_features latency (single request)")
+    print(f"  pandas + StandardScaler.transform: {before:10.2f} us")
+    print(f"  feature plan:                      {after:10.2f} us")
+    print(f"  speedup:                           {before / after:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Serving benchmark against the real app with a regression gate
+Starts the API in a uvicorn subprocess on the deterministic fixture model
+(benchmarks/fixture_model.py), so it runs offline, and measures:
+
+- /predictions/recovery: p50/p95/p99 latency and requests per second
+  under concurrent clients
+- /predictions/batch: latency and rows per second at several batch sizes
+- /predictions/batch/columnar: the same batches sent as one array per feature
+
+Cases are synthetic, drawn from the PredictionRequest field ranges.
+Results are written as JSON and compared against a stored baseline; any
+metric that regresses by more than the allowed fraction fails the run
+(exit code 1). Latency metrics (*_ms) regress when they grow, throughput
+metrics when they shrink. Baselines are machine specific: refresh them
+with --update-baseline on the machine that runs the gate.
+
+Usage (from the ml-service directory):
+    python -m benchmarks.bench_serving
+    python -m benchmarks.bench_serving --output results.json --max-regression 0.2
+    python -m benchmarks.bench_serving --threshold recovery.p99_ms=0.5 --batch-sizes 1,100,10000
+    python -m benchmarks.bench_serving --url http://127.0.0.1:8000 --no-baseline
+    python -m benchmarks.bench_serving --update-baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from app.config import BASE_DIR, RANDOM_FOREST_PARAMS
+from benchmarks.fixture_model import build_fixture_model, synthetic_cases, synthetic_columns
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "serving.json"
+DEFAULT_BATCH_SIZES = (1, 100, 10000, 100000)
+DEFAULT_MAX_REGRESSION = 0.25
+
+# Server environment: blocking load so /ready means the fixture is serving,
+# no result cache so repeated cases are really scored
+SERVER_ENV = {
+    'MODEL_LOAD_MODE': 'blocking',
+    'PREDICTION_CACHE_ENABLED': 'false',
+    'MODEL_WATCH_ENABLED': 'false'
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(models_dir: Path, port: int, timeout: float = 120.0, show_logs: bool = False) -> subprocess.Popen:
+    """
+    Start the API with uvicorn on the given models directory and wait until it is ready
+
+    Args:
+        models_dir: Directory holding the fixture artifacts
+        port: Port to listen on (127.0.0.1)
+        timeout: Seconds to wait for /ready
+        show_logs: Pass the server's log output through (discarded otherwise)
+
+    Returns:
+        Server process
+    """
+    env = dict(os.environ, MODELS_DIR=str(models_dir), **SERVER_ENV)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=BASE_DIR, env=env,
+        stdout=None if show_logs else subprocess.DEVNULL,
+        stderr=None if show_logs else subprocess.DEVNULL
+    )
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode} (rerun with --server-logs)")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/ready", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+
+    stop_server(process)
+    raise RuntimeError(f"Server was not ready within {timeout:.0f}s")
+
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {'p50_ms': round(float(p50), 3), 'p95_ms': round(float(p95), 3), 'p99_ms': round(float(p99), 3)}
+
+
+async def bench_recovery(url: str, requests: int, concurrency: int, warmup: int = 50) -> Dict[str, float]:
+    """
+    Send single-case requests from concurrent clients
+
+    Args:
+        url: Base URL of the server
+        requests: Number of measured requests
+        concurrency: Number of concurrent clients
+        warmup: Unmeasured requests sent first
+
+    Returns:
+        p50/p95/p99 latency in milliseconds and requests per second
+    """
+    bodies = [json.dumps(case).encode() for case in synthetic_cases(requests + warmup, seed=1)]
+    headers = {'Content-Type': 'application/json'}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+        for body in bodies[:warmup]:
+            (await client.post("/predictions/recovery", content=body, headers=headers)).raise_for_status()
+
+        queue = iter(bodies[warmup:])
+        latencies = []
+
+        async def worker():
+            for body in queue:
+                started = time.perf_counter()
+                response = await client.post("/predictions/recovery", content=body, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return dict(_percentiles(latencies), requests_per_second=round(len(latencies) / elapsed, 1))
+
+
+def bench_batch(url: str, size: int, min_seconds: float, columnar: bool = False,
+                max_runs: int = 50) -> Dict[str, float]:
+    """
+    Score one batch size repeatedly (at least once, until min_seconds have passed)
+
+    Args:
+        url: Base URL of the server
+        size: Cases per request
+        min_seconds: Minimum measured time
+        columnar: Send one array per feature to /predictions/batch/columnar
+            instead of a list of cases to /predictions/batch
+        max_runs: Upper bound on measured requests
+
+    Returns:
+        p50 latency in milliseconds and rows per second
+    """
+    if columnar:
+        path = "/predictions/batch/columnar"
+        body = json.dumps({name: column.tolist() for name, column in synthetic_columns(size, seed=2).items()})
+    else:
+        path = "/predictions/batch"
+        body = json.dumps({'cases': synthetic_cases(size, seed=2)})
+    body = body.encode()
+    headers = {'Content-Type': 'application/json'}
+
+    with httpx.Client(base_url=url, timeout=None) as client:
+        client.post(path, content=body, headers=headers).raise_for_status()
+
+        latencies = []
+        measured_since = time.perf_counter()
+        while not latencies or (time.perf_counter() - measured_since < min_seconds and len(latencies) < max_runs):
+            started = time.perf_counter()
+            response = client.post(path, content=body, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    return {
+        'p50_ms': _percentiles(latencies)['p50_ms'],
+        'rows_per_second': round(size * len(latencies) / sum(latencies), 1)
+    }
+
+
+def run_benchmarks(url: str, args) -> Dict[str, float]:
+    """Run every scenario and return a flat dictionary of metric name to value"""
+    results = {}
+
+    recovery = asyncio.run(bench_recovery(url, args.requests, args.concurrency))
+    results.update({f"recovery.{name}": value for name, value in recovery.items()})
+    print(f"/predictions/recovery          p50 {recovery['p50_ms']:.2f} ms  p95 {recovery['p95_ms']:.2f} ms  "
+          f"p99 {recovery['p99_ms']:.2f} ms  {recovery['requests_per_second']:,.0f} req/s")
+
+    for scenario, columnar in (('batch', False), ('columnar', True)):
+        for size in args.batch_sizes:
+            batch = bench_batch(url, size, args.batch_seconds, columnar)
+            results.update({f"{scenario}_{size}.{name}": value for name, value in batch.items()})
+            print(f"/predictions/{'batch/columnar' if columnar else 'batch':<14} {size:>7,}  "
+                  f"p50 {batch['p50_ms']:10.2f} ms  {batch['rows_per_second']:>12,.0f} rows/s")
+
+    return results
+
+
+def lower_is_better(metric: str) -> bool:
+    """Latency metrics (*_ms) regress when they grow, all others when they shrink"""
+    return metric.endswith("_ms")
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], max_regression: float,
+            thresholds: Optional[Dict[str, float]] = None) -> List[str]:
+    """
+    Compare results against a baseline
+
+    Args:
+        results: Metric name to measured value
+        baseline: Metric name to baseline value
+        max_regression: Allowed relative regression, e.g. 0.25 for 25%
+        thresholds: Per-metric overrides of max_regression
+
+    Returns:
+        Description of every metric that regressed beyond its threshold
+    """
+    thresholds = thresholds or {}
+    regressions = []
+    for metric, base in sorted(baseline.items()):
+        if metric not in results or not base:
+            continue
+        allowed = thresholds.get(metric, max_regression)
+        change = (results[metric] - base) / base
+        if lower_is_better(metric):
+            regressed = change > allowed
+        else:
+            regressed = -change > allowed
+        if regressed:
+            regressions.append(
+                f"{metric}: {results[metric]:g} vs baseline {base:g} ({change:+.1%}, allowed {allowed:.0%})")
+    return regressions
+
+
+def _parse_thresholds(values: List[str]) -> Dict[str, float]:
+    thresholds = {}
+    for value in values:
+        metric, _, fraction = value.partition("=")
+        if not fraction:
+            raise argparse.ArgumentTypeError(f"Expected METRIC=FRACTION, got '{value}'")
+        thresholds[metric] = float(fraction)
+    return thresholds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the serving endpoints and gate regressions")
+    parser.add_argument("--url", help="Benchmark an already running server instead of starting one")
+    parser.add_argument("--fixture-dir", type=Path, help="Reuse (or create) the fixture model in this directory")
+    parser.add_argument("--server-logs", action="store_true", help="Show the log output of the started server")
+    parser.add_argument("--trees", type=int, default=RANDOM_FOREST_PARAMS['n_estimators'],
+                        help="Trees in the fixture model")
+    parser.add_argument("--requests", type=int, default=2000, help="Measured /predictions/recovery requests")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent /predictions/recovery clients")
+    parser.add_argument("--batch-sizes", type=lambda value: [int(size) for size in value.split(",")],
+                        default=list(DEFAULT_BATCH_SIZES), help="Comma-separated /predictions/batch sizes")
+    parser.add_argument("--batch-seconds", type=float, default=3.0, help="Minimum measured time per batch size")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline results file")
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the baseline comparison")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help="Allowed relative regression of any metric (default 0.25)")
+    parser.add_argument("--threshold", action="append", default=[], metavar="METRIC=FRACTION",
+                        help="Allowed regression of one metric, e.g. recovery.p99_ms=0.5 (repeatable)")
+    args = parser.parse_args()
+    thresholds = _parse_thresholds(args.threshold)
+
+    process = None
+    temp_dir = None
+    url = args.url
+    if url is None:
+        fixture_dir = args.fixture_dir
+        if fixture_dir is None:
+            temp_dir = tempfile.TemporaryDirectory(prefix="bench-serving-")
+            fixture_dir = Path(temp_dir.name)
+        if not (fixture_dir / "recovery_model.pkl").exists():
+            print(f"Training fixture model ({args.trees} trees)...")
+            build_fixture_model(fixture_dir, args.trees)
+        port = _free_port()
+        process = start_server(fixture_dir, port, show_logs=args.server_logs)
+        url = f"http://127.0.0.1:{port}"
+
+    try:
+        results = run_benchmarks(url, args)
+    finally:
+        if process is not None:
+            stop_server(process)
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'fixture_trees': args.trees if args.url is None else None,
+            'requests': args.requests,
+            'concurrency': args.concurrency
+        },
+        'metrics': results
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if args.no_baseline:
+        return
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+
+    baseline = json.loads(args.baseline.read_text())['metrics']
+    regressions = compare(results, baseline, args.max_regression, thresholds)
+    if regressions:
+        print(f"\n❌ {len(regressions)} metric(s) regressed:")
+        for regression in regressions:
+            print(f"   {regression}")
+        sys.exit(1)
+    print(f"\n✅ No metric regressed more than allowed against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
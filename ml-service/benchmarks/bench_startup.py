@@ -0,0 +1,154 @@
+"""
+Startup benchmark: import time and time to first prediction
+Every trial runs in a fresh interpreter, like a new worker process, and
+records how long importing the API takes, how long the model takes to load
+and how long the first and a steady-state prediction take.
+
+The import check also lists heavy modules the API pulled in; training-only
+modules (trainer, evaluator, plotting, xgboost) must never show up there.
+
+Usage (from the ml-service directory):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --trials 10 --top 15
+    python -m benchmarks.bench_startup --max-import-ms 1500 --max-first-prediction-ms 3000
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+# Modules the API must not import at startup
+FORBIDDEN_MODULES = ('app.training', 'xgboost', 'matplotlib', 'seaborn', 'imblearn')
+
+# Heavy modules reported when present after importing the API
+HEAVY_MODULES = FORBIDDEN_MODULES + ('pandas', 'sklearn', 'scipy', 'joblib', 'pyarrow')
+
+PAYLOAD = {
+    "debt_amount": 5000.0,
+    "days_past_due": 45,
+    "credit_score": 650.0,
+    "payment_attempts": 3,
+    "communication_count": 5
+}
+
+TRIAL_SCRIPT = f"""
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+import logging
+logging.disable(logging.CRITICAL)
+
+started = time.perf_counter()
+import app.main
+from app.models.model_service import model_service
+imported = time.perf_counter()
+loaded_at_import = model_service.is_model_loaded()
+modules = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+
+model_service.load_model()
+loaded = time.perf_counter()
+if not model_service.is_model_loaded():
+    print(json.dumps({{"error": "Model is not trained"}}))
+    sys.exit(0)
+
+model_service.predict({PAYLOAD!r})
+first = time.perf_counter()
+model_service.predict(dict({PAYLOAD!r}, debt_amount=5001.0))
+steady = time.perf_counter() - first
+
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "load_ms": (loaded - imported) * 1000,
+    "first_prediction_ms": (first - loaded) * 1000,
+    "steady_prediction_ms": steady * 1000,
+    "time_to_first_prediction_ms": (first - started) * 1000,
+    "loaded_at_import": loaded_at_import,
+    "modules": modules
+}}))
+"""
+
+
+def run_trial() -> dict:
+    """Run one startup in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-c", TRIAL_SCRIPT], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> list:
+    """
+    Slowest imports of the API by cumulative time (python -X importtime)
+
+    Args:
+        top: Number of modules to return
+
+    Returns:
+        List of (cumulative ms, module) tuples
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", "import app.main"],
+        capture_output=True, text=True, check=True
+    ).stderr
+
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        timings.append((int(cumulative) / 1000, module.strip()))
+    return sorted(timings, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API import time and time to first prediction")
+    parser.add_argument("--trials", type=int, default=5, help="Fresh interpreters to start")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list (0 to skip)")
+    parser.add_argument("--max-import-ms", type=float, default=None,
+                        help="Fail if the median import time exceeds this budget")
+    parser.add_argument("--max-first-prediction-ms", type=float, default=None,
+                        help="Fail if the median time to first prediction exceeds this budget")
+    args = parser.parse_args()
+
+    trials = [run_trial() for _ in range(args.trials)]
+    if "error" in trials[0]:
+        raise SystemExit(trials[0]["error"])
+
+    print(f"API startup over {args.trials} fresh interpreters (median / max)")
+    medians = {}
+    for key in ("import_ms", "load_ms", "first_prediction_ms", "steady_prediction_ms",
+                "time_to_first_prediction_ms"):
+        values = np.array([trial[key] for trial in trials])
+        medians[key] = float(np.median(values))
+        print(f"  {key:<28} {medians[key]:10.1f} {values.max():10.1f}")
+
+    print(f"  model loaded at import:      {trials[0]['loaded_at_import']}")
+    print(f"  heavy modules after import:  {', '.join(trials[0]['modules']) or 'none'}")
+
+    if args.top:
+        print("Slowest imports (cumulative ms)")
+        for cumulative, module in slowest_imports(args.top):
+            print(f"  {cumulative:10.1f}  {module}")
+
+    failures = []
+    forbidden = [name for name in trials[0]['modules'] if name in FORBIDDEN_MODULES]
+    if forbidden:
+        failures.append(f"training-only modules imported by the API: {', '.join(forbidden)}")
+    if trials[0]['loaded_at_import']:
+        failures.append("importing the API loaded the model")
+    if args.max_import_ms is not None and medians['import_ms'] > args.max_import_ms:
+        failures.append(f"import {medians['import_ms']:.1f} ms exceeds budget {args.max_import_ms:.1f} ms")
+    if args.max_first_prediction_ms is not None and \
+            medians['time_to_first_prediction_ms'] > args.max_first_prediction_ms:
+        failures.append(f"time to first prediction {medians['time_to_first_prediction_ms']:.1f} ms "
+                        f"exceeds budget {args.max_first_prediction_ms:.1f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
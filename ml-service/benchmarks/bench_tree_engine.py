@@ -0,0 +1,51 @@
+"""
+Microbenchmark for tree-ensemble inference latency
+Compares the model's predict_proba with the native NumPy engine
+
+Usage (from the ml-service directory):
+    python -m benchmarks.bench_tree_engine
+"""
+import timeit
+import warnings
+
+import numpy as np
+
+from app.models.model_service import model_service
+from app.models.tree_engine import export_ensemble
+
+warnings.filterwarnings("ignore")
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def _best_per_call_ms(func, number: int, repeat: int = 3) -> float:
+    """Best-of-N mean latency per call in milliseconds"""
+    timings = timeit.repeat(func, number=number, repeat=repeat)
+    return min(timings) / number * 1e3
+
+
+def main():
+    if not model_service.ensure_loaded():
+        raise SystemExit("Model is not loaded. Please train the model first.")
+
+    model = model_service.bundle.model
+    engine = export_ensemble(model)
+    rng = np.random.default_rng(0)
+
+    print(f"{type(model).__name__}: {engine.n_trees} trees, {engine.n_nodes} nodes, "
+          f"max depth {engine.max_depth}")
+    print(f"{'rows':>8} {'predict_proba ms':>18} {'engine ms':>12} {'max diff':>10}")
+
+    for n_rows in BATCH_SIZES:
+        X = rng.normal(size=(n_rows, model.n_features_in_))
+        number = max(1, 2000 // n_rows)
+
+        before = _best_per_call_ms(lambda: model.predict_proba(X), number)
+        after = _best_per_call_ms(lambda: engine.predict_proba(X), number)
+        diff = np.max(np.abs(model.predict_proba(X) - engine.predict_proba(X)))
+
+        print(f"{n_rows:>8} {before:>18.3f} {after:>12.3f} {diff:>10.2g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Per-worker memory report: pickled vs memory-mapped model artifacts
+Starts N worker processes that load the model the way uvicorn workers do,
+score a batch to touch every node array, and report RSS, PSS and private
+memory while all workers are alive
+
+PSS (proportional set size) splits shared pages between the processes
+mapping them, so the sum of PSS is the real memory cost of all workers.
+
+Usage (from the ml-service directory, Linux only):
+    python -m benchmarks.bench_worker_memory --workers 8
+    python -m benchmarks.bench_worker_memory --workers 8 --trees 500
+"""
+import argparse
+import multiprocessing
+import shutil
+import tempfile
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from app.config import MODEL_PATH, SCALER_PATH, METADATA_PATH
+
+warnings.filterwarnings("ignore")
+
+N_FEATURES = 17
+
+
+def _memory_mb() -> dict:
+    """RSS, PSS and private memory of the current process in MB"""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[0].endswith(':'):
+                fields[parts[0][:-1]] = int(parts[1]) / 1024
+    return {
+        'rss': fields.get('Rss', 0.0),
+        'pss': fields.get('Pss', 0.0),
+        'private': fields.get('Private_Clean', 0.0) + fields.get('Private_Dirty', 0.0)
+    }
+
+
+def _worker(directory: str, use_flat, barrier, results):
+    """Load the model like a service worker, score once, then report memory"""
+    warnings.filterwarnings("ignore")
+    from app.models.model_bundle import ModelBundle
+
+    directory = Path(directory)
+    if use_flat is not None:
+        bundle = ModelBundle.load(directory / MODEL_PATH.name, directory / SCALER_PATH.name,
+                                  directory / METADATA_PATH.name, use_flat=use_flat)
+        X = np.random.default_rng(0).normal(size=(2000, bundle.feature_plan.n_features))
+        bundle.predict_positive(X[:1])
+        bundle.model.predict_proba(X)
+
+    # Measure while every worker holds its model
+    barrier.wait()
+    results.put(_memory_mb())
+    barrier.wait()
+
+
+def _synthetic_artifacts(directory: Path, n_trees: int):
+    """Train a larger forest so differences are visible"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(20000, N_FEATURES))
+    y = (X[:, 0] + rng.normal(size=len(X)) > 0).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=n_trees, min_samples_leaf=2, n_jobs=-1, random_state=0)
+    model.fit(scaler.transform(X), y)
+
+    joblib.dump(model, directory / MODEL_PATH.name)
+    joblib.dump({
+        'scaler': scaler,
+        'label_encoders': {},
+        'feature_names': [f"feature_{i}" for i in range(N_FEATURES)]
+    }, directory / SCALER_PATH.name)
+
+
+def _measure(directory: Path, n_workers: int, use_flat) -> list:
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(n_workers)
+    results = context.Queue()
+    workers = [
+        context.Process(target=_worker, args=(str(directory), use_flat, barrier, results))
+        for _ in range(n_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    measurements = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    return measurements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-worker memory of pickled and memory-mapped models")
+    parser.add_argument("--workers", type=int, default=8, help="Number of worker processes")
+    parser.add_argument("--trees", type=int, default=0, help="Train a synthetic forest with this many trees "
+                                                            "instead of using the served model")
+    args = parser.parse_args()
+
+    from app.models.model_bundle import ModelBundle
+    from app.models.flat_artifacts import export_flat_artifacts
+
+    directory = Path(tempfile.mkdtemp(prefix="bench-worker-memory-"))
+    try:
+        if args.trees:
+            _synthetic_artifacts(directory, args.trees)
+        else:
+            if not MODEL_PATH.exists():
+                raise SystemExit("Model is not trained. Please train the model first or pass --trees.")
+            shutil.copy(MODEL_PATH, directory / MODEL_PATH.name)
+            shutil.copy(SCALER_PATH, directory / SCALER_PATH.name)
+
+        bundle = ModelBundle.load(directory / MODEL_PATH.name, directory / SCALER_PATH.name,
+                                  directory / METADATA_PATH.name, use_flat=False)
+        if bundle.engine is None:
+            raise SystemExit("Model is not a supported tree ensemble")
+        export_flat_artifacts(bundle.engine, bundle.feature_plan, bundle.version,
+                              model_path=directory / MODEL_PATH.name, scaler_path=directory / SCALER_PATH.name)
+
+        print(f"{bundle.engine.n_trees} trees, {bundle.engine.n_nodes} nodes, "
+              f"model pickle {(directory / MODEL_PATH.name).stat().st_size / 1e6:.1f} MB, "
+              f"{args.workers} workers")
+        print(f"{'artifacts':>10} {'RSS/worker MB':>14} {'PSS/worker MB':>14} "
+              f"{'private/worker MB':>18} {'total PSS MB':>13}")
+
+        for label, use_flat in (('none', None), ('pickle', False), ('mmap', True)):
+            measurements = _measure(directory, args.workers, use_flat)
+            rss = np.mean([m['rss'] for m in measurements])
+            pss = np.mean([m['pss'] for m in measurements])
+            private = np.mean([m['private'] for m in measurements])
+            total = np.sum([m['pss'] for m in measurements])
+            print(f"{label:>10} {rss:>14.1f} {pss:>14.1f} {private:>18.1f} {total:>13.1f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
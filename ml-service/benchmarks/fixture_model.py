@@ -0,0 +1,160 @@
+"""
+Deterministic fixture model and synthetic cases for offline benchmarks
+Cases are drawn from the PredictionRequest field constraints; the fixture is
+a RandomForest with the production hyperparameters trained on such cases,
+so benchmarks run without the real datasets or a trained model
+
+Usage (from the ml-service directory):
+    python -m benchmarks.fixture_model /tmp/fixture-models
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List
+
+import joblib
+import numpy as np
+
+from app.config import (
+    API_FEATURES, RANDOM_FOREST_PARAMS, SURROGATE_PARAMS, MODEL_PATH, SCALER_PATH, METADATA_PATH, SURROGATE_PATH
+)
+from app.models.schemas import PredictionRequest
+
+# Upper bounds for fields PredictionRequest leaves open-ended
+OPEN_UPPER_BOUNDS = {
+    'debt_amount': 50000.0,
+    'days_past_due': 365,
+    'payment_attempts': 20,
+    'communication_count': 50
+}
+
+FIXTURE_VERSION = "fixture-1"
+FIXTURE_TRAINING_ROWS = 20000
+
+
+def field_ranges() -> Dict[str, tuple]:
+    """
+    Sampling range of every API feature from the PredictionRequest constraints
+
+    Returns:
+        Dictionary of feature name to (low, high, is_integer)
+    """
+    ranges = {}
+    for name in API_FEATURES:
+        field = PredictionRequest.model_fields[name]
+        low, high = 0.0, OPEN_UPPER_BOUNDS.get(name)
+        for constraint in field.metadata:
+            if getattr(constraint, 'ge', None) is not None:
+                low = constraint.ge
+            if getattr(constraint, 'gt', None) is not None:
+                low = constraint.gt + (1 if field.annotation is int else 0.01)
+            if getattr(constraint, 'le', None) is not None:
+                high = constraint.le
+        ranges[name] = (low, high, field.annotation is int)
+    return ranges
+
+
+def synthetic_columns(n_rows: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Valid synthetic cases as one array per feature
+
+    Args:
+        n_rows: Number of cases
+        seed: Random seed
+
+    Returns:
+        Dictionary of feature name to array of n_rows values
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, (low, high, is_integer) in field_ranges().items():
+        if is_integer:
+            columns[name] = rng.integers(int(low), int(high) + 1, size=n_rows)
+        else:
+            columns[name] = np.round(rng.uniform(low, high, size=n_rows), 2)
+    return columns
+
+
+def synthetic_cases(n_rows: int, seed: int = 0) -> List[dict]:
+    """Valid synthetic cases as request dictionaries"""
+    columns = synthetic_columns(n_rows, seed)
+    return [
+        dict(zip(columns, values))
+        for values in zip(*(column.tolist() for column in columns.values()))
+    ]
+
+
+def build_fixture_model(directory: Path, n_estimators: int = RANDOM_FOREST_PARAMS['n_estimators'],
+                        seed: int = 0) -> Path:
+    """
+    Train the fixture model and write it with the serving artifact names
+
+    A cascade surrogate is written too, so CASCADE_ENABLED=true can be
+    benchmarked against the same fixture.
+
+    Args:
+        directory: Target models directory
+        n_estimators: Number of trees
+        seed: Random seed for the data and the forest
+
+    Returns:
+        The models directory
+    """
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    columns = synthetic_columns(FIXTURE_TRAINING_ROWS, seed)
+    X = pd.DataFrame({name: columns[name].astype(float) for name in API_FEATURES})
+
+    # Recovery gets likelier with credit score and contact, less likely with debt and delay
+    logit = (
+        0.012 * (columns['credit_score'] - 575)
+        - 0.00003 * columns['debt_amount']
+        - 0.006 * columns['days_past_due']
+        + 0.08 * columns['payment_attempts']
+        + 0.02 * columns['communication_count']
+    )
+    rng = np.random.default_rng(seed + 1)
+    y = (rng.random(len(logit)) < 1 / (1 + np.exp(-logit))).astype(int)
+
+    scaler = StandardScaler().fit(X)
+    params = dict(RANDOM_FOREST_PARAMS, n_estimators=n_estimators, random_state=seed)
+    model = RandomForestClassifier(**params).fit(scaler.transform(X), y)
+    surrogate = RandomForestClassifier(**dict(SURROGATE_PARAMS, random_state=seed)).fit(scaler.transform(X), y)
+
+    joblib.dump(model, directory / MODEL_PATH.name)
+    joblib.dump(surrogate, directory / SURROGATE_PATH.name)
+    joblib.dump({
+        'scaler': scaler,
+        'label_encoders': {},
+        'feature_names': list(API_FEATURES)
+    }, directory / SCALER_PATH.name)
+    with open(directory / METADATA_PATH.name, 'w') as f:
+        json.dump({
+            'model_name': 'fixture_random_forest',
+            'model_version': FIXTURE_VERSION,
+            'training_date': 'fixture',
+            'metrics': {},
+            'feature_names': list(API_FEATURES),
+            'num_features': len(API_FEATURES)
+        }, f, indent=2)
+
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the deterministic benchmark fixture model")
+    parser.add_argument("directory", type=Path, help="Target models directory")
+    parser.add_argument("--trees", type=int, default=RANDOM_FOREST_PARAMS['n_estimators'], help="Number of trees")
+    args = parser.parse_args()
+
+    build_fixture_model(args.directory, args.trees)
+    print(f"Fixture model written to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
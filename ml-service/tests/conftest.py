@@ -0,0 +1,21 @@
+"""
+Shared test setup
+"""
+import pytest
+
+from app.models.model_service import model_service
+
+
+@pytest.fixture(scope="session", autouse=True)
+def loaded_model():
+    """Load the trained model once; importing the service no longer does"""
+    model_service.ensure_loaded()
+    return model_service
+
+
+@pytest.fixture
+def loaded_service(loaded_model):
+    """The served model; skips the test when no trained model could be loaded"""
+    if not loaded_model.is_model_loaded():
+        pytest.skip("Model is not loaded")
+    return loaded_model
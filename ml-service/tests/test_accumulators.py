@@ -0,0 +1,68 @@
+"""
+Tests for mergeable streaming statistics
+"""
+import numpy as np
+import pandas as pd
+
+from app.utils.accumulators import MomentAccumulator, QuantileSketch, CategoryCounter, MissingCounter
+
+
+def _values(n: int = 5000, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    values = np.column_stack([rng.normal(1e6, 3.0, n), rng.gamma(2.0, 10.0, n)])
+    values[rng.random(n) < 0.2, 1] = np.nan
+    return values
+
+
+def test_moments_merged_over_chunks_match_numpy():
+    values = _values()
+
+    chunked = MomentAccumulator(2)
+    for start in range(0, len(values), 700):
+        chunked.update(values[start:start + 700])
+    merged = MomentAccumulator(2).update(values[:1234]).merge(MomentAccumulator(2).update(values[1234:]))
+
+    for accumulator in (chunked, merged):
+        np.testing.assert_array_equal(accumulator.count, (~np.isnan(values)).sum(axis=0))
+        np.testing.assert_allclose(accumulator.mean, np.nanmean(values, axis=0), rtol=1e-12)
+        np.testing.assert_allclose(accumulator.variance, np.nanvar(values, axis=0), rtol=1e-9)
+
+
+def test_constant_accumulator_accounts_for_filled_values():
+    values = _values()
+    medians = np.nanmedian(values, axis=0)
+    filled = np.where(np.isnan(values), medians, values)
+
+    accumulator = MomentAccumulator(2).update(values)
+    accumulator.merge(MomentAccumulator.constant(medians, len(values) - accumulator.count))
+
+    np.testing.assert_allclose(accumulator.mean, filled.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(accumulator.variance, filled.var(axis=0), rtol=1e-9)
+
+
+def test_quantile_sketch_is_exact_when_small_and_close_when_sampling():
+    values = _values()
+
+    exact = QuantileSketch(2, size=len(values))
+    for start in range(0, len(values), 999):
+        exact.update(values[start:start + 999])
+    np.testing.assert_allclose(exact.median(), np.nanmedian(values, axis=0))
+
+    sampled = QuantileSketch(2, size=1000, random_state=1).update(values[:2500])
+    sampled.merge(QuantileSketch(2, size=1000, random_state=2).update(values[2500:]))
+    assert all(len(column) == 1000 for column in sampled._values)
+    true = np.nanquantile(values, [0.25, 0.75], axis=0)
+    assert np.all(np.abs(sampled.median() - np.nanmedian(values, axis=0)) < 0.1 * (true[1] - true[0]))
+
+
+def test_category_and_missing_counters_merge():
+    first = pd.DataFrame({'term': [' 36 months', ' 60 months', None], 'dti': [1.0, np.nan, np.nan]})
+    second = pd.DataFrame({'term': [' 60 months', ' 36 months'], 'dti': [2.0, 3.0]})
+
+    counts = CategoryCounter().update(first, ['term']).merge(CategoryCounter().update(second, ['term']))
+    missing = MissingCounter().update(first).merge(MissingCounter().update(second))
+
+    # Tie: the smallest value, like Series.mode()[0]
+    assert counts.mode('term') == pd.concat([first, second])['term'].mode()[0] == ' 36 months'
+    assert counts.mode('unknown') is None
+    assert missing.rate() == {'term': 0.2, 'dti': 0.4}
@@ -0,0 +1,138 @@
+"""
+Tests for admission control, load shedding and degraded scoring
+"""
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import APIRouter, FastAPI
+
+import app.models.model_bundle as model_bundle
+import app.routers.admission_route as admission_route
+from app.models.admission import (
+    AdmissionController, AdmissionGate, Overloaded, parse_admission_limits,
+    SHED_QUEUE_FULL, SHED_LATENCY_BUDGET, SHED_QUEUE_TIMEOUT
+)
+from app.models.model_bundle import ModelBundle
+from app.models.model_registry import degraded_version, split_degraded
+from benchmarks.fixture_model import build_fixture_model, synthetic_cases
+
+
+def test_parse_admission_limits():
+    """Budgets are optional and converted to seconds"""
+    assert parse_admission_limits("/predictions/batch=4:8:5000, /predictions/recovery=64:0") == {
+        '/predictions/batch': (4, 8, 5.0),
+        '/predictions/recovery': (64, 0, None)
+    }
+    for spec in ("/predictions/batch=4", "/predictions/batch=0:8", "=4:8"):
+        with pytest.raises(ValueError):
+            parse_admission_limits(spec)
+
+
+@pytest.mark.asyncio
+async def test_gate_queues_hands_over_and_sheds_when_queue_is_full():
+    """A released slot goes to the first waiter; requests beyond the queue are shed"""
+    gate = AdmissionGate("/test", max_concurrency=1, max_queue=1, budget_seconds=5.0)
+
+    assert await gate.acquire() is False
+    waiter = asyncio.ensure_future(gate.acquire())
+    await asyncio.sleep(0)
+    assert gate.queue_depth == 1
+
+    with pytest.raises(Overloaded) as shed:
+        await gate.acquire()
+    assert shed.value.reason == SHED_QUEUE_FULL and shed.value.retry_after >= 1
+
+    gate.release(0.01)
+    assert await waiter is True
+    assert (gate.active, gate.queue_depth) == (1, 0)
+    gate.release(0.01)
+    assert gate.active == 0
+    assert (gate.admitted, gate.shed) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_gate_sheds_early_when_expected_wait_exceeds_budget():
+    """With a slow endpoint, a request that would have to queue is shed right away"""
+    gate = AdmissionGate("/test", max_concurrency=1, max_queue=10, budget_seconds=0.6)
+    await gate.acquire()
+    gate.service_seconds = 0.5
+
+    with pytest.raises(Overloaded) as shed:
+        await gate.acquire()
+    assert shed.value.reason == SHED_LATENCY_BUDGET
+    assert gate.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_gate_sheds_requests_still_waiting_when_budget_runs_out():
+    gate = AdmissionGate("/test", max_concurrency=1, max_queue=10, budget_seconds=0.05)
+    await gate.acquire()
+
+    with pytest.raises(Overloaded) as shed:
+        await gate.acquire()
+    assert shed.value.reason == SHED_QUEUE_TIMEOUT
+    assert gate.queue_depth == 0
+
+    gate.release(0.01)
+    assert gate.active == 0
+
+
+@pytest.mark.asyncio
+async def test_route_returns_503_with_retry_after(monkeypatch):
+    """Only POST endpoints are gated; shed requests get Retry-After"""
+    controller = AdmissionController(enabled=True, max_concurrency=1, max_queue=0, budget_ms=1000)
+    monkeypatch.setattr(admission_route, "admission_controller", controller)
+
+    router = APIRouter(route_class=admission_route.AdmissionRoute)
+    release = asyncio.Event()
+
+    @router.post("/slow")
+    async def slow():
+        await release.wait()
+        return {"ok": True}
+
+    @router.get("/status")
+    async def get_status():
+        return {"ok": True}
+
+    test_app = FastAPI()
+    test_app.include_router(router)
+
+    transport = httpx.ASGITransport(app=test_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = asyncio.ensure_future(client.post("/slow"))
+        await asyncio.sleep(0.05)
+        shed = await client.post("/slow")
+        status = await client.get("/status")
+        release.set()
+        served = await first
+
+    assert served.status_code == 200
+    assert shed.status_code == 503 and shed.headers["Retry-After"] == "1"
+    assert status.status_code == 200
+    assert list(controller.stats()) == ["/slow"]
+    assert controller.stats()["/slow"]["shed"] == 1
+
+
+def test_degraded_bundle_scores_with_surrogate_only(tmp_path, monkeypatch):
+    """The surrogate is loaded for degraded scoring without turning on cascade mode"""
+    monkeypatch.setattr(model_bundle, "ADMISSION_DEGRADE_ENABLED", True)
+    directory = build_fixture_model(tmp_path, n_estimators=10)
+    bundle = ModelBundle.load(directory / "recovery_model.pkl", directory / "scaler.pkl",
+                              directory / "model_metadata.json", use_flat=False)
+
+    assert bundle.cascade is None and bundle.surrogate is not None
+    degraded = bundle.degraded()
+    assert degraded is bundle.degraded() and degraded.version != bundle.version
+
+    X = bundle.preprocess_batch(synthetic_cases(200))
+    np.testing.assert_array_equal(degraded.predict_positive(X), bundle.surrogate.score_surrogate(X)[0])
+    np.testing.assert_array_equal(bundle.predict_positive(X), bundle.predict_full(X))
+
+
+def test_degraded_version_labels():
+    assert split_degraded(degraded_version("primary")) == ("primary", True)
+    assert split_degraded("2.0.0") == ("2.0.0", False)
+    assert split_degraded(None) == (None, False)
@@ -0,0 +1,70 @@
+"""
+Tests for the serving benchmark's fixture model and regression gate
+"""
+import json
+
+import numpy as np
+
+from app.config import API_FEATURES
+from app.models.model_bundle import ModelBundle
+from app.models.schemas import PredictionRequest
+from benchmarks.bench_serving import compare, DEFAULT_BASELINE
+from benchmarks.fixture_model import synthetic_cases, build_fixture_model
+
+
+def test_synthetic_cases_are_valid_and_deterministic():
+    """Synthetic cases pass request validation and repeat for the same seed"""
+    cases = synthetic_cases(500, seed=7)
+
+    for case in cases:
+        PredictionRequest(**case)
+    assert cases == synthetic_cases(500, seed=7)
+    assert cases != synthetic_cases(500, seed=8)
+
+
+def test_fixture_model_is_deterministic_and_servable(tmp_path):
+    """The fixture loads like a trained model and scores identically when rebuilt"""
+    rows = synthetic_cases(50)
+    scores = []
+    for name in ('first', 'second'):
+        directory = build_fixture_model(tmp_path / name, n_estimators=5)
+        bundle = ModelBundle.load(directory / "recovery_model.pkl", directory / "scaler.pkl",
+                                  directory / "model_metadata.json", use_flat=False)
+        assert bundle.feature_names == API_FEATURES
+        scores.append(bundle.predict_positive(bundle.preprocess_batch(rows)))
+
+    np.testing.assert_array_equal(scores[0], scores[1])
+    assert ((scores[0] >= 0) & (scores[0] <= 1)).all()
+
+
+def test_compare_flags_regressions_in_the_right_direction():
+    """Latency regresses when it grows, throughput when it shrinks"""
+    baseline = {'recovery.p99_ms': 10.0, 'batch_100.rows_per_second': 1000.0}
+
+    assert compare({'recovery.p99_ms': 12.0, 'batch_100.rows_per_second': 900.0}, baseline, 0.25) == []
+    assert compare({'recovery.p99_ms': 5.0, 'batch_100.rows_per_second': 5000.0}, baseline, 0.25) == []
+
+    regressions = compare({'recovery.p99_ms': 13.0, 'batch_100.rows_per_second': 700.0}, baseline, 0.25)
+    assert [regression.split(":")[0] for regression in regressions] == [
+        'batch_100.rows_per_second', 'recovery.p99_ms'
+    ]
+
+
+def test_compare_thresholds_and_missing_metrics():
+    """Per-metric thresholds override the default; metrics missing on either side are skipped"""
+    baseline = {'recovery.p99_ms': 10.0, 'batch_1.p50_ms': 1.0}
+    results = {'recovery.p99_ms': 14.0, 'batch_10.p50_ms': 99.0}
+
+    assert compare(results, baseline, 0.25, {'recovery.p99_ms': 0.5}) == []
+    assert len(compare(results, baseline, 0.25)) == 1
+
+
+def test_stored_baseline_has_every_scenario():
+    """The committed baseline covers recovery and all default batch sizes, row-wise and columnar"""
+    metrics = json.loads(DEFAULT_BASELINE.read_text())['metrics']
+
+    for name in ('p50_ms', 'p95_ms', 'p99_ms', 'requests_per_second'):
+        assert f"recovery.{name}" in metrics
+    for size in (1, 100, 10000, 100000):
+        assert f"batch_{size}.rows_per_second" in metrics
+        assert f"columnar_{size}.rows_per_second" in metrics
@@ -0,0 +1,120 @@
+"""
+Tests for cascade inference (surrogate first, full model near thresholds)
+"""
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+
+import app.models.model_bundle as model_bundle
+from app.config import SURROGATE_PARAMS
+from app.models.cascade import Cascade, risk_codes, cascade_stats
+from app.models.model_bundle import ModelBundle
+from benchmarks.fixture_model import build_fixture_model, synthetic_cases
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(3000, 5))
+    y = (X[:, 0] + 0.5 * X[:, 1] + rng.normal(scale=0.8, size=len(X)) > 0).astype(int)
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def surrogate(data):
+    X, y = data
+    return RandomForestClassifier(**dict(SURROGATE_PARAMS, n_jobs=1)).fit(X, y)
+
+
+def test_escalates_near_thresholds_and_on_uncertainty(surrogate):
+    """Rows within the margin of 0.4/0.7 or with high tree spread go to the full model"""
+    cascade = Cascade.from_model(surrogate, margin=0.05, max_uncertainty=0.2)
+    probabilities = np.array([0.95, 0.72, 0.66, 0.55, 0.43, 0.30, 0.10])
+    uncertainty = np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.3])
+
+    assert cascade.escalate(probabilities, uncertainty).tolist() == [
+        False, True, True, False, True, False, True
+    ]
+
+
+def test_predict_uses_full_model_only_for_escalated_rows(surrogate, data):
+    """Escalated rows get full-model probabilities, the rest keep the surrogate's"""
+    X, _ = data
+    cascade = Cascade.from_model(surrogate, margin=0.05, max_uncertainty=0.15)
+    surrogate_probabilities, _ = cascade.score_surrogate(X)
+    before = cascade_stats()
+    scored_rows = []
+
+    def full_model(rows):
+        scored_rows.append(len(rows))
+        return np.full(len(rows), -1.0)
+
+    probabilities, escalated = cascade.predict(X, full_model)
+
+    assert 0 < escalated.sum() < len(X)
+    assert scored_rows == [escalated.sum()]
+    assert (probabilities[escalated] == -1.0).all()
+    np.testing.assert_array_equal(probabilities[~escalated], surrogate_probabilities[~escalated])
+
+    after = cascade_stats()
+    assert after['cases'] - before['cases'] == len(X)
+    assert after['escalated'] - before['escalated'] == escalated.sum()
+
+
+def test_evaluate_reports_escalation_and_disagreement(surrogate, data):
+    """Escalating everything reproduces the full model exactly"""
+    X, y = data
+    full = RandomForestClassifier(n_estimators=20, random_state=0, n_jobs=1).fit(X, y).predict_proba(X)[:, 1]
+
+    everything = Cascade.from_model(surrogate, margin=1.0).evaluate(X, full)
+    nothing = Cascade.from_model(surrogate, margin=0.0, max_uncertainty=1.0).evaluate(X, full)
+
+    assert everything['escalation_rate'] == 1.0
+    assert everything['category_disagreement'] == 0.0
+    assert nothing['escalation_rate'] == 0.0
+    assert 0.0 < nothing['category_disagreement'] < 0.5
+
+
+def test_boosted_surrogate_is_rejected(data):
+    """Tree spread is only an uncertainty estimate for averaging ensembles"""
+    X, y = data
+    with pytest.raises(ValueError):
+        Cascade.from_model(GradientBoostingClassifier(n_estimators=5).fit(X, y))
+
+
+def test_risk_codes():
+    """Codes follow the RISK_THRESHOLDS cut-offs"""
+    assert risk_codes(np.array([0.7, 0.69, 0.4, 0.39])).tolist() == [0, 1, 1, 2]
+
+
+def test_bundle_loads_cascade_when_enabled(tmp_path, monkeypatch):
+    """The surrogate next to the model is used only with CASCADE_ENABLED"""
+    directory = build_fixture_model(tmp_path, n_estimators=10)
+    paths = (directory / "recovery_model.pkl", directory / "scaler.pkl", directory / "model_metadata.json")
+
+    assert ModelBundle.load(*paths, use_flat=False).cascade is None
+
+    monkeypatch.setattr(model_bundle, "CASCADE_ENABLED", True)
+    bundle = ModelBundle.load(*paths, use_flat=False)
+    assert bundle.cascade is not None
+
+    X = bundle.preprocess_batch(synthetic_cases(500))
+    probabilities = bundle.predict_positive(X)
+    _, escalated = bundle.cascade.predict(X, bundle.predict_full, record=False)
+    np.testing.assert_allclose(probabilities[escalated], bundle.predict_full(X[escalated]))
+
+    (directory / "surrogate_model.pkl").unlink()
+    assert ModelBundle.load(*paths, use_flat=False).cascade is None
+
+
+def test_bundle_version_changes_with_surrogate(tmp_path):
+    """A retrained surrogate changes the bundle version"""
+    directory = build_fixture_model(tmp_path, n_estimators=5)
+    paths = (directory / "recovery_model.pkl", directory / "scaler.pkl", directory / "model_metadata.json")
+    version = ModelBundle.load(*paths, use_flat=False).version
+
+    X, y = np.random.default_rng(1).normal(size=(200, 5)), np.arange(200) % 2
+    joblib.dump(RandomForestClassifier(n_estimators=2, max_depth=2).fit(X, y), directory / "surrogate_model.pkl")
+
+    assert ModelBundle.load(*paths, use_flat=False).version != version
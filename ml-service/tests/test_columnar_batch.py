@@ -0,0 +1,144 @@
+"""
+Tests for columnar batch validation, encoding and the /predictions/batch/columnar endpoint
+"""
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.columnar_batch import (
+    parse_columns, encode_response, valid_rows, ColumnarValidationError, MAX_ERRORS
+)
+from app.models.model_service import model_service
+
+client = TestClient(app)
+
+CASES = [
+    {"debt_amount": 5000.0, "days_past_due": 45, "credit_score": 650.0, "payment_attempts": 3, "communication_count": 5},
+    {"debt_amount": 12000.0, "days_past_due": 200, "credit_score": 540.0, "payment_attempts": 0, "communication_count": 1},
+    {"debt_amount": 800.0, "days_past_due": 10, "credit_score": 780.0, "payment_attempts": 6, "communication_count": 9}
+]
+COLUMNS = {name: [case[name] for case in CASES] for name in CASES[0]}
+
+
+def _error_locs(payload) -> list:
+    with pytest.raises(ColumnarValidationError) as excinfo:
+        parse_columns(payload)
+    return [tuple(error['loc']) for error in excinfo.value.errors]
+
+
+def test_parse_columns_returns_float_arrays():
+    """Valid columns become float64 arrays of equal length"""
+    columns = parse_columns(COLUMNS)
+
+    assert set(columns) == set(COLUMNS)
+    for name, column in columns.items():
+        assert column.dtype == np.float64
+        np.testing.assert_array_equal(column, COLUMNS[name])
+
+
+def test_parse_columns_applies_prediction_request_constraints():
+    """Bounds and integer checks match PredictionRequest, reported per row"""
+    payload = dict(
+        COLUMNS,
+        debt_amount=[5000.0, 0.0, 1.0],
+        credit_score=[650.0, 540.0, 851.0],
+        days_past_due=[45, 1.5, -1]
+    )
+
+    assert _error_locs(payload) == [
+        ('body', 'debt_amount', 1),
+        ('body', 'days_past_due', 1),
+        ('body', 'days_past_due', 2),
+        ('body', 'credit_score', 2)
+    ]
+
+
+def test_valid_rows_applies_the_same_rules():
+    """Rows parse_columns would reject are masked out, the rest are kept"""
+    columns = {name: np.array(values, dtype=np.float64) for name, values in COLUMNS.items()}
+    assert valid_rows(columns).tolist() == [True, True, True]
+
+    columns['debt_amount'][0] = 0.0
+    columns['days_past_due'][1] = 1.5
+    columns['credit_score'][2] = np.nan
+    assert valid_rows(columns).tolist() == [False, False, False]
+
+    columns = {name: np.array(values, dtype=np.float64) for name, values in COLUMNS.items()}
+    columns['payment_attempts'][1] = -1
+    assert valid_rows(columns).tolist() == [True, False, True]
+
+
+def test_parse_columns_rejects_malformed_requests():
+    """Missing fields, non-arrays, non-numbers, non-finite values and ragged arrays are rejected"""
+    assert _error_locs({k: v for k, v in COLUMNS.items() if k != 'credit_score'}) == [('body', 'credit_score')]
+    assert _error_locs(dict(COLUMNS, payment_attempts=3)) == [('body', 'payment_attempts')]
+    assert _error_locs(dict(COLUMNS, debt_amount=[1.0, "x", 2.0])) == [('body', 'debt_amount', 1)]
+    assert _error_locs(dict(COLUMNS, credit_score=[650.0, None, 700.0])) == [('body', 'credit_score', 1)]
+    assert _error_locs(dict(COLUMNS, communication_count=[1, 2])) == [('body',)]
+
+
+def test_parse_columns_caps_reported_errors():
+    """Only MAX_ERRORS errors are listed, the rest are summarized"""
+    with pytest.raises(ColumnarValidationError) as excinfo:
+        parse_columns({name: [-1] * 100 for name in COLUMNS})
+
+    errors = excinfo.value.errors
+    assert len(errors) == MAX_ERRORS + 1
+    assert errors[-1]['type'] == 'too_many_errors'
+
+
+def test_encode_response_is_columnar_json():
+    """The encoded body holds one array per output field"""
+    body = json.loads(encode_response(np.array([0.81234, 0.5, 0.1]), np.array([0, 1, 2], dtype=np.int8)))
+
+    assert body == {
+        'recovery_probability': [0.8123, 0.5, 0.1],
+        'risk_category': ['LOW_RISK', 'MEDIUM_RISK', 'HIGH_RISK'],
+        'recommended_strategy': ['STANDARD_FOLLOW_UP', 'NEGOTIATION_OFFER', 'ESCALATION'],
+        'total_cases': 3
+    }
+
+
+def test_encode_response_rounds_like_python_round():
+    """Probabilities are rounded exactly as the row-wise endpoints round them"""
+    halfway = (np.arange(10000) + 0.5) / 1e4
+    probabilities = np.concatenate([
+        np.random.default_rng(0).random(20000), halfway, np.nextafter(halfway, 0), np.nextafter(halfway, 1)
+    ])
+    codes = np.zeros(len(probabilities), dtype=np.int8)
+
+    body = json.loads(encode_response(probabilities, codes))
+
+    assert body['recovery_probability'] == [round(p, 4) for p in probabilities.tolist()]
+
+
+def test_columnar_endpoint_matches_batch_endpoint():
+    """Columnar and row-wise batch endpoints return the same predictions"""
+    if not model_service.is_model_loaded():
+        pytest.skip("Model is not loaded")
+
+    columnar = client.post("/predictions/batch/columnar", json=COLUMNS)
+    rows = client.post("/predictions/batch", json={"cases": CASES})
+
+    assert columnar.status_code == 200
+    data = columnar.json()
+    assert data['total_cases'] == len(CASES)
+    for i, prediction in enumerate(rows.json()['predictions']):
+        assert data['recovery_probability'][i] == prediction['recovery_probability']
+        assert data['risk_category'][i] == prediction['risk_category']
+        assert data['recommended_strategy'][i] == prediction['recommended_strategy']
+
+
+def test_columnar_endpoint_validation_errors():
+    """Invalid bodies are rejected with 422 in the usual validation error format"""
+    response = client.post("/predictions/batch/columnar", json=dict(COLUMNS, credit_score=[650.0, 900.0, 700.0]))
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['loc'] == ['body', 'credit_score', 1]
+
+    response = client.post("/predictions/batch/columnar", content=b"{not json",
+                           headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['type'] == 'json_invalid'
@@ -0,0 +1,64 @@
+"""
+Tests for the chunked Lending Club loader
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.data_loader import DataLoader, LENDING_CLUB_DTYPES, LENDING_CLUB_CATEGORICAL
+from app.utils.feature_engineering import FeatureEngineer
+from benchmarks.bench_data_loader import synthetic_loan_csv
+
+
+@pytest.fixture(scope="module")
+def loan_csv(tmp_path_factory):
+    return synthetic_loan_csv(tmp_path_factory.mktemp("lending-club") / "loan.csv", rows=5000,
+                              total_columns=60, chunk_rows=2000)
+
+
+def test_loader_prunes_columns_and_applies_dtypes(loan_csv):
+    df = DataLoader.load_lending_club(nrows=3000, path=loan_csv, chunk_rows=700)
+
+    assert len(df) == 3000
+    assert set(df.columns) == set(LENDING_CLUB_DTYPES)
+    for column in LENDING_CLUB_CATEGORICAL:
+        # Categories seen in different chunks are merged, not demoted to object
+        assert isinstance(df[column].dtype, pd.CategoricalDtype)
+    assert df['loan_amnt'].dtype == np.float32 and df['emp_length'].dtype == object
+
+    full = pd.read_csv(loan_csv, nrows=3000)
+    np.testing.assert_allclose(df['dti'].to_numpy(), full['dti'].to_numpy(), rtol=1e-6)
+    assert (df['loan_status'].astype(str).to_numpy() == full['loan_status'].to_numpy()).all()
+
+
+def test_loader_samples_each_chunk_reproducibly(loan_csv):
+    first = DataLoader.load_lending_club(sample_frac=0.1, path=loan_csv, chunk_rows=1000)
+    second = DataLoader.load_lending_club(sample_frac=0.1, path=loan_csv, chunk_rows=1000)
+
+    assert len(first) == 500
+    # The index keeps the row numbers of the file, and every chunk contributes
+    assert first.index.is_unique and first.index.max() < 5000
+    assert np.bincount(first.index // 1000).tolist() == [100] * 5
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_loaded_frame_feeds_feature_engineering(loan_csv):
+    """Categorical columns work with the Lending Club feature pipeline"""
+    df = DataLoader.load_lending_club(sample_frac=0.2, path=loan_csv, chunk_rows=1000)
+    df = DataLoader.handle_missing_values(DataLoader.clean_data(df))
+
+    features = FeatureEngineer.add_derived_features(FeatureEngineer.create_lending_club_features(df))
+
+    assert len(features) == len(df)
+    assert features['credit_score'].between(470, 730).all()
+    assert set(features['recovered'].dropna().unique()) <= {0.0, 1.0}
+    assert features['days_past_due'].dtype == np.float64
+
+
+def test_conflicting_sample_options_are_rejected(loan_csv):
+    with pytest.raises(ValueError, match="stratify_by requires sample_size"):
+        DataLoader.load_lending_club(stratify_by='loan_status', path=loan_csv)
+    with pytest.raises(ValueError, match="nrows"):
+        DataLoader.load_lending_club(nrows=100, sample_size=50, path=loan_csv)
+    with pytest.raises(ValueError, match="nrows"):
+        DataLoader.load_lending_club(nrows=100, sample_size=50, stratify_by='loan_status', path=loan_csv)
@@ -0,0 +1,47 @@
+"""
+Tests for parallel per-source training data pipelines
+"""
+from functools import partial
+
+import pandas as pd
+import pytest
+
+from app.training.data_pipeline import prepare_sources, prepare_lending_club, STAGE_LOAD, STAGE_READ, STAGE_WRITE
+from benchmarks.bench_data_loader import synthetic_loan_csv
+
+pytest.importorskip("pyarrow")
+
+
+def _failing_pipeline(timings):
+    raise FileNotFoundError("missing.xls")
+
+
+@pytest.fixture(scope="module")
+def loan_csv(tmp_path_factory):
+    return synthetic_loan_csv(tmp_path_factory.mktemp("pipeline") / "loan.csv", rows=4000, total_columns=40)
+
+
+def test_parallel_sources_match_in_process_results(loan_csv):
+    pipelines = {
+        'sampled': partial(prepare_lending_club, sample_size=500, path=loan_csv),
+        'fraction': partial(prepare_lending_club, path=loan_csv)
+    }
+
+    frames, timings = prepare_sources(pipelines, workers=2)
+    expected, _ = prepare_sources(pipelines, workers=1)
+
+    assert list(frames) == ['sampled', 'fraction']
+    for name in pipelines:
+        pd.testing.assert_frame_equal(frames[name], expected[name].reset_index(drop=True))
+        assert {STAGE_LOAD, STAGE_WRITE, STAGE_READ, 'total'} <= set(timings[name])
+        assert timings[name]['rows'] == len(frames[name])
+    assert len(frames['sampled']) == 500 and len(frames['fraction']) == 400
+
+
+def test_failed_source_is_reported_and_left_out(loan_csv):
+    pipelines = {'lending_club': partial(prepare_lending_club, path=loan_csv), 'uci': _failing_pipeline}
+
+    frames, timings = prepare_sources(pipelines, workers=2)
+
+    assert list(frames) == ['lending_club']
+    assert 'missing.xls' in timings['uci']['error']
@@ -0,0 +1,124 @@
+"""
+Tests for the columnar dataset cache
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.utils.data_loader as data_loader
+from app.utils.data_loader import DataLoader
+from app.utils.dataset_cache import DatasetCache, DatasetSource
+from benchmarks.bench_data_loader import synthetic_loan_csv
+
+pytest.importorskip("pyarrow")
+
+
+class CountingReader:
+    """Parses a CSV in chunks and counts how often it was asked to"""
+
+    def __init__(self, chunk_rows=50):
+        self.calls = 0
+        self.chunk_rows = chunk_rows
+
+    def __call__(self, path):
+        self.calls += 1
+        with pd.read_csv(path, chunksize=self.chunk_rows, dtype={'grade': 'category'}) as reader:
+            yield from reader
+
+
+@pytest.fixture
+def source(tmp_path):
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        'grade': rng.choice(list('ABCDEFG'), size=120),
+        'amount': rng.gamma(2.0, 500.0, size=120),
+        'note': ['x'] * 60 + [None] * 60
+    }).to_csv(tmp_path / "source.csv", index=False)
+    return DatasetSource('example', tmp_path / "source.csv", CountingReader())
+
+
+def test_cache_reads_selected_columns_with_restored_categories(tmp_path, source):
+    cache = DatasetCache(tmp_path / "cache", enabled=True)
+
+    df = cache.read(source, columns=['grade', 'amount'])
+    chunks = list(cache.iter_chunks(source, columns=['amount']))
+
+    assert source.read_chunks.calls == 1
+    assert list(df.columns) == ['grade', 'amount']
+    assert isinstance(df['grade'].dtype, pd.CategoricalDtype)
+    assert [len(chunk) for chunk in chunks] == [50, 50, 20]
+    assert chunks[2].index[0] == 100 and list(chunks[0].columns) == ['amount']
+
+    expected = pd.read_csv(source.path)
+    np.testing.assert_allclose(df['amount'], expected['amount'])
+    assert (df['grade'].astype(str) == expected['grade']).all()
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_chunks_are_resliced_to_chunk_rows(tmp_path, source, enabled):
+    cache = DatasetCache(tmp_path / "cache", enabled=enabled)
+
+    chunks = list(cache.iter_chunks(source, columns=['grade', 'amount'], chunk_rows=30))
+    df = pd.concat(chunks)
+
+    # Stored (or parsed) in chunks of 50 rows, returned in chunks of 30
+    assert [len(chunk) for chunk in chunks] == [30, 30, 30, 30]
+    assert [chunk.index[0] for chunk in chunks] == [0, 30, 60, 90]
+    assert all(isinstance(chunk['grade'].dtype, pd.CategoricalDtype) for chunk in chunks)
+    assert df.index.tolist() == list(range(120))
+    np.testing.assert_allclose(df['amount'], pd.read_csv(source.path)['amount'])
+
+
+def test_cache_is_rebuilt_only_when_content_or_signature_changes(tmp_path, source):
+    cache = DatasetCache(tmp_path / "cache", enabled=True)
+    cache.ensure(source)
+
+    # Touched but unchanged: the hash matches, no rebuild
+    stat = source.path.stat()
+    os.utime(source.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.is_fresh(source)
+    assert cache.metadata('example')['mtime_ns'] == stat.st_mtime_ns + 10**9
+
+    # Same size, different content
+    text = source.path.read_text()
+    source.path.write_text(text.replace("x", "y"))
+    assert not cache.is_fresh(source)
+    cache.ensure(source)
+    assert source.read_chunks.calls == 2
+    assert (cache.read(source, columns=['note'])['note'].dropna() == 'y').all()
+
+    changed = DatasetSource('example', source.path, source.read_chunks, signature="v2")
+    assert not cache.is_fresh(changed)
+    assert not list((tmp_path / "cache").glob(".example-*"))
+
+
+def test_disabled_cache_parses_the_source(tmp_path, source):
+    cache = DatasetCache(tmp_path / "cache", enabled=False)
+    df = cache.read(source, columns=['amount'])
+    assert len(df) == 120 and list(df.columns) == ['amount']
+    assert not (tmp_path / "cache").exists()
+
+
+def test_lending_club_loader_reads_through_cache(tmp_path, monkeypatch):
+    path = synthetic_loan_csv(tmp_path / "loan.csv", rows=3000, total_columns=50)
+    cache = DatasetCache(tmp_path / "cache", enabled=True)
+    monkeypatch.setattr(data_loader, "LENDING_CLUB_PATH", path)
+    monkeypatch.setattr(data_loader, "dataset_cache", cache)
+
+    direct = DataLoader.load_lending_club(sample_size=400, path=path, chunk_rows=1000)
+    first = DataLoader.load_lending_club(sample_size=400)
+    second = DataLoader.load_lending_club(sample_size=400, columns=['loan_status', 'dti'])
+    head = DataLoader.load_lending_club(nrows=25)
+    # The cache holds one 3000-row batch; fraction samples still follow chunk_rows
+    fraction = DataLoader.load_lending_club(sample_frac=0.1, chunk_rows=700)
+    direct_fraction = DataLoader.load_lending_club(sample_frac=0.1, chunk_rows=700, path=path)
+    chunk_sizes = [len(chunk) for chunk in DataLoader.iter_lending_club(chunk_rows=700)]
+
+    assert cache.metadata('lending_club')['rows'] == 3000
+    pd.testing.assert_frame_equal(first, direct)
+    pd.testing.assert_frame_equal(second, direct[['loan_status', 'dti']])
+    assert head.index.tolist() == list(range(25))
+    assert chunk_sizes == [700, 700, 700, 700, 200]
+    pd.testing.assert_frame_equal(fraction, direct_fraction)
@@ -0,0 +1,107 @@
+"""
+Tests for columnar CSV/Parquet file scoring
+"""
+import io
+
+import httpx
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.batch.file_scorer import score_file
+from app.config import API_FEATURES
+from app.main import app
+from app.models.model_service import model_service
+from tests.test_model_service import _random_cases
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def portfolio():
+    if not model_service.is_model_loaded():
+        pytest.skip("Model is not loaded")
+
+    df = pd.DataFrame(_random_cases(1000, seed=5))
+    df.insert(0, 'case_id', np.arange(len(df)))
+    return df
+
+
+@pytest.mark.parametrize("input_name, output_name", [
+    ("cases.csv", "scored.parquet"),
+    ("cases.parquet", "scored.csv")
+])
+def test_file_scoring_matches_batch_predictions(portfolio, tmp_path, input_name, output_name):
+    input_path = tmp_path / input_name
+    if input_path.suffix == '.csv':
+        portfolio.to_csv(input_path, index=False)
+    else:
+        portfolio.to_parquet(input_path)
+
+    summary = score_file(input_path, tmp_path / output_name, chunk_rows=128)
+
+    scored = pd.read_csv(tmp_path / output_name) if output_name.endswith('.csv') \
+        else pd.read_parquet(tmp_path / output_name)
+    expected = pd.DataFrame(model_service.predict_batch(portfolio[API_FEATURES].to_dict('records')))
+
+    assert summary['rows'] == len(portfolio) and summary['invalid_rows'] == 0
+    assert scored['case_id'].tolist() == portfolio['case_id'].tolist()
+    np.testing.assert_allclose(scored['recovery_probability'], expected['recovery_probability'], atol=1e-12)
+    assert scored['risk_category'].astype(str).tolist() == expected['risk_category'].tolist()
+    assert scored['recommended_strategy'].astype(str).tolist() == expected['recommended_strategy'].tolist()
+
+
+def test_missing_values_get_null_predictions(portfolio, tmp_path):
+    portfolio.loc[3, 'credit_score'] = np.nan
+    portfolio.to_parquet(tmp_path / "cases.parquet")
+
+    summary = score_file(tmp_path / "cases.parquet", tmp_path / "scored.parquet")
+    scored = pd.read_parquet(tmp_path / "scored.parquet")
+
+    assert summary['invalid_rows'] == 1
+    assert scored.loc[3, ['recovery_probability', 'risk_category']].isna().all()
+    assert scored['recovery_probability'].notna().sum() == len(portfolio) - 1
+
+
+def test_rows_the_api_rejects_get_null_predictions(portfolio, tmp_path):
+    portfolio.loc[1, 'credit_score'] = 10.0
+    portfolio.loc[4, 'debt_amount'] = 0.0
+    portfolio.loc[5, 'payment_attempts'] = -1
+    portfolio['days_past_due'] = portfolio['days_past_due'].astype(float)
+    portfolio.loc[7, 'days_past_due'] = 30.5
+    portfolio.to_csv(tmp_path / "cases.csv", index=False)
+
+    summary = score_file(tmp_path / "cases.csv", tmp_path / "scored.parquet")
+    scored = pd.read_parquet(tmp_path / "scored.parquet")
+
+    assert summary['invalid_rows'] == 4
+    assert scored.loc[[1, 4, 5, 7], 'recovery_probability'].isna().all()
+    assert scored.loc[[1, 4, 5, 7], 'risk_category'].isna().all()
+    assert scored['recovery_probability'].notna().sum() == len(portfolio) - 4
+
+
+def test_missing_column_is_rejected(portfolio, tmp_path):
+    portfolio.drop(columns='credit_score').to_csv(tmp_path / "cases.csv", index=False)
+
+    with pytest.raises(ValueError, match="credit_score"):
+        score_file(tmp_path / "cases.csv", tmp_path / "scored.parquet")
+
+
+@pytest.mark.asyncio
+async def test_file_endpoint_returns_scored_parquet(portfolio):
+    buffer = io.BytesIO()
+    portfolio.to_parquet(buffer)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/predictions/file",
+            files={"file": ("portfolio.parquet", buffer.getvalue(), "application/octet-stream")}
+        )
+        rejected = await client.post("/predictions/file", files={"file": ("cases.json", b"[]", "application/json")})
+
+    assert response.status_code == 200
+    assert response.headers["X-Rows-Scored"] == str(len(portfolio))
+    scored = pd.read_parquet(io.BytesIO(response.content))
+    assert list(scored.columns[-3:]) == ['recovery_probability', 'risk_category', 'recommended_strategy']
+    assert rejected.status_code == 400
@@ -0,0 +1,66 @@
+"""
+Tests for memory-mapped flat model artifacts
+"""
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from app.config import MODEL_PATH, SCALER_PATH
+from app.models.flat_artifacts import export_flat_artifacts, is_current, flat_dir, FlatModel
+from app.models.model_bundle import ModelBundle
+from app.models.model_service import model_service
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    """Copy of the served artifacts with flat artifacts exported next to them"""
+    if not model_service.is_model_loaded() or model_service.bundle.engine is None:
+        pytest.skip("Served model is not loaded or not a supported tree ensemble")
+
+    model_path = shutil.copy(MODEL_PATH, tmp_path / MODEL_PATH.name)
+    scaler_path = shutil.copy(SCALER_PATH, tmp_path / SCALER_PATH.name)
+    bundle = ModelBundle.load(model_path, scaler_path, tmp_path / "model_metadata.json", use_flat=False)
+    export_flat_artifacts(bundle.engine, bundle.feature_plan, bundle.version,
+                          model_path=model_path, scaler_path=scaler_path)
+    return bundle, model_path, scaler_path
+
+
+def _is_memory_mapped(array: np.ndarray) -> bool:
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def test_flat_bundle_is_memory_mapped_and_matches(artifacts):
+    pickled, model_path, scaler_path = artifacts
+
+    flat = ModelBundle.load(model_path, scaler_path, model_path.parent / "model_metadata.json", use_flat=True)
+
+    assert isinstance(flat.model, FlatModel)
+    assert flat.version == pickled.version
+    for name in ('feature', 'threshold', 'left', 'value', 'is_leaf'):
+        assert _is_memory_mapped(getattr(flat.engine, name))
+
+    cases = [{"debt_amount": 100.0 * i, "days_past_due": i, "credit_score": 600.0,
+              "payment_attempts": 1, "communication_count": 2} for i in range(500)]
+    X = flat.preprocess_batch(cases)
+    assert np.array_equal(X, pickled.preprocess_batch(cases))
+    # Large batches go through the engine too, within the verified tolerance
+    expected = pickled.model.predict_proba(X)[:, 1]
+    assert np.max(np.abs(flat.model.predict_proba(X)[:, 1] - expected)) <= 1e-9
+
+
+def test_stale_flat_artifacts_fall_back_to_pickle(artifacts):
+    _, model_path, scaler_path = artifacts
+    assert is_current(flat_dir(model_path), model_path, scaler_path)
+
+    stat = os.stat(model_path)
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert not is_current(flat_dir(model_path), model_path, scaler_path)
+    bundle = ModelBundle.load(model_path, scaler_path, model_path.parent / "model_metadata.json", use_flat=True)
+    assert not isinstance(bundle.model, FlatModel)
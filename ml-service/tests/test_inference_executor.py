@@ -0,0 +1,81 @@
+"""
+Tests for running inference off the event loop
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models.inference_executor import InferenceExecutor
+from app.models.model_service import model_service
+
+BATCH_SECONDS = 1.0
+
+CASE = {
+    "debt_amount": 5000.0,
+    "days_past_due": 45,
+    "credit_score": 650.0,
+    "payment_attempts": 3,
+    "communication_count": 5
+}
+
+
+@pytest.mark.asyncio
+async def test_health_stays_responsive_during_large_batch(monkeypatch):
+    """A long-running batch must not block /health"""
+    def slow_predict_batch(cases, chunk_size=None, bundle=None, timings=None):
+        time.sleep(BATCH_SECONDS)  # Stands in for a large CPU-bound batch
+        return [
+            {
+                'recovery_probability': 0.5,
+                'risk_category': 'MEDIUM_RISK',
+                'recommended_strategy': 'NEGOTIATION_OFFER'
+            }
+            for _ in cases
+        ]
+
+    monkeypatch.setattr(model_service, "predict_batch", slow_predict_batch)
+    monkeypatch.setattr(model_service, "is_model_loaded", lambda: True)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        started = time.perf_counter()
+        batch = asyncio.create_task(client.post("/predictions/batch", json={"cases": [CASE] * 100}))
+        await asyncio.sleep(0.1)
+
+        health = await client.get("/health")
+        health_done = time.perf_counter() - started
+
+        batch_response = await batch
+        batch_done = time.perf_counter() - started
+
+    assert health.status_code == 200
+    assert batch_response.status_code == 200
+    assert batch_response.json()["total_cases"] == 100
+    # /health answered while the batch was still running
+    assert health_done < BATCH_SECONDS / 2
+    assert batch_done >= BATCH_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_process_executor_matches_in_process_predictions():
+    """Process workers load their own model and return the same results"""
+    if not model_service.is_model_loaded():
+        pytest.skip("Model is not loaded")
+
+    executor = InferenceExecutor('process', max_workers=1)
+    try:
+        result = await executor.predict(CASE)
+        batch = await executor.predict_batch([CASE, CASE])
+    finally:
+        executor.shutdown()
+
+    assert result == model_service.predict(CASE)
+    assert batch == [result, result]
+
+
+def test_unknown_executor_kind_rejected():
+    with pytest.raises(ValueError):
+        InferenceExecutor('fiber')
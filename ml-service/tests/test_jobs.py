@@ -0,0 +1,192 @@
+"""
+Tests for asynchronous batch jobs
+"""
+import asyncio
+import json
+
+import httpx
+import numpy as np
+import pytest
+
+import app.routers.jobs as jobs_router
+from app.config import API_FEATURES
+from app.main import app
+from app.batch.jobs import JobManager, score_chunk, split_file, JOB_COMPLETED, JOB_RUNNING, MANIFEST_NAME
+from app.models.inference_executor import inference_executor
+from app.models.model_service import model_service
+from tests.test_model_service import _random_cases
+
+
+class CountingExecutor:
+    """Runs tasks on the real inference executor and counts them"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def run(self, func, *args):
+        self.calls += 1
+        return await inference_executor.run(func, *args)
+
+
+def _columns(cases):
+    return {name: np.array([case[name] for case in cases], dtype=np.float64) for name in API_FEATURES}
+
+
+async def _wait(manager, job_id, timeout=30.0):
+    for _ in range(int(timeout / 0.01)):
+        status = manager.status(job_id)
+        if status['status'] not in ('queued', 'running'):
+            return status
+        await asyncio.sleep(0.01)
+    raise TimeoutError(f"Job {job_id} did not finish")
+
+
+@pytest.mark.asyncio
+async def test_job_scores_every_chunk_and_pages_match_model(tmp_path):
+    """Pages are the chunks, in order, with the same scores as predict_columns"""
+    cases = _random_cases(250, seed=5)
+    manager = JobManager(tmp_path, chunk_rows=100)
+
+    job = manager.create_from_columns(_columns(cases))
+    manager.submit(job['job_id'])
+    status = await _wait(manager, job['job_id'])
+    await manager.stop()
+
+    assert status['status'] == JOB_COMPLETED
+    assert (status['total_rows'], status['rows_scored'], status['chunks_total']) == (250, 250, 3)
+    assert status['progress'] == 1.0
+
+    pages = [json.loads(manager.result_page(job['job_id'], page)) for page in range(3)]
+    assert [(page['offset'], page['rows']) for page in pages] == [(0, 100), (100, 100), (200, 50)]
+    probabilities, _ = model_service.predict_columns(_columns(cases))
+    scored = [p for page in pages for p in page['recovery_probability']]
+    assert scored == [round(p, 4) for p in probabilities.tolist()]
+    with pytest.raises(KeyError):
+        manager.result_page(job['job_id'], 3)
+
+
+@pytest.mark.asyncio
+async def test_restarted_manager_resumes_from_last_completed_chunk(tmp_path):
+    """Chunks already on disk are not scored again after a restart"""
+    cases = _random_cases(500, seed=6)
+    manager = JobManager(tmp_path, chunk_rows=100)
+    job = manager.create_from_columns(_columns(cases))
+    job_dir = tmp_path / job['job_id']
+
+    # Simulate a crash: two chunks done, a third scored but not yet recorded
+    for index in range(3):
+        score_chunk(str(job_dir / "inputs" / f"{index:05d}.npz"), str(job_dir / "results" / f"{index:05d}.npz"))
+    manifest = json.loads((job_dir / MANIFEST_NAME).read_text())
+    manifest.update(status=JOB_RUNNING, chunks_completed=2, rows_scored=200)
+    (job_dir / MANIFEST_NAME).write_text(json.dumps(manifest))
+
+    executor = CountingExecutor()
+    restarted = JobManager(tmp_path, executor=executor, chunk_rows=100)
+    await restarted.start()
+    status = await _wait(restarted, job['job_id'])
+    await restarted.stop()
+
+    assert status['status'] == JOB_COMPLETED
+    assert status['rows_scored'] == 500 and status['chunks_completed'] == 5
+    assert executor.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_file_job_reports_rows_with_missing_features(tmp_path):
+    """Rows with an empty or out-of-range feature get null predictions and are counted"""
+    cases = _random_cases(30, seed=7)
+    cases[6]['credit_score'] = 10.0
+    lines = [",".join(API_FEATURES)] + [",".join(str(case[name]) for name in API_FEATURES) for case in cases]
+    lines[4] = lines[4].split(",", 1)[0] + "," * (len(API_FEATURES) - 1)
+    manager = JobManager(tmp_path / "jobs", chunk_rows=8)
+
+    job = manager.create_for_file(".csv")
+    manager.source_path(job).write_text("\n".join(lines) + "\n")
+    manager.submit(job['job_id'])
+    status = await _wait(manager, job['job_id'])
+    await manager.stop()
+
+    assert status['status'] == JOB_COMPLETED
+    assert (status['total_rows'], status['invalid_rows'], status['chunks_total']) == (30, 2, 4)
+    assert not manager.source_path(job).exists()
+    page = json.loads(manager.result_page(job['job_id'], 0))
+    assert page['recovery_probability'][3] is None and page['risk_category'][3] is None
+    assert page['recovery_probability'][6] is None
+    assert page['recovery_probability'][2] is not None
+
+
+@pytest.mark.asyncio
+async def test_file_job_resumes_after_restart_between_split_and_upload_removal(tmp_path):
+    """A job whose chunks were recorded keeps them; the leftover upload is removed"""
+    cases = _random_cases(20, seed=9)
+    lines = [",".join(API_FEATURES)] + [",".join(str(case[name]) for name in API_FEATURES) for case in cases]
+    manager = JobManager(tmp_path, chunk_rows=8)
+    job = manager.create_for_file(".csv")
+    manager.source_path(job).write_text("\n".join(lines) + "\n")
+
+    # Simulate a crash after the split was saved, before the upload was deleted
+    job_dir = tmp_path / job['job_id']
+    manifest = json.loads((job_dir / MANIFEST_NAME).read_text())
+    manifest.update(status=JOB_RUNNING, chunk_rows=split_file(manager.source_path(job), job_dir / "inputs", 8))
+    (job_dir / MANIFEST_NAME).write_text(json.dumps(manifest))
+
+    restarted = JobManager(tmp_path, chunk_rows=8)
+    await restarted.start()
+    status = await _wait(restarted, job['job_id'])
+    await restarted.stop()
+
+    assert status['status'] == JOB_COMPLETED
+    assert (status['rows_scored'], status['chunks_total']) == (20, 3)
+    assert not manager.source_path(job).exists()
+
+
+@pytest.mark.asyncio
+async def test_failed_upload_removes_the_job(tmp_path, monkeypatch):
+    if not model_service.is_model_loaded():
+        pytest.skip("Model is not loaded")
+
+    def disk_full(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    manager = JobManager(tmp_path, chunk_rows=40)
+    monkeypatch.setattr(jobs_router, "job_manager", manager)
+    monkeypatch.setattr(jobs_router.shutil, "copyfileobj", disk_full)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/jobs/file", files={"file": ("cases.csv", b"debt_amount\n1\n")})
+    await manager.stop()
+
+    assert response.status_code == 500
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_job_endpoints(tmp_path, monkeypatch):
+    if not model_service.is_model_loaded():
+        pytest.skip("Model is not loaded")
+
+    manager = JobManager(tmp_path, chunk_rows=40)
+    monkeypatch.setattr(jobs_router, "job_manager", manager)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        submitted = await client.post("/jobs/batch", json={"cases": _random_cases(100, seed=8)})
+        assert submitted.status_code == 202
+        job_id = submitted.json()['job_id']
+
+        await _wait(manager, job_id)
+        status = await client.get(f"/jobs/{job_id}")
+        page = await client.get(f"/jobs/{job_id}/results", params={"page": 2})
+        missing_page = await client.get(f"/jobs/{job_id}/results", params={"page": 3})
+        unknown = await client.get("/jobs/not-a-job")
+        deleted = await client.delete(f"/jobs/{job_id}")
+        after_delete = await client.get(f"/jobs/{job_id}")
+    await manager.stop()
+
+    assert status.json()['status'] == JOB_COMPLETED
+    assert page.status_code == 200 and page.json()['rows'] == 20
+    assert missing_page.status_code == 404
+    assert unknown.status_code == 404
+    assert deleted.status_code == 204 and after_delete.status_code == 404
+    assert not (tmp_path / job_id).exists()
@@ -0,0 +1,94 @@
+"""
+Tests for the Prometheus metrics
+"""
+import threading
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models.metrics import MetricsRegistry
+from app.models.model_service import model_service
+
+CASE = {
+    "debt_amount": 5000.0,
+    "days_past_due": 45,
+    "credit_score": 650.0,
+    "payment_attempts": 3,
+    "communication_count": 5
+}
+
+
+def _sample(text: str, line_prefix: str) -> float:
+    """Value of the first exposition line starting with line_prefix"""
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f"{line_prefix} not found in metrics")
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("test_seconds", "Test latency", ("endpoint",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        latency.labels("/x").observe(value)
+
+    text = registry.render()
+
+    assert 'test_seconds_bucket{endpoint="/x",le="0.1"} 2' in text
+    assert 'test_seconds_bucket{endpoint="/x",le="1"} 3' in text
+    assert 'test_seconds_bucket{endpoint="/x",le="+Inf"} 4' in text
+    assert 'test_seconds_count{endpoint="/x"} 4' in text
+    assert _sample(text, 'test_seconds_sum{endpoint="/x"}') == pytest.approx(2.65)
+
+
+def test_observations_from_many_threads_are_all_counted():
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Test counter")
+    latency = registry.histogram("test_seconds", "Test latency")
+
+    def record():
+        for _ in range(10000):
+            counter.labels().inc()
+            latency.labels().observe(0.001)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = registry.render()
+    assert 'test_total 40000' in text
+    assert 'test_seconds_count 40000' in text
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_stages_per_endpoint():
+    if not model_service.is_model_loaded():
+        pytest.skip("Model is not loaded")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        before = (await client.get("/metrics")).text
+        await client.post("/predictions/recovery", json=dict(CASE, debt_amount=5123.0))
+        await client.post("/predictions/batch", json={"cases": [CASE] * 7})
+        await client.post("/predictions/recovery", json={"debt_amount": -1})
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+
+    for endpoint in ("/predictions/recovery", "/predictions/batch"):
+        for stage in ("parse", "preprocess", "predict_proba", "categorize", "serialize"):
+            assert f'ml_stage_duration_seconds_count{{endpoint="{endpoint}",stage="{stage}"}}' in text
+
+    batch_sizes = 'ml_batch_size_sum{endpoint="/predictions/batch"}'
+    before_sizes = _sample(before, batch_sizes) if batch_sizes in before else 0
+    assert _sample(text, batch_sizes) - before_sizes == 7
+
+    assert 'ml_requests_total{endpoint="/predictions/recovery",status="422"}' in text
+    assert 'ml_requests_in_flight{endpoint="/predictions/recovery"} 0' in text
+    assert 'ml_model_loaded 1' in text
+    assert 'ml_model_load_duration_seconds_count{kind="load"}' in text
@@ -0,0 +1,45 @@
+"""
+Tests for micro-batching of single-case predictions
+"""
+import asyncio
+
+import pytest
+
+from app.models.inference_executor import InferenceExecutor
+from app.models.micro_batcher import MicroBatcher
+from tests.test_model_service import _random_cases
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced(loaded_service):
+    """Concurrent requests share batches and each caller gets its own result"""
+    executor = InferenceExecutor('thread', max_workers=2)
+    batcher = MicroBatcher(executor, max_batch_size=8, max_wait_us=50000)
+    cases = _random_cases(20, seed=2)
+
+    results = await asyncio.gather(*(batcher.predict(case) for case in cases))
+
+    assert results == [loaded_service.predict(case) for case in cases]
+    stats = batcher.stats.snapshot()
+    assert stats['requests'] == 20
+    assert stats['batches'] == 3  # 8 + 8 + 4
+    assert stats['max_batch_size'] == 8
+    assert stats['queue_depth'] == 0
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_reach_every_caller():
+    """A failing batch raises in every waiting request"""
+    class FailingExecutor:
+        async def predict_batch(self, cases, timings=None):
+            raise RuntimeError("Model is not loaded. Please train the model first.")
+
+    batcher = MicroBatcher(FailingExecutor(), max_batch_size=4, max_wait_us=1000)
+
+    results = await asyncio.gather(
+        *(batcher.predict(case) for case in _random_cases(3)),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
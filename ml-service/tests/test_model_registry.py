@@ -0,0 +1,114 @@
+"""
+Tests for the multi-model registry, routing and shadow scoring
+"""
+import shutil
+
+import httpx
+import pytest
+
+from app.config import MODEL_PATH, SCALER_PATH
+from app.main import app
+from app.models import inference_executor as executor_module
+from app.models.inference_executor import InferenceExecutor
+from app.models.model_registry import ModelRegistry, parse_traffic_split, PRIMARY_VERSION
+from app.models.model_service import model_service
+from app.models.shadow_scorer import ShadowScorer
+from app.routers import predictions, versioning
+
+CASE = {
+    "debt_amount": 5000.0,
+    "days_past_due": 45,
+    "credit_score": 650.0,
+    "payment_attempts": 3,
+    "communication_count": 5
+}
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """Registry with two versions that are copies of the served artifacts"""
+    if not model_service.is_model_loaded():
+        pytest.skip("Model is not loaded")
+
+    for version in ("v1", "v2"):
+        directory = tmp_path / version
+        directory.mkdir()
+        shutil.copy(MODEL_PATH, directory / MODEL_PATH.name)
+        shutil.copy(SCALER_PATH, directory / SCALER_PATH.name)
+    return ModelRegistry(tmp_path, max_bytes=1 << 30, traffic_split={})
+
+
+def test_parse_traffic_split():
+    assert parse_traffic_split("") == {}
+    assert parse_traffic_split("2.0.0=10, 2.1.0=5") == {"2.0.0": 10.0, "2.1.0": 5.0}
+    with pytest.raises(ValueError):
+        parse_traffic_split("2.0.0=80,2.1.0=30")
+    with pytest.raises(ValueError):
+        parse_traffic_split("2.0.0")
+
+
+def test_lru_memory_cap_evicts_least_recent_version(registry):
+    assert registry.available_versions() == ["v1", "v2"]
+
+    registry.get("v1")
+    registry.max_bytes = registry.stats()['bytes']  # Room for exactly one version
+    registry.get("v2")
+
+    assert registry.loaded_versions() == ["v2"]
+    assert registry.evictions == 1
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_route_by_header_and_split(registry):
+    assert registry.route() == PRIMARY_VERSION
+    assert registry.route("v2") == "v2"
+    with pytest.raises(KeyError):
+        registry.route("missing")
+
+    registry.traffic_split = {"v1": 100.0}
+    assert {registry.route() for _ in range(20)} == {"v1"}
+    assert registry.route(PRIMARY_VERSION) == PRIMARY_VERSION
+
+    # Unknown or deleted split versions fall through to the primary model
+    registry.traffic_split = {"missing": 100.0}
+    assert {registry.route() for _ in range(20)} == {PRIMARY_VERSION}
+
+
+@pytest.mark.asyncio
+async def test_shadow_scoring_records_disagreement(registry, monkeypatch):
+    monkeypatch.setattr(executor_module, "model_registry", registry)
+    scorer = ShadowScorer(InferenceExecutor('thread', 2), registry, version="v1")
+
+    cases = [{**CASE, "days_past_due": days} for days in range(0, 300, 10)]
+    primary = model_service.predict_batch(cases)
+    # Flip one primary category so exactly one disagreement is expected
+    primary[0] = {**primary[0], 'risk_category': 'NOT_A_CATEGORY'}
+
+    scorer.submit(cases, primary)
+    await scorer.drain()
+
+    stats = registry.stats()['versions']['v1']
+    assert stats['shadow_rows'] == len(cases)
+    assert stats['shadow_disagreements'] == 1
+    assert stats['shadow_max_abs_diff'] == 0.0
+    assert stats['requests'] == 1
+
+
+@pytest.mark.asyncio
+async def test_version_header_routes_request(registry, monkeypatch):
+    monkeypatch.setattr(executor_module, "model_registry", registry)
+    monkeypatch.setattr(predictions, "model_registry", registry)
+    monkeypatch.setattr(versioning, "model_registry", registry)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        routed = await client.post("/predictions/recovery", json=CASE, headers={"X-Model-Version": "v2"})
+        unknown = await client.post("/predictions/recovery", json=CASE, headers={"X-Model-Version": "v9"})
+
+    assert routed.status_code == 200
+    assert routed.headers["X-Model-Version"] == "v2"
+    assert routed.json() == model_service.predict(CASE)
+    assert unknown.status_code == 404
+    assert registry.loaded_versions() == ["v2"]
+    assert registry.stats()['versions']['v2']['requests'] == 1
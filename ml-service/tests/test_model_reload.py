@@ -0,0 +1,103 @@
+"""
+Tests for hot model reload
+"""
+import os
+import shutil
+import threading
+
+import httpx
+import pytest
+
+from app.config import MODEL_PATH, SCALER_PATH
+from app.main import app
+from app.models.model_watcher import ModelWatcher
+from app.routers import admin
+
+CASES = [
+    {
+        "debt_amount": 5000.0 + i,
+        "days_past_due": 45,
+        "credit_score": 650.0,
+        "payment_attempts": 3,
+        "communication_count": 5
+    }
+    for i in range(20)
+]
+
+
+def test_in_flight_request_keeps_its_bundle(loaded_service, monkeypatch):
+    """A reload during a prediction does not change the bundle that prediction uses"""
+    old_bundle = loaded_service.bundle
+    expected = loaded_service.predict_batch(CASES)
+    scoring = threading.Event()
+    release = threading.Event()
+    original_predict_positive = old_bundle.predict_positive
+
+    def blocking_predict_positive(features_array):
+        scoring.set()
+        release.wait(5)
+        return original_predict_positive(features_array)
+
+    monkeypatch.setattr(old_bundle, "predict_positive", blocking_predict_positive)
+
+    results = {}
+    worker = threading.Thread(target=lambda: results.update(batch=loaded_service.predict_batch(CASES)))
+    worker.start()
+    assert scoring.wait(5)
+
+    reload = loaded_service.reload_model()
+    assert loaded_service.bundle is not old_bundle
+
+    release.set()
+    worker.join(5)
+
+    assert results['batch'] == expected
+    assert reload['previous_version'] == old_bundle.version
+
+
+def test_failed_reload_keeps_serving_current_bundle(loaded_service, tmp_path):
+    bundle = loaded_service.bundle
+
+    with pytest.raises(RuntimeError):
+        loaded_service.reload_model(model_path=tmp_path / "missing.pkl")
+
+    assert loaded_service.bundle is bundle
+    assert loaded_service.predict(CASES[0])
+
+
+@pytest.mark.asyncio
+async def test_reload_endpoint_requires_admin_token(loaded_service, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_API_TOKEN", "secret")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        missing = await client.post("/admin/reload-model")
+        wrong = await client.post("/admin/reload-model", headers={"X-Admin-Token": "nope"})
+        ok = await client.post("/admin/reload-model", headers={"X-Admin-Token": "secret"})
+
+    assert missing.status_code == 403
+    assert wrong.status_code == 403
+    assert ok.status_code == 200
+    assert ok.json()["model_version"] == loaded_service.get_model_version()
+
+
+def test_watcher_reloads_once_change_is_stable(loaded_service, tmp_path):
+    model_path = shutil.copy(MODEL_PATH, tmp_path / MODEL_PATH.name)
+    scaler_path = shutil.copy(SCALER_PATH, tmp_path / SCALER_PATH.name)
+    watcher = ModelWatcher(model_path, scaler_path, tmp_path / "model_metadata.json")
+    watcher.mark_current()
+
+    assert watcher.poll() is False
+
+    stat = os.stat(model_path)
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    bundle = loaded_service.bundle
+
+    assert watcher.poll() is False  # Change seen, waiting for it to settle
+    assert loaded_service.bundle is bundle
+    assert watcher.poll() is True
+    assert loaded_service.bundle is not bundle
+    assert loaded_service.bundle.source == tmp_path
+
+    # Serve the artifacts from the real models directory again
+    loaded_service.load_model()
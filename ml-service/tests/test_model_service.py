@@ -0,0 +1,74 @@
+"""
+Tests for the model service inference paths
+"""
+import numpy as np
+
+from app.config import TREE_ENGINE_MAX_ROWS
+from app.models.model_service import model_service
+
+
+def _random_cases(n, seed=0):
+    """Generate random cases within the PredictionRequest ranges"""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "debt_amount": float(rng.uniform(1, 100000)),
+            "days_past_due": int(rng.integers(0, 365)),
+            "credit_score": float(rng.uniform(300, 850)),
+            "payment_attempts": int(rng.integers(0, 20)),
+            "communication_count": int(rng.integers(0, 50))
+        }
+        for _ in range(n)
+    ]
+
+
+def test_predict_batch_matches_single_predictions(loaded_service):
+    """Vectorized batch results must be identical to per-case results"""
+    cases = _random_cases(200)
+
+    expected = [loaded_service.predict(case) for case in cases]
+
+    assert loaded_service.predict_batch(cases) == expected
+    # Chunking must not change the results
+    assert loaded_service.predict_batch(cases, chunk_size=7) == expected
+
+
+def test_large_batch_matches_single_rows(loaded_service):
+    """Batches above TREE_ENGINE_MAX_ROWS give every case its single-row probability"""
+    bundle = loaded_service.bundle
+    features = bundle.preprocess_batch(_random_cases(TREE_ENGINE_MAX_ROWS + 300, seed=2))
+
+    batch = bundle.predict_full(features)
+    single = np.array([bundle.predict_full(row.reshape(1, -1))[0] for row in features])
+    assert np.array_equal(batch, single)
+
+
+def test_predict_batch_empty(loaded_service):
+    """Empty batch returns no predictions"""
+    assert loaded_service.predict_batch([]) == []
+
+
+def test_categorize_risk_batch_matches_scalar():
+    """Vectorized categorization agrees with the scalar version at the thresholds"""
+    probabilities = np.array([0.0, 0.3999, 0.4, 0.55, 0.6999, 0.7, 1.0])
+
+    categories, strategies = model_service._categorize_risk_batch(probabilities)
+
+    expected = [model_service._categorize_risk(p) for p in probabilities]
+    assert list(zip(categories, strategies)) == expected
+
+
+def test_feature_plan_matches_pandas_preprocessing(loaded_service):
+    """Pandas-free feature plan must produce bit-identical scaled rows"""
+    cases = _random_cases(50, seed=1)
+    # Partial case falls back to defaults for the missing features
+    cases.append({"debt_amount": 1234.5, "credit_score": 700})
+
+    for case in cases:
+        fast = loaded_service.preprocess_features(case)
+        reference = loaded_service.bundle.preprocess_features_pandas(case)
+        assert fast.shape == reference.shape
+        assert np.array_equal(fast, reference)
+
+    batch = loaded_service.preprocess_batch(cases)
+    assert np.array_equal(batch, np.vstack([loaded_service.bundle.preprocess_features_pandas(c) for c in cases]))
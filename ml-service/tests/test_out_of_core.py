@@ -0,0 +1,109 @@
+"""
+Tests for the out-of-core training data pipeline
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.config import TEST_SIZE, RANDOM_STATE
+from app.training.out_of_core import build_training_matrix, DuplicateFilter, TrainingMatrix
+import app.utils.data_loader as data_loader
+from app.utils.data_loader import DataLoader
+from app.utils.dataset_cache import DatasetCache
+from app.utils.feature_engineering import FeatureEngineer
+from app.utils.preprocessor import DataPreprocessor
+from benchmarks.bench_data_loader import synthetic_loan_csv
+
+
+@pytest.fixture(scope="module")
+def loan_csv(tmp_path_factory):
+    """Synthetic loan.csv whose last 300 rows repeat earlier ones"""
+    path = synthetic_loan_csv(tmp_path_factory.mktemp("out_of_core") / "loan.csv", rows=3000, total_columns=40)
+    df = pd.read_csv(path)
+    pd.concat([df, df.iloc[::10]]).to_csv(path, index=False)
+    return path
+
+
+def _in_memory(path):
+    """Features and fitted preprocessor of the in-memory pipeline over the whole file"""
+    df = DataLoader.load_lending_club(path=path, sample_frac=1.0)
+    df = DataLoader.handle_missing_values(DataLoader.clean_data(df))
+    features = FeatureEngineer.add_derived_features(FeatureEngineer.create_lending_club_features(df))
+    preprocessor = DataPreprocessor()
+    X, y = preprocessor.fit_transform(features.dropna(subset=['recovered']))
+    return X, y, preprocessor
+
+
+def test_matrix_matches_in_memory_pipeline(loan_csv, tmp_path):
+    matrix = build_training_matrix(tmp_path, path=loan_csv, chunk_rows=700)
+    X, y, expected = _in_memory(loan_csv)
+
+    assert matrix.manifest['raw']['rows_read'] == 3300 and matrix.manifest['raw']['rows_kept'] == 3000
+    assert matrix.feature_names == expected.feature_names
+    assert matrix.X_train.dtype == np.float32 and isinstance(matrix.X_train, np.memmap)
+    assert len(matrix.X_train) + len(matrix.X_test) == len(X)
+
+    scaler = matrix.preprocessor().scaler
+    np.testing.assert_allclose(scaler.mean_, expected.scaler.mean_, rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(scaler.scale_, expected.scaler.scale_, rtol=1e-6)
+
+    # Rows keep their order within each split; the split does not depend on chunking
+    test = np.random.default_rng(RANDOM_STATE).random(len(X)) < TEST_SIZE
+    np.testing.assert_allclose(matrix.X_train, X.to_numpy()[~test], rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(matrix.X_test, X.to_numpy()[test], rtol=1e-5, atol=1e-5)
+    np.testing.assert_array_equal(matrix.y_test, y.to_numpy()[test])
+
+
+def test_matrix_reopens_and_serves_the_same_scaling(loan_csv, tmp_path):
+    built = build_training_matrix(tmp_path, path=loan_csv, chunk_rows=1000)
+    reopened = TrainingMatrix(tmp_path)
+    preprocessor = reopened.preprocessor()
+
+    np.testing.assert_array_equal(reopened.X_test, built.X_test)
+    assert list(preprocessor.scaler.feature_names_in_) == reopened.feature_names
+    assert not np.isnan(reopened.X_train).any()
+
+
+def test_cached_dataset_is_read_in_chunk_rows_chunks(loan_csv, tmp_path, monkeypatch):
+    """Through the cache (built in one 3300-row batch) every pass still reads chunk_rows rows at a time"""
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(data_loader, "LENDING_CLUB_PATH", loan_csv)
+    monkeypatch.setattr(data_loader, "dataset_cache", DatasetCache(tmp_path / "cache", enabled=True))
+    iter_lending_club = DataLoader.iter_lending_club
+    chunk_sizes = []
+
+    def recording(*args, **kwargs):
+        for chunk in iter_lending_club(*args, **kwargs):
+            chunk_sizes.append(len(chunk))
+            yield chunk
+
+    monkeypatch.setattr(DataLoader, "iter_lending_club", staticmethod(recording))
+    cached = build_training_matrix(tmp_path / "cached", chunk_rows=500)
+    direct = build_training_matrix(tmp_path / "direct", path=loan_csv, chunk_rows=500)
+
+    assert max(chunk_sizes) == 500
+    assert chunk_sizes[:7] == [500] * 6 + [300]
+    np.testing.assert_array_equal(cached.X_train, direct.X_train)
+    np.testing.assert_array_equal(cached.y_test, direct.y_test)
+
+
+def test_extra_sources_are_appended_and_scaled_together(loan_csv, tmp_path):
+    extra = pd.DataFrame({'credit_score': [700.0, np.nan, 650.0], 'recovered': [1.0, 0.0, np.nan]})
+
+    lending_club_only = build_training_matrix(tmp_path / "lc", path=loan_csv, test_size=0.0)
+    combined = build_training_matrix(tmp_path / "all", path=loan_csv, test_size=0.0,
+                                     extra_features={'extra': extra})
+
+    assert len(combined.X_train) == len(lending_club_only.X_train) + 2
+    assert combined.manifest['extra_sources'] == ['extra']
+    assert len(combined.X_test) == 0
+
+
+def test_duplicate_filter_spans_chunks():
+    duplicates = DuplicateFilter()
+    first = pd.DataFrame({'a': [1, 2, 2], 'b': ['x', 'y', 'y']})
+    second = pd.DataFrame({'a': [2, 3, 1], 'b': ['y', 'z', 'w']})
+
+    assert duplicates.keep(first).tolist() == [True, True, False]
+    assert duplicates.keep(second).tolist() == [False, True, True]
+    assert len(duplicates.seen) == 4
@@ -0,0 +1,88 @@
+"""
+Tests for the prediction result cache
+"""
+import time
+
+import pytest
+
+from app.models.model_service import model_service
+from app.models.prediction_cache import PredictionCache, prediction_cache
+
+CASE = {
+    "debt_amount": 5000.0,
+    "days_past_due": 45,
+    "credit_score": 650.0,
+    "payment_attempts": 3,
+    "communication_count": 5
+}
+
+RESULT = {
+    'recovery_probability': 0.5,
+    'risk_category': 'MEDIUM_RISK',
+    'recommended_strategy': 'NEGOTIATION_OFFER'
+}
+
+
+def test_keys_are_canonical_and_versioned():
+    as_floats = {name: float(value) for name, value in CASE.items()}
+
+    assert PredictionCache.make_key(CASE, "v1") == PredictionCache.make_key(as_floats, "v1")
+    assert PredictionCache.make_key(CASE, "v1") != PredictionCache.make_key(CASE, "v2")
+    assert PredictionCache.make_key({**CASE, "income_level": 1.0}, "v1") is None
+
+
+def test_lru_eviction_by_entry_count():
+    cache = PredictionCache(max_entries=2, max_bytes=1 << 20, ttl_seconds=60)
+    keys = [PredictionCache.make_key({**CASE, "days_past_due": i}, "v1") for i in range(3)]
+
+    cache.put(keys[0], RESULT)
+    cache.put(keys[1], RESULT)
+    assert cache.get(keys[0]) == RESULT  # keys[0] is now most recently used
+    cache.put(keys[2], RESULT)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == RESULT
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 2
+    assert stats['misses'] == 1
+
+
+def test_memory_limit_evicts_entries():
+    key = PredictionCache.make_key(CASE, "v1")
+    entry_size = PredictionCache._entry_size(key, RESULT)
+    cache = PredictionCache(max_entries=100, max_bytes=entry_size * 3, ttl_seconds=60)
+
+    for i in range(10):
+        cache.put(PredictionCache.make_key({**CASE, "days_past_due": i}, "v1"), RESULT)
+
+    stats = cache.stats()
+    assert stats['entries'] == 3
+    assert stats['bytes'] <= stats['max_bytes']
+    assert stats['evictions'] == 7
+
+
+def test_entries_expire_after_ttl():
+    cache = PredictionCache(max_entries=10, max_bytes=1 << 20, ttl_seconds=0.01)
+    key = PredictionCache.make_key(CASE, "v1")
+
+    cache.put(key, RESULT)
+    time.sleep(0.02)
+
+    assert cache.get(key) is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_predict_uses_cache_and_model_load_clears_it():
+    if not model_service.is_model_loaded():
+        pytest.skip("Model is not loaded")
+
+    first = model_service.predict(CASE)
+    hits = prediction_cache.hits
+    assert model_service.predict(CASE) == first
+    assert prediction_cache.hits == hits + 1
+
+    model_service.load_model()
+
+    assert prediction_cache.stats()['entries'] == 0
+    assert model_service.predict(CASE) == first
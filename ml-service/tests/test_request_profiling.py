@@ -0,0 +1,85 @@
+"""
+Tests for Server-Timing headers and on-demand request profiling
+"""
+import httpx
+import pytest
+
+from app.main import app
+from app.models.model_service import model_service
+from app.models.request_profiler import request_profiler
+from app.routers import admin
+
+CASE = {
+    "debt_amount": 5000.0,
+    "days_past_due": 45,
+    "credit_score": 650.0,
+    "payment_attempts": 3,
+    "communication_count": 5
+}
+
+
+def _stages(header: str) -> dict:
+    """Parse a Server-Timing header into stage -> milliseconds"""
+    stages = {}
+    for entry in header.split(","):
+        name, _, duration = entry.strip().partition(";dur=")
+        stages[name] = float(duration)
+    return stages
+
+
+@pytest.mark.asyncio
+async def test_server_timing_is_opt_in(loaded_service):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        plain = await client.post("/predictions/recovery", json=dict(CASE, debt_amount=6001.0))
+        single = await client.post("/predictions/recovery", json=dict(CASE, debt_amount=6002.0),
+                                   headers={"X-Server-Timing": "1"})
+        batch = await client.post("/predictions/batch", json={"cases": [CASE] * 5},
+                                  headers={"X-Server-Timing": "1"})
+
+    assert "server-timing" not in plain.headers
+    for response in (single, batch):
+        assert response.status_code == 200
+        stages = _stages(response.headers["server-timing"])
+        for stage in ("parse", "preprocess", "predict_proba", "categorize", "serialize", "total"):
+            assert stage in stages
+        assert stages["total"] >= stages["predict_proba"]
+
+
+@pytest.mark.asyncio
+async def test_profiling_requires_admin_token(loaded_service, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_API_TOKEN", "secret")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/predictions/batch", json={"cases": [CASE]},
+                                     headers={"X-Profile": "1", "X-Admin-Token": "nope"})
+
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_profiled_request_stores_worker_profile(loaded_service, monkeypatch, tmp_path):
+    monkeypatch.setattr(admin, "ADMIN_API_TOKEN", "secret")
+    monkeypatch.setattr(request_profiler, "directory", tmp_path)
+    token = {"X-Admin-Token": "secret"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/predictions/batch", json={"cases": [CASE] * 20},
+                                     headers={"X-Profile": "1", **token})
+        profile_id = response.headers["x-profile-id"]
+        listing = await client.get("/admin/profiles", headers=token)
+        profile = await client.get(f"/admin/profiles/{profile_id}", params={"limit": 500}, headers=token)
+        missing = await client.get("/admin/profiles/nope", headers=token)
+
+    assert response.status_code == 200
+    assert len(response.json()["predictions"]) == 20
+    assert "server-timing" in response.headers
+    assert (tmp_path / f"{profile_id}.prof").exists()
+    assert listing.json()["profiles"] == [profile_id]
+
+    # The inference task ran on an executor thread and is merged into the profile
+    functions = [entry["function"] for entry in profile.json()["functions"]]
+    assert any(function.endswith("(predict_batch)") and "model_service" in function for function in functions)
+    assert missing.status_code == 404
@@ -0,0 +1,96 @@
+"""
+Tests for the streaming samplers
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.data_loader import DataLoader
+from app.utils.sampling import ReservoirSampler, StratifiedSampler, FractionSampler, concat_chunks
+from benchmarks.bench_data_loader import synthetic_loan_csv
+
+
+def _loans(n: int, seed: int = 0) -> pd.DataFrame:
+    """Mostly current loans, a few defaults and late loans, some missing statuses"""
+    rng = np.random.default_rng(seed)
+    status = rng.choice(['Current', 'Fully Paid', 'Charged Off', 'Default', 'Late (31-120 days)', None],
+                        p=[0.6, 0.3, 0.085, 0.005, 0.005, 0.005], size=n)
+    return pd.DataFrame({'loan_status': pd.Categorical(status), 'amount': rng.gamma(2.0, 5000.0, size=n)})
+
+
+def _feed(sampler, df: pd.DataFrame, chunk_rows: int):
+    for start in range(0, len(df), chunk_rows):
+        sampler.add(df.iloc[start:start + chunk_rows])
+    return sampler
+
+
+def test_reservoir_sample_has_exact_size_and_ignores_chunking():
+    df = _loans(20000)
+    samples = [_feed(ReservoirSampler(1000, random_state=7), df, chunk_rows).result()
+               for chunk_rows in (333, 5000, 20000)]
+
+    assert len(samples[0]) == 1000 and samples[0].index.is_unique
+    assert samples[0].index.is_monotonic_increasing
+    for other in samples[1:]:
+        pd.testing.assert_frame_equal(samples[0], other)
+    # Drawn from the whole file, not its head
+    assert samples[0].index.min() < 1000 and samples[0].index.max() > 19000
+    assert ReservoirSampler(1000, random_state=8).rows_seen == 0
+    assert not _feed(ReservoirSampler(1000, random_state=8), df, 5000).result().equals(samples[0])
+
+
+def test_reservoir_holds_at_most_its_size():
+    sampler = ReservoirSampler(50)
+    for chunk in np.array_split(_loans(10000), 40):
+        sampler.add(chunk)
+        assert len(sampler._sample) <= 50
+    assert sampler.rows_seen == 10000
+    assert len(_feed(ReservoirSampler(50), _loans(30), 7).result()) == 30
+
+
+def test_stratified_sample_keeps_rare_outcomes():
+    df = _loans(50000, seed=1)
+    counts = df['loan_status'].value_counts(dropna=False)
+    sampler = _feed(StratifiedSampler('loan_status', 2000, min_per_stratum=100, random_state=3), df, 4096)
+    sample = sampler.result()
+    sampled = sample['loan_status'].value_counts(dropna=False)
+
+    assert len(sample) == 2000 and sum(sampler.allocation().values()) == 2000
+    # Rare strata get their floor (plus their share of the rest); a uniform
+    # sample would keep about 10 rows of each
+    for status in ('Default', 'Late (31-120 days)'):
+        assert 100 <= sampled[status] < 110
+    assert 100 <= sample['loan_status'].isna().sum() < 110
+    # Rows above the floor follow the stratum sizes
+    assert (sampled['Current'] - 100) / (sampled['Fully Paid'] - 100) == pytest.approx(
+        (counts['Current'] - 100) / (counts['Fully Paid'] - 100), rel=0.01
+    )
+    assert isinstance(sample['loan_status'].dtype, pd.CategoricalDtype)
+
+    again = _feed(StratifiedSampler('loan_status', 2000, min_per_stratum=100, random_state=3), df, 1000).result()
+    pd.testing.assert_frame_equal(sample, again)
+
+
+def test_stratified_sample_of_a_small_file_keeps_every_row():
+    df = _loans(300)
+    sample = _feed(StratifiedSampler('loan_status', 1000), df, 64).result()
+    pd.testing.assert_frame_equal(sample, df)
+
+
+def test_concat_chunks_merges_categories():
+    first = pd.DataFrame({'grade': pd.Categorical(['A', 'B'])})
+    second = pd.DataFrame({'grade': pd.Categorical(['C'])}, index=[2])
+    merged = concat_chunks([first, second])
+    assert list(merged['grade'].cat.categories) == ['A', 'B', 'C']
+    assert len(_feed(FractionSampler(1.0), _loans(100), 30).result()) == 100
+
+
+def test_loader_samples_exact_size_from_whole_file(tmp_path):
+    path = synthetic_loan_csv(tmp_path / "loan.csv", rows=6000, total_columns=40, chunk_rows=3000)
+
+    head = DataLoader.load_lending_club(nrows=500, path=path, chunk_rows=1000)
+    sample = DataLoader.load_lending_club(sample_size=500, stratify_by='loan_status', path=path, chunk_rows=1000)
+
+    assert head.index.tolist() == list(range(500))
+    assert len(sample) == 500 and sample.index.max() > 5000
+    assert sample['loan_status'].value_counts().min() >= 1
@@ -0,0 +1,58 @@
+"""
+Tests for lazy startup and readiness gating
+"""
+import json
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models.model_service import model_service, LOAD_STATE_READY
+
+
+def test_import_does_not_load_model_or_training_stack():
+    """Importing the API loads no model and no training-only or pandas/sklearn modules"""
+    script = (
+        "import json, sys, warnings; warnings.filterwarnings('ignore');"
+        "import app.main; from app.models.model_service import model_service;"
+        "print(json.dumps({'loaded': model_service.is_model_loaded(), 'modules': [m for m in "
+        "('app.training', 'xgboost', 'matplotlib', 'seaborn', 'pandas', 'sklearn') if m in sys.modules]}))"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+
+    assert result == {'loaded': False, 'modules': []}
+
+
+@pytest.mark.asyncio
+async def test_ready_is_503_until_model_is_loaded(monkeypatch):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        monkeypatch.setattr(model_service, "is_ready", lambda: False)
+        not_ready = await client.get("/ready")
+        monkeypatch.undo()
+        health = await client.get("/health")
+
+    assert not_ready.status_code == 503
+    assert not_ready.json()['ready'] is False
+    assert health.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_ready_after_background_load():
+    if not model_service.is_model_loaded():
+        pytest.skip("Model is not loaded")
+
+    model_service.load_in_background(warm_up=True).join(30)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/ready")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['ready'] is True
+    assert body['load_state'] == LOAD_STATE_READY
+    assert body['model_version'] == model_service.get_model_version()
@@ -0,0 +1,78 @@
+"""
+Tests for streaming NDJSON scoring
+"""
+import json
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models.model_service import model_service
+from app.models.stream_scorer import StreamScorer, iter_lines
+from tests.test_model_service import _random_cases
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_across_chunk_boundaries():
+    data = b'{"a": 1}\n\n' + b'x' * 50 + b'\n{"b": 2}'
+
+    lines = await _collect(iter_lines(_chunks(data, 7), max_line_bytes=20))
+
+    assert lines == [b'{"a": 1}', b'', None, b'{"b": 2}']
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_scored_in_bounded_batches():
+    class RecordingExecutor:
+        def __init__(self):
+            self.batch_sizes = []
+
+        async def predict_batch(self, cases, chunk_size=None, version=None, timings=None):
+            self.batch_sizes.append(len(cases))
+            return [{'recovery_probability': case['debt_amount']} for case in cases]
+
+    executor = RecordingExecutor()
+    cases = _random_cases(250)
+    body = b''.join(json.dumps(case).encode() + b'\n' for case in cases)
+
+    blocks = await _collect(StreamScorer(executor, chunk_rows=100).score(_chunks(body, 4096)))
+
+    assert executor.batch_sizes == [100, 100, 50]
+    assert len(blocks) == 3
+    output = [json.loads(line) for block in blocks for line in block.splitlines()]
+    assert [row['recovery_probability'] for row in output] == [case['debt_amount'] for case in cases]
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_keeps_order_and_reports_bad_lines():
+    if not model_service.is_model_loaded():
+        pytest.skip("Model is not loaded")
+
+    cases = _random_cases(2500, seed=3)
+    lines = [json.dumps(case) for case in cases]
+    lines.insert(10, '{"debt_amount": -1}')
+    lines.insert(20, 'not json')
+    body = '\n'.join(lines).encode()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/predictions/stream", content=body)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    output = [json.loads(line) for line in response.text.splitlines()]
+
+    assert len(output) == len(lines)
+    assert output[10]['line'] == 11 and 'debt_amount' in output[10]['error']
+    assert output[20]['line'] == 21 and output[20]['error'].startswith('Invalid JSON')
+    predictions = [row for row in output if 'error' not in row]
+    assert predictions == model_service.predict_batch(cases)
@@ -0,0 +1,102 @@
+"""
+Tests for top-K selection by expected recovery
+"""
+import json
+
+import httpx
+import numpy as np
+import pytest
+
+from app.main import app
+from app.models.model_service import model_service
+from app.models.top_k import TopK, TopKScorer
+from tests.test_model_service import _random_cases
+from tests.test_stream_scorer import _chunks
+
+
+def test_top_k_matches_full_sort_across_chunks():
+    """Folding chunks in keeps exactly the K best rows, best first"""
+    rng = np.random.default_rng(0)
+    scores = rng.normal(size=10000)
+    top = TopK(25)
+
+    for start in range(0, len(scores), 999):
+        top.add(scores[start:start + 999], row=np.arange(start, min(start + 999, len(scores))))
+    result = top.result()
+
+    expected = np.argsort(-scores)[:25]
+    np.testing.assert_array_equal(result['row'], expected)
+    np.testing.assert_array_equal(result['score'], scores[expected])
+    assert top.rows_seen == len(scores)
+
+
+def test_top_k_with_fewer_rows_than_k_and_ties():
+    """Short inputs are returned whole; ties keep arrival order"""
+    top = TopK(10)
+    top.add(np.array([1.0, 3.0, 1.0]), row=np.array([0, 1, 2]))
+    top.add(np.array([3.0]), row=np.array([3]))
+
+    assert top.result()['row'].tolist() == [1, 3, 0, 2]
+    assert len(TopK(3).result()['score']) == 0
+    with pytest.raises(ValueError):
+        TopK(0)
+
+
+@pytest.mark.asyncio
+async def test_scorer_ranks_by_expected_recovery_and_skips_bad_lines():
+    """Expected recovery is probability * debt; invalid lines are counted, not scored"""
+    class DaysPastDueExecutor:
+        def __init__(self):
+            self.batch_sizes = []
+
+        async def predict_columns(self, columns, chunk_size=None, version=None, timings=None):
+            self.batch_sizes.append(len(columns['debt_amount']))
+            # Probability falls with days past due, so the richest case is not always first
+            probabilities = 1.0 / (1.0 + columns['days_past_due'])
+            return probabilities, np.zeros(len(probabilities), dtype=np.int8)
+
+    cases = _random_cases(250, seed=1)
+    lines = [json.dumps(dict(case, case_id=f"C-{i}")) for i, case in enumerate(cases)]
+    lines.insert(5, '{"debt_amount": -1}')
+    lines.insert(7, '{"case_id": [1]}')
+    body = '\n'.join(lines).encode()
+    executor = DaysPastDueExecutor()
+
+    timings = {}
+    selection = await TopKScorer(executor, chunk_rows=100).select(_chunks(body, 1000), k=5, timings=timings)
+
+    assert executor.batch_sizes == [98, 100, 52]
+    assert selection['total_cases'] == 250 and selection['invalid_cases'] == 2
+    assert [error['line'] for error in selection['errors']] == [6, 8]
+    expected = sorted(range(len(cases)),
+                      key=lambda i: -cases[i]['debt_amount'] / (1 + cases[i]['days_past_due']))[:5]
+    assert [case['case_id'] for case in selection['cases']] == [f"C-{i}" for i in expected]
+    assert [case['rank'] for case in selection['cases']] == [1, 2, 3, 4, 5]
+    assert 'parse' in timings
+
+
+@pytest.mark.asyncio
+async def test_top_k_endpoint_matches_batch_scoring():
+    if not model_service.is_model_loaded():
+        pytest.skip("Model is not loaded")
+
+    cases = _random_cases(3000, seed=4)
+    body = '\n'.join(json.dumps(case) for case in cases).encode()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/predictions/top-k", params={"k": 10}, content=body)
+        invalid_k = await client.post("/predictions/top-k", params={"k": 0}, content=body)
+
+    assert response.status_code == 200
+    assert invalid_k.status_code == 422
+    selection = response.json()
+    assert selection['total_cases'] == 3000 and len(selection['cases']) == 10
+
+    probabilities = np.array([result['recovery_probability'] for result in model_service.predict_batch(cases)])
+    expected_recovery = probabilities * np.array([case['debt_amount'] for case in cases])
+    ranked = [case['line'] - 1 for case in selection['cases']]
+    # Batch results are rounded to 4 decimals, so compare the set against a slightly wider cut
+    assert set(ranked) <= set(np.argsort(-expected_recovery)[:15].tolist())
+    assert [case['expected_recovery'] for case in selection['cases']] == sorted(
+        (case['expected_recovery'] for case in selection['cases']), reverse=True)
@@ -0,0 +1,90 @@
+"""
+Tests for the native NumPy tree-ensemble engine
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from xgboost import XGBClassifier
+
+from app.models.model_service import model_service
+from app.models.tree_engine import export_ensemble, build_engine, XGBOOST_TOLERANCE
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(2000, 6))
+    y = (X[:, 0] - 0.5 * X[:, 3] + rng.normal(scale=0.8, size=2000) > 0).astype(int)
+    X_test = rng.normal(0.0, 1.5, size=(1000, 6))
+    return X, y, X_test
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0),
+    GradientBoostingClassifier(n_estimators=30, max_depth=3, random_state=0)
+])
+def test_sklearn_ensembles_match_within_1e9(model, training_data):
+    X, y, X_test = training_data
+    model.fit(X, y)
+
+    engine = export_ensemble(model)
+
+    expected = model.predict_proba(X_test)
+    actual = engine.predict_proba(X_test)
+    assert np.max(np.abs(expected - actual)) <= 1e-9
+
+
+def test_xgboost_matches_to_float32_precision(training_data):
+    X, y, X_test = training_data
+    model = XGBClassifier(n_estimators=30, max_depth=4, random_state=0).fit(X, y)
+
+    engine = export_ensemble(model)
+
+    X_missing = X_test.copy()
+    X_missing[::5, 1] = np.nan
+    for data in (X_test, X_missing):
+        diff = np.abs(model.predict_proba(data)[:, 1] - engine.predict_proba(data)[:, 1])
+        assert diff.max() <= XGBOOST_TOLERANCE
+
+
+def test_single_row_matches_batch(training_data):
+    """Per-row results do not depend on batch size"""
+    X, y, X_test = training_data
+    engine = export_ensemble(RandomForestClassifier(n_estimators=15, random_state=0).fit(X, y))
+
+    batch = engine.predict_proba(X_test[:50])[:, 1]
+    single = np.array([engine.predict_proba(row.reshape(1, -1))[0, 1] for row in X_test[:50]])
+    assert np.array_equal(batch, single)
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestClassifier(n_estimators=15, random_state=0),
+    GradientBoostingClassifier(n_estimators=20, max_depth=3, random_state=0),
+    XGBClassifier(n_estimators=20, max_depth=4, random_state=0)
+])
+def test_model_leaves_give_identical_probabilities(model, training_data):
+    """Scoring the model's own apply() output matches engine traversal bit for bit"""
+    X, y, X_test = training_data
+    engine = export_ensemble(model.fit(X, y))
+
+    X_missing = X_test.copy()
+    X_missing[::5, 1] = np.nan
+    data = X_missing if isinstance(model, XGBClassifier) else X_test
+    assert np.array_equal(engine.predict_proba_from_leaves(model.apply(data)), engine.predict_proba(data))
+
+
+def test_unsupported_model_falls_back(training_data):
+    X, y, _ = training_data
+    assert build_engine(LogisticRegression().fit(X, y), X.shape[1]) is None
+
+
+def test_served_model_uses_engine():
+    if not model_service.is_model_loaded() or model_service.bundle.engine is None:
+        pytest.skip("Served model is not loaded or not a supported tree ensemble")
+
+    rng = np.random.default_rng(7)
+    X = rng.normal(size=(100, model_service.bundle.model.n_features_in_))
+
+    expected = model_service.bundle.model.predict_proba(X)[:, 1]
+    assert np.max(np.abs(model_service.bundle.predict_positive(X) - expected)) <= 1e-9